@@ -0,0 +1,183 @@
+"""
+Micro-benchmark del parser de precios y stock
+
+Reconstruye los textos de precio/stock tal como aparecen en cada tienda a
+partir de los products.json de los scrapers y compara el parser compilado
+(scrapers/price_parser.py) con la implementación anterior basada en re.search.
+
+Uso:
+    python benchmarks/bench_price_parser.py
+    python benchmarks/bench_price_parser.py --repeat 20
+"""
+import sys
+import os
+import re
+import json
+import time
+import argparse
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT_DIR, 'scrapers'))
+
+import price_parser
+
+STORES = ['sercoplus', 'impacto', 'cyccomputer', 'computershop']
+
+
+def european(value):
+    """1809.6 -> '1.809,60'"""
+    return f'{value:,.2f}'.replace(',', 'X').replace('.', ',').replace('X', '.')
+
+
+def spaced(value):
+    """3270.0 -> '3 270.00'"""
+    return f'{value:,.2f}'.replace(',', ' ')
+
+
+# Formato de precio que muestra cada tienda en sus listados
+PRICE_FORMATS = {
+    'sercoplus': lambda usd, pen: f'${european(usd)} (S/{european(pen)})',
+    'impacto': lambda usd, pen: f'${spaced(usd)} - S/{spaced(pen)}',
+    'cyccomputer': lambda usd, pen: f'$\xa0{european(usd)}\xa0(S/\xa0{european(pen)})',
+    'computershop': lambda usd, pen: f'$ {european(usd)}   (S/ {european(pen)})',
+}
+
+
+def stock_text(stock):
+    """Texto de stock tal como aparece en las tiendas"""
+    if not stock or stock == '0':
+        return 'Agotado'
+    if stock.startswith('+') or stock.endswith('+'):
+        return f"Stock: Mayor a {stock.strip('+')} Artículos"
+    return f'Stock: {stock} Artículos'
+
+
+def load_samples():
+    """Devuelve [(texto_precio, usd, pen)] y [texto_stock] de los fixtures"""
+    prices = []
+    stocks = []
+    for store in STORES:
+        path = os.path.join(ROOT_DIR, 'scrapers', store, 'products.json')
+        with open(path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        for products in data['categories'].values():
+            for product in products:
+                usd = product.get('price_usd')
+                pen = product.get('price_local')
+                if usd and pen:
+                    prices.append((PRICE_FORMATS[store](usd, pen), usd, pen))
+                stocks.append(stock_text(str(product.get('stock') or '')))
+    return prices, stocks
+
+
+# --- Implementación anterior (BaseScraper antes del parser compilado) ---
+
+def legacy_normalize(price_str):
+    price_str = price_str.replace(' ', '').replace('\xa0', '').replace(' ', '')
+    dot_count = price_str.count('.')
+    comma_count = price_str.count(',')
+    if dot_count > 1:
+        price_str = price_str.replace('.', '').replace(',', '.')
+    elif comma_count > 1:
+        price_str = price_str.replace(',', '')
+    elif dot_count == 1 and comma_count == 1:
+        if price_str.rfind(',') > price_str.rfind('.'):
+            price_str = price_str.replace('.', '').replace(',', '.')
+        else:
+            price_str = price_str.replace(',', '')
+    elif comma_count == 1 and dot_count == 0:
+        after_comma = price_str[price_str.rfind(',')+1:]
+        if len(after_comma) == 2:
+            price_str = price_str.replace(',', '.')
+        elif len(after_comma) == 3:
+            price_str = price_str.replace(',', '')
+    return price_str
+
+
+def legacy_parse_price(price_text):
+    prices = {}
+    price_text = re.sub(r'\s+', ' ', price_text.strip())
+    match = re.search(r'\$\s*([\d,\.]+)\s*\((?:S/|S\/)\s*([\d,\.]+)\)', price_text)
+    if match:
+        return {'price_usd': float(legacy_normalize(match.group(1))),
+                'price_local': float(legacy_normalize(match.group(2))), 'currency': 'PEN'}
+    match = re.search(r'\$\s*([\d,\.\s]+?)\s*-\s*(?:S/|S\/)\s*([\d,\.\s]+)', price_text)
+    if match:
+        return {'price_usd': float(legacy_normalize(match.group(1))),
+                'price_local': float(legacy_normalize(match.group(2))), 'currency': 'PEN'}
+    match = re.search(r'\$\s*([\d,\.]+)\s*(?:ó|o)\s*(?:S/|S\/)\s*([\d,\.]+)', price_text)
+    if match:
+        return {'price_usd': float(match.group(1).replace(',', '')),
+                'price_local': float(match.group(2).replace(',', '')), 'currency': 'PEN'}
+    usd_match = re.search(r'\$\s*([\d,\.]+)', price_text)
+    if usd_match:
+        prices['price_usd'] = float(usd_match.group(1).replace(',', ''))
+        prices['currency'] = 'USD'
+        pen_match = re.search(r'(?:S/|S\/)\s*([\d,\.]+)', price_text)
+        if pen_match:
+            prices['price_local'] = float(pen_match.group(1).replace(',', ''))
+            prices['currency'] = 'PEN'
+    return prices
+
+
+def legacy_parse_stock(stock_text):
+    if not stock_text:
+        return '0'
+    lower = stock_text.lower()
+    numbers = re.findall(r'\d+', stock_text)
+    if numbers:
+        qty = int(numbers[0])
+        if any(w in lower for w in ['mayor a', 'más de', 'more than', 'mayor de']):
+            return f'+{qty}'
+        return str(qty)
+    if any(w in lower for w in ['agotado', 'sin stock', 'out of stock', 'no disponible']):
+        return '0'
+    if any(w in lower for w in ['disponible', 'stock', 'en stock', 'available']):
+        return '+5'
+    if any(w in lower for w in ['pocas unidades', 'últimas unidades', 'low stock']):
+        return '1-4'
+    return '0'
+
+
+def timeit(func, samples, repeat):
+    started = time.perf_counter()
+    for _ in range(repeat):
+        for sample in samples:
+            func(sample)
+    elapsed = time.perf_counter() - started
+    return len(samples) * repeat / elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark del parser de precios/stock')
+    parser.add_argument('--repeat', type=int, default=10, help='Pasadas sobre los fixtures (default: 10)')
+    args = parser.parse_args()
+
+    prices, stocks = load_samples()
+    price_texts = [text for text, _, _ in prices]
+
+    mismatches = sum(
+        1 for text, usd, pen in prices
+        if price_parser.parse_price(text) != {'price_usd': usd, 'price_local': pen, 'currency': 'PEN'}
+    )
+
+    print(f"\n📦 {len(price_texts)} textos de precio, {len(stocks)} textos de stock "
+          f"({len(set(price_texts))} precios únicos)")
+    print(f"🔎 Precios mal interpretados por el parser nuevo: {mismatches}")
+
+    rows = [
+        ('parse_price (anterior)', timeit(legacy_parse_price, price_texts, args.repeat)),
+        ('parse_price (sin caché)', timeit(price_parser._parse_price_cached.__wrapped__, price_texts, args.repeat)),
+        ('parse_price (con caché)', timeit(price_parser.parse_price, price_texts, args.repeat)),
+        ('parse_stock (anterior)', timeit(legacy_parse_stock, stocks, args.repeat)),
+        ('parse_stock (nuevo)', timeit(price_parser.parse_stock, stocks, args.repeat)),
+    ]
+
+    print(f"\n{'Parser':<26} {'textos/s':>12}")
+    print("-" * 40)
+    for name, throughput in rows:
+        print(f"{name:<26} {throughput:>12,.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,306 @@
+"""
+Benchmark de los scrapers contra fixtures HTML grabados
+
+Reproduce páginas de categoría de cada tienda (ver fixtures.py) a través de
+un servidor HTTP local (stub_server.py) y mide:
+
+- e2e_pages_per_sec: páginas/s de punta a punta (HTTP + parseo + enriquecido),
+  con las pausas entre páginas desactivadas
+- parse_ms_per_page: parseo de una página ya descargada (BeautifulSoup + extracción)
+- enrich_*_us_per_product: clasificación de nombres, sin caché y con caché en memoria
+- db_*_ms_per_1k: carga de productos con upsert_products en una BD temporal
+
+Los resultados se comparan con benchmarks/baselines.json; una métrica que
+empeora más de --tolerance se marca como regresión y el script sale con 1.
+
+Uso:
+    python benchmarks/bench_scrapers.py
+    python benchmarks/bench_scrapers.py --store sercoplus --repeat 5
+    python benchmarks/bench_scrapers.py --save-baseline
+"""
+import sys
+import os
+import io
+import json
+import time
+import platform
+import tempfile
+import argparse
+import contextlib
+from datetime import datetime
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, ROOT_DIR)
+sys.path.insert(0, BENCH_DIR)
+
+# The enrichment cache must not persist between runs (or touch the repo's file)
+os.environ['ENRICHMENT_CACHE_PATH'] = ''
+
+from bs4 import BeautifulSoup
+
+from fixtures import STORES, CATEGORY, category_url
+from stub_server import StubServer
+from database import Database
+from scrapers.registry import create_scraper
+from scrapers import classifier
+from scrapers.enrichment import EnrichmentCache
+from scrapers.memorykings_scraper import MemoryKingsScraper
+
+BASELINES_FILE = os.path.join(BENCH_DIR, 'baselines.json')
+TOLERANCE = 0.25
+DB_PRODUCTS = 5000
+
+
+def make_scraper(store_key: str):
+    if store_key == 'memorykings':
+        return MemoryKingsScraper(use_selenium=False)
+    return create_scraper(store_key, use_selenium=False)
+
+
+def scrape(scraper, store_key: str, url: str):
+    """Recorre la categoría completa y devuelve los productos"""
+    if store_key == 'memorykings':
+        return scraper.scrape_category_page(url)
+    return [product for page in scraper.iter_category_pages(url) for product in page]
+
+
+@contextlib.contextmanager
+def quiet():
+    """Silencia los prints de progreso de los scrapers y las pausas entre páginas"""
+    sleep = time.sleep
+    time.sleep = lambda seconds: None
+    try:
+        with contextlib.redirect_stdout(io.StringIO()):
+            yield
+    finally:
+        time.sleep = sleep
+
+
+def best_of(repeat: int, func):
+    """Mejor tiempo (s) de varias ejecuciones y el resultado de la última"""
+    timings = []
+    result = None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = func()
+        timings.append(time.perf_counter() - started)
+    return min(timings), result
+
+
+# --- Métricas ---
+
+def bench_e2e(stub: StubServer, store_key: str, repeat: int) -> float:
+    """Páginas/s de punta a punta a través del stub HTTP"""
+    scraper = make_scraper(store_key)
+    url = category_url(stub.url, store_key)
+
+    def run():
+        stub.requests.clear()
+        with quiet():
+            products = scrape(scraper, store_key, url)
+        assert products, f'{store_key}: sin productos en los fixtures'
+        return len(stub.requests)
+
+    elapsed, pages = best_of(repeat, run)
+    return pages / elapsed
+
+
+def bench_parse(stub: StubServer, store_key: str, repeat: int) -> float:
+    """ms por página parseando HTML ya descargado (sin red)"""
+    scraper = make_scraper(store_key)
+    url = category_url(stub.url, store_key)
+
+    # Download once through the stub, then serve the bytes from memory
+    pages = {}
+    fetch_page = scraper.fetch_page
+
+    def recording_fetch(page_url, *args, **kwargs):
+        pages[page_url] = stub.load(page_url[len(stub.url):])
+        return fetch_page(page_url, *args, **kwargs)
+
+    scraper.fetch_page = recording_fetch
+    with quiet():
+        scrape(scraper, store_key, url)
+
+    scraper.fetch_page = lambda page_url, *args, **kwargs: BeautifulSoup(pages[page_url], 'html.parser')
+    with quiet():
+        elapsed, _ = best_of(repeat, lambda: scrape(scraper, store_key, url))
+    return elapsed * 1000 / len(pages)
+
+
+def load_names():
+    """(tienda, nombre, categoría) de todos los products.json"""
+    names = []
+    for store_key, (source, _) in STORES.items():
+        if store_key == 'memorykings':
+            continue
+        with open(os.path.join(ROOT_DIR, 'scrapers', source, 'products.json'), 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        for category, products in data['categories'].items():
+            names.extend((store_key, product['name'], category) for product in products)
+    return names
+
+
+def bench_enrichment(repeat: int):
+    """µs por producto clasificando sin caché y con la caché en memoria caliente"""
+    names = load_names()
+
+    cold, _ = best_of(repeat, lambda: [classifier.classify(name, category) for _, name, category in names])
+
+    cache = EnrichmentCache(path=None, maxsize=len(names) * 2)
+    for store, name, category in names:
+        cache.get(store, name, category)
+    warm, _ = best_of(repeat, lambda: [cache.get(*entry) for entry in names])
+
+    per_product = 1_000_000 / len(names)
+    return cold * per_product, warm * per_product
+
+
+def load_db_products(count: int):
+    """count productos de los products.json, con URLs únicas"""
+    source = []
+    for store_key, (store_source, _) in STORES.items():
+        if store_key == 'memorykings':
+            continue
+        with open(os.path.join(ROOT_DIR, 'scrapers', store_source, 'products.json'), 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        for products in data['categories'].values():
+            source.extend(dict(product, store=store_key) for product in products)
+
+    products = []
+    for i in range(count):
+        product = dict(source[i % len(source)])
+        product['source_url'] = f"{product['source_url']}#{i}"
+        product['sku'] = f"{product.get('sku') or ''}-{i}"
+        products.append(product)
+    return products
+
+
+def bench_db(repeat: int):
+    """ms por 1000 productos: inserción en BD vacía y actualización con precios nuevos"""
+    products = load_db_products(DB_PRODUCTS)
+    updated = [dict(product, price_usd=round((product.get('price_usd') or 0) * 0.97, 2))
+               for product in products]
+
+    insert_times = []
+    update_times = []
+    for _ in range(repeat):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            db = Database(os.path.join(tmp_dir, 'bench.db'))
+            db.init_db()
+            started = time.perf_counter()
+            db.upsert_products(products)
+            insert_times.append(time.perf_counter() - started)
+            started = time.perf_counter()
+            db.upsert_products(updated)
+            update_times.append(time.perf_counter() - started)
+
+    per_1k = 1000 * 1000 / DB_PRODUCTS
+    return min(insert_times) * per_1k, min(update_times) * per_1k
+
+
+def run_benchmarks(stores, repeat: int):
+    metrics = {}
+    with StubServer() as stub:
+        for store_key in stores:
+            metrics[f'{store_key}.e2e_pages_per_sec'] = bench_e2e(stub, store_key, repeat)
+            metrics[f'{store_key}.parse_ms_per_page'] = bench_parse(stub, store_key, repeat)
+            print(f"✅ {store_key}")
+
+    cold, warm = bench_enrichment(repeat)
+    metrics['enrich_cold_us_per_product'] = cold
+    metrics['enrich_warm_us_per_product'] = warm
+
+    insert, update = bench_db(repeat)
+    metrics['db_insert_ms_per_1k'] = insert
+    metrics['db_update_ms_per_1k'] = update
+    return {name: round(value, 3) for name, value in metrics.items()}
+
+
+# --- Baselines ---
+
+def load_baseline(path: str = BASELINES_FILE):
+    if not os.path.exists(path):
+        return {}
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f).get('metrics', {})
+
+
+def save_baseline(metrics, path: str = BASELINES_FILE):
+    data = {
+        'recorded_at': datetime.now().isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'machine': platform.machine(),
+        'metrics': metrics,
+    }
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(data, f, indent=2, ensure_ascii=False)
+        f.write('\n')
+
+
+def compare(metrics, baseline, tolerance: float = TOLERANCE):
+    """
+    Compara con la línea base
+
+    Las métricas *_per_sec son mejores cuanto más altas; el resto (tiempos),
+    cuanto más bajas.
+
+    Returns:
+        Lista de (métrica, actual, base, cambio relativo, es_regresión)
+    """
+    rows = []
+    for name, value in metrics.items():
+        base = baseline.get(name)
+        if not base:
+            rows.append((name, value, None, None, False))
+            continue
+        change = (value - base) / base
+        if name.endswith('_per_sec'):
+            regression = change < -tolerance
+        else:
+            regression = change > tolerance
+        rows.append((name, value, base, change, regression))
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark de scrapers con fixtures HTML grabados')
+    parser.add_argument('--store', choices=list(STORES), action='append',
+                        help='Tienda a medir (repetible; default: todas)')
+    parser.add_argument('--repeat', type=int, default=3, help='Ejecuciones por métrica, se toma la mejor (default: 3)')
+    parser.add_argument('--tolerance', type=float, default=TOLERANCE,
+                        help=f'Empeoramiento relativo tolerado antes de marcar regresión (default: {TOLERANCE})')
+    parser.add_argument('--baseline', default=BASELINES_FILE, help='Archivo de línea base')
+    parser.add_argument('--save-baseline', action='store_true', help='Guardar los resultados como nueva línea base')
+    args = parser.parse_args()
+
+    stores = args.store or list(STORES)
+    print(f"🏁 Benchmark de scrapers ({CATEGORY}, {args.repeat} ejecuciones por métrica)\n")
+    metrics = run_benchmarks(stores, args.repeat)
+
+    rows = compare(metrics, load_baseline(args.baseline), args.tolerance)
+    print(f"\n{'Métrica':<40} {'actual':>12} {'base':>12} {'cambio':>9}")
+    print("-" * 76)
+    for name, value, base, change, regression in rows:
+        base_text = f'{base:>12,.3f}' if base is not None else f"{'-':>12}"
+        change_text = f'{change:>+8.1%}' if change is not None else f"{'':>8}"
+        flag = ' ⚠️' if regression else ''
+        print(f"{name:<40} {value:>12,.3f} {base_text} {change_text}{flag}")
+
+    if args.save_baseline:
+        baseline = load_baseline(args.baseline)
+        baseline.update(metrics)
+        save_baseline(baseline, args.baseline)
+        print(f"\n💾 Línea base guardada en {args.baseline}")
+        return
+
+    regressions = [row[0] for row in rows if row[4]]
+    if regressions:
+        print(f"\n❌ {len(regressions)} regresión(es) de más del {args.tolerance:.0%}: {', '.join(regressions)}")
+        sys.exit(1)
+    print("\n✅ Sin regresiones")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,142 @@
+"""
+Benchmark del arranque en frío de la API
+
+Mide, en procesos nuevos (como un worker que despierta en Render/Railway):
+
+- startup_import_main_ms: importar main (FastAPI, Database, rutas...)
+- startup_first_health_ms: desde lanzar uvicorn hasta la primera respuesta
+  200 de /api/health
+
+Con --read-only mide los workers de scripts/serve.py (API_READ_ONLY=true).
+Los resultados se comparan con benchmarks/baselines.json como en
+bench_scrapers.py.
+
+Uso:
+    python benchmarks/bench_startup.py
+    python benchmarks/bench_startup.py --repeat 10 --read-only
+    python benchmarks/bench_startup.py --save-baseline
+"""
+import sys
+import os
+import time
+import asyncio
+import argparse
+import statistics
+import subprocess
+import tempfile
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, ROOT_DIR)
+sys.path.insert(0, BENCH_DIR)
+
+from bench_scrapers import BASELINES_FILE, TOLERANCE, load_baseline, save_baseline, compare
+from catalog import build_catalog
+from loadtest import HttpConnection, free_port
+
+IMPORT_SNIPPET = "import time; t = time.perf_counter(); import main; print(time.perf_counter() - t)"
+
+
+def server_env(db_path: str, read_only: bool) -> dict:
+    return dict(os.environ, DATABASE_PATH=db_path, API_RELOAD='False', ENRICHMENT_CACHE_PATH='',
+                API_READ_ONLY='true' if read_only else 'false', LOG_LEVEL='WARNING')
+
+
+def measure_import(env: dict) -> float:
+    """Seconds to import main in a fresh interpreter"""
+    output = subprocess.run([sys.executable, '-c', IMPORT_SNIPPET], cwd=ROOT_DIR, env=env,
+                            capture_output=True, text=True, check=True).stdout
+    return float(output.strip().splitlines()[-1])
+
+
+def measure_first_health(env: dict, timeout: float = 60.0) -> float:
+    """Seconds from spawning uvicorn to the first 200 on /api/health"""
+    port = free_port()
+
+    async def wait_ready(process):
+        deadline = time.perf_counter() + timeout
+        while time.perf_counter() < deadline:
+            if process.poll() is not None:
+                raise RuntimeError(f"uvicorn terminó con código {process.returncode}")
+            conn = HttpConnection('127.0.0.1', port)
+            try:
+                status, _ = await conn.get('/api/health', timeout=1)
+                if status == 200:
+                    return
+            except OSError:
+                await asyncio.sleep(0.005)
+            finally:
+                await conn.close()
+        raise RuntimeError(f"uvicorn no respondió en {timeout:.0f} s")
+
+    started = time.perf_counter()
+    process = subprocess.Popen(
+        [sys.executable, '-m', 'uvicorn', 'main:app', '--host', '127.0.0.1', '--port', str(port),
+         '--log-level', 'warning'],
+        cwd=ROOT_DIR, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+    )
+    try:
+        asyncio.run(wait_ready(process))
+        return time.perf_counter() - started
+    finally:
+        process.terminate()
+        process.wait(timeout=10)
+
+
+def run_benchmarks(repeat: int, read_only: bool):
+    """Median over repeat runs, in ms; the first run warms the OS file cache"""
+    prefix = 'startup_ro' if read_only else 'startup'
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        db_path = os.path.join(tmp_dir, 'startup.db')
+        build_catalog(db_path, 500, with_deals=False)
+        env = server_env(db_path, read_only)
+
+        measure_import(env)
+        imports = [measure_import(env) for _ in range(repeat)]
+        health = [measure_first_health(env) for _ in range(repeat)]
+
+    return {
+        f'{prefix}_import_main_ms': round(statistics.median(imports) * 1000, 3),
+        f'{prefix}_first_health_ms': round(statistics.median(health) * 1000, 3),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark del arranque en frío de la API')
+    parser.add_argument('--repeat', type=int, default=5, help='Arranques por métrica, se toma la mediana (default: 5)')
+    parser.add_argument('--read-only', action='store_true', help='Medir workers de solo lectura (scripts/serve.py)')
+    parser.add_argument('--tolerance', type=float, default=TOLERANCE,
+                        help=f'Empeoramiento relativo tolerado antes de marcar regresión (default: {TOLERANCE})')
+    parser.add_argument('--baseline', default=BASELINES_FILE, help='Archivo de línea base')
+    parser.add_argument('--save-baseline', action='store_true', help='Guardar los resultados como nueva línea base')
+    args = parser.parse_args()
+
+    mode = 'solo lectura' if args.read_only else 'normal'
+    print(f"🥶 Arranque en frío de la API ({mode}, mediana de {args.repeat})\n")
+    metrics = run_benchmarks(args.repeat, args.read_only)
+
+    rows = compare(metrics, load_baseline(args.baseline), args.tolerance)
+    print(f"{'Métrica':<40} {'actual':>12} {'base':>12} {'cambio':>9}")
+    print("-" * 76)
+    for name, value, base, change, regression in rows:
+        base_text = f'{base:>12,.3f}' if base is not None else f"{'-':>12}"
+        change_text = f'{change:>+8.1%}' if change is not None else f"{'':>8}"
+        flag = ' ⚠️' if regression else ''
+        print(f"{name:<40} {value:>12,.3f} {base_text} {change_text}{flag}")
+
+    if args.save_baseline:
+        baseline = load_baseline(args.baseline)
+        baseline.update(metrics)
+        save_baseline(baseline, args.baseline)
+        print(f"\n💾 Línea base guardada en {args.baseline}")
+        return
+
+    regressions = [row[0] for row in rows if row[4]]
+    if regressions:
+        print(f"\n❌ {len(regressions)} regresión(es) de más del {args.tolerance:.0%}: {', '.join(regressions)}")
+        sys.exit(1)
+    print("\n✅ Sin regresiones")
+
+
+if __name__ == "__main__":
+    main()
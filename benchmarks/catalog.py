@@ -0,0 +1,324 @@
+"""
+Catálogo sintético para pruebas de escala (10k a 1M productos)
+
+Genera una base de datos con el esquema de database.py y productos
+realistas, con las distribuciones de la base existente (pc_prices.db):
+
+- reparto por tienda y tipo de componente, stock
+- precios log-normales por tipo y tipo de cambio PEN/USD observado
+- nombres (y su marca) derivados de nombres reales del mismo tipo, con los
+  códigos de modelo cambiados para que cada modelo sea nuevo
+- el mismo modelo en varias tiendas con nombres casi iguales (mayúsculas,
+  comas, palabras de relleno, sufijos), como los que el matcher debe emparejar
+- historial de precios (paseo aleatorio hacia el precio actual) con
+  fechas en los últimos --days días
+
+Las filas se insertan en bloque (executemany), no con upsert_products, para
+que 1M de productos se generen en minutos.
+
+Uso:
+    python benchmarks/catalog.py --size 100000 --out /tmp/catalog_100k.db
+    python benchmarks/catalog.py --size 1000000 --out /tmp/catalog_1m.db --history 4 --no-deals
+    python scripts/profile_queries.py --db /tmp/catalog_100k.db --threshold 20
+"""
+import sys
+import os
+import re
+import math
+import time
+import random
+import sqlite3
+import argparse
+import statistics
+from datetime import datetime, timedelta
+from urllib.parse import urlsplit
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT_DIR)
+
+from database import Database
+from scrapers.classifier import normalize_product_name
+
+DEFAULT_SOURCE = os.path.join(ROOT_DIR, 'pc_prices.db')
+CHUNK = 10000
+
+# Share of models listed by more than one store, and how many stores list them
+DUPLICATE_RATE = 0.35
+EXTRA_STORES = (1, 1, 1, 2, 2, 3)
+
+# Runs mixing letters and digits (model codes, part numbers) are regenerated
+_CODE_RE = re.compile(r'[A-Z0-9][A-Z0-9\-/]{4,}')
+# Spec parts (20MB, 4.60GHZ, 6000MHZ, 2X16GB, DDR5, CL38) are kept as they are
+_SPEC_RE = re.compile(r'^\d*X?\d+(?:[A-Z]{1,3}\d?)?$|^(?:DDR|GEN|CL|X|PCIE|LGA|AM)\d*$')
+
+# Cosmetic differences between stores listing the same model
+FILLER_WORDS = ('NUEVO', 'OEM', 'BOX', 'BLACK', 'RGB', 'ORIGINAL')
+SEPARATORS = (' ', ', ', ' - ', ' / ')
+
+
+def load_profile(db_path: str = DEFAULT_SOURCE) -> dict:
+    """
+    Distributions of the existing catalog
+
+    Returns:
+        Dictionary with store/type weights, (name, brand) templates per
+        type, log-price mean/stdev per type, stock weights, PEN rate and the
+        URL host of each store
+    """
+    conn = sqlite3.connect(db_path)
+    rows = conn.execute("""
+        SELECT name, component_type, brand, price_usd, price_local, currency, stock, store, source_url, image_url
+        FROM products WHERE is_active = 1 AND price_usd > 0 AND component_type != ''
+    """).fetchall()
+    conn.close()
+    if not rows:
+        raise ValueError(f"{db_path} no tiene productos activos de los que partir")
+
+    stores, types, stock, hosts = {}, {}, {}, {}
+    names, log_prices = {}, {}
+    rates, with_image = [], 0
+    for name, component_type, brand, price_usd, price_local, currency, stock_value, store, url, image in rows:
+        stores[store] = stores.get(store, 0) + 1
+        types[component_type] = types.get(component_type, 0) + 1
+        stock[stock_value or 'unknown'] = stock.get(stock_value or 'unknown', 0) + 1
+        names.setdefault(component_type, []).append((name, brand or 'Unknown'))
+        log_prices.setdefault(component_type, []).append(math.log(price_usd))
+        if currency == 'PEN' and price_local:
+            rates.append(price_local / price_usd)
+        if url:
+            hosts.setdefault(store, urlsplit(url).netloc)
+        with_image += bool(image)
+
+    return {
+        'stores': stores,
+        'types': types,
+        'stock': stock,
+        'names': names,
+        'prices': {t: (statistics.fmean(v), statistics.pstdev(v) or 0.5) for t, v in log_prices.items()},
+        'pen_rate': statistics.median(rates) if rates else 3.75,
+        'hosts': hosts,
+        'image_share': with_image / len(rows),
+    }
+
+
+def _weighted(rng: random.Random, weights: dict):
+    return rng.choices(list(weights), weights=list(weights.values()))[0]
+
+
+def _new_code(rng: random.Random, token: str) -> str:
+    """Same shape as token (letters stay letters, digits stay digits), new characters"""
+    return ''.join(
+        rng.choice('ABCDEFGHJKLMNPRSTUVWXYZ') if char.isalpha() else
+        rng.choice('0123456789') if char.isdigit() else char
+        for char in token
+    )
+
+
+def model_name(rng: random.Random, template: str) -> str:
+    """A new model built on a real name: model codes regenerated, specs kept"""
+    changed = False
+
+    def replace(match):
+        nonlocal changed
+        code = match.group(0)
+        if all(_SPEC_RE.match(part) for part in re.split(r'[\-/]', code) if part) \
+                or not re.search(r'\d', code) or not re.search(r'[A-Z]', code):
+            return code
+        changed = True
+        return _new_code(rng, code)
+
+    name = _CODE_RE.sub(replace, ' '.join(template.upper().replace(',', ' ').split()))
+    if not changed:
+        name += ' ' + _new_code(rng, 'PN' + 'X' * rng.randint(3, 5) + '9' * rng.randint(2, 4))
+    return name
+
+
+def store_variant(rng: random.Random, name: str) -> str:
+    """How another store would title the same model"""
+    tokens = name.split()
+    roll = rng.random()
+    if roll < 0.3:
+        # Same words: only case and separators differ (same normalized_name)
+        separator = rng.choice(SEPARATORS)
+        cut = rng.randint(1, max(1, len(tokens) - 1))
+        text = ' '.join(tokens[:cut]) + separator + ' '.join(tokens[cut:])
+        return text.title() if rng.random() < 0.5 else text
+    if roll < 0.6 and len(tokens) > 3:
+        # A spec word dropped or moved
+        i = rng.randrange(1, len(tokens))
+        word = tokens.pop(i)
+        if rng.random() < 0.5:
+            tokens.insert(rng.randrange(1, len(tokens) + 1), word)
+        return ' '.join(tokens)
+    if roll < 0.85:
+        return f"{name} {rng.choice(FILLER_WORDS)}"
+    # Part number in parentheses, as several stores append it
+    return f"{name} ({_new_code(rng, 'XX-XXXXX-99')})"
+
+
+def generate_products(profile: dict, size: int, rng: random.Random,
+                      duplicate_rate: float = DUPLICATE_RATE, now: datetime = None):
+    """
+    Yields size product rows (Product.to_row() order) grouped by model
+
+    Each model is listed by one store, or by 2-4 stores with near-duplicate
+    names and prices a few percent apart.
+    """
+    now = now or datetime.now()
+    store_names = list(profile['stores'])
+    produced = 0
+    while produced < size:
+        component_type = _weighted(rng, profile['types'])
+        template, brand = rng.choice(profile['names'][component_type])
+        name = model_name(rng, template)
+        mu, sigma = profile['prices'][component_type]
+        base_price = math.exp(rng.gauss(mu, sigma))
+
+        first_store = _weighted(rng, profile['stores'])
+        listing = [first_store]
+        if rng.random() < duplicate_rate:
+            others = [store for store in store_names if store != first_store]
+            listing += rng.sample(others, min(len(others), rng.choice(EXTRA_STORES)))
+
+        for position, store in enumerate(listing):
+            if produced >= size:
+                return
+            title = name if position == 0 else store_variant(rng, name)
+            price_usd = round(base_price * rng.uniform(0.93, 1.08), 2)
+            slug = re.sub(r'[^a-z0-9]+', '-', title.lower()).strip('-')[:60]
+            url = f"https://{profile['hosts'].get(store, store + '.pe')}/producto/{slug}-{produced}"
+            image = f"{url.rsplit('/', 1)[0]}/img/{produced}.jpg" if rng.random() < profile['image_share'] else ''
+            scraped = now - timedelta(minutes=rng.randint(0, 3 * 24 * 60))
+            produced += 1
+            yield (
+                title, normalize_product_name(title), component_type, brand,
+                _new_code(rng, 'XXX99999'), price_usd, round(price_usd * profile['pen_rate'], 2), 'PEN',
+                _weighted(rng, profile['stock']), store, url, image, scraped.isoformat(), None,
+            )
+
+
+def price_path(rng: random.Random, price: float, points: int, days: int, now: datetime):
+    """(price, recorded_at) samples ending at the current price, oldest first"""
+    if points <= 1:
+        return [(price, now)]
+    offsets = sorted(rng.sample(range(1, days * 24), min(points - 1, days * 24 - 1)), reverse=True)
+    walk = [price]
+    for _ in offsets:
+        step = rng.gauss(0, 0.03)
+        if rng.random() < 0.1:
+            step += rng.uniform(0.05, 0.2)  # Earlier price before a drop
+        walk.append(max(0.01, walk[-1] * (1 + step)))
+    walk = walk[1:][::-1]
+    return [(round(value, 2), now - timedelta(hours=hours)) for value, hours in zip(walk, offsets)] + [(price, now)]
+
+
+def build_catalog(db_path: str, size: int, seed: int = 42, source: str = DEFAULT_SOURCE,
+                  history: int = 6, days: int = 90, duplicate_rate: float = DUPLICATE_RATE,
+                  with_deals: bool = True, progress: bool = False) -> int:
+    """
+    Creates (or extends) db_path with size synthetic products
+
+    Args:
+        db_path: Database to fill (schema created by Database.init_db)
+        size: Number of products
+        seed: Random seed, same seed and source give the same catalog
+        source: Database whose distributions are copied
+        history: price_history rows per product (the last one is the current price)
+        days: How far back the price history goes
+        duplicate_rate: Share of models listed by several stores
+        with_deals: Recompute the deals table afterwards (deals.py)
+        progress: Print progress every CHUNK products
+
+    Returns:
+        Number of active products in db_path
+    """
+    rng = random.Random(seed)
+    profile = load_profile(source)
+    now = datetime.now().replace(microsecond=0)
+
+    db = Database(db_path)
+    db.init_db()
+    conn = db.get_connection()
+    cursor = conn.cursor()
+    fields = ('name', 'normalized_name', 'component_type', 'brand', 'sku', 'price_usd', 'price_local',
+              'currency', 'stock', 'store', 'source_url', 'image_url', 'last_scraped', 'metadata')
+    insert_product = f"INSERT INTO products ({', '.join(fields)}) VALUES ({', '.join('?' * len(fields))})"
+
+    started = time.perf_counter()
+    rows = generate_products(profile, size, rng, duplicate_rate, now)
+    done = 0
+    try:
+        while True:
+            chunk = [row for _, row in zip(range(CHUNK), rows)]
+            if not chunk:
+                break
+            cursor.execute("BEGIN")
+            cursor.executemany(insert_product, chunk)
+            # Rows of one executemany get consecutive ids
+            first_id = cursor.execute("SELECT MAX(id) FROM products").fetchone()[0] - len(chunk) + 1
+            points = []
+            for offset, row in enumerate(chunk):
+                for price, recorded_at in price_path(rng, row[5], history, days, now):
+                    points.append((first_id + offset, price, round(price * profile['pen_rate'], 2), row[8],
+                                   recorded_at.strftime('%Y-%m-%d %H:%M:%S')))
+            cursor.executemany("""
+                INSERT INTO price_history (product_id, price_usd, price_local, stock, recorded_at)
+                VALUES (?, ?, ?, ?, ?)
+            """, points)
+            conn.commit()
+            done += len(chunk)
+            if progress:
+                print(f"  {done:>9,} / {size:,} productos ({done / (time.perf_counter() - started):,.0f}/s)")
+    finally:
+        conn.close()
+
+    db.refresh_store_counts()
+    if with_deals:
+        import deals
+        deals.refresh_deals(db)
+    return db.count_products()
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Genera un catálogo sintético para pruebas de escala')
+    parser.add_argument('--size', type=int, default=100000, help='Productos a generar (default: 100000)')
+    parser.add_argument('--out', required=True, help='Base de datos a crear')
+    parser.add_argument('--source', default=DEFAULT_SOURCE,
+                        help='Base de datos de la que se copian las distribuciones (default: pc_prices.db)')
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--history', type=int, default=6, help='Puntos de historial por producto (default: 6)')
+    parser.add_argument('--days', type=int, default=90, help='Días que cubre el historial (default: 90)')
+    parser.add_argument('--duplicate-rate', type=float, default=DUPLICATE_RATE,
+                        help=f'Fracción de modelos en varias tiendas (default: {DUPLICATE_RATE})')
+    parser.add_argument('--no-deals', action='store_true', help='No recalcular la tabla deals')
+    parser.add_argument('--force', action='store_true', help='Sobrescribir --out si existe')
+    args = parser.parse_args()
+
+    if os.path.abspath(args.out) == os.path.abspath(args.source):
+        print("❌ --out no puede ser la base de datos de origen")
+        sys.exit(1)
+    if os.path.exists(args.out):
+        if not args.force:
+            print(f"❌ {args.out} ya existe (usar --force para sobrescribirla)")
+            sys.exit(1)
+        os.remove(args.out)
+
+    print(f"🏭 Generando {args.size:,} productos en {args.out} (distribuciones de {args.source})")
+    started = time.perf_counter()
+    total = build_catalog(args.out, args.size, args.seed, args.source, args.history, args.days,
+                          args.duplicate_rate, not args.no_deals, progress=True)
+    elapsed = time.perf_counter() - started
+
+    conn = sqlite3.connect(args.out)
+    history = conn.execute("SELECT COUNT(*) FROM price_history").fetchone()[0]
+    shared = conn.execute("SELECT COUNT(*) FROM products WHERE store_count > 1").fetchone()[0]
+    deals_count = conn.execute("SELECT COUNT(*) FROM deals").fetchone()[0]
+    conn.close()
+
+    print(f"\n✅ {total:,} productos, {history:,} precios históricos, {deals_count:,} ofertas en {elapsed:.1f}s")
+    print(f"   {shared:,} productos con el mismo nombre normalizado en varias tiendas")
+    print(f"   Tamaño: {os.path.getsize(args.out) / 1024 / 1024:.1f} MB")
+
+
+if __name__ == "__main__":
+    main()
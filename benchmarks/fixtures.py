@@ -0,0 +1,269 @@
+"""
+Fixtures HTML para los benchmarks de scrapers
+
+Páginas de categoría (y de producto para MemoryKings) guardadas en
+benchmarks/fixtures/<tienda>/, servidas por stub_server.py. Hay dos fuentes:
+
+- --record: descarga páginas reales de la tienda (requiere red). Los enlaces
+  a la propia tienda se reescriben para que apunten al stub.
+- --rebuild: reconstruye las páginas con el marcado que esperan los
+  scrapers a partir de los products.json guardados (sin red).
+
+Uso:
+    python benchmarks/fixtures.py --rebuild
+    python benchmarks/fixtures.py --record sercoplus --pages 2
+"""
+import sys
+import os
+import re
+import json
+import argparse
+from html import escape
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, ROOT_DIR)
+sys.path.insert(0, BENCH_DIR)
+
+from bench_price_parser import PRICE_FORMATS, stock_text
+
+FIXTURES_DIR = os.path.join(BENCH_DIR, 'fixtures')
+
+# Replaced with the stub server's base URL when a page is served
+STUB_TOKEN = '__STUB__'
+
+CATEGORY = 'procesadores'
+PRODUCTS_PER_PAGE = 24
+PAGES = 2
+
+# Store key -> (products.json used to rebuild, live base URL)
+STORES = {
+    'sercoplus': ('sercoplus', 'https://sercoplus.com'),
+    'pcimpacto': ('impacto', 'https://www.impacto.com.pe'),
+    'cyccomputer': ('cyccomputer', 'https://cyccomputer.pe'),
+    'computershop': ('computershop', 'https://computershopperu.com'),
+    'memorykings': ('cyccomputer', 'https://www.memorykings.pe'),
+}
+
+
+def page_path(store_key: str, category: str, page: int) -> str:
+    return os.path.join(FIXTURES_DIR, store_key, category, f'page-{page}.html')
+
+
+def product_path(store_key: str, slug: str) -> str:
+    return os.path.join(FIXTURES_DIR, store_key, 'producto', f'{slug}.html')
+
+
+def category_url(base_url: str, store_key: str, category: str = CATEGORY) -> str:
+    """URL de la categoría en el stub (lo que se pasa a iter_category_pages)"""
+    if store_key == 'pcimpacto':
+        # Impacto rebuilds the query string when paginating
+        return f'{base_url}/{store_key}/{category}?c=19'
+    return f'{base_url}/{store_key}/{category}'
+
+
+def slugify(text: str) -> str:
+    return re.sub(r'[^a-z0-9]+', '-', text.lower()).strip('-')[:60]
+
+
+def _write(path: str, html: str):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write(html)
+
+
+# --- Reconstrucción desde products.json ---
+
+def _chrome(title: str, body: str) -> str:
+    """Cabecera, menú y pie comunes: el peso típico de una página de tienda"""
+    menu = '\n'.join(
+        f'<li class="menu-entry"><a class="menu-link" href="/categoria/{i}-seccion-{i}">Sección {i}</a></li>'
+        for i in range(120)
+    )
+    scripts = '\n'.join(
+        f'<script>window.dataLayer=window.dataLayer||[];dataLayer.push({{"evento":"vista","bloque":{i}}});</script>'
+        for i in range(40)
+    )
+    return f"""<!DOCTYPE html>
+<html lang="es">
+<head>
+<meta charset="utf-8">
+<title>{escape(title)}</title>
+<link rel="stylesheet" href="/themes/assets/css/theme.css">
+{scripts}
+</head>
+<body id="category">
+<header id="header"><nav class="main-menu"><ul>
+{menu}
+</ul></nav></header>
+<main id="wrapper">
+{body}
+</main>
+<footer id="footer"><div class="footer-container">
+<p>Lima - Perú · Atención de lunes a sábado · Todos los derechos reservados</p>
+</div></footer>
+</body>
+</html>
+"""
+
+
+def _sercoplus_product(p, price):
+    return f"""<article class="product-miniature js-product-miniature" data-id-product="{escape(p['sku'])}">
+<div class="tvproduct-wrapper">
+<div class="tvproduct-image"><a href="{escape(p['source_url'])}" class="thumbnail product-thumbnail">
+<img class="tvproduct-defult-img" src="{escape(p['image_url'])}" alt="{escape(p['name'])}">
+<img class="tvproduct-hover-img" src="{escape(p['image_url'])}" alt="{escape(p['name'])}"></a></div>
+<div class="tvproduct-info-box-wrapper">
+<div class="tvproduct-name product-title"><a href="{escape(p['source_url'])}"><h6>{escape(p['name'])}</h6></a></div>
+<div class="tvproduct-reference"><span class="label">Ref:</span> <span class="value">{escape(p['sku'])}</span></div>
+<div class="tvproduct-stock"><span class="label">Stock:</span> <span class="value">{escape(stock_text(p['stock']))}</span></div>
+<div class="tv-product-price"><span class="price">{price}</span></div>
+</div></div></article>"""
+
+
+def _impacto_product(p, price):
+    return f"""<div class="col-md-3"><div class="single-product">
+<div class="product-image"><a href="{escape(p['source_url'])}"><img class="first-image" src="{escape(p['image_url'])}"></a></div>
+<div class="product-content"><h4 class="product-title"><a href="{escape(p['source_url'])}">{escape(p['name'])}</a></h4>
+<div class="price-box"><span class="price-sale-2">{price}</span></div>
+<div class="detail"><p>MINICÓDIGO: {escape(p['sku'])}</p><p>STOCK: {escape(p['stock'] or '0')}</p></div>
+</div></div></div>"""
+
+
+def _cyccomputer_product(p, price):
+    return f"""<div class="item-inner">
+<div class="laberProduct-image"><a href="{escape(p['source_url'])}"><img src="{escape(p['image_url'])}" alt=""></a></div>
+<div class="laberProduct-container">
+<h2 class="productName"><a href="{escape(p['source_url'])}">{escape(p['name'])}</a></h2>
+<div class="manufacturer_name">Marca: {escape(p['brand'])}</div>
+<div class="laberProduct-price"><span class="price">{price}</span></div>
+<div class="quantity">{escape(stock_text(p['stock']))}</div>
+</div></div>"""
+
+
+def _computershop_product(p, price):
+    stock = p['stock'] or '0'
+    stock_label = f'&gt;{stock.strip("+")}' if '+' in stock else escape(stock)
+    return f"""<div class="product-miniature js-product-miniature">
+<meta itemprop="sku" content="{escape(p['sku'])}">
+<div class="product-container">
+<div class="thumbnail-container"><a href="{escape(p['source_url'])}"><img class="img-fluid" src="{escape(p['image_url'])}"></a></div>
+<div class="product-description">
+<h5 class="product-name"><a href="{escape(p['source_url'])}">{escape(p['name'])}</a></h5>
+<span class="stock-mini">Marca: {escape(p['brand'])}</span>
+<span class="stock-mini" data-stock="{escape(stock)}">Stock: {stock_label}</span>
+<span class="product-price">{price}</span>
+</div></div></div>"""
+
+
+def _pagination(store_key: str, page: int, last: bool) -> str:
+    next_page = page + 1
+    if store_key == 'sercoplus':
+        link = '' if last else f'<a rel="next" class="next js-search-link" href="?page={next_page}">Siguiente</a>'
+        return f'<nav class="pagination">{link}</nav>'
+    if store_key == 'computershop':
+        disabled = ' disabled' if last else ''
+        return f'<nav class="pagination"><a class="next{disabled}" href="?page={next_page}">Siguiente</a></nav>'
+    # Impacto / CycComputer: "next" link only while there are more pages
+    return '' if last else f'<a class="next" href="?page={next_page}">Siguiente</a>'
+
+
+RENDERERS = {
+    'sercoplus': _sercoplus_product,
+    'pcimpacto': _impacto_product,
+    'cyccomputer': _cyccomputer_product,
+    'computershop': _computershop_product,
+}
+
+
+def _load_products(source: str):
+    with open(os.path.join(ROOT_DIR, 'scrapers', source, 'products.json'), 'r', encoding='utf-8') as f:
+        data = json.load(f)
+    products = []
+    for product in data['categories'][CATEGORY]:
+        if product.get('price_usd') and product.get('price_local'):
+            products.append({key: str(product.get(key) or '') for key in
+                             ('name', 'sku', 'stock', 'brand', 'source_url', 'image_url')}
+                            | {'usd': product['price_usd'], 'pen': product['price_local']})
+    return products[:PRODUCTS_PER_PAGE * PAGES]
+
+
+def _rebuild_memorykings(products):
+    links = []
+    for i, p in enumerate(products):
+        slug = slugify(p['name'])
+        links.append(f'<div class="product-item"><a href="{STUB_TOKEN}/memorykings/producto/{slug}">'
+                     f'{escape(p["name"])}</a></div>')
+        body = f"""<div class="detalle-producto">
+<h1>{escape(p['name'])}</h1>
+<div class="price">$ {p['usd']:,.2f} ó S/ {p['pen']:,.2f}</div>
+<div class="datos"><span>Número de Parte:</span> <strong>{escape(p['sku'] or slug[:12])}</strong></div>
+<div class="datos"><span>Código Interno:</span> <strong>MK{i:05d}</strong></div>
+<div class="existencias"><span>Stock: {escape(p['stock'] or '0')}</span></div>
+<div class="brand">{escape(p['brand'])}</div>
+</div>"""
+        _write(product_path('memorykings', slug), _chrome(p['name'], body))
+
+    listing = f'<section class="listado">{"".join(links)}</section>'
+    _write(page_path('memorykings', CATEGORY, 1), _chrome('Procesadores', listing))
+
+
+def rebuild_fixtures():
+    """Reconstruye todas las páginas a partir de los products.json"""
+    for store_key, (source, _) in STORES.items():
+        products = _load_products(source)
+        if store_key == 'memorykings':
+            _rebuild_memorykings(products[:PRODUCTS_PER_PAGE])
+        else:
+            render = RENDERERS[store_key]
+            price_format = PRICE_FORMATS[source]
+            for page in range(1, PAGES + 1):
+                chunk = products[(page - 1) * PRODUCTS_PER_PAGE:page * PRODUCTS_PER_PAGE]
+                items = '\n'.join(render(p, escape(price_format(p['usd'], p['pen']))) for p in chunk)
+                body = f'<section id="products"><div class="products row">\n{items}\n</div>' \
+                       f'{_pagination(store_key, page, page == PAGES)}</section>'
+                _write(page_path(store_key, CATEGORY, page), _chrome(f'Procesadores - página {page}', body))
+        print(f"✅ {store_key}: fixtures reconstruidos")
+
+
+# --- Grabación de páginas reales ---
+
+def record_fixtures(store_key: str, pages: int = PAGES):
+    """Descarga páginas reales de la categoría y las guarda como fixtures"""
+    from scrapers.registry import STORES as REGISTRY
+
+    base_url = STORES[store_key][1]
+    url = REGISTRY[store_key]['categories'][CATEGORY]
+    headers = {'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 '
+                             '(KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36'}
+
+    import requests
+    session = requests.Session()
+    for page in range(1, pages + 1):
+        separator = '&' if '?' in url else '?'
+        page_url = url if page == 1 else f'{url}{separator}page={page}'
+        response = session.get(page_url, headers=headers, timeout=30)
+        response.raise_for_status()
+        html = response.text.replace(base_url, f'{STUB_TOKEN}/{store_key}')
+        _write(page_path(store_key, CATEGORY, page), html)
+        print(f"✅ {store_key}: página {page} grabada ({len(html) // 1024} KB)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Genera o graba los fixtures HTML de los benchmarks')
+    parser.add_argument('--rebuild', action='store_true', help='Reconstruir desde products.json (sin red)')
+    parser.add_argument('--record', choices=[key for key in STORES if key != 'memorykings'],
+                        help='Grabar páginas reales de una tienda (requiere red)')
+    parser.add_argument('--pages', type=int, default=PAGES, help=f'Páginas a grabar (default: {PAGES})')
+    args = parser.parse_args()
+
+    if args.record:
+        record_fixtures(args.record, args.pages)
+    elif args.rebuild:
+        rebuild_fixtures()
+    else:
+        parser.print_help()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,391 @@
+"""
+Prueba de carga de la API con tráfico de clientes reales
+
+Simula N clientes concurrentes (asyncio, conexiones keep-alive, sin
+dependencias externas) con los recorridos de la app iOS
+(ios_example/PCPriceAPI.swift: latest, best-deals, search, compare-quick,
+health) y del dashboard.html (listado y búsqueda). Levanta un uvicorn local
+sobre un catálogo sintético (catalog.py) del tamaño pedido, o ataca una instancia en
+marcha con --url, y reporta p50/p95/p99 y peticiones/s por endpoint.
+
+El dashboard también llama a /api/compare/{nombre} y /api/stats, que hoy no
+están registrados en main.py, así que no forman parte de la mezcla.
+
+Uso:
+    python benchmarks/loadtest.py --users 10 50 100 --duration 30
+    python benchmarks/loadtest.py --catalog 20000 --think 0 --users 32
+    python benchmarks/loadtest.py --url http://localhost:8000 --users 20
+"""
+import sys
+import os
+import re
+import json
+import math
+import time
+import random
+import socket
+import asyncio
+import argparse
+import tempfile
+import subprocess
+from urllib.parse import urlsplit, quote
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, ROOT_DIR)
+sys.path.insert(0, BENCH_DIR)
+
+from catalog import build_catalog
+
+COMPONENT_TYPES = ['procesadores', 'tarjetas-video', 'memorias-ram', 'almacenamiento', 'placas-madre']
+DASHBOARD_SHARE = 0.2
+PERCENTILES = (50, 95, 99)
+
+
+# ==================== CLIENTE HTTP ====================
+
+class HttpConnection:
+    """Minimal HTTP/1.1 keep-alive client (GET only) on asyncio streams"""
+
+    def __init__(self, host: str, port: int):
+        self.host = host
+        self.port = port
+        self.reader = None
+        self.writer = None
+
+    async def get(self, path: str, timeout: float = 30.0):
+        """Returns (status, body); reconnects once if the server closed the socket"""
+        for attempt in (1, 2):
+            if self.writer is None:
+                self.reader, self.writer = await asyncio.open_connection(self.host, self.port)
+            try:
+                return await asyncio.wait_for(self._request(path), timeout)
+            except asyncio.TimeoutError:
+                # The late response would be read as the next request's: drop the socket
+                await self.close()
+                raise
+            except (ConnectionError, asyncio.IncompleteReadError):
+                await self.close()
+                if attempt == 2:
+                    raise
+
+    async def _request(self, path: str):
+        self.writer.write(f"GET {path} HTTP/1.1\r\nHost: {self.host}\r\n"
+                          f"Accept: application/json\r\n\r\n".encode('ascii'))
+        await self.writer.drain()
+
+        head = await self.reader.readuntil(b'\r\n\r\n')
+        lines = head.decode('latin-1').split('\r\n')
+        status = int(lines[0].split()[1])
+        headers = {}
+        for line in lines[1:]:
+            if ':' in line:
+                name, value = line.split(':', 1)
+                headers[name.strip().lower()] = value.strip()
+
+        if headers.get('transfer-encoding', '').lower() == 'chunked':
+            body = b''
+            while True:
+                size = int((await self.reader.readuntil(b'\r\n')).split(b';')[0], 16)
+                chunk = await self.reader.readexactly(size + 2)
+                if size == 0:
+                    break
+                body += chunk[:-2]
+        else:
+            body = await self.reader.readexactly(int(headers.get('content-length', 0)))
+
+        if headers.get('connection', '').lower() == 'close':
+            await self.close()
+        return status, body
+
+    async def close(self):
+        if self.writer is not None:
+            self.writer.close()
+            try:
+                await self.writer.wait_closed()
+            except Exception:
+                pass
+        self.reader = self.writer = None
+
+
+# ==================== ESCENARIOS ====================
+
+class Session:
+    """One virtual client: a connection, its RNG and the shared sample data"""
+
+    def __init__(self, conn: HttpConnection, rng: random.Random, sample: dict, think: float, record):
+        self.conn = conn
+        self.rng = rng
+        self.sample = sample
+        self.think = think
+        self.record = record
+
+    async def call(self, label: str, path: str):
+        started = time.perf_counter()
+        try:
+            status, body = await self.conn.get(path)
+        except Exception:
+            self.record(label, 0, time.perf_counter() - started)
+            return None
+        self.record(label, status, time.perf_counter() - started)
+        if status != 200:
+            return None
+        try:
+            return json.loads(body)
+        except ValueError:
+            return None
+
+    async def pause(self):
+        if self.think > 0:
+            await asyncio.sleep(self.rng.expovariate(1 / self.think))
+
+    def product_ids(self, data, key='products'):
+        ids = [item['id'] for item in (data or {}).get(key, []) if 'id' in item]
+        return ids or self.sample['ids']
+
+    async def mobile(self):
+        """App session: home feed, a category, deals, a search and a product tap"""
+        rng = self.rng
+        data = await self.call('/api/mobile/latest', '/api/mobile/latest?limit=50')
+        ids = self.product_ids(data)
+        await self.pause()
+
+        if rng.random() < 0.5:
+            component_type = rng.choice(COMPONENT_TYPES)
+            data = await self.call('/api/mobile/latest',
+                                   f'/api/mobile/latest?limit=20&component_type={component_type}')
+            ids = self.product_ids(data)
+            await self.pause()
+
+        if rng.random() < 0.6:
+            query = '' if rng.random() < 0.5 else f'&component_type={rng.choice(COMPONENT_TYPES)}'
+            data = await self.call('/api/mobile/best-deals', f'/api/mobile/best-deals?limit=10{query}')
+            ids = self.product_ids(data, 'deals')
+            await self.pause()
+
+        if rng.random() < 0.5:
+            term = rng.choice(self.sample['terms'])
+            data = await self.call('/api/search', f'/api/search?query={quote(term)}&limit=20')
+            await self.pause()
+
+        for _ in range(rng.choice((0, 1, 1, 2))):
+            await self.call('/api/mobile/compare-quick/{product_id}',
+                            f'/api/mobile/compare-quick/{rng.choice(ids)}')
+            await self.pause()
+
+        if rng.random() < 0.1:
+            await self.call('/api/health', '/api/health')
+
+    async def dashboard(self):
+        """dashboard.html: product listing and a search"""
+        await self.call('/api/products', '/api/products?limit=20')
+        await self.pause()
+        term = self.rng.choice(self.sample['terms'])
+        await self.call('/api/search', f'/api/search?query={quote(term)}')
+        await self.pause()
+
+
+async def load_sample(host: str, port: int) -> dict:
+    """Product ids and search terms taken from the catalog under test"""
+    conn = HttpConnection(host, port)
+    status, body = await conn.get('/api/products?limit=500')
+    await conn.close()
+    if status != 200:
+        raise RuntimeError(f"/api/products respondió {status}")
+    products = json.loads(body)['products']
+    if not products:
+        raise RuntimeError("El catálogo está vacío")
+
+    words = {}
+    for product in products:
+        for word in re.findall(r'[A-Za-z0-9]{4,}', product['name']):
+            words[word.lower()] = words.get(word.lower(), 0) + 1
+    terms = [word for word, _ in sorted(words.items(), key=lambda item: -item[1])[:100]]
+    return {'ids': [product['id'] for product in products], 'terms': terms}
+
+
+async def run_level(host: str, port: int, users: int, duration: float, ramp: float,
+                    think: float, dashboard_share: float, sample: dict, seed: int) -> dict:
+    """Runs users clients for duration seconds; returns the samples per endpoint"""
+    samples = {}
+    deadline = None
+
+    def record(label, status, seconds):
+        # Requests finished after the deadline are dropped so req/s stays honest
+        if time.perf_counter() <= deadline:
+            samples.setdefault(label, []).append((status, seconds))
+
+    async def client(index):
+        rng = random.Random(seed * 100003 + index)
+        if ramp:
+            await asyncio.sleep(ramp * index / users)
+        conn = HttpConnection(host, port)
+        session = Session(conn, rng, sample, think, record)
+        try:
+            while time.perf_counter() < deadline:
+                if rng.random() < dashboard_share:
+                    await session.dashboard()
+                else:
+                    await session.mobile()
+        finally:
+            await conn.close()
+
+    started = time.perf_counter()
+    deadline = started + duration
+    await asyncio.gather(*(client(i) for i in range(users)))
+    return summarize(samples, min(time.perf_counter(), deadline) - started)
+
+
+# ==================== REPORTE ====================
+
+def percentile(sorted_values, pct: float) -> float:
+    """Nearest-rank percentile of an already sorted list"""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, math.ceil(pct / 100 * len(sorted_values)))
+    return sorted_values[min(rank, len(sorted_values)) - 1]
+
+
+def summarize(samples: dict, elapsed: float) -> dict:
+    """Count, errors, req/s and latency percentiles (ms) per endpoint plus a 'total' row"""
+    def stats(entries):
+        latencies = sorted(seconds for _, seconds in entries)
+        row = {
+            'requests': len(entries),
+            'errors': sum(1 for status, _ in entries if not 200 <= status < 400),
+            'rps': round(len(entries) / elapsed, 2) if elapsed else 0.0,
+            'max_ms': round(latencies[-1] * 1000, 2) if latencies else 0.0,
+        }
+        for pct in PERCENTILES:
+            row[f'p{pct}_ms'] = round(percentile(latencies, pct) * 1000, 2)
+        return row
+
+    endpoints = {label: stats(entries) for label, entries in sorted(samples.items())}
+    endpoints['total'] = stats([entry for entries in samples.values() for entry in entries])
+    return {'elapsed_s': round(elapsed, 2), 'endpoints': endpoints}
+
+
+def format_level(users: int, result: dict) -> str:
+    lines = [f"👥 {users} clientes, {result['elapsed_s']} s",
+             f"{'Endpoint':<42} {'req':>7} {'err':>5} {'req/s':>8} {'p50 ms':>8} {'p95 ms':>8} "
+             f"{'p99 ms':>8} {'máx ms':>8}",
+             "-" * 101]
+    for label, row in result['endpoints'].items():
+        if label == 'total':
+            lines.append("-" * 101)
+        lines.append(f"{label:<42} {row['requests']:>7} {row['errors']:>5} {row['rps']:>8.1f} "
+                     f"{row['p50_ms']:>8.1f} {row['p95_ms']:>8.1f} {row['p99_ms']:>8.1f} {row['max_ms']:>8.1f}")
+    return '\n'.join(lines)
+
+
+# ==================== SERVIDOR LOCAL ====================
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def start_server(db_path: str, port: int, workers: int = 1) -> subprocess.Popen:
+    """uvicorn main:app on 127.0.0.1:port against db_path; waits for /api/health"""
+    env = dict(os.environ, DATABASE_PATH=db_path, API_RELOAD='False', ENRICHMENT_CACHE_PATH='')
+    process = subprocess.Popen(
+        [sys.executable, '-m', 'uvicorn', 'main:app', '--host', '127.0.0.1', '--port', str(port),
+         '--workers', str(workers), '--log-level', 'warning', '--no-access-log'],
+        cwd=ROOT_DIR, env=env
+    )
+
+    async def wait_ready():
+        deadline = time.perf_counter() + 60
+        while time.perf_counter() < deadline:
+            if process.poll() is not None:
+                raise RuntimeError(f"uvicorn terminó con código {process.returncode}")
+            conn = HttpConnection('127.0.0.1', port)
+            try:
+                status, _ = await conn.get('/api/health', timeout=2)
+                if status == 200:
+                    return
+            except OSError:
+                pass
+            finally:
+                await conn.close()
+            await asyncio.sleep(0.2)
+        raise RuntimeError("uvicorn no respondió en 60 s")
+
+    try:
+        asyncio.run(wait_ready())
+    except Exception:
+        process.terminate()
+        raise
+    return process
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Prueba de carga de la API (tráfico app iOS + dashboard)')
+    parser.add_argument('--url', help='Atacar una API ya en marcha en lugar de levantar uvicorn')
+    parser.add_argument('--db', help='Base de datos a servir (default: catálogo sintético temporal)')
+    parser.add_argument('--catalog', type=int, default=5000,
+                        help='Productos del catálogo sintético, ver catalog.py (default: 5000)')
+    parser.add_argument('--workers', type=int, default=1, help='Workers de uvicorn (default: 1)')
+    parser.add_argument('--users', type=int, nargs='+', default=[10, 50],
+                        help='Clientes concurrentes; varios valores = un nivel cada uno (default: 10 50)')
+    parser.add_argument('--duration', type=float, default=20, help='Segundos por nivel (default: 20)')
+    parser.add_argument('--ramp', type=float, default=2, help='Segundos para arrancar todos los clientes (default: 2)')
+    parser.add_argument('--think', type=float, default=1.0,
+                        help='Pausa media entre acciones de un cliente, s (0 = sin pausas) (default: 1)')
+    parser.add_argument('--dashboard-share', type=float, default=DASHBOARD_SHARE,
+                        help=f'Fracción de sesiones de dashboard (default: {DASHBOARD_SHARE})')
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--json', help='Guardar los resultados en este archivo JSON')
+    args = parser.parse_args()
+
+    process = None
+    tmp_dir = None
+    try:
+        if args.url:
+            parts = urlsplit(args.url)
+            host, port = parts.hostname, parts.port or 80
+            target = args.url
+        else:
+            db_path = args.db
+            if not db_path:
+                tmp_dir = tempfile.TemporaryDirectory()
+                db_path = os.path.join(tmp_dir.name, 'loadtest.db')
+                started = time.perf_counter()
+                total = build_catalog(db_path, args.catalog, args.seed)
+                print(f"📦 Catálogo sintético: {total:,} productos en {time.perf_counter() - started:.1f}s")
+            host, port = '127.0.0.1', free_port()
+            process = start_server(db_path, port, args.workers)
+            target = f"uvicorn local ({args.workers} worker(s), {db_path})"
+
+        sample = asyncio.run(load_sample(host, port))
+        print(f"🎯 {target}: {len(args.users)} nivel(es) de {args.duration:.0f}s, "
+              f"pausa media {args.think}s, {args.dashboard_share:.0%} dashboard\n")
+
+        results = []
+        for users in args.users:
+            result = asyncio.run(run_level(host, port, users, args.duration, args.ramp, args.think,
+                                           args.dashboard_share, sample, args.seed))
+            results.append(dict(result, users=users))
+            print(format_level(users, result) + '\n')
+
+        print(f"{'Clientes':>9} {'req/s':>9} {'p95 ms':>9} {'p99 ms':>9} {'errores':>8}")
+        for result in results:
+            total = result['endpoints']['total']
+            print(f"{result['users']:>9} {total['rps']:>9.1f} {total['p95_ms']:>9.1f} "
+                  f"{total['p99_ms']:>9.1f} {total['errors']:>8}")
+
+        if args.json:
+            with open(args.json, 'w', encoding='utf-8') as f:
+                json.dump({'target': target, 'think_s': args.think, 'levels': results}, f, indent=2)
+            print(f"\n💾 Resultados guardados en {args.json}")
+    finally:
+        if process is not None:
+            process.terminate()
+            process.wait(timeout=10)
+        if tmp_dir is not None:
+            tmp_dir.cleanup()
+
+
+if __name__ == "__main__":
+    main()
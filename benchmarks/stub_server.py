@@ -0,0 +1,89 @@
+"""
+Servidor HTTP local que sirve los fixtures HTML de los benchmarks
+
+    /<tienda>/<categoria>?page=N       -> fixtures/<tienda>/<categoria>/page-N.html
+    /<tienda>/producto/<slug>          -> fixtures/<tienda>/producto/<slug>.html
+
+El marcador __STUB__ de los fixtures se reemplaza por la URL del servidor,
+así los enlaces absolutos de las páginas grabadas apuntan al stub.
+"""
+import sys
+import os
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse, parse_qs
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from fixtures import FIXTURES_DIR, STUB_TOKEN
+
+
+class StubServer:
+    """Sirve los fixtures en 127.0.0.1 en un hilo, contando peticiones por ruta"""
+
+    def __init__(self, fixtures_dir: str = FIXTURES_DIR):
+        self.fixtures_dir = fixtures_dir
+        self.requests = []
+        self._cache = {}
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            # Keep-alive, like a real store behind a requests.Session
+            protocol_version = 'HTTP/1.1'
+
+            def do_GET(self):
+                stub.requests.append(self.path)
+                body = stub.load(self.path)
+                if body is None:
+                    self.send_error(404)
+                    return
+                self.send_response(200)
+                self.send_header('Content-Type', 'text/html; charset=utf-8')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        self.url = f'http://127.0.0.1:{self.server.server_address[1]}'
+        self._thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+
+    def start(self) -> 'StubServer':
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    def resolve(self, path: str):
+        """Ruta de la petición -> archivo del fixture (o None)"""
+        parsed = urlparse(path)
+        parts = [part for part in parsed.path.split('/') if part]
+        if len(parts) == 3 and parts[1] == 'producto':
+            relative = os.path.join(parts[0], 'producto', f'{parts[2]}.html')
+        elif len(parts) == 2:
+            page = parse_qs(parsed.query).get('page', ['1'])[0]
+            relative = os.path.join(parts[0], parts[1], f'page-{page}.html')
+        else:
+            return None
+        full_path = os.path.join(self.fixtures_dir, relative)
+        return full_path if os.path.isfile(full_path) else None
+
+    def load(self, path: str):
+        """Contenido del fixture con el marcador reemplazado (cacheado en memoria)"""
+        file_path = self.resolve(path)
+        if file_path is None:
+            return None
+        if file_path not in self._cache:
+            with open(file_path, 'r', encoding='utf-8') as f:
+                self._cache[file_path] = f.read().replace(STUB_TOKEN, self.url).encode('utf-8')
+        return self._cache[file_path]
@@ -1,18 +1,38 @@
-"""Script para analizar formatos de stock en la base de datos"""
+"""Script para analizar formatos de stock en la base de datos
+
+Uso:
+    python check_stock_formats.py                      # lee pc_prices.db
+    python check_stock_formats.py scrapers/*/products.ndjson  # lee snapshots
+"""
 import sqlite3
+import sys
+from collections import Counter
+
+from snapshots import read_columns
+
+snapshot_paths = sys.argv[1:]
 
-conn = sqlite3.connect('pc_prices.db')
-cursor = conn.cursor()
+if snapshot_paths:
+    # Solo se leen las columnas store y stock de cada snapshot
+    counter = Counter()
+    for path in snapshot_paths:
+        columns = read_columns(path, ['store', 'stock'])
+        counter.update(zip(columns['store'], columns['stock']))
+    results = sorted(counter.items(), key=lambda item: (item[0][0] or '', -item[1]))
+    results = [(store, stock, count) for (store, stock), count in results]
+else:
+    conn = sqlite3.connect('pc_prices.db')
+    cursor = conn.cursor()
 
-# Obtener formatos de stock por tienda
-cursor.execute('''
-    SELECT store, stock, COUNT(*) as count 
-    FROM products 
-    GROUP BY store, stock 
-    ORDER BY store, count DESC
-''')
+    # Obtener formatos de stock por tienda
+    cursor.execute('''
+        SELECT store, stock, COUNT(*) as count 
+        FROM products 
+        GROUP BY store, stock 
+        ORDER BY store, count DESC
+    ''')
 
-results = cursor.fetchall()
+    results = cursor.fetchall()
 
 print('\n' + '='*60)
 print('ANÁLISIS DE FORMATOS DE STOCK POR TIENDA')
@@ -30,34 +50,26 @@ for store, stock, count in results:
     print(f'   {stock_display:35} → {count:4} productos')
 
 # Resumen de formatos únicos
-cursor.execute('''
-    SELECT DISTINCT stock 
-    FROM products 
-    ORDER BY stock
-''')
-
-unique_stocks = cursor.fetchall()
+unique_stocks = sorted({stock for _, stock, _ in results}, key=lambda stock: (stock is not None, stock or ''))
 
 print('\n' + '='*60)
 print('FORMATOS ÚNICOS DE STOCK EN TODA LA BD:')
 print('='*60)
-for (stock,) in unique_stocks:
+for stock in unique_stocks:
     print(f'  - {repr(stock)}')
 
 # Contar productos sin stock o con stock "unknown"
-cursor.execute('''
-    SELECT store, COUNT(*) as count
-    FROM products
-    WHERE stock IS NULL OR stock = '' OR stock = 'unknown'
-    GROUP BY store
-''')
-
-problematic = cursor.fetchall()
+problematic = Counter()
+for store, stock, count in results:
+    if stock is None or stock == '' or stock == 'unknown':
+        problematic[store] += count
+
 if problematic:
     print('\n' + '='*60)
     print('⚠️  PRODUCTOS CON STOCK PROBLEMÁTICO:')
     print('='*60)
-    for store, count in problematic:
+    for store, count in problematic.items():
         print(f'  {store}: {count} productos')
 
-conn.close()
+if not snapshot_paths:
+    conn.close()
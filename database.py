@@ -6,20 +6,86 @@ Handles all database operations for the PC price scraper
 import sqlite3
 from typing import List, Dict, Optional
 from datetime import datetime
-import json
 
-class Database:
+from scrapers.product import Product
+from metrics import instrument_methods
+from storage import Storage
+
+# SQLite expressions mapping price_history.recorded_at to its bucket start
+ROLLUP_BUCKETS = {
+    'day': "date(recorded_at)",
+    'week': "date(recorded_at, 'weekday 0', '-6 days')",  # Monday
+}
+
+
+def merge_pending_points(points: Dict, pending_rows) -> Dict:
+    """
+    Merges price_history rows not rolled up yet into bucketed points
+    
+    Args:
+        points: Rolled-up points keyed by bucket start (updated in place)
+        pending_rows: Rows with t (bucket start), price_usd, price_local
+            and stock, oldest first
+    """
+    for pending in pending_rows:
+        point = points.get(pending['t'])
+        if point is None:
+            points[pending['t']] = {
+                't': pending['t'],
+                'min_price_usd': pending['price_usd'],
+                'max_price_usd': pending['price_usd'],
+                'price_usd': pending['price_usd'],
+                'price_local': pending['price_local'],
+                'stock': pending['stock'],
+                'samples': 1,
+            }
+        else:
+            point['min_price_usd'] = min(point['min_price_usd'], pending['price_usd'])
+            point['max_price_usd'] = max(point['max_price_usd'], pending['price_usd'])
+            point['price_usd'] = pending['price_usd']
+            point['price_local'] = pending['price_local']
+            point['stock'] = pending['stock']
+            point['samples'] += 1
+    return points
+
+
+class Database(Storage):
     """SQLite database handler for PC component prices"""
     
-    def __init__(self, db_path: str = "pc_prices.db"):
+    def __init__(self, db_path: str = "pc_prices.db", profiler=None, read_only: bool = False):
         self.db_path = db_path
+        # Optional profiler.QueryProfiler timing every statement (off by default)
+        self.profiler = profiler
+        # API serving workers: every write raises, schema is owned by the writer process
+        self.read_only = read_only
     
     def get_connection(self):
         """Creates and returns a database connection"""
-        conn = sqlite3.connect(self.db_path)
+        if self.profiler is not None:
+            conn = self.profiler.connect(self.db_path)
+        else:
+            conn = sqlite3.connect(self.db_path)
         conn.row_factory = sqlite3.Row
+        if self.read_only:
+            conn.execute("PRAGMA query_only = ON")
         return conn
     
+    def enable_wal(self) -> str:
+        """
+        Switches the database file to write-ahead logging
+        
+        WAL is persistent, so this is done once by the writer. Readers then
+        never block on the writer (or each other), which is what lets several
+        API worker processes share one SQLite file.
+        
+        Returns:
+            The journal mode now in effect ('wal' unless the filesystem refused)
+        """
+        conn = sqlite3.connect(self.db_path)
+        mode = conn.execute("PRAGMA journal_mode = WAL").fetchone()[0]
+        conn.close()
+        return mode
+    
     def init_db(self):
         """Initializes the database schema"""
         conn = self.get_connection()
@@ -44,7 +110,8 @@ class Database:
                 last_scraped TIMESTAMP,
                 created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
                 is_active INTEGER DEFAULT 1,
-                metadata TEXT
+                metadata TEXT,
+                store_count INTEGER DEFAULT 1
             )
         """)
         
@@ -54,6 +121,13 @@ class Database:
         except sqlite3.OperationalError:
             pass  # Column already exists
         
+        # Add store_count column (stores offering the same normalized name)
+        try:
+            cursor.execute("ALTER TABLE products ADD COLUMN store_count INTEGER DEFAULT 1")
+            self._refresh_store_counts(cursor)
+        except sqlite3.OperationalError:
+            pass  # Column already exists
+        
         # Create indexes for better query performance
         cursor.execute("""
             CREATE INDEX IF NOT EXISTS idx_name ON products(name)
@@ -79,6 +153,9 @@ class Database:
         cursor.execute("""
             CREATE INDEX IF NOT EXISTS idx_active ON products(is_active)
         """)
+        cursor.execute("""
+            CREATE INDEX IF NOT EXISTS idx_store_count ON products(store_count)
+        """)
         
         # Create price history table
         cursor.execute("""
@@ -92,6 +169,104 @@ class Database:
                 FOREIGN KEY (product_id) REFERENCES products(id)
             )
         """)
+        cursor.execute("""
+            CREATE INDEX IF NOT EXISTS idx_price_history_product
+            ON price_history(product_id, recorded_at)
+        """)
+        
+        # Daily/weekly price buckets built from price_history by rollup_price_history()
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS price_rollups (
+                product_id INTEGER NOT NULL,
+                resolution TEXT NOT NULL,
+                bucket_start TEXT NOT NULL,
+                min_price_usd REAL,
+                max_price_usd REAL,
+                price_usd REAL,
+                price_local REAL,
+                stock TEXT,
+                samples INTEGER,
+                last_recorded_at TIMESTAMP,
+                PRIMARY KEY (product_id, resolution, bucket_start)
+            )
+        """)
+        
+        # Highest price_history id already folded into price_rollups
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS price_rollup_state (
+                id INTEGER PRIMARY KEY CHECK (id = 1),
+                last_history_id INTEGER NOT NULL
+            )
+        """)
+        
+        # Current deals, rebuilt by deals.refresh_deals()
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS deals (
+                product_id INTEGER PRIMARY KEY,
+                trailing_median REAL,
+                drop_pct REAL,
+                all_time_low INTEGER,
+                all_time_min REAL,
+                store_count INTEGER,
+                min_price_usd REAL,
+                max_price_usd REAL,
+                spread_pct REAL,
+                is_cheapest INTEGER,
+                score REAL,
+                computed_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                FOREIGN KEY (product_id) REFERENCES products(id)
+            )
+        """)
+        cursor.execute("""
+            CREATE INDEX IF NOT EXISTS idx_deals_score ON deals(score DESC)
+        """)
+        
+        # Change log for downstream sync (/api/changes): fed by triggers, so every
+        # write path is captured; the id is the client cursor
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS product_changes (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                product_id INTEGER NOT NULL,
+                op TEXT NOT NULL,
+                changed_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            )
+        """)
+        cursor.execute("""
+            CREATE TRIGGER IF NOT EXISTS trg_products_insert AFTER INSERT ON products
+            BEGIN
+                INSERT INTO product_changes (product_id, op) VALUES (NEW.id, 'insert');
+            END
+        """)
+        # Rescrapes that only touch last_scraped/store_count are not changes
+        cursor.execute("""
+            CREATE TRIGGER IF NOT EXISTS trg_products_update AFTER UPDATE ON products
+            WHEN OLD.name IS NOT NEW.name
+              OR OLD.normalized_name IS NOT NEW.normalized_name
+              OR OLD.component_type IS NOT NEW.component_type
+              OR OLD.brand IS NOT NEW.brand
+              OR OLD.sku IS NOT NEW.sku
+              OR OLD.price_usd IS NOT NEW.price_usd
+              OR OLD.price_local IS NOT NEW.price_local
+              OR OLD.currency IS NOT NEW.currency
+              OR OLD.stock IS NOT NEW.stock
+              OR OLD.store IS NOT NEW.store
+              OR OLD.source_url IS NOT NEW.source_url
+              OR OLD.image_url IS NOT NEW.image_url
+              OR OLD.is_active IS NOT NEW.is_active
+              OR OLD.metadata IS NOT NEW.metadata
+            BEGIN
+                INSERT INTO product_changes (product_id, op) VALUES (
+                    NEW.id,
+                    CASE WHEN NEW.is_active = 0 AND OLD.is_active != 0 THEN 'deactivate' ELSE 'update' END
+                );
+            END
+        """)
+        cursor.execute("""
+            CREATE TRIGGER IF NOT EXISTS trg_products_delete AFTER DELETE ON products
+            BEGIN
+                INSERT INTO product_changes (product_id, op) VALUES (OLD.id, 'delete');
+            END
+        """)
         
         # Create product matching table for cross-store comparison
         cursor.execute("""
@@ -116,6 +291,7 @@ class Database:
                 url TEXT NOT NULL,
                 category TEXT,
                 frequency_hours INTEGER DEFAULT 24,
+                adaptive_frequency_hours INTEGER,
                 last_run TIMESTAMP,
                 next_run TIMESTAMP,
                 is_active INTEGER DEFAULT 1,
@@ -135,19 +311,68 @@ class Database:
                 error_message TEXT,
                 duration_seconds REAL,
                 started_at TIMESTAMP,
-                completed_at TIMESTAMP
+                completed_at TIMESTAMP,
+                price_changes INTEGER
+            )
+        """)
+        
+        # price_history rows written by each run (adaptive scheduling)
+        try:
+            cursor.execute("ALTER TABLE scraping_logs ADD COLUMN price_changes INTEGER")
+        except sqlite3.OperationalError:
+            pass  # Column already exists
+        
+        # Interval picked by adaptive scheduling (frequency_hours stays the configured one)
+        try:
+            cursor.execute("ALTER TABLE scraping_schedule ADD COLUMN adaptive_frequency_hours INTEGER")
+        except sqlite3.OperationalError:
+            pass  # Column already exists
+        
+        # Per-page stage timings of scrape runs (scrapers/tracing.py)
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS scrape_spans (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                run_id TEXT NOT NULL,
+                store TEXT,
+                category TEXT,
+                page INTEGER,
+                stage TEXT NOT NULL,
+                parent TEXT,
+                calls INTEGER NOT NULL,
+                total_ms REAL NOT NULL,
+                self_ms REAL NOT NULL,
+                max_ms REAL NOT NULL,
+                recorded_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            )
+        """)
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_scrape_spans_run ON scrape_spans(run_id)")
+        
+        # Create images table (product image URL -> content-addressed thumbnails)
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS images (
+                url TEXT PRIMARY KEY,
+                content_hash TEXT,
+                status TEXT,
+                content_type TEXT,
+                etag TEXT,
+                last_modified TEXT,
+                content_length TEXT,
+                width INTEGER,
+                height INTEGER,
+                fetched_at TIMESTAMP,
+                error TEXT
             )
         """)
         
         conn.commit()
         conn.close()
     
-    def insert_product(self, product: Dict) -> bool:
+    def insert_product(self, product) -> bool:
         """
         Inserts or updates a product in the database
         
         Args:
-            product: Dictionary with product information
+            product: Product record or dictionary with product information
             
         Returns:
             True if successful, False otherwise
@@ -156,112 +381,9 @@ class Database:
         cursor = conn.cursor()
         
         try:
-            # Convert metadata to JSON if exists
-            metadata_json = None
-            if product.get('metadata'):
-                metadata_json = json.dumps(product['metadata'])
-            
-            # Check if product already exists (by source_url or SKU+store)
-            existing = None
-            
-            # First try by source URL (most reliable)
-            if product.get('source_url'):
-                cursor.execute("""
-                    SELECT id, price_usd, price_local, stock FROM products 
-                    WHERE source_url = ?
-                """, (product['source_url'],))
-                existing = cursor.fetchone()
-            
-            # If not found and has SKU, try by SKU+store
-            if not existing and product.get('sku'):
-                cursor.execute("""
-                    SELECT id, price_usd, price_local, stock FROM products 
-                    WHERE sku = ? AND store = ? AND is_active = 1
-                """, (product['sku'], product['store']))
-                existing = cursor.fetchone()
-            
-            if existing:
-                # Update existing product
-                product_id = existing['id']
-                old_price_usd = existing['price_usd']
-                old_price_local = existing['price_local'] if 'price_local' in existing.keys() else None
-                old_stock = existing['stock'] if 'stock' in existing.keys() else None
-                
-                cursor.execute("""
-                    UPDATE products SET
-                        name = ?,
-                        normalized_name = ?,
-                        component_type = ?,
-                        brand = ?,
-                        sku = ?,
-                        price_usd = ?,
-                        price_local = ?,
-                        currency = ?,
-                        stock = ?,
-                        image_url = ?,
-                        last_scraped = ?,
-                        metadata = ?
-                    WHERE id = ?
-                """, (
-                    product['name'],
-                    product.get('normalized_name', ''),
-                    product.get('component_type', ''),
-                    product.get('brand', ''),
-                    product.get('sku', ''),
-                    product['price_usd'],
-                    product.get('price_local'),
-                    product.get('currency', 'USD'),
-                    product.get('stock', 'unknown'),
-                    product.get('image_url', ''),
-                    product.get('last_scraped', datetime.now().isoformat()),
-                    metadata_json,
-                    product_id
-                ))
-                
-                # Record price history if price changed
-                if (old_price_usd != product['price_usd'] or 
-                    old_price_local != product.get('price_local') or
-                    old_stock != product.get('stock')):
-                    cursor.execute("""
-                        INSERT INTO price_history (product_id, price_usd, price_local, stock)
-                        VALUES (?, ?, ?, ?)
-                    """, (product_id, product['price_usd'], product.get('price_local'), product.get('stock')))
-                
-                conn.commit()
-                conn.close()
-                return True
-            
-            # Insert new product
-            cursor.execute("""
-                INSERT INTO products (
-                    name, normalized_name, component_type, brand, sku, 
-                    price_usd, price_local, currency, stock,
-                    store, source_url, image_url, last_scraped, metadata
-                ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-            """, (
-                product['name'],
-                product.get('normalized_name', ''),
-                product.get('component_type', ''),
-                product.get('brand', ''),
-                product.get('sku', ''),
-                product['price_usd'],
-                product.get('price_local'),
-                product.get('currency', 'USD'),
-                product.get('stock', 'unknown'),
-                product['store'],
-                product.get('source_url', ''),
-                product.get('image_url', ''),
-                product.get('last_scraped', datetime.now().isoformat()),
-                metadata_json
-            ))
-            
-            # Record initial price in history
-            product_id = cursor.lastrowid
-            cursor.execute("""
-                INSERT INTO price_history (product_id, price_usd, price_local, stock)
-                VALUES (?, ?, ?, ?)
-            """, (product_id, product['price_usd'], product.get('price_local'), product.get('stock')))
-            
+            touched_names = set()
+            self._upsert_product(cursor, product, touched_names)
+            self._refresh_store_counts(cursor, touched_names)
             conn.commit()
             conn.close()
             return True
@@ -273,6 +395,229 @@ class Database:
             conn.close()
             return False
     
+    def upsert_products(self, products: List) -> Dict:
+        """
+        Inserts or updates a batch of products in a single transaction
+        
+        Uses one connection for the whole batch instead of one per product,
+        which is what makes loading thousands of rows fast.
+        
+        Args:
+            products: List of Product records or product dictionaries
+            
+        Returns:
+            Dictionary with 'inserted', 'updated' and 'errors' counts
+        """
+        result = {'inserted': 0, 'updated': 0, 'errors': 0}
+        if not products:
+            return result
+        
+        conn = self.get_connection()
+        cursor = conn.cursor()
+        
+        try:
+            # Explicit BEGIN so the per-product savepoints nest inside one transaction
+            cursor.execute("BEGIN")
+            touched_names = set()
+            for product in products:
+                try:
+                    cursor.execute("SAVEPOINT product_upsert")
+                    action = self._upsert_product(cursor, product, touched_names)
+                    cursor.execute("RELEASE SAVEPOINT product_upsert")
+                    result[action] += 1
+                except Exception as e:
+                    cursor.execute("ROLLBACK TO SAVEPOINT product_upsert")
+                    cursor.execute("RELEASE SAVEPOINT product_upsert")
+                    print(f"Error inserting product {product.get('source_url', '')}: {e}")
+                    result['errors'] += 1
+            
+            # One grouped pass for the whole batch instead of one per product
+            self._refresh_store_counts(cursor, touched_names)
+            conn.commit()
+        finally:
+            conn.close()
+        
+        return result
+    
+    def _upsert_product(self, cursor, product, touched_names: Optional[set] = None) -> str:
+        """
+        Inserts or updates a single product using an open cursor
+        
+        Args:
+            cursor: Cursor of an open connection
+            product: Product record (scrapers/product.py) or product dictionary
+            touched_names: If given, collects the normalized names whose
+                store_count must be refreshed
+        
+        Returns:
+            'inserted' or 'updated'
+        """
+        if not hasattr(product, 'to_row'):
+            product = Product.from_dict(product)
+        
+        (name, normalized_name, component_type, brand, sku, price_usd, price_local,
+         currency, stock, store, source_url, image_url, last_scraped, metadata_json) = product.to_row()
+        
+        # Check if product already exists (by source_url or SKU+store)
+        existing = None
+        
+        # First try by source URL (most reliable)
+        if source_url:
+            cursor.execute("""
+                SELECT id, price_usd, price_local, stock, normalized_name FROM products 
+                WHERE source_url = ?
+            """, (source_url,))
+            existing = cursor.fetchone()
+        
+        # If not found and has SKU, try by SKU+store
+        if not existing and sku:
+            cursor.execute("""
+                SELECT id, price_usd, price_local, stock, normalized_name FROM products 
+                WHERE sku = ? AND store = ? AND is_active = 1
+            """, (sku, store))
+            existing = cursor.fetchone()
+        
+        if touched_names is not None:
+            touched_names.add(normalized_name)
+            if existing and existing['normalized_name'] != normalized_name:
+                touched_names.add(existing['normalized_name'])
+        
+        if existing:
+            # Update existing product
+            product_id = existing['id']
+            
+            cursor.execute("""
+                UPDATE products SET
+                    name = ?,
+                    normalized_name = ?,
+                    component_type = ?,
+                    brand = ?,
+                    sku = ?,
+                    price_usd = ?,
+                    price_local = ?,
+                    currency = ?,
+                    stock = ?,
+                    image_url = ?,
+                    last_scraped = ?,
+                    metadata = ?
+                WHERE id = ?
+            """, (
+                name, normalized_name, component_type, brand, sku,
+                price_usd, price_local, currency, stock,
+                image_url, last_scraped, metadata_json,
+                product_id
+            ))
+            
+            # Record price history if price changed
+            if (existing['price_usd'] != price_usd or 
+                existing['price_local'] != price_local or
+                existing['stock'] != stock):
+                cursor.execute("""
+                    INSERT INTO price_history (product_id, price_usd, price_local, stock)
+                    VALUES (?, ?, ?, ?)
+                """, (product_id, price_usd, price_local, stock))
+            
+            return 'updated'
+        
+        # Insert new product
+        cursor.execute("""
+            INSERT INTO products (
+                name, normalized_name, component_type, brand, sku, 
+                price_usd, price_local, currency, stock,
+                store, source_url, image_url, last_scraped, metadata
+            ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+        """, (
+            name, normalized_name, component_type, brand, sku,
+            price_usd, price_local, currency, stock,
+            store, source_url, image_url, last_scraped, metadata_json
+        ))
+        
+        # Record initial price in history
+        product_id = cursor.lastrowid
+        cursor.execute("""
+            INSERT INTO price_history (product_id, price_usd, price_local, stock)
+            VALUES (?, ?, ?, ?)
+        """, (product_id, price_usd, price_local, stock))
+        
+        return 'inserted'
+    
+    def deactivate_products(self, source_urls: List[str]) -> int:
+        """
+        Marks products inactive by source URL
+        
+        Returns:
+            Number of products deactivated
+        """
+        conn = self.get_connection()
+        cursor = conn.cursor()
+        deactivated = 0
+        touched_names = set()
+        
+        for start in range(0, len(source_urls), 500):
+            chunk = source_urls[start:start + 500]
+            placeholders = ','.join('?' * len(chunk))
+            cursor.execute(f"""
+                SELECT normalized_name FROM products
+                WHERE is_active = 1 AND source_url IN ({placeholders})
+            """, chunk)
+            touched_names.update(row[0] for row in cursor.fetchall())
+            cursor.execute(f"""
+                UPDATE products SET is_active = 0
+                WHERE is_active = 1 AND source_url IN ({placeholders})
+            """, chunk)
+            deactivated += cursor.rowcount
+        
+        self._refresh_store_counts(cursor, touched_names)
+        conn.commit()
+        conn.close()
+        return deactivated
+    
+    def refresh_store_counts(self, names: Optional[set] = None):
+        """
+        Recomputes products.store_count
+        
+        Args:
+            names: Only these normalized names (None = every product)
+        """
+        conn = self.get_connection()
+        cursor = conn.cursor()
+        self._refresh_store_counts(cursor, names)
+        conn.commit()
+        conn.close()
+    
+    def _refresh_store_counts(self, cursor, names: Optional[set] = None):
+        """Sets store_count (distinct active stores per normalized name) using an open cursor"""
+        if names is None:
+            cursor.execute("""
+                UPDATE products SET store_count = counts.n
+                FROM (
+                    SELECT normalized_name, COUNT(DISTINCT store) AS n FROM products
+                    WHERE is_active = 1 AND normalized_name != ''
+                    GROUP BY normalized_name
+                ) AS counts
+                WHERE counts.normalized_name = products.normalized_name
+            """)
+            cursor.execute("""
+                UPDATE products SET store_count = 1
+                WHERE normalized_name IS NULL OR normalized_name = ''
+            """)
+            return
+        
+        names = [name for name in names if name]
+        # Chunked to stay under SQLite's bound parameter limit
+        for start in range(0, len(names), 500):
+            chunk = names[start:start + 500]
+            placeholders = ','.join('?' * len(chunk))
+            cursor.execute(f"""
+                UPDATE products SET store_count = counts.n
+                FROM (
+                    SELECT normalized_name, COUNT(DISTINCT store) AS n FROM products
+                    WHERE is_active = 1 AND normalized_name IN ({placeholders})
+                    GROUP BY normalized_name
+                ) AS counts
+                WHERE counts.normalized_name = products.normalized_name
+            """, chunk)
+    
     def get_products(self, skip: int = 0, limit: int = 50, filters=None) -> List[Dict]:
         """
         Gets products with optional filters
@@ -288,7 +633,12 @@ class Database:
         conn = self.get_connection()
         cursor = conn.cursor()
         
-        query = "SELECT * FROM products WHERE 1=1"
+        # image_hash is set once images.py has cached thumbnails for image_url
+        query = """
+            SELECT p.*, i.content_hash AS image_hash FROM products p
+            LEFT JOIN images i ON i.url = p.image_url AND i.status = 'ok'
+            WHERE 1=1
+        """
         params = []
         
         if filters:
@@ -508,12 +858,19 @@ class Database:
         try:
             # Delete price history first
             cursor.execute("DELETE FROM price_history WHERE product_id = ?", (product_id,))
+            cursor.execute("DELETE FROM price_rollups WHERE product_id = ?", (product_id,))
+            cursor.execute("DELETE FROM deals WHERE product_id = ?", (product_id,))
+            
+            cursor.execute("SELECT normalized_name FROM products WHERE id = ?", (product_id,))
+            row = cursor.fetchone()
             
             # Delete product
             cursor.execute("DELETE FROM products WHERE id = ?", (product_id,))
+            success = cursor.rowcount > 0
             
+            if row:
+                self._refresh_store_counts(cursor, {row['normalized_name']})
             conn.commit()
-            success = cursor.rowcount > 0
             conn.close()
             
             return success
@@ -538,3 +895,398 @@ class Database:
         
         conn.close()
         return history
+    
+    def get_deals(self, component_type: Optional[str] = None, limit: int = 10) -> List[Dict]:
+        """
+        Gets the best current deals computed by deals.refresh_deals()
+        
+        Args:
+            component_type: Only deals of this component type
+            limit: Maximum number of deals
+        """
+        conn = self.get_connection()
+        cursor = conn.cursor()
+        
+        query = """
+            SELECT p.*, d.trailing_median, d.drop_pct, d.all_time_low, d.all_time_min,
+                   d.store_count, d.min_price_usd, d.max_price_usd, d.spread_pct,
+                   d.is_cheapest, d.score, d.computed_at
+            FROM deals d
+            JOIN products p ON p.id = d.product_id
+            WHERE p.is_active = 1
+        """
+        params = []
+        if component_type:
+            query += " AND p.component_type = ?"
+            params.append(component_type)
+        query += " ORDER BY d.score DESC LIMIT ?"
+        params.append(limit)
+        
+        cursor.execute(query, params)
+        deals = [dict(row) for row in cursor.fetchall()]
+        
+        conn.close()
+        return deals
+    
+    def get_change_cursor(self) -> int:
+        """Returns the latest product_changes id (0 if there are none)"""
+        conn = self.get_connection()
+        cursor = conn.cursor()
+        cursor.execute("SELECT COALESCE(MAX(id), 0) FROM product_changes")
+        latest = cursor.fetchone()[0]
+        conn.close()
+        return latest
+    
+    def get_changes(self, since: int = 0, limit: int = 1000) -> Dict:
+        """
+        Gets products changed after a cursor, one entry per product
+        
+        Several changes to the same product are collapsed into the latest
+        one. Inserted/updated products come with their current row.
+        
+        Args:
+            since: Cursor from a previous call (0 = from the beginning)
+            limit: Maximum number of products returned
+        
+        Returns:
+            Dictionary with changes, next_cursor, has_more and reset (True
+            when changes after the cursor were pruned: refetch everything)
+        """
+        conn = self.get_connection()
+        cursor = conn.cursor()
+        
+        cursor.execute("SELECT MIN(id), COALESCE(MAX(id), 0) FROM product_changes")
+        oldest, latest = cursor.fetchone()
+        if oldest is not None and since < oldest - 1:
+            conn.close()
+            return {'changes': [], 'next_cursor': latest, 'has_more': False, 'reset': True}
+        
+        cursor.execute("""
+            SELECT c.id AS cursor, c.op, c.changed_at, c.product_id, p.*
+            FROM (
+                SELECT MAX(id) AS id FROM product_changes
+                WHERE id > ?
+                GROUP BY product_id
+                ORDER BY id
+                LIMIT ?
+            ) AS last
+            JOIN product_changes c ON c.id = last.id
+            LEFT JOIN products p ON p.id = c.product_id AND c.op IN ('insert', 'update')
+            ORDER BY c.id
+        """, (since, limit + 1))
+        rows = cursor.fetchall()
+        conn.close()
+        
+        has_more = len(rows) > limit
+        changes = []
+        for row in rows[:limit]:
+            row = dict(row)
+            change = {
+                'cursor': row.pop('cursor'),
+                'op': row.pop('op'),
+                'changed_at': row.pop('changed_at'),
+                'product_id': row.pop('product_id'),
+            }
+            change['product'] = row if row['id'] is not None else None
+            changes.append(change)
+        
+        return {
+            'changes': changes,
+            'next_cursor': changes[-1]['cursor'] if changes else since,
+            'has_more': has_more,
+            'reset': False,
+        }
+    
+    def prune_changes(self, keep_days: int) -> int:
+        """Deletes change log rows older than keep_days (the latest row is kept)"""
+        conn = self.get_connection()
+        cursor = conn.cursor()
+        cursor.execute("""
+            DELETE FROM product_changes
+            WHERE changed_at < datetime('now', ?)
+            AND id < (SELECT MAX(id) FROM product_changes)
+        """, (f'-{int(keep_days)} days',))
+        deleted = cursor.rowcount
+        conn.commit()
+        conn.close()
+        return deleted
+    
+    def rollup_price_history(self, compact_after_days: Optional[int] = None) -> Dict[str, int]:
+        """
+        Folds new price_history rows into daily and weekly buckets
+        
+        Incremental: only rows added since the previous run are read, and
+        merged into existing buckets (min/max/last/samples).
+        
+        Args:
+            compact_after_days: Also delete rolled-up raw rows older than
+                this many days (the latest row of each product is kept)
+        
+        Returns:
+            Dictionary with rows_rolled_up and rows_compacted
+        """
+        conn = self.get_connection()
+        cursor = conn.cursor()
+        
+        cursor.execute("SELECT last_history_id FROM price_rollup_state WHERE id = 1")
+        row = cursor.fetchone()
+        last_id = row[0] if row else 0
+        cursor.execute("SELECT COALESCE(MAX(id), 0) FROM price_history")
+        max_id = cursor.fetchone()[0]
+        
+        rolled_up = 0
+        if max_id > last_id:
+            cursor.execute("SELECT COUNT(*) FROM price_history WHERE id > ? AND id <= ?",
+                           (last_id, max_id))
+            rolled_up = cursor.fetchone()[0]
+            
+            for resolution, bucket in ROLLUP_BUCKETS.items():
+                cursor.execute(f"""
+                    INSERT INTO price_rollups (
+                        product_id, resolution, bucket_start, min_price_usd, max_price_usd,
+                        price_usd, price_local, stock, samples, last_recorded_at
+                    )
+                    SELECT product_id, ?, bucket_start, MIN(price_usd), MAX(price_usd),
+                           MAX(CASE WHEN rn = 1 THEN price_usd END),
+                           MAX(CASE WHEN rn = 1 THEN price_local END),
+                           MAX(CASE WHEN rn = 1 THEN stock END),
+                           COUNT(*), MAX(recorded_at)
+                    FROM (
+                        SELECT product_id, price_usd, price_local, stock, recorded_at,
+                               {bucket} AS bucket_start,
+                               ROW_NUMBER() OVER (
+                                   PARTITION BY product_id, {bucket}
+                                   ORDER BY recorded_at DESC, id DESC
+                               ) AS rn
+                        FROM price_history
+                        WHERE id > ? AND id <= ?
+                    )
+                    GROUP BY product_id, bucket_start
+                    ON CONFLICT (product_id, resolution, bucket_start) DO UPDATE SET
+                        min_price_usd = MIN(min_price_usd, excluded.min_price_usd),
+                        max_price_usd = MAX(max_price_usd, excluded.max_price_usd),
+                        price_usd = CASE WHEN excluded.last_recorded_at >= last_recorded_at
+                                    THEN excluded.price_usd ELSE price_usd END,
+                        price_local = CASE WHEN excluded.last_recorded_at >= last_recorded_at
+                                      THEN excluded.price_local ELSE price_local END,
+                        stock = CASE WHEN excluded.last_recorded_at >= last_recorded_at
+                                THEN excluded.stock ELSE stock END,
+                        samples = samples + excluded.samples,
+                        last_recorded_at = MAX(last_recorded_at, excluded.last_recorded_at)
+                """, (resolution, last_id, max_id))
+            
+            cursor.execute("""
+                INSERT OR REPLACE INTO price_rollup_state (id, last_history_id) VALUES (1, ?)
+            """, (max_id,))
+        
+        compacted = 0
+        if compact_after_days:
+            cursor.execute("""
+                DELETE FROM price_history
+                WHERE id <= ?
+                AND recorded_at < datetime('now', ?)
+                AND id NOT IN (SELECT MAX(id) FROM price_history GROUP BY product_id)
+            """, (max_id, f'-{int(compact_after_days)} days'))
+            compacted = cursor.rowcount
+        
+        conn.commit()
+        conn.close()
+        
+        return {'rows_rolled_up': rolled_up, 'rows_compacted': compacted}
+    
+    def get_price_series(self, product_id: int, resolution: str = 'auto',
+                         days: Optional[int] = None, max_points: int = 500,
+                         raw_days: int = 30) -> Dict:
+        """
+        Gets a chart-ready price series for a product
+        
+        Args:
+            product_id: Product ID
+            resolution: 'raw', 'day', 'week' or 'auto' (finest resolution
+                that fits in max_points)
+            days: Only the last N days (None = all history)
+            max_points: Maximum points returned (the most recent ones)
+            raw_days: Raw rows are only guaranteed this far back (compaction)
+        
+        Returns:
+            Dictionary with resolution and points (oldest first); each point
+            has t, min_price_usd, max_price_usd, price_usd (last), price_local,
+            stock and samples
+        """
+        conn = self.get_connection()
+        cursor = conn.cursor()
+        since = None
+        if days:
+            cursor.execute("SELECT datetime('now', ?)", (f'-{int(days)} days',))
+            since = cursor.fetchone()[0]
+        
+        if resolution == 'auto':
+            resolution = self._pick_resolution(cursor, product_id, since, days, max_points, raw_days)
+        
+        if resolution == 'raw':
+            cursor.execute("""
+                SELECT recorded_at AS t, price_usd AS min_price_usd, price_usd AS max_price_usd,
+                       price_usd, price_local, stock, 1 AS samples
+                FROM price_history
+                WHERE product_id = ? AND recorded_at >= COALESCE(?, '')
+                ORDER BY recorded_at DESC, id DESC
+                LIMIT ?
+            """, (product_id, since, max_points))
+            points = [dict(row) for row in cursor.fetchall()]
+        else:
+            points = self._bucketed_series(cursor, product_id, resolution, since, max_points)
+        
+        conn.close()
+        points.reverse()
+        return {'product_id': product_id, 'resolution': resolution, 'points': points}
+    
+    def _pick_resolution(self, cursor, product_id: int, since: Optional[str],
+                         days: Optional[int], max_points: int, raw_days: int) -> str:
+        if days is None:
+            cursor.execute("""
+                SELECT julianday('now') - julianday(MIN(bucket_start))
+                FROM price_rollups WHERE product_id = ? AND resolution = 'day'
+            """, (product_id,))
+            span = cursor.fetchone()[0]
+            if span is None:
+                cursor.execute("""
+                    SELECT julianday('now') - julianday(MIN(recorded_at))
+                    FROM price_history WHERE product_id = ?
+                """, (product_id,))
+                span = cursor.fetchone()[0] or 0
+        else:
+            span = days
+        
+        if span <= raw_days:
+            cursor.execute("""
+                SELECT COUNT(*) FROM price_history
+                WHERE product_id = ? AND recorded_at >= COALESCE(?, '')
+            """, (product_id, since))
+            if cursor.fetchone()[0] <= max_points:
+                return 'raw'
+        return 'day' if span <= max_points else 'week'
+    
+    def _bucketed_series(self, cursor, product_id: int, resolution: str,
+                         since: Optional[str], max_points: int) -> List[Dict]:
+        if resolution not in ROLLUP_BUCKETS:
+            raise ValueError(f"Unknown resolution: {resolution}")
+        bucket = ROLLUP_BUCKETS[resolution]
+        since_bucket = None
+        if since:
+            cursor.execute(f"SELECT {bucket} FROM (SELECT ? AS recorded_at)", (since,))
+            since_bucket = cursor.fetchone()[0]
+        
+        cursor.execute("""
+            SELECT bucket_start AS t, min_price_usd, max_price_usd, price_usd,
+                   price_local, stock, samples
+            FROM price_rollups
+            WHERE product_id = ? AND resolution = ? AND bucket_start >= COALESCE(?, '')
+            ORDER BY bucket_start DESC
+            LIMIT ?
+        """, (product_id, resolution, since_bucket, max_points))
+        points = {row['t']: dict(row) for row in cursor.fetchall()}
+        
+        # Rows not rolled up yet are bucketed on the fly and merged in
+        cursor.execute("SELECT last_history_id FROM price_rollup_state WHERE id = 1")
+        row = cursor.fetchone()
+        cursor.execute(f"""
+            SELECT {bucket} AS t, price_usd, price_local, stock
+            FROM price_history
+            WHERE product_id = ? AND id > ? AND {bucket} >= COALESCE(?, '')
+            ORDER BY recorded_at, id
+        """, (product_id, row[0] if row else 0, since_bucket))
+        merge_pending_points(points, cursor.fetchall())
+        
+        return [points[t] for t in sorted(points, reverse=True)[:max_points]]
+    
+    def save_scrape_spans(self, run_id: str, spans: List[Dict]) -> int:
+        """Stores the aggregated spans of a scrape run (see scrapers/tracing.py)"""
+        conn = self.get_connection()
+        cursor = conn.cursor()
+        cursor.executemany("""
+            INSERT INTO scrape_spans (
+                run_id, store, category, page, stage, parent, calls, total_ms, self_ms, max_ms
+            ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+        """, [
+            (run_id, span['store'], span['category'], span['page'], span['stage'], span['parent'],
+             span['calls'], span['total_ms'], span['self_ms'], span['max_ms'])
+            for span in spans
+        ])
+        conn.commit()
+        conn.close()
+        return len(spans)
+    
+    def get_scrape_spans(self, run_id: Optional[str] = None) -> List[Dict]:
+        """Spans of a scrape run (the latest run when run_id is None)"""
+        conn = self.get_connection()
+        cursor = conn.cursor()
+        if run_id is None:
+            cursor.execute("SELECT run_id FROM scrape_spans ORDER BY id DESC LIMIT 1")
+            row = cursor.fetchone()
+            run_id = row['run_id'] if row else None
+        cursor.execute("""
+            SELECT * FROM scrape_spans
+            WHERE run_id = ?
+            ORDER BY store, category, page, id
+        """, (run_id,))
+        rows = [dict(row) for row in cursor.fetchall()]
+        conn.close()
+        return rows
+    
+    def get_scrape_runs(self, limit: int = 10) -> List[Dict]:
+        """Latest traced scrape runs with their stores and root span time"""
+        conn = self.get_connection()
+        cursor = conn.cursor()
+        cursor.execute("""
+            SELECT run_id, MIN(recorded_at) AS recorded_at,
+                   GROUP_CONCAT(DISTINCT store) AS stores,
+                   SUM(CASE WHEN parent IS NULL THEN total_ms ELSE 0 END) AS total_ms
+            FROM scrape_spans
+            GROUP BY run_id
+            ORDER BY MAX(id) DESC
+            LIMIT ?
+        """, (limit,))
+        rows = [dict(row) for row in cursor.fetchall()]
+        conn.close()
+        return rows
+    
+    def get_scrape_metrics(self) -> List[Dict]:
+        """
+        Per-store scrape counters from scrape_spans, for /metrics
+        
+        Totals cover every stored run; last_* values cover the latest run
+        of each store. Page time excludes DB writes (separate thread).
+        """
+        conn = self.get_connection()
+        cursor = conn.cursor()
+        cursor.execute("""
+            WITH latest AS (
+                SELECT s.store, s.run_id
+                FROM scrape_spans s
+                JOIN (
+                    SELECT store, MAX(id) AS id FROM scrape_spans
+                    WHERE stage = 'page' GROUP BY store
+                ) last ON last.id = s.id
+            )
+            SELECT s.store,
+                   SUM(CASE WHEN s.stage = 'page' AND s.page IS NOT NULL THEN 1 ELSE 0 END) AS pages_total,
+                   SUM(CASE WHEN s.stage = 'fetch_error' THEN s.calls ELSE 0 END) AS fetch_errors_total,
+                   SUM(CASE WHEN s.run_id = latest.run_id AND s.stage = 'page' AND s.page IS NOT NULL
+                            THEN 1 ELSE 0 END) AS last_pages,
+                   SUM(CASE WHEN s.run_id = latest.run_id AND s.stage = 'page'
+                            THEN s.total_ms ELSE 0 END) AS last_page_ms,
+                   SUM(CASE WHEN s.run_id = latest.run_id AND s.stage IN ('selenium_load', 'selenium_wait')
+                            THEN s.total_ms ELSE 0 END) AS last_selenium_ms
+            FROM scrape_spans s
+            LEFT JOIN latest ON latest.store = s.store
+            WHERE s.store IS NOT NULL
+            GROUP BY s.store
+            ORDER BY s.store
+        """)
+        rows = [dict(row) for row in cursor.fetchall()]
+        conn.close()
+        return rows
+
+
+# Per-method latency histogram for /metrics (pcscraper_db_call_duration_seconds)
+instrument_methods(Database, exclude=('get_connection',))
@@ -0,0 +1,213 @@
+"""
+Deal Detection Engine
+Batch job that scores every active product against its own price history
+and against the same product in other stores, using NumPy arrays instead
+of per-product queries, and stores the results in the deals table
+"""
+
+from typing import Dict
+
+import numpy as np
+
+# Bonus added to the score of products at their all-time low
+ALL_TIME_LOW_BONUS = 0.05
+
+
+def load_arrays(db) -> Dict[str, np.ndarray]:
+    """
+    Loads active products and their price history as NumPy arrays
+
+    History is ordered by (product, time), which compute_deals relies on.
+    """
+    conn = db.get_connection()
+    cursor = conn.cursor()
+
+    cursor.execute("""
+        SELECT id, COALESCE(NULLIF(normalized_name, ''), '#' || id), store, price_usd
+        FROM products
+        WHERE is_active = 1 AND price_usd > 0
+        ORDER BY id
+    """)
+    products = cursor.fetchall()
+
+    cursor.execute("""
+        SELECT h.product_id, julianday(h.recorded_at), h.price_usd
+        FROM price_history h
+        JOIN products p ON p.id = h.product_id
+        WHERE p.is_active = 1 AND p.price_usd > 0 AND h.price_usd > 0
+        ORDER BY h.product_id, h.recorded_at, h.id
+    """)
+    history = cursor.fetchall()
+
+    # Compacted history survives only in the daily rollups
+    cursor.execute("""
+        SELECT product_id, MIN(min_price_usd), MAX(max_price_usd)
+        FROM price_rollups
+        WHERE resolution = 'day' AND min_price_usd > 0
+        GROUP BY product_id
+    """)
+    rollups = cursor.fetchall()
+
+    cursor.execute("SELECT julianday('now')")
+    now = cursor.fetchone()[0]
+    conn.close()
+
+    return {
+        'product_id': np.array([row[0] for row in products], dtype=np.int64),
+        'group': np.array([row[1] for row in products], dtype=object),
+        'store': np.array([row[2] for row in products], dtype=object),
+        'price': np.array([row[3] for row in products], dtype=np.float64),
+        'history_product_id': np.array([row[0] for row in history], dtype=np.int64),
+        'history_day': np.array([row[1] for row in history], dtype=np.float64),
+        'history_price': np.array([row[2] for row in history], dtype=np.float64),
+        'rollup_product_id': np.array([row[0] for row in rollups], dtype=np.int64),
+        'rollup_min': np.array([row[1] for row in rollups], dtype=np.float64),
+        'rollup_max': np.array([row[2] for row in rollups], dtype=np.float64),
+        'now': now,
+    }
+
+
+def compute_deals(arrays: Dict[str, np.ndarray], window_days: int = 30,
+                  min_drop: float = 0.05, min_spread: float = 0.05) -> Dict[str, np.ndarray]:
+    """
+    Scores every product in one vectorized pass
+
+    For each product:
+        - drop_pct: drop of the current price from the median of the
+          previous prices recorded in the last window_days
+        - all_time_low: current price is the lowest ever seen, and the
+          product has been more expensive before
+        - spread_pct / is_cheapest: spread between the cheapest and most
+          expensive offer with the same normalized name, and whether this
+          product is the cheapest of several stores
+
+    Returns:
+        Arrays aligned with arrays['product_id'], plus an is_deal mask
+    """
+    product_ids = arrays['product_id']
+    price = arrays['price']
+    n = len(product_ids)
+
+    if not n:
+        # No active products (history and rollups may still hold inactive ones)
+        no_values, no_flags = np.zeros(0), np.zeros(0, dtype=bool)
+        return {
+            'product_id': product_ids, 'trailing_median': no_values, 'drop_pct': no_values,
+            'all_time_low': no_flags, 'all_time_min': no_values,
+            'store_count': np.zeros(0, dtype=np.int64), 'group_min': no_values,
+            'group_max': no_values, 'spread_pct': no_values, 'is_cheapest': no_flags,
+            'score': no_values, 'is_deal': no_flags,
+        }
+
+    # History rows -> product index (every history row has a product, via the JOIN)
+    h_idx = np.searchsorted(product_ids, arrays['history_product_id'])
+    h_price = arrays['history_price']
+
+    # Trailing median, excluding each product's latest row (the current price)
+    is_latest = np.ones(len(h_idx), dtype=bool)
+    is_latest[:-1] = h_idx[1:] != h_idx[:-1]
+    in_window = (arrays['history_day'] >= arrays['now'] - window_days) & ~is_latest
+    w_idx = h_idx[in_window]
+    w_price = h_price[in_window]
+    order = np.lexsort((w_price, w_idx))
+    w_price = w_price[order]
+
+    counts = np.bincount(w_idx, minlength=n)
+    starts = np.cumsum(counts) - counts
+    has_window = counts > 0
+    median = np.full(n, np.nan)
+    low = starts[has_window] + (counts[has_window] - 1) // 2
+    high = starts[has_window] + counts[has_window] // 2
+    median[has_window] = (w_price[low] + w_price[high]) / 2
+    drop_pct = np.zeros(n)
+    drop_pct[has_window] = (median[has_window] - price[has_window]) / median[has_window]
+
+    # All-time low over raw history and compacted rollups
+    all_time_min = np.full(n, np.inf)
+    all_time_max = np.zeros(n)
+    np.minimum.at(all_time_min, h_idx, h_price)
+    np.maximum.at(all_time_max, h_idx, h_price)
+    r_idx = np.searchsorted(product_ids, arrays['rollup_product_id'])
+    known = (r_idx < n) & (product_ids[np.minimum(r_idx, n - 1)] == arrays['rollup_product_id'])
+    np.minimum.at(all_time_min, r_idx[known], arrays['rollup_min'][known])
+    np.maximum.at(all_time_max, r_idx[known], arrays['rollup_max'][known])
+    all_time_min = np.minimum(all_time_min, price)
+    all_time_low = (price <= all_time_min) & (all_time_max > price)
+
+    # Cross-store spread per canonical product (normalized name)
+    groups, g = np.unique(arrays['group'], return_inverse=True)
+    stores, s = np.unique(arrays['store'], return_inverse=True)
+    n_groups, n_stores = len(groups), len(stores)
+    group_min = np.full(n_groups, np.inf)
+    group_max = np.zeros(n_groups)
+    np.minimum.at(group_min, g, price)
+    np.maximum.at(group_max, g, price)
+    store_pairs = np.unique(g * n_stores + s)
+    group_stores = np.bincount(store_pairs // n_stores, minlength=n_groups)
+
+    store_count = group_stores[g]
+    spread_pct = (group_max[g] - group_min[g]) / group_max[g]
+    is_cheapest = (store_count > 1) & (price <= group_min[g]) & (spread_pct > 0)
+
+    score = (np.clip(drop_pct, 0, None) + np.where(is_cheapest, spread_pct, 0)
+             + ALL_TIME_LOW_BONUS * all_time_low)
+    is_deal = (drop_pct >= min_drop) | all_time_low | (is_cheapest & (spread_pct >= min_spread))
+
+    return {
+        'product_id': product_ids,
+        'trailing_median': median,
+        'drop_pct': drop_pct,
+        'all_time_low': all_time_low,
+        'all_time_min': all_time_min,
+        'store_count': store_count,
+        'group_min': group_min[g],
+        'group_max': group_max[g],
+        'spread_pct': spread_pct,
+        'is_cheapest': is_cheapest,
+        'score': score,
+        'is_deal': is_deal,
+    }
+
+
+def refresh_deals(db, window_days: int = 30, min_drop: float = 0.05,
+                  min_spread: float = 0.05) -> int:
+    """
+    Recomputes the deals table
+
+    Returns:
+        Number of deals stored
+    """
+    result = compute_deals(load_arrays(db), window_days, min_drop, min_spread)
+    mask = result['is_deal']
+
+    def column(name):
+        return result[name][mask].tolist()
+
+    def flag(name):
+        # 0/1 like the SQLite schema; PostgreSQL has no implicit boolean -> integer cast
+        return [int(value) for value in column(name)]
+
+    medians = [None if np.isnan(value) else round(value, 2) for value in column('trailing_median')]
+    rows = list(zip(
+        column('product_id'), medians,
+        np.round(result['drop_pct'][mask], 4).tolist(),
+        flag('all_time_low'), column('all_time_min'), column('store_count'),
+        column('group_min'), column('group_max'),
+        np.round(result['spread_pct'][mask], 4).tolist(),
+        flag('is_cheapest'),
+        np.round(result['score'][mask], 4).tolist(),
+    ))
+
+    conn = db.get_connection()
+    cursor = conn.cursor()
+    cursor.execute("DELETE FROM deals")
+    cursor.executemany("""
+        INSERT INTO deals (
+            product_id, trailing_median, drop_pct, all_time_low, all_time_min,
+            store_count, min_price_usd, max_price_usd, spread_pct, is_cheapest, score
+        ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+    """, rows)
+    conn.commit()
+    conn.close()
+
+    return len(rows)
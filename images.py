@@ -0,0 +1,253 @@
+"""
+Image Thumbnail Cache
+Downloads product images once per distinct URL, stores content-addressed
+thumbnails on local disk and tells the API where to find them
+"""
+
+import io
+import os
+import hashlib
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import Dict, List, Optional
+
+# Fixed thumbnail sizes (longest side, in pixels) served by /api/images/{hash}
+THUMBNAIL_SIZES: Dict[str, int] = {
+    'sm': 96,
+    'md': 256,
+    'lg': 512,
+}
+
+# Larger downloads are rejected (store CDNs sometimes link huge originals)
+MAX_IMAGE_BYTES = 10 * 1024 * 1024
+
+USER_AGENT = ('Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 '
+              '(KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36')
+
+
+def is_image_hash(value: str) -> bool:
+    """True for a sha256 hex digest as produced by ImageCache"""
+    return len(value) == 64 and all(c in '0123456789abcdef' for c in value)
+
+
+class ImageCache:
+    """
+    Content-addressed thumbnail store
+
+    Thumbnails live in <directory>/<hash[:2]>/<hash>_<size>.jpg, where hash
+    is the sha256 of the downloaded image bytes, so products (and stores)
+    sharing an image share its thumbnails. The images table maps each
+    image URL to its hash plus the validators (ETag, Last-Modified,
+    Content-Length) used by the HEAD check on later syncs.
+    """
+
+    def __init__(self, db, directory: str, max_workers: int = 8, timeout: int = 10):
+        """
+        Args:
+            db: Database instance (images table)
+            directory: Root directory for thumbnails
+            max_workers: Maximum concurrent downloads
+            timeout: Request timeout in seconds
+        """
+        self.db = db
+        self.directory = directory
+        self.max_workers = max_workers
+        self.timeout = timeout
+        self._local = threading.local()
+
+    def _session(self):
+        # requests.Session is not thread-safe: one per worker thread
+        session = getattr(self._local, 'session', None)
+        if session is None:
+            # Imported on first fetch: the API only serves cached files
+            import requests
+            session = requests.Session()
+            session.headers['User-Agent'] = USER_AGENT
+            self._local.session = session
+        return session
+
+    def thumbnail_path(self, content_hash: str, size: str = 'md') -> str:
+        """Path of a thumbnail on disk (it may not exist)"""
+        return os.path.join(self.directory, content_hash[:2], f'{content_hash}_{size}.jpg')
+
+    def has_thumbnails(self, content_hash: str) -> bool:
+        """True when every size of an image is already on disk"""
+        return all(os.path.exists(self.thumbnail_path(content_hash, size)) for size in THUMBNAIL_SIZES)
+
+    def pending_urls(self, refresh: bool = False) -> List[str]:
+        """
+        Distinct product image URLs that still need work
+
+        Args:
+            refresh: Also return URLs already cached (revalidated with HEAD)
+        """
+        conn = self.db.get_connection()
+        cursor = conn.cursor()
+        if refresh:
+            cursor.execute("""
+                SELECT DISTINCT image_url FROM products
+                WHERE is_active = 1 AND image_url IS NOT NULL AND image_url != ''
+            """)
+        else:
+            cursor.execute("""
+                SELECT DISTINCT p.image_url FROM products p
+                LEFT JOIN images i ON i.url = p.image_url
+                WHERE p.is_active = 1 AND p.image_url IS NOT NULL AND p.image_url != ''
+                AND (i.url IS NULL OR i.status != 'ok')
+            """)
+        urls = [row[0] for row in cursor.fetchall()]
+        conn.close()
+        return urls
+
+    def get_image(self, url: str) -> Optional[Dict]:
+        """Returns the images row for a URL, or None"""
+        conn = self.db.get_connection()
+        row = conn.execute("SELECT * FROM images WHERE url = ?", (url,)).fetchone()
+        conn.close()
+        return dict(row) if row else None
+
+    def sync(self, refresh: bool = False) -> Dict[str, int]:
+        """
+        Fetches every pending image URL with bounded concurrency
+
+        Returns:
+            Counts per outcome: 'ok' (new thumbnails), 'unchanged' (HEAD
+            validators matched), 'reused' (bytes already cached under
+            another URL) and 'failed'
+        """
+        urls = self.pending_urls(refresh)
+        counts = {'ok': 0, 'unchanged': 0, 'reused': 0, 'failed': 0}
+        if not urls:
+            return counts
+
+        with ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix='images') as executor:
+            for outcome in executor.map(self.process_url, urls):
+                counts[outcome] += 1
+        return counts
+
+    def process_url(self, url: str) -> str:
+        """HEAD-checks, downloads and thumbnails one image URL"""
+        previous = self.get_image(url)
+        record = {
+            'url': url,
+            'content_hash': previous['content_hash'] if previous else None,
+            'status': 'failed',
+            'content_type': None,
+            'etag': None,
+            'last_modified': None,
+            'content_length': None,
+            'width': previous['width'] if previous else None,
+            'height': previous['height'] if previous else None,
+            'error': None,
+        }
+        outcome = 'failed'
+
+        try:
+            session = self._session()
+
+            # HEAD first: skip non-images and unchanged images without downloading
+            head = session.head(url, timeout=self.timeout, allow_redirects=True)
+            if head.status_code < 400:
+                record['content_type'] = head.headers.get('Content-Type')
+                record['etag'] = head.headers.get('ETag')
+                record['last_modified'] = head.headers.get('Last-Modified')
+                record['content_length'] = head.headers.get('Content-Length')
+
+                if record['content_type'] and not record['content_type'].startswith('image/'):
+                    raise ValueError(f"No es una imagen: {record['content_type']}")
+                if int(record['content_length'] or 0) > MAX_IMAGE_BYTES:
+                    raise ValueError(f"Imagen demasiado grande: {record['content_length']} bytes")
+
+                if (previous and previous['status'] == 'ok' and
+                        self._same_validators(previous, record) and
+                        self.has_thumbnails(previous['content_hash'])):
+                    record['status'] = 'ok'
+                    self._save(record)
+                    return 'unchanged'
+
+            # Some CDNs reject HEAD (405); the GET below is the real check
+            response = session.get(url, timeout=self.timeout)
+            response.raise_for_status()
+            content = response.content
+            if len(content) > MAX_IMAGE_BYTES:
+                raise ValueError(f"Imagen demasiado grande: {len(content)} bytes")
+
+            record['content_type'] = response.headers.get('Content-Type', record['content_type'])
+            record['etag'] = response.headers.get('ETag', record['etag'])
+            record['last_modified'] = response.headers.get('Last-Modified', record['last_modified'])
+            record['content_length'] = str(len(content))
+
+            content_hash = hashlib.sha256(content).hexdigest()
+            record['content_hash'] = content_hash
+
+            if self.has_thumbnails(content_hash):
+                outcome = 'reused'
+            else:
+                record['width'], record['height'] = self._write_thumbnails(content_hash, content)
+                outcome = 'ok'
+            record['status'] = 'ok'
+
+        except Exception as e:
+            record['error'] = str(e)[:500]
+            outcome = 'failed'
+            # Keep serving the thumbnails from the last good fetch
+            if previous and previous['status'] == 'ok' and self.has_thumbnails(previous['content_hash']):
+                record['status'] = 'ok'
+
+        self._save(record)
+        return outcome
+
+    @staticmethod
+    def _same_validators(previous: Dict, current: Dict) -> bool:
+        validators = [key for key in ('etag', 'last_modified', 'content_length') if current[key]]
+        return bool(validators) and all(previous[key] == current[key] for key in validators)
+
+    def _write_thumbnails(self, content_hash: str, content: bytes):
+        try:
+            from PIL import Image
+        except ImportError:
+            raise RuntimeError("Las miniaturas requieren Pillow: pip install Pillow")
+
+        with Image.open(io.BytesIO(content)) as image:
+            image.load()
+            width, height = image.size
+            if image.mode not in ('RGB', 'L'):
+                # JPEG has no alpha: flatten transparent PNGs onto white
+                background = Image.new('RGB', image.size, (255, 255, 255))
+                rgba = image.convert('RGBA')
+                background.paste(rgba, mask=rgba.split()[-1])
+                image = background
+
+            os.makedirs(os.path.dirname(self.thumbnail_path(content_hash)), exist_ok=True)
+            for size, pixels in THUMBNAIL_SIZES.items():
+                thumbnail = image.copy()
+                thumbnail.thumbnail((pixels, pixels))
+                path = self.thumbnail_path(content_hash, size)
+                # Write then rename so the API never serves a half-written file
+                tmp_path = f'{path}.{threading.get_ident()}.tmp'
+                thumbnail.save(tmp_path, 'JPEG', quality=85, optimize=True)
+                os.replace(tmp_path, path)
+
+        return width, height
+
+    def _save(self, record: Dict):
+        conn = self.db.get_connection()
+        conn.execute("""
+            INSERT INTO images
+            (url, content_hash, status, content_type, etag, last_modified,
+             content_length, width, height, fetched_at, error)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            ON CONFLICT (url) DO UPDATE SET
+                content_hash = excluded.content_hash, status = excluded.status,
+                content_type = excluded.content_type, etag = excluded.etag,
+                last_modified = excluded.last_modified, content_length = excluded.content_length,
+                width = excluded.width, height = excluded.height,
+                fetched_at = excluded.fetched_at, error = excluded.error
+        """, (
+            record['url'], record['content_hash'], record['status'], record['content_type'],
+            record['etag'], record['last_modified'], record['content_length'],
+            record['width'], record['height'], datetime.now().isoformat(), record['error']
+        ))
+        conn.commit()
+        conn.close()
@@ -4,16 +4,26 @@ FastAPI application for scraping and comparing PC component prices
 Optimized for mobile app consumption (iOS)
 """
 
-from fastapi import FastAPI, HTTPException, BackgroundTasks, Query
+from fastapi import FastAPI, HTTPException, BackgroundTasks, Query, Request
+from fastapi.concurrency import run_in_threadpool
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import FileResponse, PlainTextResponse
 from pydantic import BaseModel, Field
 from typing import List, Optional, Dict
 from datetime import datetime
 import uvicorn
 import logging
+import os
+import sys
+import time
+import zlib
 
-from database import Database
-from scrapers import SercoPlusScraper, PCImpactoScraper, ComputerShopScraper
+from storage import open_storage
+from profiler import QueryProfiler, REPORT_ORDERS
+from images import ImageCache, THUMBNAIL_SIZES, is_image_hash
+from pipeline import ingest_ndjson
+from metrics import REGISTRY, HTTP_REQUEST_SECONDS, HTTP_REQUESTS, CACHE_REQUESTS, CACHE_HIT_RATIO
+from scrapers.registry import ScraperRegistry
 # from product_matcher import ProductMatcher  # Módulo no utilizado actualmente
 # from scheduler import ScrapingScheduler, STORE_URLS  # Comentado temporalmente
 from config import config
@@ -33,21 +43,41 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Request latency/throughput per route template (served at /metrics)
+@app.middleware("http")
+async def record_request_metrics(request: Request, call_next):
+    started = time.perf_counter()
+    status = 500
+    try:
+        response = await call_next(request)
+        status = response.status_code
+        return response
+    finally:
+        # Route template, not the raw path, to keep label cardinality bounded
+        route = request.scope.get("route")
+        route_path = getattr(route, "path", "unmatched")
+        HTTP_REQUEST_SECONDS.observe(time.perf_counter() - started, method=request.method, route=route_path)
+        HTTP_REQUESTS.inc(method=request.method, route=route_path, status=status)
+
 # Setup logging
 logging.basicConfig(level=config.LOG_LEVEL)
 logger = logging.getLogger(__name__)
 
 # Initialize database, scrapers, and utilities
-db = Database(config.DATABASE_PATH)
+query_profiler = QueryProfiler(config.QUERY_PROFILER_THRESHOLD_MS) if config.QUERY_PROFILER_ENABLED else None
+db = open_storage(config.DATABASE_URL or config.DATABASE_PATH, profiler=query_profiler,
+                  read_only=config.API_READ_ONLY, pool_size=config.DATABASE_POOL_SIZE)
+image_cache = ImageCache(db, config.IMAGE_CACHE_DIR, config.IMAGE_FETCH_WORKERS)
 # matcher = ProductMatcher(db)  # No utilizado actualmente
 # scheduler = ScrapingScheduler(db)  # Comentado temporalmente
 
-# Initialize store-specific scrapers
-scrapers = {
-    'SercoPlus': SercoPlusScraper(),
-    'PCImpacto': PCImpactoScraper(),
-    'ComputerShop': ComputerShopScraper()
-}
+# Store-specific scrapers, built on the first /api/scrape for each store
+# (read-only workers never scrape)
+scrapers = ScraperRegistry({} if config.API_READ_ONLY else {
+    'SercoPlus': ('scrapers.sercoplus_scraper', 'SercoPlusScraper'),
+    'PCImpacto': ('scrapers.pcimpacto_scraper', 'PCImpactoScraper'),
+    'ComputerShop': ('scrapers.computershop_scraper', 'ComputerShopScraper'),
+})
 
 # Pydantic models
 class ScrapeRequest(BaseModel):
@@ -81,11 +111,44 @@ class PriceComparisonResponse(BaseModel):
     price_difference: float
 
 
+def require_writable():
+    """Write endpoints are disabled on read-only serving workers"""
+    if db.read_only:
+        raise HTTPException(status_code=503, detail="API en modo solo lectura: las escrituras las hace scripts/writer.py")
+
+
+def gunzip_limited(data: bytes, limit: int) -> bytes:
+    """
+    Decompresses every member of a gzip body (cat a.gz b.gz), up to limit + 1 bytes
+
+    Raises:
+        zlib.error: Corrupt or truncated body
+    """
+    output = []
+    size = 0
+    while data and size <= limit:
+        decompressor = zlib.decompressobj(16 + zlib.MAX_WBITS)
+        chunk = decompressor.decompress(data, limit + 1 - size)
+        output.append(chunk)
+        size += len(chunk)
+        if size > limit:
+            break  # Over the limit: the caller answers 413
+        if not decompressor.eof:
+            raise zlib.error("gzip truncado")
+        # Like the gzip module, allow zero padding after the last member
+        data = decompressor.unused_data.lstrip(b"\x00")
+    return b"".join(output)
+
+
 @app.on_event("startup")
 async def startup_event():
     """Initialize database and scheduler on startup"""
-    db.init_db()
-    logger.info("✅ Database initialized")
+    if db.read_only:
+        # Schema and migrations belong to the writer (scripts/writer.py)
+        logger.info(f"📖 Modo solo lectura (worker {os.getpid()}): {config.DATABASE_PATH}")
+    else:
+        db.init_db()
+        logger.info("✅ Database initialized")
     
     # Start scheduler if enabled
     # if config.ENABLE_AUTO_SCRAPING:
@@ -98,7 +161,7 @@ async def shutdown_event():
     # if scheduler.is_running:
     #     scheduler.stop_scheduler()
     #     logger.info("⏹️ Scheduler stopped")
-    pass
+    db.close()
 
 @app.get("/")
 async def root():
@@ -128,6 +191,7 @@ async def scrape_store(request: ScrapeRequest, background_tasks: BackgroundTasks
     - **url**: URL de la página a scrapear
     - **store_name**: Nombre de la tienda (SercoPlus, PCImpacto, o ComputerShop)
     """
+    require_writable()
     try:
         # Get appropriate scraper
         scraper = scrapers.get(request.store_name)
@@ -159,7 +223,7 @@ async def scrape_store(request: ScrapeRequest, background_tasks: BackgroundTasks
             "saved": saved_count,
             "store": request.store_name,
             "url": request.url,
-            "products": products[:5]  # Return first 5 as sample
+            "products": [dict(product) for product in products[:5]]  # Return first 5 as sample
         }
     
     except HTTPException:
@@ -212,6 +276,7 @@ async def create_product(product: ProductCreate):
     - **url**: URL del producto
     - **store_name**: Nombre de la tienda
     """
+    require_writable()
     try:
         # Mapear campos de la API a la BD
         product_dict = {
@@ -239,6 +304,43 @@ async def create_product(product: ProductCreate):
         logger.error(f"Error creating product: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
+@app.post("/api/products/bulk")
+async def bulk_upsert_products(request: Request):
+    """
+    Carga masiva de productos en NDJSON (opcionalmente gzip)
+    
+    Una línea JSON por producto con los campos de la tabla products
+    (name, price_usd, store, source_url, ...); {"source_url": ..., "is_active": 0}
+    desactiva un producto. Usado por scripts/upload_to_api.py
+    """
+    require_writable()
+    too_large = HTTPException(status_code=413, detail="Lote demasiado grande, dividir en lotes más pequeños")
+    
+    # BULK_MAX_BYTES caps the body as sent (checked while reading) and once decompressed
+    content_length = request.headers.get("content-length", "")
+    if content_length.isdigit() and int(content_length) > config.BULK_MAX_BYTES:
+        raise too_large
+    chunks = []
+    received = 0
+    async for chunk in request.stream():
+        received += len(chunk)
+        if received > config.BULK_MAX_BYTES:
+            raise too_large
+        chunks.append(chunk)
+    body = b"".join(chunks)
+    
+    if request.headers.get("content-encoding") == "gzip" or body[:2] == b"\x1f\x8b":
+        try:
+            body = gunzip_limited(body, config.BULK_MAX_BYTES)
+        except zlib.error:
+            raise HTTPException(status_code=400, detail="Cuerpo gzip inválido")
+    
+    if len(body) > config.BULK_MAX_BYTES:
+        raise too_large
+    
+    # The upsert is blocking SQLite work: keep it off the event loop
+    return await run_in_threadpool(ingest_ndjson, db, body.splitlines())
+
 @app.get("/api/products/{product_id}")
 async def get_product(product_id: int):
     """Obtiene un producto específico por ID"""
@@ -249,6 +351,30 @@ async def get_product(product_id: int):
     
     return product
 
+@app.get("/api/products/{product_id}/history")
+async def get_product_history(
+    product_id: int,
+    resolution: str = Query("auto", description="raw, day, week o auto"),
+    days: Optional[int] = Query(None, ge=1, description="Solo los últimos N días"),
+    max_points: int = Query(config.PRICE_HISTORY_MAX_POINTS, ge=1, le=5000,
+                            description="Máximo de puntos (los más recientes)")
+):
+    """
+    Serie de precios lista para graficar
+    
+    Con resolución day/week cada punto trae min, max y último precio del periodo
+    """
+    if resolution not in ("auto", "raw", "day", "week"):
+        raise HTTPException(status_code=400, detail="Resolución inválida (raw, day, week o auto)")
+    
+    if not db.get_product_by_id(product_id):
+        raise HTTPException(status_code=404, detail="Producto no encontrado")
+    
+    return db.get_price_series(
+        product_id, resolution, days, max_points,
+        raw_days=config.PRICE_HISTORY_RAW_DAYS or 36500
+    )
+
 # Endpoint deshabilitado temporalmente - requiere ProductMatcher
 # @app.get("/api/compare/{product_name}")
 # async def compare_prices(product_name: str, component_type: Optional[str] = None):
@@ -269,6 +395,23 @@ async def get_product(product_id: int):
 #     
 #     return comparison
 
+@app.get("/api/changes")
+async def get_changes(
+    since: Optional[int] = Query(None, ge=0, description="Cursor de la última sincronización (0 = desde el inicio)"),
+    limit: int = Query(1000, ge=1, le=5000, description="Máximo de productos por página")
+):
+    """
+    Productos insertados, actualizados, desactivados o eliminados después de un cursor
+    
+    - Sin **since** solo devuelve el cursor actual (usar tras una descarga completa)
+    - Seguir pidiendo con **next_cursor** mientras **has_more** sea true
+    - Si **reset** es true el cursor es demasiado antiguo: descargar todo de nuevo
+    """
+    if since is None:
+        return {"changes": [], "next_cursor": db.get_change_cursor(), "has_more": False, "reset": False}
+    
+    return db.get_changes(since, limit)
+
 @app.get("/api/search")
 async def search_products(query: str, limit: int = 20):
     """
@@ -518,6 +661,7 @@ async def get_statistics():
 @app.delete("/api/products/{product_id}")
 async def delete_product(product_id: int):
     """Elimina un producto específico"""
+    require_writable()
     success = db.delete_product(product_id)
     
     if not success:
@@ -618,6 +762,32 @@ async def get_component_types():
 #     }
 
 
+@app.get("/api/images/{image_hash}")
+async def get_image_thumbnail(
+    image_hash: str,
+    size: str = Query("md", description="Tamaño de miniatura: sm, md o lg")
+):
+    """
+    Sirve una miniatura cacheada por hash de contenido (ver scripts/sync_images.py)
+    
+    El contenido de un hash nunca cambia, así que se puede cachear indefinidamente
+    """
+    if not is_image_hash(image_hash) or size not in THUMBNAIL_SIZES:
+        raise HTTPException(status_code=404, detail="Imagen no encontrada")
+    
+    path = image_cache.thumbnail_path(image_hash, size)
+    if not os.path.exists(path):
+        CACHE_REQUESTS.inc(cache="thumbnail", result="miss")
+        raise HTTPException(status_code=404, detail="Imagen no encontrada")
+    
+    CACHE_REQUESTS.inc(cache="thumbnail", result="hit")
+    return FileResponse(
+        path,
+        media_type="image/jpeg",
+        headers={"Cache-Control": "public, max-age=31536000, immutable"}
+    )
+
+
 @app.get("/api/mobile/latest")
 async def get_latest_products_mobile(
     limit: int = Query(20, description="Productos a retornar"),
@@ -643,6 +813,8 @@ async def get_latest_products_mobile(
             "stock": p["stock"],
             "store": p["store"],
             "url": p.get("source_url"),
+            "thumbnail": f"/api/images/{p['image_hash']}?size=sm" if p.get("image_hash") else None,
+            "stores_available": p.get("store_count") or 1,
             "updated": p.get("last_scraped")
         })
     
@@ -660,19 +832,42 @@ async def get_best_deals_mobile(
     """
     Obtiene las mejores ofertas actuales (productos con mayor descuento entre tiendas)
     Optimizado para app móvil
+    
+    Las ofertas las calcula deals.py (caída vs mediana reciente, mínimo histórico
+    y diferencia entre tiendas); aquí solo se leen de la tabla deals
     """
-    # Get products with price history to find best deals
-    # This is a simplified version - you could enhance with actual discount calculation
+    products = db.get_deals(component_type, limit)
     
+    if products or db.get_deals(limit=1):
+        deals = []
+        for p in products:
+            deals.append({
+                "id": p["id"],
+                "name": p["name"],
+                "brand": p["brand"],
+                "price_usd": p["price_usd"],
+                "price_pen": p.get("price_local"),
+                "store": p["store"],
+                "url": p.get("source_url"),
+                "stores_available": p["store_count"],
+                "previous_price_usd": p["trailing_median"],
+                "drop_pct": round(p["drop_pct"] * 100, 1),
+                "all_time_low": bool(p["all_time_low"]),
+                "spread_pct": round(p["spread_pct"] * 100, 1),
+                "cheapest": bool(p["is_cheapest"])
+            })
+        
+        return {
+            "count": len(deals),
+            "deals": deals
+        }
+    
+    # No deals computed yet (run scripts/compute_deals.py): cheapest products
     conn = db.get_connection()
     cursor = conn.cursor()
     
     query = """
-        SELECT p.*, 
-               (SELECT COUNT(*) FROM products p2 
-                WHERE p2.normalized_name = p.normalized_name 
-                AND p2.store != p.store) as store_count
-        FROM products p
+        SELECT p.* FROM products p
         WHERE is_active = 1
     """
     
@@ -698,7 +893,7 @@ async def get_best_deals_mobile(
             "price_pen": p.get("price_local"),
             "store": p["store"],
             "url": p.get("source_url"),
-            "stores_available": p.get("store_count", 1)
+            "stores_available": p["store_count"]
         })
     
     return {
@@ -769,6 +964,125 @@ async def health_check():
     }
 
 
+# ==================== MÉTRICAS ====================
+
+SCRAPE_PAGES = REGISTRY.counter(
+    'scrape_pages_total', 'Páginas scrapeadas por tienda (todas las ejecuciones en scrape_spans)', ('store',))
+SCRAPE_FETCH_ERRORS = REGISTRY.counter(
+    'scrape_fetch_errors_total', 'Errores de descarga por tienda (todas las ejecuciones en scrape_spans)', ('store',))
+SCRAPE_PAGES_PER_SECOND = REGISTRY.gauge(
+    'scrape_pages_per_second', 'Páginas por segundo de la última ejecución de cada tienda', ('store',))
+SELENIUM_UTILIZATION = REGISTRY.gauge(
+    'scrape_selenium_utilization',
+    'Fracción del tiempo de página de la última ejecución ocupada por Selenium (carga + espera)', ('store',))
+
+
+@REGISTRY.collector
+def collect_scrape_metrics():
+    """Scrapes run in other processes; their spans are read from the database"""
+    for row in db.get_scrape_metrics():
+        labels = {'store': row['store']}
+        yield SCRAPE_PAGES, labels, row['pages_total']
+        yield SCRAPE_FETCH_ERRORS, labels, row['fetch_errors_total']
+        page_seconds = (row['last_page_ms'] or 0) / 1000
+        if page_seconds:
+            yield SCRAPE_PAGES_PER_SECOND, labels, round(row['last_pages'] / page_seconds, 4)
+            yield SELENIUM_UTILIZATION, labels, round(row['last_selenium_ms'] / 1000 / page_seconds, 4)
+
+
+@REGISTRY.collector
+def collect_cache_metrics():
+    """Hit/miss counters of the caches loaded in this process, plus hit ratios"""
+    counts = {}
+    for name in ('scrapers.enrichment', 'enrichment'):
+        module = sys.modules.get(name)
+        cache = getattr(module, '_shared_cache', None)
+        if cache is not None:
+            counts['enrichment'] = (cache.hits, cache.misses)
+    for name in ('scrapers.price_parser', 'price_parser'):
+        module = sys.modules.get(name)
+        if module is None:
+            continue
+        for cache_name, func in (('parse_price', '_parse_price_cached'), ('parse_stock', 'parse_stock'),
+                                 ('parse_labeled_stock', 'parse_labeled_stock')):
+            info = getattr(module, func).cache_info()
+            hits, misses = counts.get(cache_name, (0, 0))
+            counts[cache_name] = (hits + info.hits, misses + info.misses)
+
+    for cache_name, (hits, misses) in counts.items():
+        yield CACHE_REQUESTS, {'cache': cache_name, 'result': 'hit'}, hits
+        yield CACHE_REQUESTS, {'cache': cache_name, 'result': 'miss'}, misses
+
+    totals = {}
+    for (cache_name, result), value in CACHE_REQUESTS.samples().items():
+        totals.setdefault(cache_name, {'hit': 0, 'miss': 0})[result] = value
+    for cache_name, total in totals.items():
+        if total['hit'] + total['miss']:
+            yield CACHE_HIT_RATIO, {'cache': cache_name}, round(total['hit'] / (total['hit'] + total['miss']), 4)
+
+
+@app.get("/metrics", response_class=PlainTextResponse)
+async def get_metrics():
+    """
+    Métricas en formato de texto de Prometheus
+    
+    Latencia por ruta, duración por método de Database, aciertos de cachés,
+    páginas/s, errores de descarga y uso de Selenium por tienda
+    """
+    body = await run_in_threadpool(REGISTRY.render)
+    return PlainTextResponse(body, media_type="text/plain; version=0.0.4; charset=utf-8")
+
+
+# ==================== ADMIN ====================
+
+def require_admin(request: Request):
+    """X-Admin-Token must match ADMIN_TOKEN; without a token only localhost is allowed"""
+    if config.ADMIN_TOKEN:
+        if request.headers.get("x-admin-token") != config.ADMIN_TOKEN:
+            raise HTTPException(status_code=403, detail="Token de administración inválido")
+    elif not request.client or request.client.host not in ("127.0.0.1", "::1", "localhost"):
+        raise HTTPException(status_code=403, detail="Endpoint de administración solo accesible desde localhost")
+
+
+def get_query_profiler() -> QueryProfiler:
+    if db.profiler is None:
+        raise HTTPException(status_code=404, detail="Profiler de consultas desactivado (QUERY_PROFILER_ENABLED=true)")
+    return db.profiler
+
+
+@app.get("/api/admin/queries")
+async def get_query_report(
+    request: Request,
+    limit: int = Query(20, ge=1, le=200),
+    order: str = Query("total", description=f"Orden: {', '.join(REPORT_ORDERS)}"),
+    slow: int = Query(20, ge=0, le=200, description="Consultas lentas recientes a incluir")
+):
+    """
+    Consultas SQL más costosas desde el arranque (o el último reset)
+    
+    Agrupadas por método de Database y SQL normalizado, con forma de los
+    parámetros, filas y tiempos. Las lentas incluyen su EXPLAIN QUERY PLAN
+    """
+    require_admin(request)
+    profiler = get_query_profiler()
+    if order not in REPORT_ORDERS:
+        raise HTTPException(status_code=400, detail=f"Orden inválido ({', '.join(REPORT_ORDERS)})")
+    return {
+        "since": profiler.started_at,
+        "threshold_ms": profiler.threshold_ms,
+        "queries": profiler.report(limit=limit, order=order),
+        "slow_queries": profiler.slow_queries(limit=slow) if slow else [],
+    }
+
+
+@app.post("/api/admin/queries/reset")
+async def reset_query_report(request: Request):
+    """Vacía las estadísticas y el log de consultas lentas"""
+    require_admin(request)
+    get_query_profiler().reset()
+    return {"success": True}
+
+
 if __name__ == "__main__":
     uvicorn.run(
         "main:app",
@@ -0,0 +1,276 @@
+"""
+Metrics
+In-process counters, gauges and histograms rendered in the Prometheus text
+exposition format (served at /metrics). No client library or external
+service: samples live in memory and collectors compute the rest on scrape
+"""
+
+import math
+import time
+import functools
+import threading
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+# Seconds; the Prometheus client defaults
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.075, 0.1, 0.25, 0.5, 0.75, 1.0, 2.5, 5.0, 7.5, 10.0)
+
+# SQLite calls are mostly sub-millisecond
+DB_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5)
+
+PREFIX = 'pcscraper_'
+
+
+def _escape(value) -> str:
+    return str(value).replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"')
+
+
+def _format_labels(names: Sequence[str], values: Sequence, extra: str = '') -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return '{' + ','.join(pairs) + '}' if pairs else ''
+
+
+def _format_value(value: float) -> str:
+    if value == math.inf:
+        return '+Inf'
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+class _Metric:
+    kind = ''
+
+    def __init__(self, name: str, documentation: str, labels: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.label_names = tuple(labels)
+        self._lock = threading.Lock()
+        self._values: Dict[Tuple, object] = {}
+
+    def _key(self, labels: Dict) -> Tuple:
+        if set(labels) != set(self.label_names):
+            raise ValueError(f"{self.name}: etiquetas esperadas {self.label_names}, recibidas {tuple(labels)}")
+        return tuple(str(labels[name]) for name in self.label_names)
+
+    def header(self) -> List[str]:
+        return [f'# HELP {self.name} {self.documentation}', f'# TYPE {self.name} {self.kind}']
+
+    def clear(self):
+        with self._lock:
+            self._values.clear()
+
+
+class Counter(_Metric):
+    """Monotonic count, e.g. requests served or fetch errors"""
+    kind = 'counter'
+
+    def inc(self, amount: float = 1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def get(self, **labels) -> float:
+        return self._values.get(self._key(labels), 0)
+
+    def _store(self, value: float, **labels):
+        """Sets the value outright (collectors mirroring a count kept elsewhere)"""
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = value
+
+    def samples(self) -> Dict[Tuple, float]:
+        with self._lock:
+            return dict(self._values)
+
+    def render(self) -> List[str]:
+        with self._lock:
+            items = sorted(self._values.items())
+        return self.header() + [f'{self.name}{_format_labels(self.label_names, key)} {_format_value(value)}'
+                                for key, value in items]
+
+
+class Gauge(Counter):
+    """Value that goes up and down, e.g. open Selenium drivers"""
+    kind = 'gauge'
+
+    def set(self, value: float, **labels):
+        self._store(value, **labels)
+
+    def dec(self, amount: float = 1, **labels):
+        self.inc(-amount, **labels)
+
+
+class Histogram(_Metric):
+    """Distribution of observed values (latencies) in cumulative buckets"""
+    kind = 'histogram'
+
+    def __init__(self, name: str, documentation: str, labels: Sequence[str] = (),
+                 buckets: Sequence[float] = DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labels)
+        self.buckets = tuple(sorted(buckets)) + (math.inf,)
+
+    def observe(self, value: float, **labels):
+        key = self._key(labels)
+        with self._lock:
+            state = self._values.get(key)
+            if state is None:
+                # Per-bucket counts (not cumulative), sum, count
+                state = self._values[key] = [[0] * len(self.buckets), 0.0, 0]
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    state[0][i] += 1
+                    break
+            state[1] += value
+            state[2] += 1
+
+    def time(self, **labels) -> '_Timer':
+        """Context manager observing the elapsed seconds"""
+        return _Timer(self, labels)
+
+    def count(self, **labels) -> int:
+        state = self._values.get(self._key(labels))
+        return state[2] if state else 0
+
+    def render(self) -> List[str]:
+        with self._lock:
+            items = sorted((key, ([*state[0]], state[1], state[2])) for key, state in self._values.items())
+        lines = self.header()
+        for key, (counts, total, count) in items:
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets, counts):
+                cumulative += bucket_count
+                le = f'le="{_format_value(bound)}"'
+                lines.append(f'{self.name}_bucket{_format_labels(self.label_names, key, le)} {cumulative}')
+            labels = _format_labels(self.label_names, key)
+            lines.append(f'{self.name}_sum{labels} {_format_value(total)}')
+            lines.append(f'{self.name}_count{labels} {count}')
+        return lines
+
+
+class _Timer:
+    __slots__ = ('histogram', 'labels', 'started')
+
+    def __init__(self, histogram: Histogram, labels: Dict):
+        self.histogram = histogram
+        self.labels = labels
+
+    def __enter__(self):
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.histogram.observe(time.perf_counter() - self.started, **self.labels)
+        return False
+
+
+class Registry:
+    """
+    Named metrics plus collectors evaluated on every render
+
+    A collector returns (metric, labels, value) samples for values that are
+    cheaper to read when scraped than to keep updated (DB aggregates, cache
+    counters owned by other modules). Each sample overwrites the value of
+    its label set.
+    """
+
+    def __init__(self):
+        self._metrics: Dict[str, _Metric] = {}
+        self._collectors: List[Callable[[], Iterable[Tuple[_Metric, Dict, float]]]] = []
+        self._lock = threading.Lock()
+
+    def _register(self, metric: _Metric) -> _Metric:
+        with self._lock:
+            existing = self._metrics.get(metric.name)
+            if existing is not None:
+                return existing  # Module reloaded / imported under two names
+            self._metrics[metric.name] = metric
+            return metric
+
+    def counter(self, name: str, documentation: str, labels: Sequence[str] = ()) -> Counter:
+        return self._register(Counter(PREFIX + name, documentation, labels))
+
+    def gauge(self, name: str, documentation: str, labels: Sequence[str] = ()) -> Gauge:
+        return self._register(Gauge(PREFIX + name, documentation, labels))
+
+    def histogram(self, name: str, documentation: str, labels: Sequence[str] = (),
+                  buckets: Sequence[float] = DEFAULT_BUCKETS) -> Histogram:
+        return self._register(Histogram(PREFIX + name, documentation, labels, buckets))
+
+    def collector(self, func: Callable):
+        """Registers a collector (usable as a decorator)"""
+        with self._lock:
+            self._collectors.append(func)
+        return func
+
+    def render(self) -> str:
+        """All metrics in Prometheus text format"""
+        with self._lock:
+            collectors = list(self._collectors)
+            metrics = list(self._metrics.values())
+
+        for collect in collectors:
+            try:
+                for metric, labels, value in collect():
+                    metric._store(value, **labels)
+            except Exception as e:
+                # A broken collector must not take down the endpoint
+                print(f"⚠️ Error en collector de métricas {getattr(collect, '__name__', collect)}: {e}")
+
+        lines = []
+        for metric in sorted(metrics, key=lambda metric: metric.name):
+            lines.extend(metric.render())
+        return '\n'.join(lines) + '\n'
+
+
+REGISTRY = Registry()
+
+# --- Shared metrics ---
+
+HTTP_REQUEST_SECONDS = REGISTRY.histogram(
+    'http_request_duration_seconds', 'Latencia de las peticiones HTTP por ruta', ('method', 'route'))
+HTTP_REQUESTS = REGISTRY.counter(
+    'http_requests_total', 'Peticiones HTTP por ruta y código de estado', ('method', 'route', 'status'))
+DB_CALL_SECONDS = REGISTRY.histogram(
+    'db_call_duration_seconds', 'Duración de cada método de Database (consultas SQLite)', ('method',),
+    buckets=DB_BUCKETS)
+DB_CALL_ERRORS = REGISTRY.counter(
+    'db_call_errors_total', 'Excepciones lanzadas por métodos de Database', ('method',))
+CACHE_REQUESTS = REGISTRY.counter(
+    'cache_requests_total', 'Búsquedas en cachés del proceso, por resultado (hit/miss)', ('cache', 'result'))
+CACHE_HIT_RATIO = REGISTRY.gauge(
+    'cache_hit_ratio', 'Proporción de aciertos de cada caché del proceso', ('cache',))
+
+
+def instrument_methods(cls, histogram: Histogram = DB_CALL_SECONDS,
+                       errors: Optional[Counter] = DB_CALL_ERRORS,
+                       exclude: Iterable[str] = ()):
+    """
+    Times every public method of a class into histogram{method=...}
+
+    Applied once to Database, so each query method reports its latency
+    without touching its body.
+    """
+    skip = set(exclude)
+    for name, func in list(vars(cls).items()):
+        if name.startswith('_') or name in skip or not callable(func) or getattr(func, '_instrumented', False):
+            continue
+
+        def wrap(func, name):
+            @functools.wraps(func)
+            def timed(*args, **kwargs):
+                started = time.perf_counter()
+                try:
+                    return func(*args, **kwargs)
+                except Exception:
+                    if errors is not None:
+                        errors.inc(method=name)
+                    raise
+                finally:
+                    histogram.observe(time.perf_counter() - started, method=name)
+            timed._instrumented = True
+            return timed
+
+        setattr(cls, name, wrap(func, name))
+    return cls
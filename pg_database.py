@@ -0,0 +1,846 @@
+"""
+PostgreSQL Database Module
+Storage backend for deployments where several API nodes share one catalog
+
+Reuses the portable queries of database.Database through a connection
+adapter that speaks the sqlite3 API (qmark placeholders, sqlite3.Row-like
+rows), and overrides what is SQLite-specific: schema, bulk loads (COPY),
+full-text search (tsvector) and date arithmetic.
+
+Requires the optional psycopg packages: pip install "psycopg[binary]" psycopg-pool
+"""
+
+import re
+import threading
+from datetime import datetime
+from functools import lru_cache
+from typing import Dict, List, Optional
+
+from database import Database, merge_pending_points
+from metrics import instrument_methods
+from scrapers.product import Product, PRODUCT_FIELDS
+
+# Postgres expressions mapping price_history.recorded_at to its bucket start
+ROLLUP_BUCKETS = {
+    'day': "CAST(recorded_at AS DATE)",
+    'week': "CAST(date_trunc('week', recorded_at) AS DATE)",  # Monday
+}
+
+# Timestamps are stored as UTC without time zone, like SQLite's CURRENT_TIMESTAMP
+UTC_NOW = "(now() AT TIME ZONE 'utc')"
+
+# Indexed document for search_products(); queries must repeat it verbatim to use the index
+SEARCH_DOCUMENT = (
+    "to_tsvector('simple', coalesce(name, '') || ' ' || coalesce(brand, '') || ' ' || coalesce(sku, ''))"
+)
+
+
+@lru_cache(maxsize=512)
+def to_pyformat(sql: str) -> str:
+    """
+    Translates a qmark (?) statement to psycopg's %s placeholders
+
+    Question marks inside quoted literals are kept and literal % signs are
+    doubled, so the SQL shared with the SQLite backend runs unchanged.
+    """
+    out = []
+    quote = None
+    for char in sql:
+        if quote:
+            if char == quote:
+                quote = None
+        elif char in ("'", '"'):
+            quote = char
+        elif char == '?':
+            out.append('%s')
+            continue
+        if char == '%':
+            out.append('%%')
+            continue
+        out.append(char)
+    return ''.join(out)
+
+
+def prefix_tsquery(query: str) -> str:
+    """
+    Builds a prefix-matching tsquery from a free-text search term
+
+    'RTX 4060' becomes 'rtx:* & 4060:*', so partial words keep matching
+    like the SQLite backend's LIKE search does (infixes do not).
+    """
+    return ' & '.join(f'{word}:*' for word in re.findall(r'\w+', query.lower()))
+
+
+class Row:
+    """Result row readable by column name or position, like sqlite3.Row"""
+
+    __slots__ = ('_names', '_values')
+
+    def __init__(self, names: tuple, values: tuple):
+        self._names = names
+        self._values = values
+
+    def keys(self) -> List[str]:
+        return list(self._names)
+
+    def __getitem__(self, key):
+        if isinstance(key, (int, slice)):
+            return self._values[key]
+        return self._values[self._names.index(key)]
+
+    def __iter__(self):
+        return iter(self._values)
+
+    def __len__(self):
+        return len(self._values)
+
+    def __repr__(self):
+        return f'Row({dict(zip(self._names, self._values))!r})'
+
+
+def row_factory(cursor):
+    """psycopg row factory producing Row objects"""
+    names = tuple(column.name for column in cursor.description or ())
+
+    def make_row(values):
+        return Row(names, values)
+    return make_row
+
+
+class PgCursor:
+    """sqlite3-style cursor over a psycopg cursor"""
+
+    def __init__(self, cursor):
+        self._cursor = cursor
+
+    def execute(self, sql: str, params=()):
+        self._cursor.execute(to_pyformat(sql), params if params is not None else ())
+        return self
+
+    def executemany(self, sql: str, seq_of_params):
+        self._cursor.executemany(to_pyformat(sql), seq_of_params)
+        return self
+
+    def fetchone(self):
+        return self._cursor.fetchone()
+
+    def fetchall(self):
+        return self._cursor.fetchall()
+
+    def fetchmany(self, size: int = 1):
+        return self._cursor.fetchmany(size)
+
+    def __iter__(self):
+        return iter(self._cursor)
+
+    @property
+    def rowcount(self) -> int:
+        return self._cursor.rowcount
+
+    @property
+    def description(self):
+        return self._cursor.description
+
+    def close(self):
+        self._cursor.close()
+
+
+class PgConnection:
+    """
+    sqlite3-style connection borrowed from the pool
+
+    close() rolls back anything uncommitted (as closing a sqlite3
+    connection does) and returns the connection to the pool.
+    """
+
+    def __init__(self, pool, conn):
+        self._pool = pool
+        self.raw = conn  # psycopg connection, for COPY
+
+    def cursor(self) -> PgCursor:
+        return PgCursor(self.raw.cursor())
+
+    def execute(self, sql: str, params=()) -> PgCursor:
+        return self.cursor().execute(sql, params)
+
+    def executemany(self, sql: str, seq_of_params) -> PgCursor:
+        return self.cursor().executemany(sql, seq_of_params)
+
+    def commit(self):
+        self.raw.commit()
+
+    def rollback(self):
+        self.raw.rollback()
+
+    def close(self):
+        if self.raw is None:
+            return
+        conn, self.raw = self.raw, None
+        if not conn.broken:
+            conn.rollback()
+        self._pool.putconn(conn)
+
+
+class PostgresDatabase(Database):
+    """PostgreSQL database handler for PC component prices"""
+
+    def __init__(self, url: str, read_only: bool = False, pool_size: int = 10):
+        super().__init__(url, read_only=read_only)
+        self.url = url
+        self.pool_size = pool_size
+        # Opened on first use, so each uvicorn worker process gets its own pool
+        self._pool = None
+        self._pool_lock = threading.Lock()
+
+    def _get_pool(self):
+        if self._pool is None:
+            with self._pool_lock:
+                if self._pool is None:
+                    try:
+                        from psycopg_pool import ConnectionPool
+                    except ImportError:
+                        raise RuntimeError(
+                            'PostgreSQL requiere psycopg: pip install "psycopg[binary]" psycopg-pool'
+                        )
+                    options = '-c timezone=UTC'
+                    if self.read_only:
+                        options += ' -c default_transaction_read_only=on'
+                    self._pool = ConnectionPool(
+                        self.url, min_size=1, max_size=self.pool_size, open=True,
+                        kwargs={'row_factory': row_factory, 'options': options}
+                    )
+        return self._pool
+
+    def get_connection(self) -> PgConnection:
+        """Borrows a pooled connection; close() gives it back"""
+        pool = self._get_pool()
+        return PgConnection(pool, pool.getconn())
+
+    def close(self):
+        """Closes the connection pool"""
+        if self._pool is not None:
+            self._pool.close()
+            self._pool = None
+
+    def enable_wal(self) -> str:
+        """Nothing to do: PostgreSQL readers never block on the writer (MVCC)"""
+        return 'mvcc'
+
+    def init_db(self):
+        """Initializes the database schema"""
+        conn = self.get_connection()
+        cursor = conn.cursor()
+
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS products (
+                id BIGSERIAL PRIMARY KEY,
+                name TEXT NOT NULL,
+                normalized_name TEXT,
+                component_type TEXT,
+                brand TEXT,
+                sku TEXT,
+                price_usd DOUBLE PRECISION NOT NULL,
+                price_local DOUBLE PRECISION,
+                currency TEXT,
+                stock TEXT,
+                store TEXT NOT NULL,
+                source_url TEXT UNIQUE,
+                image_url TEXT,
+                last_scraped TIMESTAMP,
+                created_at TIMESTAMP DEFAULT (now() AT TIME ZONE 'utc'),
+                is_active INTEGER DEFAULT 1,
+                metadata TEXT,
+                store_count INTEGER DEFAULT 1
+            )
+        """)
+        for column in ('name', 'normalized_name', 'component_type', 'brand', 'store',
+                       'price_usd', 'sku', 'is_active', 'store_count'):
+            cursor.execute(f"CREATE INDEX IF NOT EXISTS idx_{column} ON products({column})")
+        cursor.execute(f"CREATE INDEX IF NOT EXISTS idx_products_search ON products USING GIN ({SEARCH_DOCUMENT})")
+
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS price_history (
+                id BIGSERIAL PRIMARY KEY,
+                product_id BIGINT REFERENCES products(id),
+                price_usd DOUBLE PRECISION NOT NULL,
+                price_local DOUBLE PRECISION,
+                stock TEXT,
+                recorded_at TIMESTAMP DEFAULT (now() AT TIME ZONE 'utc')
+            )
+        """)
+        cursor.execute("""
+            CREATE INDEX IF NOT EXISTS idx_price_history_product
+            ON price_history(product_id, recorded_at)
+        """)
+
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS price_rollups (
+                product_id BIGINT NOT NULL,
+                resolution TEXT NOT NULL,
+                bucket_start DATE NOT NULL,
+                min_price_usd DOUBLE PRECISION,
+                max_price_usd DOUBLE PRECISION,
+                price_usd DOUBLE PRECISION,
+                price_local DOUBLE PRECISION,
+                stock TEXT,
+                samples INTEGER,
+                last_recorded_at TIMESTAMP,
+                PRIMARY KEY (product_id, resolution, bucket_start)
+            )
+        """)
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS price_rollup_state (
+                id INTEGER PRIMARY KEY CHECK (id = 1),
+                last_history_id BIGINT NOT NULL
+            )
+        """)
+
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS deals (
+                product_id BIGINT PRIMARY KEY REFERENCES products(id),
+                trailing_median DOUBLE PRECISION,
+                drop_pct DOUBLE PRECISION,
+                all_time_low INTEGER,
+                all_time_min DOUBLE PRECISION,
+                store_count INTEGER,
+                min_price_usd DOUBLE PRECISION,
+                max_price_usd DOUBLE PRECISION,
+                spread_pct DOUBLE PRECISION,
+                is_cheapest INTEGER,
+                score DOUBLE PRECISION,
+                computed_at TIMESTAMP DEFAULT (now() AT TIME ZONE 'utc')
+            )
+        """)
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_deals_score ON deals(score DESC)")
+
+        # Change log for /api/changes, fed by triggers as in the SQLite schema
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS product_changes (
+                id BIGSERIAL PRIMARY KEY,
+                product_id BIGINT NOT NULL,
+                op TEXT NOT NULL,
+                changed_at TIMESTAMP DEFAULT (now() AT TIME ZONE 'utc')
+            )
+        """)
+        cursor.execute("""
+            CREATE OR REPLACE FUNCTION log_product_change() RETURNS trigger AS $$
+            BEGIN
+                -- BIGSERIAL ids of concurrent transactions can commit out of order, and
+                -- get_changes() pages by id: writers take turns until commit instead
+                PERFORM pg_advisory_xact_lock('product_changes'::regclass::oid::bigint);
+                IF TG_OP = 'INSERT' THEN
+                    INSERT INTO product_changes (product_id, op) VALUES (NEW.id, 'insert');
+                ELSIF TG_OP = 'DELETE' THEN
+                    INSERT INTO product_changes (product_id, op) VALUES (OLD.id, 'delete');
+                -- Rescrapes that only touch last_scraped/store_count are not changes
+                ELSIF (OLD.name, OLD.normalized_name, OLD.component_type, OLD.brand, OLD.sku,
+                       OLD.price_usd, OLD.price_local, OLD.currency, OLD.stock, OLD.store,
+                       OLD.source_url, OLD.image_url, OLD.is_active, OLD.metadata)
+                      IS DISTINCT FROM
+                      (NEW.name, NEW.normalized_name, NEW.component_type, NEW.brand, NEW.sku,
+                       NEW.price_usd, NEW.price_local, NEW.currency, NEW.stock, NEW.store,
+                       NEW.source_url, NEW.image_url, NEW.is_active, NEW.metadata) THEN
+                    INSERT INTO product_changes (product_id, op) VALUES (
+                        NEW.id,
+                        CASE WHEN NEW.is_active = 0 AND OLD.is_active != 0 THEN 'deactivate' ELSE 'update' END
+                    );
+                END IF;
+                RETURN NULL;
+            END
+            $$ LANGUAGE plpgsql
+        """)
+        cursor.execute("DROP TRIGGER IF EXISTS trg_products_changes ON products")
+        cursor.execute("""
+            CREATE TRIGGER trg_products_changes AFTER INSERT OR UPDATE OR DELETE ON products
+            FOR EACH ROW EXECUTE FUNCTION log_product_change()
+        """)
+
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS product_matches (
+                id BIGSERIAL PRIMARY KEY,
+                product_id_1 BIGINT REFERENCES products(id),
+                product_id_2 BIGINT REFERENCES products(id),
+                confidence DOUBLE PRECISION DEFAULT 0.0,
+                match_method TEXT,
+                created_at TIMESTAMP DEFAULT (now() AT TIME ZONE 'utc'),
+                UNIQUE(product_id_1, product_id_2)
+            )
+        """)
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS scraping_schedule (
+                id BIGSERIAL PRIMARY KEY,
+                store_name TEXT NOT NULL,
+                url TEXT NOT NULL,
+                category TEXT,
+                frequency_hours INTEGER DEFAULT 24,
+                adaptive_frequency_hours INTEGER,
+                last_run TIMESTAMP,
+                next_run TIMESTAMP,
+                is_active INTEGER DEFAULT 1,
+                created_at TIMESTAMP DEFAULT (now() AT TIME ZONE 'utc')
+            )
+        """)
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS scraping_logs (
+                id BIGSERIAL PRIMARY KEY,
+                store_name TEXT NOT NULL,
+                url TEXT,
+                products_found INTEGER,
+                products_saved INTEGER,
+                status TEXT,
+                error_message TEXT,
+                duration_seconds DOUBLE PRECISION,
+                started_at TIMESTAMP,
+                completed_at TIMESTAMP,
+                price_changes INTEGER
+            )
+        """)
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS scrape_spans (
+                id BIGSERIAL PRIMARY KEY,
+                run_id TEXT NOT NULL,
+                store TEXT,
+                category TEXT,
+                page INTEGER,
+                stage TEXT NOT NULL,
+                parent TEXT,
+                calls INTEGER NOT NULL,
+                total_ms DOUBLE PRECISION NOT NULL,
+                self_ms DOUBLE PRECISION NOT NULL,
+                max_ms DOUBLE PRECISION NOT NULL,
+                recorded_at TIMESTAMP DEFAULT (now() AT TIME ZONE 'utc')
+            )
+        """)
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_scrape_spans_run ON scrape_spans(run_id)")
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS images (
+                url TEXT PRIMARY KEY,
+                content_hash TEXT,
+                status TEXT,
+                content_type TEXT,
+                etag TEXT,
+                last_modified TEXT,
+                content_length TEXT,
+                width INTEGER,
+                height INTEGER,
+                fetched_at TIMESTAMP,
+                error TEXT
+            )
+        """)
+
+        # SQLite's julianday(), used by the deal engine (deals.py)
+        cursor.execute("""
+            CREATE OR REPLACE FUNCTION julianday(moment TIMESTAMP) RETURNS DOUBLE PRECISION AS $$
+                SELECT CAST(EXTRACT(EPOCH FROM moment) AS DOUBLE PRECISION) / 86400.0 + 2440587.5
+            $$ LANGUAGE SQL IMMUTABLE
+        """)
+        cursor.execute("""
+            CREATE OR REPLACE FUNCTION julianday(moment TEXT) RETURNS DOUBLE PRECISION AS $$
+                SELECT julianday(CASE WHEN lower(moment) = 'now' THEN now() AT TIME ZONE 'utc'
+                                      ELSE CAST(moment AS TIMESTAMP) END)
+            $$ LANGUAGE SQL STABLE
+        """)
+
+        conn.commit()
+        conn.close()
+
+    def insert_product(self, product) -> bool:
+        """Inserts or updates a product in the database (a batch of one)"""
+        return self.upsert_products([product])['errors'] == 0
+
+    def upsert_products(self, products: List) -> Dict:
+        """
+        Inserts or updates a batch of products with set-based statements
+
+        The batch is streamed into a temporary table with COPY and merged
+        with a handful of statements, instead of two or three round trips
+        per product. Matching follows the SQLite backend: by source_url,
+        then by SKU+store; when a batch repeats a product the last copy
+        wins. Invalid products are counted as errors before loading.
+
+        Args:
+            products: List of Product records or product dictionaries
+
+        Returns:
+            Dictionary with 'inserted', 'updated' and 'errors' counts
+        """
+        result = {'inserted': 0, 'updated': 0, 'errors': 0}
+        rows = []
+        for product in products:
+            try:
+                if not hasattr(product, 'to_row'):
+                    product = Product.from_dict(product)
+                row = list(product.to_row())
+                if not row[0] or not row[9] or row[5] is None:
+                    raise ValueError("name, store and price_usd are required")
+                if isinstance(row[12], str):
+                    row[12] = datetime.fromisoformat(row[12])
+                rows.append([len(rows)] + row)
+            except Exception as e:
+                source_url = product.get('source_url', '') if isinstance(product, dict) else product.source_url
+                print(f"Error inserting product {source_url}: {e}")
+                result['errors'] += 1
+        if not rows:
+            return result
+
+        conn = self.get_connection()
+        cursor = conn.cursor()
+
+        try:
+            cursor.execute("""
+                CREATE TEMP TABLE product_staging (
+                    seq INTEGER, name TEXT, normalized_name TEXT, component_type TEXT, brand TEXT,
+                    sku TEXT, price_usd DOUBLE PRECISION, price_local DOUBLE PRECISION, currency TEXT,
+                    stock TEXT, store TEXT, source_url TEXT, image_url TEXT, last_scraped TIMESTAMP,
+                    metadata TEXT, target_id BIGINT, old_normalized_name TEXT,
+                    old_price_usd DOUBLE PRECISION, old_price_local DOUBLE PRECISION, old_stock TEXT
+                ) ON COMMIT DROP
+            """)
+            with conn.raw.cursor() as raw_cursor:
+                with raw_cursor.copy(f"COPY product_staging (seq, {', '.join(PRODUCT_FIELDS)}) FROM STDIN") as copy:
+                    for row in rows:
+                        copy.write_row(row)
+
+            # Repeats of a product within the batch: keep the last copy
+            cursor.execute("""
+                DELETE FROM product_staging s USING product_staging later
+                WHERE later.seq > s.seq AND (
+                    (s.source_url != '' AND later.source_url = s.source_url)
+                    OR (s.source_url = '' AND later.source_url = '' AND s.sku != ''
+                        AND later.sku = s.sku AND later.store = s.store)
+                )
+            """)
+            duplicates = cursor.rowcount
+
+            # Existing product by source URL, else by SKU+store
+            cursor.execute("""
+                UPDATE product_staging s SET target_id = p.id
+                FROM products p
+                WHERE s.source_url != '' AND p.source_url = s.source_url
+            """)
+            cursor.execute("""
+                UPDATE product_staging s SET target_id = (
+                    SELECT p.id FROM products p
+                    WHERE p.sku = s.sku AND p.store = s.store AND p.is_active = 1
+                    ORDER BY p.id LIMIT 1
+                )
+                WHERE s.target_id IS NULL AND s.sku != ''
+            """)
+            cursor.execute("""
+                DELETE FROM product_staging s USING product_staging later
+                WHERE later.target_id = s.target_id AND later.seq > s.seq
+            """)
+            duplicates += cursor.rowcount
+
+            cursor.execute("""
+                UPDATE product_staging s SET
+                    old_normalized_name = p.normalized_name,
+                    old_price_usd = p.price_usd,
+                    old_price_local = p.price_local,
+                    old_stock = p.stock
+                FROM products p
+                WHERE p.id = s.target_id
+            """)
+            cursor.execute("""
+                UPDATE products p SET
+                    name = s.name,
+                    normalized_name = s.normalized_name,
+                    component_type = s.component_type,
+                    brand = s.brand,
+                    sku = s.sku,
+                    price_usd = s.price_usd,
+                    price_local = s.price_local,
+                    currency = s.currency,
+                    stock = s.stock,
+                    image_url = s.image_url,
+                    last_scraped = s.last_scraped,
+                    metadata = s.metadata
+                FROM product_staging s
+                WHERE p.id = s.target_id
+            """)
+            updated = cursor.rowcount
+
+            # Record price history if price or stock changed
+            cursor.execute("""
+                INSERT INTO price_history (product_id, price_usd, price_local, stock)
+                SELECT target_id, price_usd, price_local, stock FROM product_staging
+                WHERE target_id IS NOT NULL AND (
+                    old_price_usd IS DISTINCT FROM price_usd
+                    OR old_price_local IS DISTINCT FROM price_local
+                    OR old_stock IS DISTINCT FROM stock
+                )
+            """)
+
+            cursor.execute("SELECT COUNT(*) FROM product_staging WHERE target_id IS NULL")
+            new_products = cursor.fetchone()[0]
+            cursor.execute(f"""
+                WITH inserted AS (
+                    INSERT INTO products ({', '.join(PRODUCT_FIELDS)})
+                    SELECT {', '.join(PRODUCT_FIELDS)} FROM product_staging
+                    WHERE target_id IS NULL
+                    ORDER BY seq
+                    ON CONFLICT (source_url) DO NOTHING
+                    RETURNING id, price_usd, price_local, stock
+                )
+                INSERT INTO price_history (product_id, price_usd, price_local, stock)
+                SELECT id, price_usd, price_local, stock FROM inserted
+            """)
+            inserted = cursor.rowcount
+
+            # One grouped pass for the whole batch, as in Database.upsert_products
+            cursor.execute("""
+                UPDATE products SET store_count = counts.n
+                FROM (
+                    SELECT normalized_name, COUNT(DISTINCT store) AS n FROM products
+                    WHERE is_active = 1 AND normalized_name != '' AND normalized_name IN (
+                        SELECT normalized_name FROM product_staging
+                        UNION SELECT old_normalized_name FROM product_staging
+                    )
+                    GROUP BY normalized_name
+                ) AS counts
+                WHERE counts.normalized_name = products.normalized_name
+            """)
+            conn.commit()
+        finally:
+            conn.close()
+
+        result['inserted'] = inserted
+        result['updated'] = updated + duplicates
+        result['errors'] += new_products - inserted  # source_url taken by a row not matched
+        return result
+
+    def search_products(self, query: str, limit: int = 20) -> List[Dict]:
+        """
+        Searches products by name, brand or SKU word prefixes
+
+        Uses the GIN index on SEARCH_DOCUMENT instead of a LIKE scan.
+        """
+        tsquery = prefix_tsquery(query)
+        if not tsquery:
+            return []
+
+        conn = self.get_connection()
+        cursor = conn.cursor()
+        cursor.execute(f"""
+            SELECT * FROM products
+            WHERE {SEARCH_DOCUMENT} @@ to_tsquery('simple', ?)
+            ORDER BY price_usd ASC
+            LIMIT ?
+        """, (tsquery, limit))
+        products = [dict(row) for row in cursor.fetchall()]
+        conn.close()
+        return products
+
+    def prune_changes(self, keep_days: int) -> int:
+        """Deletes change log rows older than keep_days (the latest row is kept)"""
+        conn = self.get_connection()
+        cursor = conn.cursor()
+        cursor.execute(f"""
+            DELETE FROM product_changes
+            WHERE changed_at < {UTC_NOW} - make_interval(days => CAST(? AS INTEGER))
+            AND id < (SELECT MAX(id) FROM product_changes)
+        """, (int(keep_days),))
+        deleted = cursor.rowcount
+        conn.commit()
+        conn.close()
+        return deleted
+
+    def rollup_price_history(self, compact_after_days: Optional[int] = None) -> Dict[str, int]:
+        """Folds new price_history rows into daily and weekly buckets (see Database)"""
+        conn = self.get_connection()
+        cursor = conn.cursor()
+
+        cursor.execute("SELECT last_history_id FROM price_rollup_state WHERE id = 1")
+        row = cursor.fetchone()
+        last_id = row[0] if row else 0
+        cursor.execute("SELECT COALESCE(MAX(id), 0) FROM price_history")
+        max_id = cursor.fetchone()[0]
+
+        rolled_up = 0
+        if max_id > last_id:
+            cursor.execute("SELECT COUNT(*) FROM price_history WHERE id > ? AND id <= ?",
+                           (last_id, max_id))
+            rolled_up = cursor.fetchone()[0]
+
+            for resolution, bucket in ROLLUP_BUCKETS.items():
+                cursor.execute(f"""
+                    INSERT INTO price_rollups AS r (
+                        product_id, resolution, bucket_start, min_price_usd, max_price_usd,
+                        price_usd, price_local, stock, samples, last_recorded_at
+                    )
+                    SELECT product_id, CAST(? AS TEXT), bucket_start, MIN(price_usd), MAX(price_usd),
+                           MAX(CASE WHEN rn = 1 THEN price_usd END),
+                           MAX(CASE WHEN rn = 1 THEN price_local END),
+                           MAX(CASE WHEN rn = 1 THEN stock END),
+                           COUNT(*), MAX(recorded_at)
+                    FROM (
+                        SELECT product_id, price_usd, price_local, stock, recorded_at,
+                               {bucket} AS bucket_start,
+                               ROW_NUMBER() OVER (
+                                   PARTITION BY product_id, {bucket}
+                                   ORDER BY recorded_at DESC, id DESC
+                               ) AS rn
+                        FROM price_history
+                        WHERE id > ? AND id <= ?
+                    ) AS pending
+                    GROUP BY product_id, bucket_start
+                    ON CONFLICT (product_id, resolution, bucket_start) DO UPDATE SET
+                        min_price_usd = LEAST(r.min_price_usd, excluded.min_price_usd),
+                        max_price_usd = GREATEST(r.max_price_usd, excluded.max_price_usd),
+                        price_usd = CASE WHEN excluded.last_recorded_at >= r.last_recorded_at
+                                    THEN excluded.price_usd ELSE r.price_usd END,
+                        price_local = CASE WHEN excluded.last_recorded_at >= r.last_recorded_at
+                                      THEN excluded.price_local ELSE r.price_local END,
+                        stock = CASE WHEN excluded.last_recorded_at >= r.last_recorded_at
+                                THEN excluded.stock ELSE r.stock END,
+                        samples = r.samples + excluded.samples,
+                        last_recorded_at = GREATEST(r.last_recorded_at, excluded.last_recorded_at)
+                """, (resolution, last_id, max_id))
+
+            cursor.execute("""
+                INSERT INTO price_rollup_state (id, last_history_id) VALUES (1, ?)
+                ON CONFLICT (id) DO UPDATE SET last_history_id = excluded.last_history_id
+            """, (max_id,))
+
+        compacted = 0
+        if compact_after_days:
+            cursor.execute(f"""
+                DELETE FROM price_history
+                WHERE id <= ?
+                AND recorded_at < {UTC_NOW} - make_interval(days => CAST(? AS INTEGER))
+                AND id NOT IN (SELECT MAX(id) FROM price_history GROUP BY product_id)
+            """, (max_id, int(compact_after_days)))
+            compacted = cursor.rowcount
+
+        conn.commit()
+        conn.close()
+
+        return {'rows_rolled_up': rolled_up, 'rows_compacted': compacted}
+
+    def get_price_series(self, product_id: int, resolution: str = 'auto',
+                         days: Optional[int] = None, max_points: int = 500,
+                         raw_days: int = 30) -> Dict:
+        """Gets a chart-ready price series for a product (see Database)"""
+        conn = self.get_connection()
+        cursor = conn.cursor()
+        since = None
+        if days:
+            cursor.execute(f"SELECT {UTC_NOW} - make_interval(days => CAST(? AS INTEGER))", (int(days),))
+            since = cursor.fetchone()[0]
+
+        if resolution == 'auto':
+            resolution = self._pick_resolution(cursor, product_id, since, days, max_points, raw_days)
+
+        if resolution == 'raw':
+            query = """
+                SELECT recorded_at AS t, price_usd AS min_price_usd, price_usd AS max_price_usd,
+                       price_usd, price_local, stock, 1 AS samples
+                FROM price_history
+                WHERE product_id = ?
+            """
+            params = [product_id]
+            if since is not None:
+                query += " AND recorded_at >= ?"
+                params.append(since)
+            query += " ORDER BY recorded_at DESC, id DESC LIMIT ?"
+            params.append(max_points)
+            cursor.execute(query, params)
+            points = [dict(row) for row in cursor.fetchall()]
+        else:
+            points = self._bucketed_series(cursor, product_id, resolution, since, max_points)
+
+        conn.close()
+        points.reverse()
+        return {'product_id': product_id, 'resolution': resolution, 'points': points}
+
+    def _pick_resolution(self, cursor, product_id: int, since: Optional[datetime],
+                         days: Optional[int], max_points: int, raw_days: int) -> str:
+        if days is None:
+            cursor.execute("""
+                SELECT julianday('now') - julianday(MIN(bucket_start))
+                FROM price_rollups WHERE product_id = ? AND resolution = 'day'
+            """, (product_id,))
+            span = cursor.fetchone()[0]
+            if span is None:
+                cursor.execute("""
+                    SELECT julianday('now') - julianday(MIN(recorded_at))
+                    FROM price_history WHERE product_id = ?
+                """, (product_id,))
+                span = cursor.fetchone()[0] or 0
+        else:
+            span = days
+
+        if span <= raw_days:
+            query = "SELECT COUNT(*) FROM price_history WHERE product_id = ?"
+            params = [product_id]
+            if since is not None:
+                query += " AND recorded_at >= ?"
+                params.append(since)
+            cursor.execute(query, params)
+            if cursor.fetchone()[0] <= max_points:
+                return 'raw'
+        return 'day' if span <= max_points else 'week'
+
+    def _bucketed_series(self, cursor, product_id: int, resolution: str,
+                         since: Optional[datetime], max_points: int) -> List[Dict]:
+        if resolution not in ROLLUP_BUCKETS:
+            raise ValueError(f"Unknown resolution: {resolution}")
+        bucket = ROLLUP_BUCKETS[resolution]
+        since_bucket = None
+        if since is not None:
+            cursor.execute(f"SELECT {bucket} FROM (SELECT CAST(? AS TIMESTAMP) AS recorded_at) AS since",
+                           (since,))
+            since_bucket = cursor.fetchone()[0]
+
+        query = """
+            SELECT bucket_start AS t, min_price_usd, max_price_usd, price_usd,
+                   price_local, stock, samples
+            FROM price_rollups
+            WHERE product_id = ? AND resolution = ?
+        """
+        params = [product_id, resolution]
+        if since_bucket is not None:
+            query += " AND bucket_start >= ?"
+            params.append(since_bucket)
+        query += " ORDER BY bucket_start DESC LIMIT ?"
+        params.append(max_points)
+        cursor.execute(query, params)
+        points = {row['t']: dict(row) for row in cursor.fetchall()}
+
+        # Rows not rolled up yet are bucketed on the fly and merged in
+        cursor.execute("SELECT last_history_id FROM price_rollup_state WHERE id = 1")
+        row = cursor.fetchone()
+        query = f"""
+            SELECT {bucket} AS t, price_usd, price_local, stock
+            FROM price_history
+            WHERE product_id = ? AND id > ?
+        """
+        params = [product_id, row[0] if row else 0]
+        if since_bucket is not None:
+            query += f" AND {bucket} >= ?"
+            params.append(since_bucket)
+        cursor.execute(query + " ORDER BY recorded_at, id", params)
+        merge_pending_points(points, cursor.fetchall())
+
+        return [points[t] for t in sorted(points, reverse=True)[:max_points]]
+
+    def get_scrape_runs(self, limit: int = 10) -> List[Dict]:
+        """Latest traced scrape runs with their stores and root span time"""
+        conn = self.get_connection()
+        cursor = conn.cursor()
+        cursor.execute("""
+            SELECT run_id, MIN(recorded_at) AS recorded_at,
+                   string_agg(DISTINCT store, ',') AS stores,
+                   SUM(CASE WHEN parent IS NULL THEN total_ms ELSE 0 END) AS total_ms
+            FROM scrape_spans
+            GROUP BY run_id
+            ORDER BY MAX(id) DESC
+            LIMIT ?
+        """, (limit,))
+        rows = [dict(row) for row in cursor.fetchall()]
+        conn.close()
+        return rows
+
+
+# Overrides only: inherited methods are already timed through Database
+instrument_methods(PostgresDatabase, exclude=('get_connection',))
@@ -0,0 +1,327 @@
+"""
+Scraping Pipeline
+Streams scraped products page by page into the database through a bounded
+queue, so memory stays flat and rows are saved while later pages are fetched
+"""
+
+import json
+import time
+import uuid
+import queue
+import threading
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+from scrapers.product import Product
+from scrapers.tracing import Tracer, format_flame_table
+from snapshots import JsonSnapshotSink, iter_snapshot
+
+# Marks the end of the stream in the writer queue
+_STOP = object()
+
+
+def iter_store_pages(scraper, store_key: str, categories: Dict[str, str],
+                     max_pages: int = None) -> Iterator[Tuple[str, List[Dict]]]:
+    """
+    Yields (category_key, products) for every page of every category
+
+    Products are normalized the same way the load_to_db.py scripts did it:
+    store is the registry key and component_type is the category key.
+
+    Producing each page is timed as a 'page' span on the scraper's tracer;
+    its self time (not spent in fetch/enrich/pause) is the container loop.
+    """
+    tracer = getattr(scraper, 'tracer', None) or Tracer(enabled=False)
+    for category_key, category_url in categories.items():
+        pages = scraper.iter_category_pages(category_url, max_pages=max_pages)
+        page = 0
+        while True:
+            tracer.set_context(store_key, category_key, page + 1)
+            with tracer.span('page'):
+                products = next(pages, None)
+                if products is None:
+                    # The pagination check after the last page belongs to it
+                    tracer.set_context(store_key, category_key, page or None)
+            if products is None:
+                break
+            page += 1
+            for product in products:
+                product['store'] = store_key
+                product['component_type'] = category_key
+            yield category_key, products
+
+
+class BatchUpserter:
+    """
+    Consumes product pages from a bounded queue and upserts them in batches
+
+    A background thread owns the database writes. Producers call put() and
+    block when the queue is full, which keeps memory bounded. Buffers are
+    flushed when they reach batch_size or whenever the queue runs dry, so
+    the first rows reach the database while later pages are still loading.
+
+    Usage:
+        with BatchUpserter(db, sinks=[JsonSnapshotSink('products.json')]) as upserter:
+            for category_key, products in iter_store_pages(...):
+                upserter.put('sercoplus', category_key, products)
+        print(upserter.counts)
+    """
+
+    def __init__(self, db=None, batch_size: int = 200, max_pending_pages: int = 8,
+                 sinks: Optional[List] = None, tracer: Optional[Tracer] = None):
+        """
+        Args:
+            db: Database instance (None = only write to sinks)
+            batch_size: Products per upsert transaction
+            max_pending_pages: Pages allowed to wait in the queue
+            sinks: Optional snapshot writers with write(category, products) and close()
+            tracer: Optional tracer; each upsert is timed as a 'db_write' span
+        """
+        self.db = db
+        self.batch_size = batch_size
+        self.sinks = list(sinks or [])
+        self.tracer = tracer or Tracer(enabled=False)
+        self.counts: Dict[str, Dict[str, int]] = {}
+        self.error: Optional[Exception] = None
+        self._queue = queue.Queue(maxsize=max_pending_pages)
+        self._thread = None
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+        return False
+
+    def start(self):
+        """Starts the writer thread"""
+        if self._thread:
+            return
+        self._thread = threading.Thread(target=self._run, name='batch-upserter', daemon=True)
+        self._thread.start()
+
+    def put(self, store_key: str, category_key: str, products: List[Dict]):
+        """Queues a page of products, blocking while the queue is full"""
+        if self.error:
+            raise RuntimeError(f"El escritor de la BD falló: {self.error}")
+        if products:
+            self._queue.put((store_key, category_key, products))
+
+    def close(self) -> Dict[str, Dict[str, int]]:
+        """Flushes pending products, stops the writer and closes the sinks"""
+        if self._thread:
+            self._queue.put(_STOP)
+            self._thread.join()
+            self._thread = None
+        for sink in self.sinks:
+            sink.close()
+        return self.counts
+
+    def _run(self):
+        buffers: Dict[str, List[Dict]] = {}
+
+        while True:
+            item = self._queue.get()
+            if item is _STOP:
+                break
+            if self.error:
+                continue  # Keep draining so producers never block forever
+
+            store_key, category_key, products = item
+            try:
+                for sink in self.sinks:
+                    sink.write(category_key, products)
+
+                buffer = buffers.setdefault(store_key, [])
+                buffer.extend(products)
+                if len(buffer) >= self.batch_size or self._queue.empty():
+                    self._flush(store_key, buffer)
+                    buffers[store_key] = []
+            except Exception as e:
+                self._fail(store_key, e)
+
+        for store_key, buffer in buffers.items():
+            if self.error:
+                break
+            if buffer:
+                try:
+                    self._flush(store_key, buffer)
+                except Exception as e:
+                    self._fail(store_key, e)
+
+    def _fail(self, store_key: str, error: Exception):
+        """Records the writer's first error; later pages are drained, not written"""
+        print(f"❌ Error escribiendo lote de {store_key}: {error}")
+        self.error = error
+
+    def _flush(self, store_key: str, products: List[Dict]):
+        counts = self.counts.setdefault(store_key, {'inserted': 0, 'updated': 0, 'errors': 0})
+        if not self.db:
+            return
+        self.tracer.set_context(store_key)
+        with self.tracer.span('db_write'):
+            result = self.db.upsert_products(products)
+        for key, value in result.items():
+            counts[key] += value
+
+
+def run_store(scraper, store_key: str, categories: Dict[str, str], db=None,
+              sinks: Optional[List] = None, max_pages: int = None) -> Dict:
+    """
+    Scrapes every category of a store and streams it to the database
+
+    Args:
+        scraper: Store scraper with iter_category_pages()
+        store_key: Registry key used as products.store
+        categories: category_key -> URL mapping
+        db: Database instance (None = only write to sinks)
+        sinks: Optional snapshot writers
+        max_pages: Maximum pages per category (None = all pages)
+
+    Returns:
+        Dictionary with totals, per-category counts, data quality counters,
+        one sample product per category, the DB write counts and the
+        timing spans of the run (also saved to scrape_spans and printed)
+    """
+    tracer = getattr(scraper, 'tracer', None) or Tracer(enabled=False)
+    tracer.collect()  # Start from a clean slate
+    started = time.perf_counter()
+    stats = {
+        'run_id': uuid.uuid4().hex[:12],
+        'total_products': 0,
+        'categories': {category_key: 0 for category_key in categories},
+        'with_price': 0,
+        'with_image': 0,
+        'with_stock': 0,
+        'samples': {},
+        'saved': {'inserted': 0, 'updated': 0, 'errors': 0}
+    }
+
+    current_category = None
+    with BatchUpserter(db, sinks=sinks, tracer=tracer) as upserter:
+        for category_key, products in iter_store_pages(scraper, store_key, categories, max_pages):
+            if category_key != current_category:
+                print(f"\n📦 Scraping: {category_key.upper()}")
+                current_category = category_key
+
+            upserter.put(store_key, category_key, products)
+
+            stats['total_products'] += len(products)
+            stats['categories'][category_key] += len(products)
+            stats['with_price'] += sum(1 for p in products if p.get('price_usd') or p.get('price_local'))
+            stats['with_image'] += sum(1 for p in products if p.get('image_url'))
+            stats['with_stock'] += sum(1 for p in products if p.get('stock'))
+            if products and category_key not in stats['samples']:
+                stats['samples'][category_key] = dict(products[0])
+
+    if upserter.error:
+        raise RuntimeError(f"El escritor de la BD falló: {upserter.error}")
+
+    stats['saved'] = upserter.counts.get(store_key, stats['saved'])
+    stats['spans'] = tracer.collect()
+    if stats['spans']:
+        wall_seconds = time.perf_counter() - started
+        if db:
+            db.save_scrape_spans(stats['run_id'], stats['spans'])
+        print(f"\n⏱️  Tiempo por etapa (run {stats['run_id']}, {wall_seconds:.1f}s):")
+        print(format_flame_table(stats['spans'], wall_seconds))
+    return stats
+
+
+def load_snapshot(db, path: str, store_key: str, batch_size: int = 500) -> Dict:
+    """
+    Streams a snapshot file into the database in batches
+
+    Args:
+        db: Database instance
+        path: .ndjson, .parquet or legacy .json snapshot
+        store_key: Registry key stored as products.store
+        batch_size: Products per upsert transaction
+
+    Returns:
+        Dictionary with per-category counts and the DB write counts
+    """
+    stats = {
+        'total_products': 0,
+        'categories': {},
+        'saved': {'inserted': 0, 'updated': 0, 'errors': 0}
+    }
+
+    with BatchUpserter(db, batch_size=batch_size) as upserter:
+        batch = []
+        batch_category = None
+        for row in iter_snapshot(path):
+            product = Product.from_dict(row)
+            product.store = store_key
+            category_key = product.component_type or ''
+
+            if batch and (category_key != batch_category or len(batch) >= batch_size):
+                upserter.put(store_key, batch_category, batch)
+                batch = []
+
+            batch.append(product)
+            batch_category = category_key
+            stats['total_products'] += 1
+            stats['categories'][category_key] = stats['categories'].get(category_key, 0) + 1
+
+        if batch:
+            upserter.put(store_key, batch_category, batch)
+
+    if upserter.error:
+        raise RuntimeError(f"El escritor de la BD falló: {upserter.error}")
+
+    stats['saved'] = upserter.counts.get(store_key, stats['saved'])
+    return stats
+
+
+def ingest_ndjson(db, lines: Iterable, batch_size: int = 500) -> Dict:
+    """
+    Upserts products sent as NDJSON (POST /api/products/bulk)
+
+    Each line is a product dictionary with the products table field names.
+    Lines with "is_active": 0 only deactivate the product with that
+    source_url. Malformed lines are counted as errors and skipped.
+
+    Args:
+        db: Database instance
+        lines: NDJSON lines (str or bytes)
+        batch_size: Products per upsert transaction
+
+    Returns:
+        Dictionary with received, inserted, updated, deactivated and errors counts
+    """
+    result = {'received': 0, 'inserted': 0, 'updated': 0, 'deactivated': 0, 'errors': 0}
+    batch = []
+    deactivate = []
+
+    def flush():
+        counts = db.upsert_products(batch)
+        for key in ('inserted', 'updated', 'errors'):
+            result[key] += counts[key]
+        batch.clear()
+
+    for line in lines:
+        if not line.strip():
+            continue
+        result['received'] += 1
+        try:
+            row = json.loads(line)
+            if row.get('is_active', 1) == 0:
+                deactivate.append(row['source_url'])
+                continue
+            if not row.get('name') or not row.get('store') or row.get('price_usd') is None:
+                raise ValueError('name, store y price_usd son obligatorios')
+            batch.append(Product.from_dict(row))
+        except (ValueError, KeyError, TypeError, AttributeError):
+            result['errors'] += 1
+            continue
+
+        if len(batch) >= batch_size:
+            flush()
+
+    if batch:
+        flush()
+    if deactivate:
+        result['deactivated'] = db.deactivate_products(deactivate)
+
+    return result
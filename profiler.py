@@ -0,0 +1,301 @@
+"""
+Query Profiler
+Opt-in timing of every SQL statement run through Database connections.
+Statements are aggregated by normalized SQL (literals and IN lists folded),
+with the Database method that issued them, the shape of their parameters,
+rows returned and duration. Statements slower than a threshold go to the
+slow-query log together with their EXPLAIN QUERY PLAN
+"""
+
+import re
+import sys
+import time
+import logging
+import threading
+import sqlite3
+from collections import deque
+from datetime import datetime
+from typing import Dict, List, Optional
+
+logger = logging.getLogger('pcscraper.slow_queries')
+
+_STRING_RE = re.compile(r"'(?:[^']|'')*'")
+_NUMBER_RE = re.compile(r'(?<![\w.])-?\d+(?:\.\d+)?\b')
+_IN_LIST_RE = re.compile(r'\(\s*\?(?:\s*,\s*\?)+\s*\)')
+_SPACE_RE = re.compile(r'\s+')
+
+# Orders accepted by report()
+REPORT_ORDERS = ('total', 'max', 'mean', 'calls', 'rows')
+
+
+def normalize_sql(sql: str) -> str:
+    """Folds literals to ? and (?, ?, ...) lists to (?...), one line"""
+    sql = _STRING_RE.sub('?', sql)
+    sql = _NUMBER_RE.sub('?', sql)
+    sql = _IN_LIST_RE.sub('(?...)', sql)
+    return _SPACE_RE.sub(' ', sql).strip()
+
+
+def params_shape(params) -> str:
+    """Types of the parameters, never their values: '(str, int)', '{name: str}'"""
+    if params is None or params == ():
+        return '()'
+    if isinstance(params, dict):
+        return '{' + ', '.join(f'{key}: {type(value).__name__}' for key, value in params.items()) + '}'
+    try:
+        return '(' + ', '.join(type(value).__name__ for value in params) + ')'
+    except TypeError:
+        return type(params).__name__
+
+
+def _caller(skip_files=('profiler.py',)) -> str:
+    """Name of the nearest Database method on the stack (or the nearest caller)"""
+    frame = sys._getframe(2)
+    fallback = None
+    while frame is not None:
+        filename = frame.f_code.co_filename
+        if filename.endswith('database.py') and frame.f_code.co_name != 'get_connection':
+            return frame.f_code.co_name
+        if fallback is None and not filename.endswith(skip_files) and 'sqlite3' not in filename:
+            fallback = frame.f_code.co_name
+        frame = frame.f_back
+    return fallback or '?'
+
+
+class _Statement:
+    __slots__ = ('sql', 'params', 'shape', 'method', 'many', 'seconds', 'rows')
+
+    def __init__(self, sql, params, method, many):
+        self.sql = sql
+        self.params = params
+        self.shape = f'{len(params)}×{params_shape(params[0]) if params else "()"}' if many \
+            else params_shape(params)
+        self.method = method
+        self.many = many
+        self.seconds = 0.0
+        self.rows = 0
+
+
+class ProfilingCursor(sqlite3.Cursor):
+    """Times execute and the fetches that follow it (SQLite steps lazily)"""
+
+    _statement: Optional[_Statement] = None
+
+    def _begin(self, sql, params, many):
+        self._finish()
+        self._statement = _Statement(sql, params, _caller(), many)
+
+    def _finish(self):
+        statement = self._statement
+        if statement is not None:
+            self._statement = None
+            if not statement.many and statement.rows == 0 and self.rowcount > 0:
+                statement.rows = self.rowcount  # DML: rows affected
+            self.connection.profiler.record(statement, self.connection)
+
+    def _timed(self, func, *args):
+        started = time.perf_counter()
+        try:
+            return func(*args)
+        finally:
+            if self._statement is not None:
+                self._statement.seconds += time.perf_counter() - started
+
+    def execute(self, sql, parameters=()):
+        self._begin(sql, parameters, False)
+        return self._timed(super().execute, sql, parameters)
+
+    def executemany(self, sql, seq_of_parameters):
+        seq_of_parameters = list(seq_of_parameters)
+        self._begin(sql, seq_of_parameters, True)
+        result = self._timed(super().executemany, sql, seq_of_parameters)
+        if self._statement is not None:
+            self._statement.rows = max(self.rowcount, 0)
+        return result
+
+    def fetchone(self):
+        row = self._timed(super().fetchone)
+        if row is not None and self._statement is not None:
+            self._statement.rows += 1
+        return row
+
+    def fetchmany(self, size=None):
+        rows = self._timed(super().fetchmany, size if size is not None else self.arraysize)
+        if self._statement is not None:
+            self._statement.rows += len(rows)
+        return rows
+
+    def fetchall(self):
+        rows = self._timed(super().fetchall)
+        if self._statement is not None:
+            self._statement.rows += len(rows)
+        return rows
+
+    def __iter__(self):
+        return iter(self.fetchone, None)
+
+    def close(self):
+        self._finish()
+        super().close()
+
+
+class ProfilingConnection(sqlite3.Connection):
+    """sqlite3 connection whose cursors report to self.profiler"""
+
+    profiler: 'QueryProfiler' = None
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._cursors: List[ProfilingCursor] = []
+
+    def cursor(self, factory=ProfilingCursor):
+        cursor = super().cursor(factory)
+        self._cursors.append(cursor)
+        return cursor
+
+    def execute(self, sql, parameters=()):
+        return self.cursor().execute(sql, parameters)
+
+    def executemany(self, sql, seq_of_parameters):
+        return self.cursor().executemany(sql, seq_of_parameters)
+
+    def commit(self):
+        self._finish_all()
+        super().commit()
+
+    def close(self):
+        self._finish_all()
+        super().close()
+
+    def _finish_all(self):
+        cursors, self._cursors = self._cursors, []
+        for cursor in cursors:
+            cursor._finish()
+
+
+class QueryProfiler:
+    """
+    Aggregated statement timings plus a bounded slow-query log
+
+    Usage:
+        profiler = QueryProfiler(threshold_ms=50)
+        db = Database('pc_prices.db', profiler=profiler)
+        ...
+        for entry in profiler.report(limit=10):
+            print(entry['method'], entry['sql'], entry['total_ms'])
+
+    Parameter values are never stored, only their types. The plan of a
+    slow statement is captured right after it finishes, on the same
+    connection, with the same parameters.
+    """
+
+    def __init__(self, threshold_ms: float = 50.0, slow_log_size: int = 200, explain: bool = True):
+        """
+        Args:
+            threshold_ms: Statements at or above this go to the slow-query log
+            slow_log_size: Slow statements kept (oldest dropped first)
+            explain: Capture EXPLAIN QUERY PLAN for slow statements
+        """
+        self.threshold_ms = threshold_ms
+        self.explain = explain
+        self.started_at = datetime.now().isoformat(timespec='seconds')
+        self._stats: Dict[tuple, Dict] = {}
+        self._slow = deque(maxlen=slow_log_size)
+        self._lock = threading.Lock()
+
+    def connect(self, db_path: str, **kwargs) -> ProfilingConnection:
+        """sqlite3.connect() returning a connection that reports here"""
+        conn = sqlite3.connect(db_path, factory=ProfilingConnection, **kwargs)
+        conn.profiler = self
+        return conn
+
+    def record(self, statement: _Statement, conn: sqlite3.Connection):
+        sql = normalize_sql(statement.sql)
+        ms = statement.seconds * 1000
+        key = (statement.method, sql)
+
+        with self._lock:
+            entry = self._stats.get(key)
+            if entry is None:
+                entry = self._stats[key] = {
+                    'method': statement.method, 'sql': sql, 'calls': 0, 'total_ms': 0.0,
+                    'max_ms': 0.0, 'rows': 0, 'slow_calls': 0, 'shapes': set(), 'plan': None,
+                }
+            entry['calls'] += 1
+            entry['total_ms'] += ms
+            entry['max_ms'] = max(entry['max_ms'], ms)
+            entry['rows'] += statement.rows
+            entry['shapes'].add(statement.shape)
+            slow = ms >= self.threshold_ms
+            if slow:
+                entry['slow_calls'] += 1
+
+        if not slow:
+            return
+
+        plan = self._explain(conn, statement) if self.explain else None
+        slow_entry = {
+            'at': datetime.now().isoformat(timespec='seconds'),
+            'method': statement.method, 'sql': sql, 'params': statement.shape,
+            'rows': statement.rows, 'ms': round(ms, 3), 'plan': plan,
+        }
+        with self._lock:
+            if plan:
+                entry['plan'] = plan
+            self._slow.append(slow_entry)
+        logger.warning("Consulta lenta (%.1f ms, %s, %d filas): %s", ms, statement.method, statement.rows, sql)
+
+    def _explain(self, conn: sqlite3.Connection, statement: _Statement) -> Optional[List[str]]:
+        """EXPLAIN QUERY PLAN lines, run on a plain cursor so it is not profiled"""
+        if statement.many:
+            params = statement.params[0] if statement.params else ()
+        else:
+            params = statement.params
+        try:
+            cursor = sqlite3.Cursor(conn)
+            rows = cursor.execute(f"EXPLAIN QUERY PLAN {statement.sql}", params).fetchall()
+            cursor.close()
+        except sqlite3.Error:
+            return None  # DDL, multiple statements, closed connection...
+        return [row[3] for row in rows]
+
+    def report(self, limit: int = 20, order: str = 'total') -> List[Dict]:
+        """Top statements by total, max or mean time, calls or rows"""
+        if order not in REPORT_ORDERS:
+            raise ValueError(f"Orden desconocido: {order} (usar {', '.join(REPORT_ORDERS)})")
+        with self._lock:
+            entries = [dict(entry, shapes=sorted(entry['shapes'])) for entry in self._stats.values()]
+        for entry in entries:
+            entry['mean_ms'] = round(entry['total_ms'] / entry['calls'], 3)
+            entry['total_ms'] = round(entry['total_ms'], 3)
+            entry['max_ms'] = round(entry['max_ms'], 3)
+        key = {'total': 'total_ms', 'max': 'max_ms', 'mean': 'mean_ms'}.get(order, order)
+        entries.sort(key=lambda entry: -entry[key])
+        return entries[:limit]
+
+    def slow_queries(self, limit: int = 50) -> List[Dict]:
+        """Latest slow statements, newest first"""
+        with self._lock:
+            return list(self._slow)[::-1][:limit]
+
+    def reset(self):
+        with self._lock:
+            self._stats.clear()
+            self._slow.clear()
+            self.started_at = datetime.now().isoformat(timespec='seconds')
+
+
+def format_report(entries: List[Dict]) -> str:
+    """Text table of report() entries (with the plan of slow statements)"""
+    if not entries:
+        return "(sin consultas registradas)"
+    lines = [f"{'Método':<26} {'llamadas':>8} {'total ms':>10} {'media ms':>9} {'máx ms':>9} {'filas':>8} {'lentas':>6}",
+             "-" * 82]
+    for entry in entries:
+        lines.append(f"{entry['method'][:26]:<26} {entry['calls']:>8} {entry['total_ms']:>10.1f} "
+                     f"{entry['mean_ms']:>9.2f} {entry['max_ms']:>9.2f} {entry['rows']:>8} {entry['slow_calls']:>6}")
+        lines.append(f"    {entry['sql'][:160]}")
+        lines.append(f"    parámetros: {', '.join(entry['shapes'])[:150]}")
+        for step in entry['plan'] or []:
+            lines.append(f"    plan: {step}")
+    return '\n'.join(lines)
@@ -1,13 +1,22 @@
 """
 Store-specific scrapers package
 Each store has its own scraper class optimized for its HTML structure
+
+Scraper classes are imported on first attribute access (PEP 562), so
+importing a light submodule (scrapers.product, scrapers.tracing,
+scrapers.registry) does not pull in BeautifulSoup, requests or Selenium.
 """
 
-from .sercoplus_scraper import SercoPlusScraper
-from .memorykings_scraper import MemoryKingsScraper
-from .pcimpacto_scraper import PCImpactoScraper
-from .computershop_scraper import ComputerShopScraper
-from .base_scraper import BaseScraper
+import importlib
+
+# Public name -> submodule defining it
+_LAZY_ATTRS = {
+    'BaseScraper': '.base_scraper',
+    'SercoPlusScraper': '.sercoplus_scraper',
+    'MemoryKingsScraper': '.memorykings_scraper',
+    'PCImpactoScraper': '.pcimpacto_scraper',
+    'ComputerShopScraper': '.computershop_scraper',
+}
 
 __all__ = [
     'BaseScraper',
@@ -16,3 +25,16 @@ __all__ = [
     'PCImpactoScraper',
     'ComputerShopScraper'
 ]
+
+
+def __getattr__(name):
+    module_name = _LAZY_ATTRS.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(module_name, __name__), name)
+    globals()[name] = value  # Later lookups skip __getattr__
+    return value
+
+
+def __dir__():
+    return sorted(list(globals()) + list(_LAZY_ATTRS))
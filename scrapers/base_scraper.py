@@ -3,7 +3,6 @@ Base Scraper Class
 Abstract base class for all store-specific scrapers
 """
 
-import re
 import requests
 from bs4 import BeautifulSoup
 from typing import List, Dict, Optional
@@ -11,6 +10,21 @@ from datetime import datetime
 from abc import ABC, abstractmethod
 import time
 
+try:
+    from . import classifier
+    from .enrichment import get_enrichment_cache
+    from .cassette import get_cassette
+    from .tracing import get_tracer
+    from .product import Product
+    from .price_parser import normalize_price_number, parse_price, parse_stock
+except ImportError:  # imported as a top-level module (scrapers/ on sys.path)
+    import classifier
+    from enrichment import get_enrichment_cache
+    from cassette import get_cassette
+    from tracing import get_tracer
+    from product import Product
+    from price_parser import normalize_price_number, parse_price, parse_stock
+
 
 class BaseScraper(ABC):
     """Base class for all PC component scrapers"""
@@ -29,6 +43,15 @@ class BaseScraper(ABC):
         }
         self.session = requests.Session()
         self.session.headers.update(self.headers)
+        
+        # Classifier results shared by every scraper in the process
+        self.enrichment = get_enrichment_cache()
+        
+        # Record/replay of fetched pages (SCRAPER_CASSETTE_MODE), None when off
+        self.cassette = get_cassette(store_name)
+        
+        # Timing spans (fetch, enrich, pause...) collected per page by the pipeline
+        self.tracer = get_tracer()
     
     def init_selenium(self):
         """Initialize Selenium WebDriver using built-in Chrome driver manager"""
@@ -98,22 +121,41 @@ class BaseScraper(ABC):
         Returns:
             BeautifulSoup object or None if error
         """
-        if self.use_selenium:
-            return self._fetch_with_selenium(url, wait_time)
-        else:
-            return self._fetch_with_requests(url, timeout)
+        with self.tracer.span('fetch'):
+            if self.cassette and self.cassette.replaying:
+                with self.tracer.span('replay'):
+                    html = self.cassette.play(url)
+                if html is None:
+                    return None
+                with self.tracer.span('soup'):
+                    return BeautifulSoup(html, 'html.parser')
+            
+            if self.use_selenium:
+                return self._fetch_with_selenium(url, wait_time)
+            else:
+                return self._fetch_with_requests(url, timeout)
     
     def _fetch_with_requests(self, url: str, timeout: int = 10) -> Optional[BeautifulSoup]:
         """Fetch page using requests library"""
         try:
-            response = self.session.get(url, timeout=timeout)
-            response.raise_for_status()
-            response.encoding = response.apparent_encoding
+            with self.tracer.span('http'):
+                response = self.session.get(url, timeout=timeout)
+                response.raise_for_status()
+            with self.tracer.span('detect_encoding'):
+                response.encoding = response.apparent_encoding
             
-            return BeautifulSoup(response.content, 'html.parser')
+            if self.cassette:
+                self.cassette.record(url, response.text, 'requests', response.status_code)
+            
+            with self.tracer.span('soup'):
+                return BeautifulSoup(response.content, 'html.parser')
             
         except requests.RequestException as e:
             print(f"❌ Error fetching {url}: {e}")
+            self.tracer.event('fetch_error')
+            if self.cassette:
+                status = e.response.status_code if e.response is not None else 0
+                self.cassette.record(url, None, 'requests', status)
             return None
     
     def _fetch_with_selenium(self, url: str, wait_time: int = 3) -> Optional[BeautifulSoup]:
@@ -125,14 +167,22 @@ class BaseScraper(ABC):
             if not self.driver:
                 return self._fetch_with_requests(url)
             
-            self.driver.get(url)
-            time.sleep(wait_time)  # Wait for JavaScript to load
+            with self.tracer.span('selenium_load'):
+                self.driver.get(url)
+            with self.tracer.span('selenium_wait'):
+                time.sleep(wait_time)  # Wait for JavaScript to load
             
             page_source = self.driver.page_source
-            return BeautifulSoup(page_source, 'html.parser')
+            if self.cassette:
+                self.cassette.record(url, page_source, 'selenium')
+            with self.tracer.span('soup'):
+                return BeautifulSoup(page_source, 'html.parser')
             
         except Exception as e:
             print(f"❌ Error fetching with Selenium {url}: {e}")
+            self.tracer.event('fetch_error')
+            if self.cassette:
+                self.cassette.record(url, None, 'selenium', 0)
             return None
     
     def _normalize_price_number(self, price_str: str) -> str:
@@ -142,47 +192,10 @@ class BaseScraper(ABC):
         Examples:
             "1.953,67" -> "1953.67" (European format with thousands separator)
             "1,953.67" -> "1953.67" (US format with thousands separator)
-            "1 326.49" -> "1326.49" (Space as thousands separator)
             "3 270.00" -> "3270.00" (Space as thousands separator)
             "91,80" -> "91.80" (European format without thousands)
-            "91.80" -> "91.80" (US format without thousands)
         """
-        # Remove all types of spaces first (regular space, non-breaking space, etc.)
-        price_str = price_str.replace(' ', '').replace('\xa0', '').replace('\u00a0', '')
-        
-        # Count dots and commas
-        dot_count = price_str.count('.')
-        comma_count = price_str.count(',')
-        
-        # Determine format
-        if dot_count > 1:
-            # Multiple dots = European thousands separator (1.953.456,78)
-            price_str = price_str.replace('.', '').replace(',', '.')
-        elif comma_count > 1:
-            # Multiple commas = unlikely but handle (1,953,456.78)
-            price_str = price_str.replace(',', '')
-        elif dot_count == 1 and comma_count == 1:
-            # Both present - check which is last
-            dot_pos = price_str.rfind('.')
-            comma_pos = price_str.rfind(',')
-            if comma_pos > dot_pos:
-                # European format: 1.953,67
-                price_str = price_str.replace('.', '').replace(',', '.')
-            else:
-                # US format: 1,953.67
-                price_str = price_str.replace(',', '')
-        elif comma_count == 1 and dot_count == 0:
-            # Only comma - check if it's decimal or thousands
-            comma_pos = price_str.rfind(',')
-            after_comma = price_str[comma_pos+1:]
-            if len(after_comma) == 2:
-                # Likely decimal: 91,80 -> 91.80
-                price_str = price_str.replace(',', '.')
-            elif len(after_comma) == 3:
-                # Likely thousands: 1,000 -> 1000
-                price_str = price_str.replace(',', '')
-        
-        return price_str
+        return normalize_price_number(price_str)
     
     def parse_price(self, price_text: str) -> Dict:
         """
@@ -194,65 +207,8 @@ class BaseScraper(ABC):
             "$ 345.00 ó S/ 1,186.50" -> price_usd: 345.00, price_local: 1186.50
             "$ 1.953,67 (S/ 2.444,00)" -> price_usd: 1953.67, price_local: 2444.00
         """
-        prices = {}
-        
-        # Remove extra whitespace
-        price_text = re.sub(r'\s+', ' ', price_text.strip())
-        
-        # Pattern 1: $91,80 (S/319,46) or $ 1.953,67 (S/ 2.444,00)
-        pattern1 = r'\$\s*([\d,\.]+)\s*\((?:S/|S\/)\s*([\d,\.]+)\)'
-        match = re.search(pattern1, price_text)
-        
-        if match:
-            usd_price = self._normalize_price_number(match.group(1))
-            local_price = self._normalize_price_number(match.group(2))
-            
-            prices['price_usd'] = float(usd_price)
-            prices['price_local'] = float(local_price)
-            prices['currency'] = 'PEN'
-            return prices
-        
-        # Pattern 2: $131.00 - S/445.40 or $389.00 - S/1 326.49 or $3 270.00 - S/11 150.70
-        pattern2 = r'\$\s*([\d,\.\s]+?)\s*-\s*(?:S/|S\/)\s*([\d,\.\s]+)'
-        match = re.search(pattern2, price_text)
-        
-        if match:
-            usd_price = self._normalize_price_number(match.group(1))
-            local_price = self._normalize_price_number(match.group(2))
-            
-            prices['price_usd'] = float(usd_price)
-            prices['price_local'] = float(local_price)
-            prices['currency'] = 'PEN'
-            return prices
-        
-        # Pattern 3: $ 345.00 ó S/ 1,186.50
-        pattern3 = r'\$\s*([\d,\.]+)\s*(?:ó|o)\s*(?:S/|S\/)\s*([\d,\.]+)'
-        match = re.search(pattern3, price_text)
-        
-        if match:
-            usd_price = match.group(1).replace(',', '')
-            local_price = match.group(2).replace(',', '')
-            
-            prices['price_usd'] = float(usd_price)
-            prices['price_local'] = float(local_price)
-            prices['currency'] = 'PEN'
-            return prices
-        
-        # Fallback: try to extract just USD price
-        usd_match = re.search(r'\$\s*([\d,\.]+)', price_text)
-        if usd_match:
-            usd_price = usd_match.group(1).replace(',', '')
-            prices['price_usd'] = float(usd_price)
-            prices['currency'] = 'USD'
-            
-            # Try to find PEN price
-            pen_match = re.search(r'(?:S/|S\/)\s*([\d,\.]+)', price_text)
-            if pen_match:
-                local_price = pen_match.group(1).replace(',', '')
-                prices['price_local'] = float(local_price)
-                prices['currency'] = 'PEN'
-        
-        return prices
+        # parse_price() returns a fresh dict, callers may update it freely
+        return parse_price(price_text)
     
     def parse_stock(self, stock_text: str) -> str:
         """
@@ -263,70 +219,11 @@ class BaseScraper(ABC):
             - '+10' for "Mayor a 10" (more than 10) - formato estándar
             - '0' for out of stock
         """
-        if not stock_text:
-            return '0'
-        
-        stock_text_lower = stock_text.lower()
-        
-        # Check for explicit number in text FIRST
-        numbers = re.findall(r'\d+', stock_text)
-        if numbers:
-            qty = int(numbers[0])
-            
-            # Check if it says "Mayor a X" or similar
-            if any(word in stock_text_lower for word in ['mayor a', 'más de', 'more than', 'mayor de']):
-                # If "Mayor a 10" return "+10" (formato estándar)
-                return f'+{qty}'
-            
-            # Regular number
-            return str(qty)
-        
-        # Check for out of stock
-        if any(word in stock_text_lower for word in ['agotado', 'sin stock', 'out of stock', 'no disponible']):
-            return '0'
-        
-        # Check for available but no specific number
-        if any(word in stock_text_lower for word in ['disponible', 'stock', 'en stock', 'available']):
-            return '+5'
-        
-        if any(word in stock_text_lower for word in ['pocas unidades', 'últimas unidades', 'low stock']):
-            return '1-4'
-        
-        return '0'
+        return parse_stock(stock_text)
     
     def extract_brand_from_name(self, name: str) -> str:
         """Extracts brand from product name"""
-        common_brands = [
-            'Intel', 'AMD', 'NVIDIA', 'ASUS', 'MSI', 'Gigabyte', 'ASRock',
-            'Corsair', 'Kingston', 'Samsung', 'Western Digital', 'WD',
-            'Seagate', 'Crucial', 'G.Skill', 'HyperX', 'Razer',
-            'Logitech', 'Cooler Master', 'NZXT', 'Thermaltake',
-            'EVGA', 'Zotac', 'Sapphire', 'XFX', 'PNY', 'Palit',
-            'Adata', 'Patriot', 'Team', 'Lexar', 'DeepCool', 'Deepcool',
-            'XPG', 'Galax', 'KFA2', 'Gainward', 'Inno3D',
-            'Colorful', 'Powercolor', 'Biostar', 'ECS', 'Gambyte'
-        ]
-        
-        name_upper = name.upper()
-        
-        # Check for brands in order (longer names first to avoid partial matches)
-        sorted_brands = sorted(common_brands, key=len, reverse=True)
-        for brand in sorted_brands:
-            if brand.upper() in name_upper:
-                return brand
-        
-        # Skip common non-brand words
-        skip_words = ['TARJETA', 'DE', 'VIDEO', 'PROCESADOR', 'MEMORIA', 'RAM', 
-                     'PLACA', 'MADRE', 'CASE', 'GABINETE', 'FUENTE', 'DISCO',
-                     'SSD', 'HDD', 'MONITOR', 'TECLADO', 'MOUSE', 'SOPORTE']
-        
-        words = name.split()
-        for word in words:
-            word_upper = word.upper().strip()
-            if word_upper and word_upper not in skip_words and len(word_upper) > 2:
-                return word
-        
-        return 'Unknown'
+        return classifier.extract_brand_from_name(name)
     
     def identify_component_type(self, name: str, category: str = '') -> str:
         """
@@ -339,114 +236,45 @@ class BaseScraper(ABC):
         Returns:
             Component type string
         """
-        text = (name + ' ' + category).lower()
-        
-        # Check for exclusions first (things that shouldn't be in certain categories)
-        # Exclude cases/gabinetes from tarjeta_grafica
-        if any(word in text for word in ['case s/', 'case sin', 'gabinete s/']):
-            return 'gabinete'
-        
-        # Exclude accessories/supports from main categories (check before GPU keywords)
-        if any(word in text for word in ['soporte para', 'soporte pcie', 'bracket', 'riser', 'extensor']):
-            return 'accesorio'
-        
-        type_keywords = {
-            'procesador': ['procesador', 'processor', 'cpu', 'core i', 'ryzen', 'pentium', 'celeron', 'athlon'],
-            'tarjeta_grafica': ['tarjeta de video', 'tarjeta grafica', 'tarjeta gráfica', 'gpu ', 'geforce', 'radeon', 'rtx', 'gtx', 'video card'],
-            'memoria_ram': ['memoria ram', 'memoria ddr', 'ram ddr', 'dimm', 'sodimm'],
-            'almacenamiento': ['ssd', 'hdd', 'nvme', 'disco duro', 'storage', 'm.2', 'sata'],
-            'placa_madre': ['motherboard', 'placa madre', 'mainboard', 'placa base'],
-            'fuente': ['fuente de poder', 'fuente poder', 'psu', 'power supply'],
-            'gabinete': ['gabinete', 'case', 'caja pc', 'chasis', 'carcasa'],
-            'refrigeracion': ['cooler', 'refrigeracion', 'refrigeración', 'ventilador', 'fan', 'liquid cooling', 'water cooling'],
-            'monitor': ['monitor', 'display', 'pantalla'],
-            'teclado': ['teclado', 'keyboard'],
-            'mouse': ['mouse', 'ratón', 'raton'],
-            'auriculares': ['auricular', 'headset', 'headphone']
-        }
-        
-        for component_type, keywords in type_keywords.items():
-            if any(keyword in text for keyword in keywords):
-                return component_type
-        
-        return 'otro'
+        return classifier.identify_component_type(name, category)
     
     def normalize_product_name(self, name: str) -> str:
         """
         Normalizes product name for better comparison between stores
         Removes common variations and standardizes format
         """
-        # Convert to uppercase
-        name = name.upper()
-        
-        # Remove extra whitespace
-        name = re.sub(r'\s+', ' ', name).strip()
-        
-        # Remove common words that don't affect product identity
-        remove_words = [
-            'PROCESADOR', 'PROCESSOR', 'CPU',
-            'TARJETA GRAFICA', 'TARJETA GRÁFICA', 'GPU',
-            'MEMORIA', 'RAM',
-            'BOX', 'CAJA',
-            '- NEGRO', '- BLANCO', '- BLACK', '- WHITE'
-        ]
-        
-        for word in remove_words:
-            name = name.replace(word, '')
-        
-        # Standardize brand names
-        brand_variations = {
-            'INTEL®': 'INTEL',
-            'AMD®': 'AMD',
-            'NVIDIA®': 'NVIDIA',
-        }
-        
-        for old, new in brand_variations.items():
-            name = name.replace(old, new)
-        
-        # Remove special characters except common ones
-        name = re.sub(r'[^\w\s\-/.]', '', name)
-        
-        # Remove extra whitespace again
-        name = re.sub(r'\s+', ' ', name).strip()
-        
-        return name
+        return classifier.normalize_product_name(name)
     
-    def create_product_dict(self, **kwargs) -> Dict:
+    def create_product_dict(self, **kwargs) -> Product:
         """
-        Creates a standardized product dictionary
+        Creates a standardized product record
         
-        All store scrapers should use this to ensure consistent format
+        All store scrapers should use this to ensure consistent format.
+        Returns a slotted Product, which still supports dict-style access.
+        Normalized name, type and brand come from the enrichment cache, so
+        names already seen (in this or an earlier run) are not reclassified.
         """
-        product = {
-            'name': kwargs.get('name', ''),
-            'normalized_name': self.normalize_product_name(kwargs.get('name', '')),
-            'component_type': kwargs.get('component_type', ''),
-            'brand': kwargs.get('brand', ''),
-            'sku': kwargs.get('sku', ''),
-            'price_usd': kwargs.get('price_usd', 0.0),
-            'price_local': kwargs.get('price_local', 0.0),
-            'currency': kwargs.get('currency', 'USD'),
-            'stock': kwargs.get('stock', 'unknown'),
-            'store': self.store_name,
-            'source_url': kwargs.get('source_url', ''),
-            'image_url': kwargs.get('image_url', ''),
-            'last_scraped': datetime.now().isoformat(),
-            'metadata': kwargs.get('metadata', {})
-        }
-        
-        # Auto-detect component type if not provided
-        if not product['component_type']:
-            product['component_type'] = self.identify_component_type(
-                product['name'], 
-                kwargs.get('category', '')
+        with self.tracer.span('enrich'):
+            name = kwargs.get('name', '')
+            enriched = self.enrichment.get(self.store_name, name, kwargs.get('category', ''))
+        
+            return Product(
+                name=name,
+                normalized_name=enriched['normalized_name'],
+                # Auto-detect component type and brand if not provided
+                component_type=kwargs.get('component_type') or enriched['component_type'],
+                brand=kwargs.get('brand') or enriched['brand'],
+                sku=kwargs.get('sku', ''),
+                price_usd=kwargs.get('price_usd', 0.0),
+                price_local=kwargs.get('price_local', 0.0),
+                currency=kwargs.get('currency', 'USD'),
+                stock=kwargs.get('stock', 'unknown'),
+                store=self.store_name,
+                source_url=kwargs.get('source_url', ''),
+                image_url=kwargs.get('image_url', ''),
+                last_scraped=datetime.now().isoformat(),
+                metadata=kwargs.get('metadata')
             )
-        
-        # Auto-detect brand if not provided
-        if not product['brand']:
-            product['brand'] = self.extract_brand_from_name(product['name'])
-        
-        return product
     
     def scrape_with_retry(self, url: str, max_retries: int = 3, delay: int = 2) -> Optional[BeautifulSoup]:
         """
@@ -467,6 +295,18 @@ class BaseScraper(ABC):
             
             if attempt < max_retries - 1:
                 print(f"⚠️ Retry {attempt + 1}/{max_retries} for {url}")
-                time.sleep(delay)
+                self.pause(delay)
         
         return None
+    
+    def pause(self, seconds: float):
+        """
+        Politeness delay between requests
+        
+        Skipped when replaying a cassette: the store is not being hit, and
+        replay latency is simulated per page by the cassette instead.
+        """
+        if self.cassette and self.cassette.replaying:
+            return
+        with self.tracer.span('pause'):
+            time.sleep(seconds)
@@ -0,0 +1,157 @@
+"""
+HTTP Cassettes
+Record-and-replay of the pages fetched by the scrapers. In record mode every
+page (requests response or Selenium page source) is appended to a gzipped
+NDJSON cassette per store; in replay mode pages are served from it with an
+optional artificial latency, so a full store run can be reproduced offline
+"""
+
+import os
+import re
+import json
+import gzip
+import time
+import atexit
+import random
+import threading
+from typing import Dict, Optional
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+MODES = ('record', 'replay')
+
+
+class Cassette:
+    """
+    Pages of one store, keyed by URL
+
+    Each line of the cassette is {"url", "source", "status", "body"} where
+    body is the decoded HTML (null for a failed fetch, which replays as a
+    failure too). A URL fetched several times keeps its last response.
+    """
+
+    def __init__(self, path: str, mode: str, latency: float = 0.0, jitter: float = 0.0):
+        """
+        Args:
+            path: Cassette file (.ndjson.gz)
+            mode: 'record' or 'replay'
+            latency: Seconds added to every replayed page
+            jitter: Extra random seconds (0..jitter) per replayed page,
+                seeded by URL so repeated runs wait the same
+        """
+        if mode not in MODES:
+            raise ValueError(f"Modo de cassette desconocido: {mode}")
+        self.path = path
+        self.mode = mode
+        self.latency = latency
+        self.jitter = jitter
+        self.hits = 0
+        self.misses = 0
+        self._entries: Dict[str, Dict] = {}
+        self._file = None
+        self._lock = threading.Lock()
+
+        if mode == 'replay':
+            self._load()
+        else:
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+            self._file = gzip.open(path, 'wt', encoding='utf-8')
+            atexit.register(self.close)
+
+    @property
+    def replaying(self) -> bool:
+        return self.mode == 'replay'
+
+    @property
+    def recording(self) -> bool:
+        return self.mode == 'record'
+
+    def _load(self):
+        if not os.path.exists(self.path):
+            raise FileNotFoundError(f"No existe el cassette {self.path}")
+        with gzip.open(self.path, 'rt', encoding='utf-8') as f:
+            for line in f:
+                if line.strip():
+                    entry = json.loads(line)
+                    self._entries[entry['url']] = entry
+
+    def record(self, url: str, body: Optional[str], source: str = 'requests', status: int = 200):
+        """Appends one fetched page (body=None for a failed fetch)"""
+        entry = {'url': url, 'source': source, 'status': status, 'body': body}
+        with self._lock:
+            self._entries[url] = entry
+            if self._file:
+                self._file.write(json.dumps(entry, ensure_ascii=False) + '\n')
+
+    def play(self, url: str) -> Optional[str]:
+        """
+        Returns the recorded HTML for a URL after the configured latency
+
+        URLs missing from the cassette (or recorded as failures) return None,
+        exactly like a failed fetch; the network is never used.
+        """
+        entry = self._entries.get(url)
+        delay = self.latency
+        if self.jitter:
+            delay += random.Random(url).uniform(0, self.jitter)
+        if delay:
+            time.sleep(delay)
+
+        with self._lock:
+            if entry is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+        if entry is None:
+            print(f"⚠️ Cassette sin respuesta para {url}")
+            return None
+        return entry['body']
+
+    def close(self):
+        """
+        Flushes and closes a recording cassette
+
+        atexit closes it on a normal exit; processes ending with os._exit()
+        (ProcessPoolExecutor workers) must call this themselves.
+        """
+        with self._lock:
+            if self._file:
+                self._file.close()
+                self._file = None
+
+
+_cassettes: Dict[str, Cassette] = {}
+_cassettes_lock = threading.Lock()
+
+
+def cassette_path(directory: str, store_name: str) -> str:
+    slug = re.sub(r'[^a-z0-9]+', '-', store_name.lower()).strip('-')
+    return os.path.join(directory, f'{slug}.ndjson.gz')
+
+
+def get_cassette(store_name: str) -> Optional[Cassette]:
+    """
+    Cassette shared by every scraper of a store in this process
+
+    Configured through the environment, so processes spawned by the
+    orchestrator inherit it:
+        SCRAPER_CASSETTE_MODE: '' (off), 'record' or 'replay'
+        SCRAPER_CASSETTE_DIR: directory of the cassettes (default: cassettes/)
+        SCRAPER_REPLAY_LATENCY / SCRAPER_REPLAY_JITTER: seconds per replayed page
+    """
+    mode = os.getenv('SCRAPER_CASSETTE_MODE', '').strip().lower()
+    if not mode:
+        return None
+
+    directory = os.getenv('SCRAPER_CASSETTE_DIR', os.path.join(ROOT_DIR, 'cassettes'))
+    path = cassette_path(directory, store_name)
+    with _cassettes_lock:
+        cassette = _cassettes.get(path)
+        if cassette is None or cassette.mode != mode:
+            cassette = Cassette(
+                path, mode,
+                latency=float(os.getenv('SCRAPER_REPLAY_LATENCY', '0')),
+                jitter=float(os.getenv('SCRAPER_REPLAY_JITTER', '0')),
+            )
+            _cassettes[path] = cassette
+        return cassette
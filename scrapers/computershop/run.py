@@ -1,22 +1,39 @@
 """
 Script completo para scrapear ComputerShop Peru - Todas las categorías
+Los productos se guardan en la base de datos página a página mientras se
+scrapea; los snapshots (products.ndjson / .parquet / .json) son opcionales
 """
 from scraper import ComputerShopScraper
-import json
 from datetime import datetime
+import argparse
 import os
+import sys
+
+# Add project root to path
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, ROOT_DIR)
+from scrapers.registry import get_categories
+from pipeline import run_store
+from snapshots import build_snapshot_sinks
+from database import Database
+from config import config
+
+STORE_KEY = 'computershop'
 
 def main():
+    parser = argparse.ArgumentParser(description='Scraping completo de ComputerShop Peru')
+    parser.add_argument('--max-pages', type=int, default=None,
+                        help='Máximo de páginas por categoría (default: todas)')
+    parser.add_argument('--snapshot', nargs='*', choices=['ndjson', 'parquet', 'json'],
+                        help='Guardar también snapshots (default: ndjson; parquet requiere pyarrow)')
+    parser.add_argument('--no-db', action='store_true',
+                        help='No escribir en la base de datos (usar con --snapshot)')
+    args = parser.parse_args()
+    
     scraper = ComputerShopScraper(use_selenium=True)
     
-    # Categorías de ComputerShop Peru
-    categories = {
-        'placas-madre': 'https://computershopperu.com/categoria/32-placas-madre',
-        'procesadores': 'https://computershopperu.com/categoria/39-procesadores',
-        'memorias-ram': 'https://computershopperu.com/categoria/51-memorias-ram-pc',
-        'almacenamiento': 'https://computershopperu.com/categoria/36-almacenamiento',
-        'tarjetas-video': 'https://computershopperu.com/categoria/20-tarjeta-de-video',
-    }
+    # Categorías definidas en el registro de tiendas (scrapers/registry.py)
+    categories = get_categories(STORE_KEY)
     
     print("\n" + "="*70)
     print("🚀 SCRAPING COMPLETO DE COMPUTERSHOP PERU")
@@ -24,20 +41,26 @@ def main():
     print(f"Fecha: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
     print(f"Categorías: {len(categories)}")
     
-    # Scrape todas las categorías
-    all_results = {}
-    total_products = 0
+    db = None
+    if not args.no_db:
+        db = Database(os.path.join(ROOT_DIR, config.DATABASE_PATH))
+        db.init_db()
     
-    for category_key, category_url in categories.items():
-        print(f"\n📦 Scraping: {category_key.upper()}")
-        print(f"   URL: {category_url}")
-        
-        # Scrape category page (todas las páginas sin límite)
-        products = scraper.scrape_category_page(category_url, max_pages=None)
-        all_results[category_key] = products
-        total_products += len(products)
-        
-        print(f"   ✅ {len(products)} productos scrapeados")
+    # Snapshots opcionales en el directorio del scraper
+    sinks = []
+    if args.snapshot is not None:
+        formats = args.snapshot or ['ndjson']
+        sinks = build_snapshot_sinks(os.path.dirname(os.path.abspath(__file__)), formats)
+    
+    # Scrape todas las categorías (los productos van a la BD a medida que llegan)
+    try:
+        stats = run_store(scraper, STORE_KEY, categories, db=db, sinks=sinks,
+                          max_pages=args.max_pages)
+    finally:
+        # Cerrar Selenium
+        scraper.close_selenium()
+    
+    total_products = stats['total_products']
     
     # Resumen final
     print(f"\n\n{'='*70}")
@@ -45,53 +68,39 @@ def main():
     print('='*70)
     print(f"\nTotal de productos: {total_products}")
     print(f"\nPor categoría:")
-    for category, products in all_results.items():
-        print(f"  - {category}: {len(products)} productos")
-    
-    # Estadísticas generales
-    all_products_flat = []
-    for products in all_results.values():
-        all_products_flat.extend(products)
+    for category, count in stats['categories'].items():
+        print(f"  - {category}: {count} productos")
     
-    if all_products_flat:
-        with_price = sum(1 for p in all_products_flat if p.get('price_usd') or p.get('price_local'))
-        with_image = sum(1 for p in all_products_flat if p.get('image_url'))
-        with_stock = sum(1 for p in all_products_flat if p.get('stock'))
+    if total_products:
+        with_price = stats['with_price']
+        with_image = stats['with_image']
+        with_stock = stats['with_stock']
         
         print(f"\nCalidad de datos:")
         print(f"  Con precio: {with_price}/{total_products} ({with_price/total_products*100:.1f}%)")
         print(f"  Con imagen: {with_image}/{total_products} ({with_image/total_products*100:.1f}%)")
         print(f"  Con stock: {with_stock}/{total_products} ({with_stock/total_products*100:.1f}%)")
         
-        # Guardar resultados
-        output_file = 'products.json'
-        with open(output_file, 'w', encoding='utf-8') as f:
-            json.dump({
-                'timestamp': datetime.now().isoformat(),
-                'total_products': total_products,
-                'categories': all_results
-            }, f, indent=2, ensure_ascii=False)
-        
-        print(f"\n💾 Resultados guardados en: {output_file}")
+        if db:
+            saved = stats['saved']
+            print(f"\n💾 Base de datos: {saved['inserted']} nuevos, {saved['updated']} actualizados, "
+                  f"{saved['errors']} errores")
+        for sink in sinks:
+            print(f"\n💾 Resultados guardados en: {sink.path}")
         
         # Mostrar muestra de cada categoría
         print(f"\n{'='*70}")
         print("📦 MUESTRA DE PRODUCTOS POR CATEGORÍA")
         print('='*70)
         
-        for category, products in all_results.items():
-            if products:
-                print(f"\n--- {category.upper()} ---")
-                sample = products[0]
-                print(f"Nombre: {sample.get('name', '')[:70]}...")
-                print(f"Precio: ${sample.get('price_usd', 0)} / S/{sample.get('price_local', 0)}")
-                print(f"Stock: {sample.get('stock', 'N/A')}")
-                print(f"SKU: {sample.get('sku', 'N/A')}")
-                print(f"Marca: {sample.get('brand', 'N/A')}")
-                print(f"Imagen: {'✅' if sample.get('image_url') else '❌'}")
-    
-    # Cerrar Selenium
-    scraper.close_selenium()
+        for category, sample in stats['samples'].items():
+            print(f"\n--- {category.upper()} ---")
+            print(f"Nombre: {sample.get('name', '')[:70]}...")
+            print(f"Precio: ${sample.get('price_usd', 0)} / S/{sample.get('price_local', 0)}")
+            print(f"Stock: {sample.get('stock', 'N/A')}")
+            print(f"SKU: {sample.get('sku', 'N/A')}")
+            print(f"Marca: {sample.get('brand', 'N/A')}")
+            print(f"Imagen: {'✅' if sample.get('image_url') else '❌'}")
 
 if __name__ == "__main__":
     main()
@@ -8,9 +8,8 @@ import os
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from base_scraper import BaseScraper
-from typing import List, Dict, Optional
+from typing import List, Dict, Optional, Iterator
 import re
-import time
 
 
 class ComputerShopScraper(BaseScraper):
@@ -95,14 +94,26 @@ class ComputerShopScraper(BaseScraper):
         """
         Scrapes all products from a category page
         
+        Collects every page yielded by iter_category_pages into one list.
+        Use iter_category_pages directly to process products page by page.
+        """
+        all_products = []
+        for products in self.iter_category_pages(url, max_pages=max_pages):
+            all_products.extend(products)
+        return all_products
+    
+    def iter_category_pages(self, url: str, max_pages: Optional[int] = None) -> Iterator[List[Dict]]:
+        """
+        Yields the products of a category one page at a time
+        
         Args:
             url: Category page URL
             max_pages: Maximum number of pages to scrape (None = all pages)
             
-        Returns:
-            List of product dictionaries
+        Yields:
+            List of product dictionaries found on each page
         """
-        all_products = []
+        total_products = 0
         current_page = 1
         
         print(f"\n🔍 Scraping ComputerShop category: {url}")
@@ -138,13 +149,16 @@ class ComputerShopScraper(BaseScraper):
             
             # Extract products from current page
             page_products = 0
+            products = []
             for container in product_containers:
                 product = self._extract_product_from_container(container, url)
                 if product:
-                    all_products.append(product)
+                    products.append(product)
                     page_products += 1
             
             print(f"   💾 {page_products} productos extraídos exitosamente")
+            total_products += page_products
+            yield products
             
             # Check if there's a next page
             pagination = soup.find('nav', class_='pagination')
@@ -158,10 +172,9 @@ class ComputerShopScraper(BaseScraper):
                 break
             
             current_page += 1
-            time.sleep(2)  # Be respectful to the server
+            self.pause(2)  # Be respectful to the server
         
-        print(f"\n✅ Total de productos scrapeados: {len(all_products)}")
-        return all_products
+        print(f"\n✅ Total de productos scrapeados: {total_products}")
     
     def _extract_product_from_container(self, container, category_url: str) -> Optional[Dict]:
         """
@@ -247,32 +260,11 @@ class ComputerShopScraper(BaseScraper):
         
         price_text = price_elem.get_text(strip=True)
         
-        # Remove HTML entities
-        price_text = price_text.replace('\xa0', ' ').replace('&nbsp;', ' ')
-        
-        # Extract USD price: $ 26,00
-        usd_match = re.search(r'\$\s*([\d,\.]+)', price_text)
-        price_usd = 0
-        if usd_match:
-            usd_str = self._normalize_price_number(usd_match.group(1))
-            try:
-                price_usd = float(usd_str)
-            except:
-                pass
-        
-        # Extract PEN price: S/ 89,70
-        pen_match = re.search(r'S/\s*([\d,\.]+)', price_text)
-        price_local = 0
-        if pen_match:
-            pen_str = self._normalize_price_number(pen_match.group(1))
-            try:
-                price_local = float(pen_str)
-            except:
-                pass
+        prices = self.parse_price(price_text.replace('&nbsp;', ' '))
         
         return {
-            'price_usd': price_usd,
-            'price_local': price_local
+            'price_usd': prices.get('price_usd', 0),
+            'price_local': prices.get('price_local', 0)
         }
     
     def _extract_stock(self, stock_elem) -> str:
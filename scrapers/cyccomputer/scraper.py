@@ -6,12 +6,13 @@ Specialized scraper for cyccomputer.pe
 import re
 import sys
 import os
-from typing import List, Dict, Optional
+from typing import List, Dict, Optional, Iterator
 from urllib.parse import urlencode, urlparse, parse_qs
 
 # Add parent directory to path to import base_scraper
 sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
 from base_scraper import BaseScraper
+from price_parser import parse_labeled_stock
 
 
 class CycComputerScraper(BaseScraper):
@@ -32,11 +33,23 @@ class CycComputerScraper(BaseScraper):
         """
         Scrapes a category/listing page from CycComputer with pagination support
         
+        Collects every page yielded by iter_category_pages into one list.
+        Use iter_category_pages directly to process products page by page.
+        """
+        all_products = []
+        for products in self.iter_category_pages(url, max_pages=max_pages):
+            all_products.extend(products)
+        return all_products
+    
+    def iter_category_pages(self, url: str, max_pages: int = None) -> Iterator[List[Dict]]:
+        """
+        Yields the products of a category one page at a time
+        
         Args:
             url: Category URL (ej: https://cyccomputer.pe/categoria/233-placas-madre)
             max_pages: Maximum number of pages to scrape (None = all pages)
         """
-        all_products = []
+        total_products = 0
         seen_urls = set()  # Para evitar duplicados
         current_page = 1
         
@@ -65,6 +78,7 @@ class CycComputerScraper(BaseScraper):
             print(f"      📦 Encontrados {len(product_containers)} productos")
             
             page_products = 0
+            products = []
             for container in product_containers:
                 try:
                     product_data = {}
@@ -98,24 +112,8 @@ class CycComputerScraper(BaseScraper):
                     stock_elem = container.find('div', class_='quantity')
                     if stock_elem:
                         stock_text = stock_elem.get_text(strip=True)
-                        # Extraer el número o texto después de "Stock:"
-                        stock_match = re.search(r'Stock:\s*(.+)', stock_text, re.IGNORECASE)
-                        if stock_match:
-                            stock_value = stock_match.group(1).strip()
-                            
-                            # Convertir "Mayor a X Artículos" a "+X" (formato estándar: +10)
-                            mayor_match = re.search(r'Mayor\s+a\s+(\d+)', stock_value, re.IGNORECASE)
-                            if mayor_match:
-                                product_data['stock'] = f"+{mayor_match.group(1)}"
-                            # Convertir "X Artículos" a "X"
-                            elif re.search(r'(\d+)\s+Artículo', stock_value, re.IGNORECASE):
-                                num_match = re.search(r'(\d+)', stock_value)
-                                if num_match:
-                                    product_data['stock'] = num_match.group(1)
-                            else:
-                                product_data['stock'] = self.parse_stock(stock_value)
-                        else:
-                            product_data['stock'] = 'unknown'
+                        # "Stock: Mayor a 10 Artículos" -> "+10", "Stock: 3 Artículos" -> "3"
+                        product_data['stock'] = parse_labeled_stock(stock_text)
                     
                     # Extract brand - div.manufacturer_name
                     brand_elem = container.find('div', class_='manufacturer_name')
@@ -159,7 +157,7 @@ class CycComputerScraper(BaseScraper):
                             metadata={},
                             component_type=''  # Se asignará luego en run.py
                         )
-                        all_products.append(product)
+                        products.append(product)
                         seen_urls.add(product_data.get('source_url'))  # Marcar como visto
                         page_products += 1
                             
@@ -168,6 +166,8 @@ class CycComputerScraper(BaseScraper):
                     continue
             
             print(f"      ✅ {page_products} productos agregados")
+            total_products += page_products
+            yield products
             
             # Check if there's a next page
             # Buscar botón "siguiente" o paginación
@@ -191,8 +191,6 @@ class CycComputerScraper(BaseScraper):
                 break
             
             # Delay between pages
-            import time
-            time.sleep(2)
+            self.pause(2)
         
-        print(f"   📊 Total: {len(all_products)} productos de {current_page} página(s)")
-        return all_products
+        print(f"   📊 Total: {total_products} productos de {current_page} página(s)")
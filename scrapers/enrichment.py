@@ -0,0 +1,183 @@
+"""
+Product Enrichment Cache
+Memoizes classifier results (component type, brand, normalized name) per
+(store, raw name, category), in memory and in a small SQLite file, so a
+repeat run over the same catalog does almost no classification work
+"""
+
+import atexit
+import sqlite3
+import threading
+from collections import OrderedDict
+from typing import Dict, Optional, Tuple
+
+try:
+    from . import classifier
+except ImportError:  # imported as a top-level module (scrapers/ on sys.path)
+    import classifier
+
+# Pending results written to SQLite in one transaction once this many pile up
+FLUSH_EVERY = 500
+
+
+class EnrichmentCache:
+    """
+    Bounded LRU in front of a persistent SQLite table
+
+    Rows are stamped with classifier.RULES_VERSION; rows from other
+    versions are ignored (and overwritten), so changing a rule
+    invalidates every cached result. The first lookup for a
+    (store, category) pair loads that whole partition from SQLite in one
+    query. Safe to share between scraper threads.
+    """
+
+    def __init__(self, path: Optional[str] = None, maxsize: int = 20000,
+                 rules_version: int = classifier.RULES_VERSION):
+        """
+        Args:
+            path: SQLite file for persistence (None/'' = memory only)
+            maxsize: Maximum entries kept in memory
+            rules_version: Version stamped on (and required of) stored rows
+        """
+        self.path = path or None
+        self.maxsize = maxsize
+        self.rules_version = rules_version
+        self.hits = 0
+        self.misses = 0
+        self._entries: 'OrderedDict[Tuple[str, str, str], Dict[str, str]]' = OrderedDict()
+        self._loaded_partitions = set()
+        self._pending = []
+        self._lock = threading.Lock()
+
+        if self.path:
+            self._init_db()
+
+    def _connect(self):
+        conn = sqlite3.connect(self.path, timeout=30)
+        conn.row_factory = sqlite3.Row
+        return conn
+
+    def _init_db(self):
+        conn = self._connect()
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS enrichment_cache (
+                store TEXT NOT NULL,
+                name TEXT NOT NULL,
+                category TEXT NOT NULL,
+                rules_version INTEGER NOT NULL,
+                component_type TEXT,
+                brand TEXT,
+                normalized_name TEXT,
+                PRIMARY KEY (store, name, category)
+            )
+        """)
+        conn.commit()
+        conn.close()
+
+    def get(self, store: str, name: str, category: str = '') -> Dict[str, str]:
+        """
+        Returns component_type, brand and normalized_name for a raw name
+
+        The returned dictionary is shared; copy it before modifying.
+        """
+        key = (store, name, category)
+
+        with self._lock:
+            if self.path and (store, category) not in self._loaded_partitions:
+                self._load_partition(store, category)
+
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry
+
+        # Classify outside the lock; a concurrent duplicate is harmless
+        entry = classifier.classify(name, category)
+
+        with self._lock:
+            self.misses += 1
+            self._remember(key, entry)
+            if self.path:
+                self._pending.append((store, name, category, self.rules_version,
+                                      entry['component_type'], entry['brand'],
+                                      entry['normalized_name']))
+                if len(self._pending) >= FLUSH_EVERY:
+                    self._flush_locked()
+
+        return entry
+
+    def _remember(self, key, entry):
+        self._entries[key] = entry
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+
+    def _load_partition(self, store: str, category: str):
+        self._loaded_partitions.add((store, category))
+
+        conn = self._connect()
+        rows = conn.execute("""
+            SELECT name, component_type, brand, normalized_name
+            FROM enrichment_cache
+            WHERE store = ? AND category = ? AND rules_version = ?
+        """, (store, category, self.rules_version)).fetchall()
+        conn.close()
+
+        for row in rows:
+            self._remember((store, row['name'], category), {
+                'component_type': row['component_type'],
+                'brand': row['brand'],
+                'normalized_name': row['normalized_name'],
+            })
+
+    def flush(self):
+        """Writes pending results to SQLite"""
+        with self._lock:
+            self._flush_locked()
+
+    def _flush_locked(self):
+        if not self._pending or not self.path:
+            return
+        pending, self._pending = self._pending, []
+        try:
+            conn = self._connect()
+            conn.executemany("""
+                INSERT OR REPLACE INTO enrichment_cache
+                (store, name, category, rules_version, component_type, brand, normalized_name)
+                VALUES (?, ?, ?, ?, ?, ?, ?)
+            """, pending)
+            conn.commit()
+            conn.close()
+        except sqlite3.Error as e:
+            # The cache is an optimization: losing a batch only costs recomputation
+            print(f"⚠️ No se pudo guardar la caché de enriquecimiento: {e}")
+
+    def stats(self) -> Dict[str, int]:
+        """Returns hit/miss counters and the in-memory size"""
+        return {'hits': self.hits, 'misses': self.misses, 'size': len(self._entries)}
+
+
+_shared_cache: Optional[EnrichmentCache] = None
+_shared_lock = threading.Lock()
+
+
+def get_enrichment_cache() -> EnrichmentCache:
+    """
+    Returns the process-wide cache, creating it on first use
+
+    Sized and placed by ENRICHMENT_CACHE_SIZE / ENRICHMENT_CACHE_PATH
+    (config.py; an empty path keeps the cache in memory only).
+    """
+    global _shared_cache
+    with _shared_lock:
+        if _shared_cache is None:
+            # Imported here: settings are read after config has loaded .env
+            from config import config
+            try:
+                _shared_cache = EnrichmentCache(config.ENRICHMENT_CACHE_PATH, config.ENRICHMENT_CACHE_SIZE)
+            except sqlite3.Error as e:
+                print(f"⚠️ Caché de enriquecimiento solo en memoria: {e}")
+                _shared_cache = EnrichmentCache(path=None, maxsize=config.ENRICHMENT_CACHE_SIZE)
+            atexit.register(_shared_cache.flush)
+        return _shared_cache
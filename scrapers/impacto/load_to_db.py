@@ -1,17 +1,18 @@
 """
-Script para cargar productos de Impacto desde JSON a la base de datos
+Script para cargar productos de Impacto desde un snapshot a la base de datos
 """
-import json
 import sys
 import os
 
 # Add parent directory to path
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(__file__))))
 from database import Database
+from pipeline import load_snapshot
+from snapshots import find_snapshot
 from datetime import datetime
 
 def load_impacto_to_db():
-    """Carga productos de Impacto JSON a la base de datos"""
+    """Carga productos de Impacto desde products.ndjson/.parquet/.json a la base de datos"""
     
     print("\n" + "="*80)
     print("📥 CARGANDO PRODUCTOS DE IMPACTO A LA BASE DE DATOS")
@@ -21,44 +22,26 @@ def load_impacto_to_db():
     db = Database('pc_prices.db')  # Usar la misma BD que las otras tiendas
     db.init_db()
     
-    # Leer JSON
-    json_path = 'scrapers/impacto/products.json'
-    try:
-        with open(json_path, 'r', encoding='utf-8') as f:
-            data = json.load(f)
-    except FileNotFoundError:
-        print(f"❌ No se encontró: {json_path}")
-        print("   Ejecuta primero: cd scrapers/impacto && python run.py")
+    # Buscar snapshot (products.ndjson, products.parquet o products.json)
+    snapshot_dir = os.path.dirname(os.path.abspath(__file__))
+    snapshot_path = find_snapshot(snapshot_dir)
+    if not snapshot_path:
+        print(f"❌ No se encontró snapshot en: {snapshot_dir}")
+        print("   Ejecuta primero: cd scrapers/impacto && python run.py --snapshot")
         return False
     
-    print(f"📄 Archivo: {json_path}")
-    print(f"📅 Timestamp: {data.get('timestamp')}")
-    print(f"📦 Total productos: {data.get('total_products')}\n\n")
-    
-    # Cargar por categoría - usar nombres tal cual
-    categories = data.get('categories', {})
-    inserted = 0
-    skipped = 0
-    
-    for category_key, products in categories.items():
-        print(f"📂 Categoría: {category_key.upper()} ({len(products)} productos)")
-        
-        for product in products:
-            # Asegurar que tenga store (en minúscula para consistencia)
-            product['store'] = 'pcimpacto'
-            
-            # Usar el nombre de categoría directamente como component_type
-            product['component_type'] = category_key
-            
-            # Insertar o actualizar
-            success = db.insert_product(product)
-            if success:
-                inserted += 1
-            else:
-                skipped += 1
-        
+    print(f"📄 Archivo: {snapshot_path}\n\n")
+    
+    # Cargar en streaming y por lotes (store y component_type ya normalizados)
+    stats = load_snapshot(db, snapshot_path, 'pcimpacto')
+    
+    for category_key, count in stats['categories'].items():
+        print(f"📂 Categoría: {category_key.upper()} ({count} productos)")
         print(f"   ✅ {category_key}: Procesados\n")
     
+    inserted = stats['saved']['inserted'] + stats['saved']['updated']
+    skipped = stats['saved']['errors']
+    
     # Resumen
     print("\n" + "="*80)
     print("✅ CARGA COMPLETADA")
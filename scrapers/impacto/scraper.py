@@ -6,7 +6,7 @@ Specialized scraper for impacto.com.pe
 import re
 import sys
 import os
-from typing import List, Dict, Optional
+from typing import List, Dict, Optional, Iterator
 from urllib.parse import urlencode, urlparse, parse_qs
 
 # Add parent directory to path to import base_scraper
@@ -121,13 +121,25 @@ class ImpactoScraper(BaseScraper):
         """
         Scrapes a category/listing page from Impacto with pagination support
         
+        Collects every page yielded by iter_category_pages into one list.
+        Use iter_category_pages directly to process products page by page.
+        """
+        all_products = []
+        for products in self.iter_category_pages(url, max_pages=max_pages):
+            all_products.extend(products)
+        return all_products
+    
+    def iter_category_pages(self, url: str, max_pages: int = None) -> Iterator[List[Dict]]:
+        """
+        Yields the products of a category one page at a time
+        
         Args:
             url: Category URL (ej: https://www.impacto.com.pe/catalogo?categoria=Procesador&c=19)
             max_pages: Maximum number of pages to scrape (None = all pages)
         
         La estructura parece usar parámetros de query para paginación
         """
-        all_products = []
+        total_products = 0
         current_page = 1
         
         # Parse URL to get base and params
@@ -164,6 +176,7 @@ class ImpactoScraper(BaseScraper):
             print(f"      📦 Encontrados {len(product_containers)} productos")
             
             page_products = 0
+            products = []
             for container in product_containers:
                 try:
                     product_data = {}
@@ -231,7 +244,7 @@ class ImpactoScraper(BaseScraper):
                             metadata={},
                             component_type=''  # Se asignará luego en run.py
                         )
-                        all_products.append(product)
+                        products.append(product)
                         page_products += 1
                             
                 except Exception as e:
@@ -239,6 +252,8 @@ class ImpactoScraper(BaseScraper):
                     continue
             
             print(f"      ✅ {page_products} productos agregados")
+            total_products += page_products
+            yield products
             
             # Check if there's a next page
             # Buscar botón "siguiente" o paginación
@@ -262,9 +277,7 @@ class ImpactoScraper(BaseScraper):
                 break
             
             # Delay between pages
-            import time
-            time.sleep(2)
+            self.pause(2)
         
-        print(f"   📊 Total: {len(all_products)} productos de {current_page} página(s)")
-        return all_products
+        print(f"   📊 Total: {total_products} productos de {current_page} página(s)")
 
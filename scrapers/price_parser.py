@@ -0,0 +1,188 @@
+"""
+Price and Stock Parsing
+Compiled, memoized parsers shared by every store scraper
+"""
+
+import re
+from functools import lru_cache
+from typing import Dict, Optional, Tuple
+
+# A price number: digit groups joined by '.' or ',', optionally split into
+# thousands by (non-breaking) spaces, e.g. "91,80", "1.953,67", "3  270.00"
+_NUMBER = r'\d+(?:[.,]\d+)*(?:[ \xa0]+\d{3}(?:[.,]\d+)*)*'
+
+# One pass over a price string: the number after "$" and, further along,
+# the number after "S/". Whatever separates them ("(", "-", "ó") is skipped.
+_PRICE_RE = re.compile(r'\$\s*(' + _NUMBER + r')(?:.*?S/\s*(' + _NUMBER + r'))?', re.DOTALL)
+_LOCAL_PRICE_RE = re.compile(r'S/\s*(' + _NUMBER + r')')
+
+_SPACES = str.maketrans('', '', ' \xa0')
+
+_DIGITS_RE = re.compile(r'\d+')
+_MORE_THAN_RE = re.compile(r'mayor a|más de|more than|mayor de')
+_OUT_OF_STOCK_RE = re.compile(r'agotado|sin stock|out of stock|no disponible')
+_IN_STOCK_RE = re.compile(r'disponible|stock|available')
+_LOW_STOCK_RE = re.compile(r'pocas unidades|últimas unidades|low stock')
+
+# "Stock: Mayor a 10 Artículos" / "Stock: 3 Artículos" (CycComputer listings)
+_STOCK_LABEL_RE = re.compile(r'Stock:\s*(.+)', re.IGNORECASE)
+_MORE_THAN_QTY_RE = re.compile(r'Mayor\s+a\s+(\d+)', re.IGNORECASE)
+_ITEMS_QTY_RE = re.compile(r'(\d+)\s+Artículo', re.IGNORECASE)
+
+
+def normalize_price_number(price_str: str) -> str:
+    """
+    Normalize price number from various formats to standard float string
+
+    Examples:
+        "1.953,67" -> "1953.67" (European format with thousands separator)
+        "1,953.67" -> "1953.67" (US format with thousands separator)
+        "1 326.49" -> "1326.49" (Space as thousands separator)
+        "91,80" -> "91.80" (European format without thousands)
+        "91.80" -> "91.80" (US format without thousands)
+    """
+    price_str = price_str.translate(_SPACES)
+
+    dot_pos = price_str.rfind('.')
+    comma_pos = price_str.rfind(',')
+
+    if comma_pos == -1:
+        # "91.80", "1953" or European thousands only ("1.953.456")
+        if dot_pos != -1 and price_str.find('.') != dot_pos:
+            return price_str.replace('.', '')
+        return price_str
+
+    if dot_pos == -1:
+        if price_str.find(',') != comma_pos:
+            # Multiple commas: thousands separators (1,953,456)
+            return price_str.replace(',', '')
+        decimals = len(price_str) - comma_pos - 1
+        if decimals == 2:
+            return price_str.replace(',', '.')  # 91,80
+        if decimals == 3:
+            return price_str.replace(',', '')  # 1,000
+        return price_str
+
+    if comma_pos > dot_pos:
+        # European format: 1.953,67
+        return price_str.replace('.', '').replace(',', '.')
+    # US format: 1,953.67
+    return price_str.replace(',', '')
+
+
+def _to_float(number: str) -> Optional[float]:
+    try:
+        return float(normalize_price_number(number))
+    except ValueError:
+        return None
+
+
+@lru_cache(maxsize=8192)
+def _parse_price_cached(price_text: str) -> Tuple[Optional[float], Optional[float]]:
+    match = _PRICE_RE.search(price_text)
+    if not match:
+        # Soles only, e.g. "S/ 89,70"
+        local_match = _LOCAL_PRICE_RE.search(price_text)
+        return None, _to_float(local_match.group(1)) if local_match else None
+
+    usd_text, local_text = match.groups()
+    if local_text is None:
+        # "S/" written before "$"
+        local_match = _LOCAL_PRICE_RE.search(price_text)
+        local_text = local_match.group(1) if local_match else None
+
+    return _to_float(usd_text), _to_float(local_text) if local_text else None
+
+
+def parse_price(price_text: str) -> Dict:
+    """
+    Parses price text to extract USD and local currency
+
+    A single compiled pattern reads the number after "$" as the USD price
+    and the number after "S/" as the local price, whatever separates them.
+    Results are memoized, since listings repeat the same price strings.
+
+    Examples:
+        "$91,80 (S/319,46)" -> price_usd: 91.80, price_local: 319.46
+        "$131.00 - S/445.40" -> price_usd: 131.00, price_local: 445.40
+        "$3 270.00 - S/11 150.70" -> price_usd: 3270.00, price_local: 11150.70
+        "$ 345.00 ó S/ 1,186.50" -> price_usd: 345.00, price_local: 1186.50
+        "$ 1.953,67 (S/ 2.444,00)" -> price_usd: 1953.67, price_local: 2444.00
+        "S/ 89,70" -> price_local: 89.70
+
+    Returns:
+        Dictionary with price_usd, price_local and currency (empty if no price)
+    """
+    usd, local = _parse_price_cached(price_text)
+
+    if usd is None:
+        if local is None:
+            return {}
+        return {'price_local': local, 'currency': 'PEN'}
+
+    prices = {'price_usd': usd, 'currency': 'USD'}
+    if local is not None:
+        prices['price_local'] = local
+        prices['currency'] = 'PEN'
+    return prices
+
+
+@lru_cache(maxsize=1024)
+def parse_stock(stock_text: str) -> str:
+    """
+    Parses stock information to numeric format
+
+    Returns:
+        - Numeric string for exact quantities: '0', '1', '5', '8', etc.
+        - '+10' for "Mayor a 10" (more than 10) - formato estándar
+        - '0' for out of stock
+    """
+    if not stock_text:
+        return '0'
+
+    stock_text_lower = stock_text.lower()
+
+    # Check for explicit number in text FIRST
+    number = _DIGITS_RE.search(stock_text)
+    if number:
+        qty = int(number.group())
+        if _MORE_THAN_RE.search(stock_text_lower):
+            return f'+{qty}'
+        return str(qty)
+
+    if _OUT_OF_STOCK_RE.search(stock_text_lower):
+        return '0'
+
+    # Available but no specific number
+    if _IN_STOCK_RE.search(stock_text_lower):
+        return '+5'
+
+    if _LOW_STOCK_RE.search(stock_text_lower):
+        return '1-4'
+
+    return '0'
+
+
+@lru_cache(maxsize=1024)
+def parse_labeled_stock(stock_text: str) -> str:
+    """
+    Parses "Stock: ..." labels such as "Stock: Mayor a 10 Artículos"
+
+    Returns:
+        '+X' for "Mayor a X", 'X' for "X Artículos", parse_stock() for
+        anything else and 'unknown' when there is no "Stock:" label
+    """
+    label = _STOCK_LABEL_RE.search(stock_text)
+    if not label:
+        return 'unknown'
+
+    stock_value = label.group(1).strip()
+
+    more_than = _MORE_THAN_QTY_RE.search(stock_value)
+    if more_than:
+        return f'+{more_than.group(1)}'
+
+    if _ITEMS_QTY_RE.search(stock_value):
+        return _DIGITS_RE.search(stock_value).group()
+
+    return parse_stock(stock_value)
@@ -0,0 +1,124 @@
+"""
+Product Record
+Compact, slotted record for scraped products
+"""
+
+import json
+from datetime import datetime
+from typing import Dict, Optional, Tuple
+
+# Field order matches the products table columns written by Database
+PRODUCT_FIELDS: Tuple[str, ...] = (
+    'name', 'normalized_name', 'component_type', 'brand', 'sku',
+    'price_usd', 'price_local', 'currency', 'stock', 'store',
+    'source_url', 'image_url', 'last_scraped', 'metadata'
+)
+
+
+class Product:
+    """
+    A scraped product
+
+    Uses __slots__ instead of a per-instance dict, so a product costs a
+    fraction of the memory of the old 14-key dict and attribute access is
+    a direct slot lookup. It also supports the dict-style access the
+    scrapers and scripts already use (product['name'], product.get(),
+    dict(product)), so both forms keep working.
+    """
+
+    __slots__ = PRODUCT_FIELDS
+
+    def __init__(self, name: str = '', normalized_name: str = '', component_type: str = '',
+                 brand: str = '', sku: str = '', price_usd: Optional[float] = None,
+                 price_local: Optional[float] = None, currency: str = 'USD',
+                 stock: str = 'unknown', store: str = '', source_url: str = '',
+                 image_url: str = '', last_scraped: Optional[str] = None,
+                 metadata: Optional[Dict] = None):
+        self.name = name
+        self.normalized_name = normalized_name
+        self.component_type = component_type
+        self.brand = brand
+        self.sku = sku
+        self.price_usd = price_usd
+        self.price_local = price_local
+        self.currency = currency
+        self.stock = stock
+        self.store = store
+        self.source_url = source_url
+        self.image_url = image_url
+        self.last_scraped = last_scraped
+        # None instead of an empty dict: most products carry no metadata
+        self.metadata = metadata or None
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> 'Product':
+        """Builds a Product from a product dictionary, ignoring unknown keys"""
+        return cls(**{field: data[field] for field in PRODUCT_FIELDS if field in data})
+
+    def to_row(self) -> Tuple:
+        """
+        Returns the values for the products table, in PRODUCT_FIELDS order
+
+        Missing last_scraped defaults to now and metadata is JSON-encoded.
+        """
+        return (
+            self.name,
+            self.normalized_name or '',
+            self.component_type or '',
+            self.brand or '',
+            self.sku or '',
+            self.price_usd,
+            self.price_local,
+            self.currency or 'USD',
+            self.stock if self.stock is not None else 'unknown',
+            self.store,
+            self.source_url or '',
+            self.image_url or '',
+            self.last_scraped or datetime.now().isoformat(),
+            json.dumps(self.metadata) if self.metadata else None
+        )
+
+    def to_dict(self) -> Dict:
+        """Returns the product as a plain dictionary (metadata defaults to {})"""
+        data = {field: getattr(self, field) for field in PRODUCT_FIELDS}
+        data['metadata'] = self.metadata or {}
+        return data
+
+    def to_json(self) -> str:
+        """Serializes the product for snapshots"""
+        return json.dumps(self.to_dict(), ensure_ascii=False)
+
+    # Dict-style access, kept for existing callers
+
+    def __getitem__(self, key: str):
+        if key not in PRODUCT_FIELDS:
+            raise KeyError(key)
+        if key == 'metadata':
+            return self.metadata or {}
+        return getattr(self, key)
+
+    def __setitem__(self, key: str, value):
+        if key not in PRODUCT_FIELDS:
+            raise KeyError(key)
+        setattr(self, key, value)
+
+    def __contains__(self, key) -> bool:
+        return key in PRODUCT_FIELDS
+
+    def get(self, key: str, default=None):
+        """dict.get() equivalent"""
+        if key not in PRODUCT_FIELDS:
+            return default
+        return self[key]
+
+    def keys(self):
+        """Field names, so dict(product) works"""
+        return PRODUCT_FIELDS
+
+    def __eq__(self, other) -> bool:
+        if isinstance(other, Product):
+            return all(getattr(self, f) == getattr(other, f) for f in PRODUCT_FIELDS)
+        return NotImplemented
+
+    def __repr__(self) -> str:
+        return f"Product(name={self.name!r}, store={self.store!r}, price_usd={self.price_usd!r})"
@@ -0,0 +1,146 @@
+"""
+Store Registry
+Single source of truth for the stores scraped by the batch pipeline:
+display name, scraper class location and category URLs
+"""
+
+import importlib
+import threading
+from typing import Dict, List, Tuple
+
+# Keyed by the store name used in the database (products.store)
+STORES: Dict[str, Dict] = {
+    'sercoplus': {
+        'name': 'SercoPlus',
+        'module': 'scrapers.sercoplus.scraper',
+        'class': 'SercoPlusScraper',
+        'categories': {
+            'placas-madre': 'https://sercoplus.com/34-mainboard',
+            'procesadores': 'https://sercoplus.com/37-procesadores',
+            'memorias-ram': 'https://sercoplus.com/55-memorias-ram',
+            'almacenamiento': 'https://sercoplus.com/53-almacenamiento',
+            'tarjetas-video': 'https://sercoplus.com/32-tarjeta-de-video',
+        }
+    },
+    'pcimpacto': {
+        'name': 'PCImpacto',
+        'module': 'scrapers.impacto.scraper',
+        'class': 'ImpactoScraper',
+        'categories': {
+            'placas-madre': 'https://www.impacto.com.pe/catalogo?categoria=Placas%20Madre&c=17',
+            'procesadores': 'https://www.impacto.com.pe/catalogo?categoria=Procesador&c=19',
+            'memorias-ram': 'https://www.impacto.com.pe/catalogo?categoria=Memoria%20Ram&c=14',
+            'almacenamiento': 'https://www.impacto.com.pe/catalogo?categoria=Almacenamiento&c=6',
+            'tarjetas-video': 'https://www.impacto.com.pe/catalogo?categoria=Tarjeta%20de%20Video&c=25',
+        }
+    },
+    'cyccomputer': {
+        'name': 'CycComputer',
+        'module': 'scrapers.cyccomputer.scraper',
+        'class': 'CycComputerScraper',
+        'categories': {
+            'placas-madre': 'https://cyccomputer.pe/categoria/233-placas-madre',
+            'procesadores': 'https://cyccomputer.pe/categoria/254-procesadores-accesorios',
+            'memorias-ram': 'https://cyccomputer.pe/categoria/796-memorias-ram',
+            'almacenamiento': 'https://cyccomputer.pe/categoria/243-almacenamiento',
+            'tarjetas-video': 'https://cyccomputer.pe/categoria/234-tarjetas-graficas',
+        }
+    },
+    'computershop': {
+        'name': 'ComputerShop',
+        'module': 'scrapers.computershop.scraper',
+        'class': 'ComputerShopScraper',
+        'categories': {
+            'placas-madre': 'https://computershopperu.com/categoria/32-placas-madre',
+            'procesadores': 'https://computershopperu.com/categoria/39-procesadores',
+            'memorias-ram': 'https://computershopperu.com/categoria/51-memorias-ram-pc',
+            'almacenamiento': 'https://computershopperu.com/categoria/36-almacenamiento',
+            'tarjetas-video': 'https://computershopperu.com/categoria/20-tarjeta-de-video',
+        }
+    },
+}
+
+
+def get_store_keys() -> List[str]:
+    """Returns the keys of all registered stores"""
+    return list(STORES.keys())
+
+
+def get_categories(store_key: str) -> Dict[str, str]:
+    """Returns the category -> URL mapping for a store"""
+    return STORES[store_key]['categories']
+
+
+def create_scraper(store_key: str, **kwargs):
+    """
+    Imports and instantiates the scraper class for a store
+
+    The scraper module is only imported here, so callers that never
+    scrape do not pay for BeautifulSoup/Selenium imports.
+    """
+    store = STORES.get(store_key)
+    if not store:
+        raise ValueError(f"Tienda no registrada: {store_key}")
+
+    module = importlib.import_module(store['module'])
+    scraper_class = getattr(module, store['class'])
+    return scraper_class(**kwargs)
+
+
+class ScraperRegistry:
+    """
+    Scrapers keyed by store name, constructed on first use
+
+    Usage:
+        scrapers = ScraperRegistry({'SercoPlus': ('scrapers.sercoplus_scraper', 'SercoPlusScraper')})
+        scrapers.keys()              # no import, no instance
+        scrapers.get('SercoPlus')    # imports the module and builds the scraper once
+
+    Lets the API list its stores at startup without importing
+    BeautifulSoup/requests or opening drivers until a scrape is requested.
+    """
+
+    def __init__(self, specs: Dict[str, Tuple[str, str]], **kwargs):
+        """
+        Args:
+            specs: Store name -> (module path, class name)
+            kwargs: Passed to every scraper constructor
+        """
+        self._specs = dict(specs)
+        self._kwargs = kwargs
+        self._instances: Dict[str, object] = {}
+        self._lock = threading.Lock()
+
+    def keys(self) -> List[str]:
+        return list(self._specs)
+
+    def __contains__(self, name) -> bool:
+        return name in self._specs
+
+    def __len__(self) -> int:
+        return len(self._specs)
+
+    def is_loaded(self, name: str) -> bool:
+        """Whether the scraper for name has been constructed already"""
+        return name in self._instances
+
+    def get(self, name: str, default=None):
+        """The scraper for a store name (built on first call), or default if unknown"""
+        spec = self._specs.get(name)
+        if spec is None:
+            return default
+        instance = self._instances.get(name)
+        if instance is None:
+            with self._lock:
+                instance = self._instances.get(name)
+                if instance is None:
+                    module_path, class_name = spec
+                    scraper_class = getattr(importlib.import_module(module_path), class_name)
+                    instance = self._instances[name] = scraper_class(**self._kwargs)
+        return instance
+
+    def __getitem__(self, name: str):
+        scraper = self.get(name)
+        if scraper is None:
+            raise KeyError(name)
+        return scraper
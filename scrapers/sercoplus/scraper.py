@@ -6,7 +6,7 @@ Specialized scraper for sercoplus.com
 import re
 import sys
 import os
-from typing import List, Dict, Optional
+from typing import List, Dict, Optional, Iterator
 
 # Add parent directory to path to import base_scraper
 sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
@@ -148,6 +148,18 @@ class SercoPlusScraper(BaseScraper):
         """
         Scrapes a category/listing page from SercoPlus with pagination support
         
+        Collects every page yielded by iter_category_pages into one list.
+        Use iter_category_pages directly to process products page by page.
+        """
+        all_products = []
+        for products in self.iter_category_pages(url, max_pages=max_pages):
+            all_products.extend(products)
+        return all_products
+    
+    def iter_category_pages(self, url: str, max_pages: int = None) -> Iterator[List[Dict]]:
+        """
+        Yields the products of a category one page at a time
+        
         Args:
             url: Category URL
             max_pages: Maximum number of pages to scrape (None = all pages)
@@ -161,7 +173,7 @@ class SercoPlusScraper(BaseScraper):
         - Referencia: div.tvproduct-reference > span.value
         - Paginación: a.js-search-link con data-query-param="?page=X"
         """
-        all_products = []
+        total_products = 0
         current_page = 1
         
         while True:
@@ -189,6 +201,7 @@ class SercoPlusScraper(BaseScraper):
             print(f"      📦 Encontrados {len(product_containers)} productos")
             
             page_products = 0
+            products = []
             for container in product_containers:
                 try:
                     product_data = {}
@@ -248,7 +261,7 @@ class SercoPlusScraper(BaseScraper):
                             image_url=product_data.get('image_url', ''),
                             metadata={}
                         )
-                        all_products.append(product)
+                        products.append(product)
                         page_products += 1
                             
                 except Exception as e:
@@ -256,6 +269,8 @@ class SercoPlusScraper(BaseScraper):
                     continue
             
             print(f"      ✅ {page_products} productos agregados")
+            total_products += page_products
+            yield products
             
             # Check if there's a next page
             next_page = soup.find('a', class_='js-search-link', attrs={'rel': 'next'})
@@ -277,11 +292,9 @@ class SercoPlusScraper(BaseScraper):
                 break
             
             # Delay between pages
-            import time
-            time.sleep(2)
+            self.pause(2)
         
-        print(f"   📊 Total: {len(all_products)} productos de {current_page} página(s)")
-        return all_products
+        print(f"   📊 Total: {total_products} productos de {current_page} página(s)")
     
     def scrape_category_quick(self, url: str) -> List[Dict]:
         """
@@ -0,0 +1,203 @@
+"""
+Scrape Tracing
+Lightweight timing spans for scrape runs. Spans nest per thread and are
+aggregated per (store, category, page, stage) as they close, so a run keeps
+one row per page and stage instead of one per call. Rows are stored in the
+scrape_spans table and summarized as a flame table
+"""
+
+import time
+import threading
+from typing import Dict, List, Optional, Tuple
+
+
+class _Span:
+    __slots__ = ('tracer', 'stage', 'started', 'child_seconds')
+
+    def __init__(self, tracer: 'Tracer', stage: str):
+        self.tracer = tracer
+        self.stage = stage
+
+    def __enter__(self):
+        self.child_seconds = 0.0
+        self.tracer._stack().append(self)
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        elapsed = time.perf_counter() - self.started
+        stack = self.tracer._stack()
+        stack.pop()
+        parent = stack[-1] if stack else None
+        if parent is not None:
+            parent.child_seconds += elapsed
+        self.tracer._add(self.stage, parent.stage if parent else None,
+                         elapsed, elapsed - self.child_seconds)
+        return False
+
+
+class _NullSpan:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+
+_NULL_SPAN = _NullSpan()
+
+
+class Tracer:
+    """
+    Collects timing spans from any number of threads
+
+    Usage:
+        tracer.set_context(store='sercoplus', category='procesadores', page=1)
+        with tracer.span('fetch'):
+            with tracer.span('http'):
+                ...
+        rows = tracer.collect()
+
+    Each row has calls, total_ms (including nested spans), self_ms
+    (excluding them) and max_ms. A span is attributed to the context of
+    its thread when it closes.
+    """
+
+    def __init__(self, enabled: Optional[bool] = None):
+        """
+        Args:
+            enabled: Record spans; None follows SCRAPE_TRACING (config.py),
+                whose 0 turns every span into a no-op
+        """
+        if enabled is None:
+            # Imported here: the setting is read after config has loaded .env
+            from config import config
+            enabled = config.SCRAPE_TRACING
+        self.enabled = enabled
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._rows: Dict[Tuple, List] = {}
+
+    def span(self, stage: str):
+        """Context manager timing one stage"""
+        if not self.enabled:
+            return _NULL_SPAN
+        return _Span(self, stage)
+
+    def event(self, stage: str):
+        """Counts an occurrence without timing it (e.g. 'fetch_error')"""
+        if not self.enabled:
+            return
+        stack = self._stack()
+        self._add(stage, stack[-1].stage if stack else None, 0.0, 0.0)
+
+    def set_context(self, store: Optional[str] = None, category: Optional[str] = None,
+                    page: Optional[int] = None):
+        """Store/category/page that this thread's spans are attributed to"""
+        self._local.context = (store, category, page)
+
+    def _stack(self) -> List[_Span]:
+        stack = getattr(self._local, 'stack', None)
+        if stack is None:
+            stack = self._local.stack = []
+        return stack
+
+    def _add(self, stage: str, parent: Optional[str], total: float, own: float):
+        key = getattr(self._local, 'context', (None, None, None)) + (stage, parent)
+        with self._lock:
+            row = self._rows.get(key)
+            if row is None:
+                self._rows[key] = [1, total, own, total]
+            else:
+                row[0] += 1
+                row[1] += total
+                row[2] += own
+                if total > row[3]:
+                    row[3] = total
+
+    def collect(self, clear: bool = True) -> List[Dict]:
+        """Returns the aggregated rows (and starts over unless clear=False)"""
+        with self._lock:
+            items = list(self._rows.items())
+            if clear:
+                self._rows = {}
+        return [{
+            'store': store, 'category': category, 'page': page,
+            'stage': stage, 'parent': parent, 'calls': calls,
+            'total_ms': round(total * 1000, 3), 'self_ms': round(own * 1000, 3),
+            'max_ms': round(longest * 1000, 3),
+        } for (store, category, page, stage, parent), (calls, total, own, longest) in items]
+
+
+_tracer: Optional[Tracer] = None
+_tracer_lock = threading.Lock()
+
+
+def get_tracer() -> Tracer:
+    """Process-wide tracer shared by every scraper"""
+    global _tracer
+    with _tracer_lock:
+        if _tracer is None:
+            _tracer = Tracer()
+        return _tracer
+
+
+def summarize(rows: List[Dict]) -> List[Dict]:
+    """
+    Aggregates rows per stage, in flame order
+
+    Stages are nested under their parent and siblings sorted by total
+    time. Each entry gets a depth for indentation.
+    """
+    stages: Dict[Tuple[Optional[str], str], Dict] = {}
+    for row in rows:
+        key = (row['parent'], row['stage'])
+        entry = stages.setdefault(key, {'stage': row['stage'], 'parent': row['parent'], 'calls': 0,
+                                        'total_ms': 0.0, 'self_ms': 0.0, 'max_ms': 0.0})
+        entry['calls'] += row['calls']
+        entry['total_ms'] += row['total_ms']
+        entry['self_ms'] += row['self_ms']
+        entry['max_ms'] = max(entry['max_ms'], row['max_ms'])
+
+    ordered = []
+
+    def visit(parent, depth, seen):
+        children = sorted((entry for entry in stages.values() if entry['parent'] == parent),
+                          key=lambda entry: -entry['total_ms'])
+        for entry in children:
+            if entry['stage'] in seen:
+                continue
+            ordered.append(dict(entry, depth=depth))
+            visit(entry['stage'], depth + 1, seen | {entry['stage']})
+
+    visit(None, 0, frozenset())
+    return ordered
+
+
+def format_flame_table(rows: List[Dict], wall_seconds: Optional[float] = None) -> str:
+    """
+    Text table of where the time went, slowest stages first at each level
+
+    Percentages are relative to wall_seconds, or to the sum of the root
+    spans when it is not given.
+    """
+    summary = summarize(rows)
+    if not summary:
+        return "(sin spans registrados)"
+
+    wall_ms = wall_seconds * 1000 if wall_seconds else \
+        sum(entry['total_ms'] for entry in summary if entry['depth'] == 0)
+    lines = [f"{'Etapa':<28} {'llamadas':>9} {'total s':>9} {'propio s':>9} {'% run':>7} "
+             f"{'media ms':>9} {'máx ms':>9}",
+             "-" * 86]
+    for entry in summary:
+        share = entry['total_ms'] / wall_ms * 100 if wall_ms else 0.0
+        bar = '█' * int(round(share / 5))
+        lines.append(
+            f"{'  ' * entry['depth'] + entry['stage']:<28} {entry['calls']:>9} "
+            f"{entry['total_ms'] / 1000:>9.2f} {entry['self_ms'] / 1000:>9.2f} {share:>6.1f}% "
+            f"{entry['total_ms'] / entry['calls']:>9.1f} {entry['max_ms']:>9.1f} {bar}"
+        )
+    return '\n'.join(lines)
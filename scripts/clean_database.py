@@ -401,6 +401,7 @@ def main():
         cleaner.print_statistics("ANTES DE ELIMINAR")
         cleaner.remove_by_store(args.remove_store, dry_run)
         if not dry_run:
+            cleaner.db.refresh_store_counts()
             cleaner.print_statistics("DESPUÉS DE ELIMINAR")
             cleaner.vacuum_database()
         return
@@ -413,6 +414,8 @@ def main():
         days=args.days,
         dry_run=not args.execute
     )
+    if args.execute:
+        cleaner.db.refresh_store_counts()
 
 
 if __name__ == "__main__":
@@ -0,0 +1,43 @@
+"""
+Recalcula la tabla de ofertas (caída de precio, mínimo histórico
+y diferencia entre tiendas) usada por /api/mobile/best-deals
+"""
+
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from database import Database
+from config import config
+from deals import refresh_deals
+
+
+def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Detección de ofertas sobre el historial de precios')
+    parser.add_argument('--db', default=config.DATABASE_PATH,
+                        help=f'Ruta a la base de datos (default: {config.DATABASE_PATH})')
+    parser.add_argument('--window', type=int, default=config.DEAL_WINDOW_DAYS,
+                        help=f'Días para la mediana de referencia (default: {config.DEAL_WINDOW_DAYS})')
+    parser.add_argument('--min-drop', type=float, default=config.DEAL_MIN_DROP,
+                        help=f'Caída mínima vs mediana, 0-1 (default: {config.DEAL_MIN_DROP})')
+    parser.add_argument('--min-spread', type=float, default=config.DEAL_MIN_SPREAD,
+                        help=f'Diferencia mínima entre tiendas, 0-1 (default: {config.DEAL_MIN_SPREAD})')
+
+    args = parser.parse_args()
+
+    db = Database(args.db)
+    db.init_db()
+
+    start = time.time()
+    count = refresh_deals(db, args.window, args.min_drop, args.min_spread)
+
+    print(f"🏷️  Ofertas detectadas: {count}")
+    print(f"⏱️  Tiempo: {time.time() - start:.2f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,109 @@
+"""
+Perfil de consultas SQL: ejecuta una carga representativa de la API
+(listados con filtros, conteos, búsqueda, estadísticas por tienda) con el
+profiler activado y muestra las consultas más costosas con su plan.
+Con --url lee el informe de una API en marcha (/api/admin/queries)
+"""
+
+import os
+import sys
+import json
+import logging
+import itertools
+from types import SimpleNamespace
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from database import Database
+from config import config
+from profiler import QueryProfiler, REPORT_ORDERS, format_report
+
+
+def make_filters(component_type=None, brand=None, store=None, min_price=None, max_price=None):
+    """Same attributes as main.ComponentFilter, without importing the API"""
+    return SimpleNamespace(component_type=component_type, brand=brand, store=store,
+                           min_price=min_price, max_price=max_price)
+
+
+def run_workload(db: Database, repeat: int = 1):
+    """Mix of the queries behind the listing, store and stats endpoints"""
+    types = db.get_all_types()
+    stores = db.get_all_stores()
+    brands = db.get_all_brands()[:5]
+
+    combos = [make_filters()]
+    combos += [make_filters(component_type=t) for t in types]
+    combos += [make_filters(store=s) for s in stores]
+    combos += [make_filters(component_type=t, store=s) for t, s in itertools.product(types, stores)]
+    combos += [make_filters(brand=b) for b in brands]
+    combos += [make_filters(component_type=t, min_price=50, max_price=500) for t in types]
+
+    for _ in range(repeat):
+        for filters in combos:
+            for skip in (0, 50):
+                db.get_products(skip, 50, filters)
+            db.count_products(filters)
+        for term in ('ryzen', 'rtx', 'ddr5', 'ssd'):
+            db.search_products(term)
+        db.get_statistics()
+        db.get_deals(limit=20)
+        db.get_changes(0, limit=500)
+    return len(combos)
+
+
+def fetch_report(url: str, token: str, limit: int, order: str) -> dict:
+    import requests
+
+    response = requests.get(f"{url.rstrip('/')}/api/admin/queries",
+                            params={'limit': limit, 'order': order},
+                            headers={'X-Admin-Token': token} if token else {}, timeout=30)
+    response.raise_for_status()
+    return response.json()
+
+
+def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Consultas SQL más costosas (profiler de Database)')
+    parser.add_argument('--db', default=config.DATABASE_PATH,
+                        help=f'Ruta a la base de datos (default: {config.DATABASE_PATH})')
+    parser.add_argument('--repeat', type=int, default=3, help='Repeticiones de la carga (default: 3)')
+    parser.add_argument('--threshold', type=float, default=config.QUERY_PROFILER_THRESHOLD_MS,
+                        help=f'Umbral de consulta lenta en ms (default: {config.QUERY_PROFILER_THRESHOLD_MS})')
+    parser.add_argument('--top', type=int, default=10, help='Consultas a mostrar (default: 10)')
+    parser.add_argument('--order', choices=REPORT_ORDERS, default='total', help='Orden del informe')
+    parser.add_argument('--url', help='Leer el informe de una API en marcha (ej. http://localhost:8000)')
+    parser.add_argument('--token', default=config.ADMIN_TOKEN, help='X-Admin-Token para --url')
+    parser.add_argument('--json', action='store_true', help='Imprimir el informe como JSON')
+
+    args = parser.parse_args()
+
+    if args.url:
+        try:
+            data = fetch_report(args.url, args.token, args.top, args.order)
+        except Exception as e:
+            print(f"❌ No se pudo leer el informe de {args.url}: {e}")
+            sys.exit(1)
+        entries = data['queries']
+        print(f"📡 {args.url} (desde {data['since']}, umbral {data['threshold_ms']} ms)\n")
+    else:
+        if not os.path.exists(args.db):
+            print(f"❌ No existe la base de datos: {args.db}")
+            sys.exit(1)
+        logging.getLogger('pcscraper.slow_queries').disabled = True  # The report already lists them
+        profiler = QueryProfiler(threshold_ms=args.threshold)
+        db = Database(args.db, profiler=profiler)
+        db.init_db()
+        profiler.reset()  # Only the workload, not the schema checks
+        combos = run_workload(db, args.repeat)
+        entries = profiler.report(limit=args.top, order=args.order)
+        print(f"🔎 {combos} combinaciones de filtros × {args.repeat} repeticiones sobre {args.db}\n")
+
+    if args.json:
+        print(json.dumps(entries, indent=2, ensure_ascii=False))
+    else:
+        print(format_report(entries))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,36 @@
+"""
+Agrega el historial de precios en buckets diarios/semanales
+y compacta las filas crudas antiguas
+"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from database import Database
+from config import config
+
+
+def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Rollup y compactación del historial de precios')
+    parser.add_argument('--db', default=config.DATABASE_PATH,
+                        help=f'Ruta a la base de datos (default: {config.DATABASE_PATH})')
+    parser.add_argument('--days', type=int, default=config.PRICE_HISTORY_RAW_DAYS,
+                        help=f'Compactar filas crudas con más de N días, 0 = no compactar '
+                             f'(default: {config.PRICE_HISTORY_RAW_DAYS})')
+
+    args = parser.parse_args()
+
+    db = Database(args.db)
+    db.init_db()
+    result = db.rollup_price_history(args.days or None)
+
+    print(f"✅ Filas agregadas: {result['rows_rolled_up']}")
+    print(f"🗜️  Filas compactadas: {result['rows_compacted']}")
+
+
+if __name__ == "__main__":
+    main()
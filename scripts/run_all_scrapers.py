@@ -44,7 +44,7 @@ def scrape_memorykings():
             'store': 'memorykings',
             'total_products': total_products,
             'categories': all_results
-        }, f, indent=2, ensure_ascii=False)
+        }, f, indent=2, ensure_ascii=False, default=dict)
     
     print(f"\n💾 MemoryKings: {total_products} productos guardados en {output_file}")
     return total_products, all_results
@@ -77,7 +77,7 @@ def scrape_sercoplus():
             'store': 'sercoplus',
             'total_products': total_products,
             'categories': all_results
-        }, f, indent=2, ensure_ascii=False)
+        }, f, indent=2, ensure_ascii=False, default=dict)
     
     print(f"\n💾 SercoPlus: {total_products} productos guardados en {output_file}")
     return total_products, all_results
@@ -1,239 +1,279 @@
 """
-Script mejorado para ejecutar todos los scrapers incluyendo ComputerShop
-Ejecuta todas las tiendas y consolida resultados
+Orquestador de scraping para todas las tiendas
+Ejecuta todas las tiendas en paralelo (un proceso por tienda) y envía los
+productos página a página a la base de datos con escritura por lotes
 """
 import sys
 import os
+import time
+import uuid
+import queue
+import argparse
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime
-import subprocess
 
-def run_scraper(store_name, scraper_path):
+# Add project root to path
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT_DIR)
+
+from database import Database
+from config import config
+from scrapers.registry import STORES, get_store_keys, get_categories, create_scraper
+from pipeline import BatchUpserter, iter_store_pages
+from scrapers.tracing import Tracer, format_flame_table
+
+
+def scrape_store(store_key, product_queue, max_pages=None):
     """
-    Ejecuta un scraper específico
-    
+    Ejecuta el scraper de una tienda en un proceso separado
+
+    Cada página scrapeada se envía a la cola para que el proceso principal
+    la guarde mientras el resto de páginas y tiendas sigue descargándose.
+
     Args:
-        store_name: Nombre de la tienda
-        scraper_path: Path al script run.py del scraper
-    
+        store_key: Clave de la tienda en el registro (ej: 'sercoplus')
+        product_queue: Cola compartida con el proceso principal
+        max_pages: Máximo de páginas por categoría (None = todas)
+
     Returns:
-        bool: True si exitoso, False si falló
+        dict: Tiempos, conteos y spans de tiempo por etapa de la tienda
     """
-    print(f"\n{'='*80}")
-    print(f"🏪 {store_name.upper()} - Iniciando scraping...")
-    print('='*80)
-    
+    if ROOT_DIR not in sys.path:
+        sys.path.insert(0, ROOT_DIR)
+
+    started = time.perf_counter()
+    result = {
+        'store': store_key,
+        'products': 0,
+        'categories': {},
+        'spans': [],
+        'error': None
+    }
+
+    scraper = None
     try:
-        # Change to scraper directory
-        scraper_dir = os.path.dirname(scraper_path)
-        original_dir = os.getcwd()
-        
-        os.chdir(scraper_dir)
-        
-        # Run the scraper
-        result = subprocess.run(
-            [sys.executable, 'run.py'],
-            capture_output=True,
-            text=True,
-            timeout=1800  # 30 minutes timeout
-        )
-        
-        # Return to original directory
-        os.chdir(original_dir)
-        
-        # Print output
-        if result.stdout:
-            print(result.stdout)
-        
-        if result.returncode == 0:
-            print(f"\n✅ {store_name} scraping completado exitosamente")
-            return True
-        else:
-            print(f"\n❌ Error en {store_name} scraping")
-            if result.stderr:
-                print(f"Error: {result.stderr}")
-            return False
-            
-    except subprocess.TimeoutExpired:
-        print(f"\n⏱️ Timeout en {store_name} scraping (30 minutos)")
-        os.chdir(original_dir)
-        return False
+        scraper = create_scraper(store_key, use_selenium=True)
+        scraper.tracer.collect()
+
+        # Cada página se envía en cuanto se scrapea
+        last = time.perf_counter()
+        for category_key, products in iter_store_pages(scraper, store_key,
+                                                       get_categories(store_key), max_pages):
+            product_queue.put((store_key, category_key, products))
+
+            now = time.perf_counter()
+            category = result['categories'].setdefault(category_key, {'products': 0, 'seconds': 0.0})
+            category['products'] += len(products)
+            category['seconds'] = round(category['seconds'] + now - last, 2)
+            result['products'] += len(products)
+            last = now
+
     except Exception as e:
-        print(f"\n❌ Error ejecutando {store_name}: {e}")
-        os.chdir(original_dir)
-        return False
+        result['error'] = str(e)
+    finally:
+        if scraper:
+            scraper.close_selenium()
+            # Los workers del pool terminan con os._exit(): atexit no cerraría el cassette
+            if scraper.cassette:
+                scraper.cassette.close()
+            result['spans'] = scraper.tracer.collect()
+        result['seconds'] = round(time.perf_counter() - started, 2)
+        # Señal de fin para el proceso principal
+        product_queue.put((store_key, None, None))
+
+    return result
 
-def load_to_database(store_name, loader_path):
+
+def run_all_stores(store_keys, db, max_pages=None):
     """
-    Carga productos a la base de datos
-    
+    Ejecuta las tiendas en paralelo y guarda sus productos por lotes
+
     Args:
-        store_name: Nombre de la tienda
-        loader_path: Path al script load_to_db.py
-    
+        store_keys: Lista de tiendas a procesar
+        db: Instancia de Database donde escribir
+        max_pages: Máximo de páginas por categoría (None = todas)
+
     Returns:
-        bool: True si exitoso, False si falló
+        dict: Resultado por tienda (tiempos, productos, guardados, spans)
     """
-    print(f"\n📥 Cargando {store_name} a base de datos...")
-    
-    try:
-        loader_dir = os.path.dirname(loader_path)
-        original_dir = os.getcwd()
-        
-        os.chdir(loader_dir)
-        
-        result = subprocess.run(
-            [sys.executable, 'load_to_db.py'],
-            capture_output=True,
-            text=True,
-            timeout=600  # 10 minutes timeout
-        )
-        
-        os.chdir(original_dir)
-        
-        if result.stdout:
-            print(result.stdout)
-        
-        if result.returncode == 0:
-            print(f"✅ {store_name} cargado a BD exitosamente")
-            return True
-        else:
-            print(f"❌ Error cargando {store_name} a BD")
-            if result.stderr:
-                print(f"Error: {result.stderr}")
-            return False
-            
-    except Exception as e:
-        print(f"❌ Error cargando {store_name}: {e}")
-        os.chdir(original_dir)
-        return False
+    manager = multiprocessing.Manager()
+    product_queue = manager.Queue(maxsize=len(store_keys) * 4)
 
-def main():
-    """Ejecuta todos los scrapers y carga a BD"""
-    
-    print("\n" + "="*80)
-    print("🚀 SCRAPING UNIFICADO - TODAS LAS TIENDAS")
-    print("="*80)
-    print(f"Fecha: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
-    
-    # Define stores and their paths
-    stores = [
-        {
-            'name': 'SercoPlus',
-            'scraper': 'scrapers/sercoplus/run.py',
-            'loader': 'scripts/load_sercoplus_to_db.py'
-        },
-        {
-            'name': 'MemoryKings',
-            'scraper': 'scrapers/memorykings/run.py',
-            'loader': 'scripts/load_memorykings_to_db.py'
-        },
-        {
-            'name': 'PCImpacto',
-            'scraper': 'scrapers/impacto/run.py',
-            'loader': 'scrapers/impacto/load_to_db.py'
-        },
-        {
-            'name': 'CycComputer',
-            'scraper': 'scrapers/cyccomputer/run.py',
-            'loader': 'scrapers/cyccomputer/load_to_db.py'
-        },
-        {
-            'name': 'ComputerShop',
-            'scraper': 'scrapers/computershop/run.py',
-            'loader': 'scrapers/computershop/load_to_db.py'
-        }
-    ]
-    
-    print(f"Tiendas a procesar: {len(stores)}")
-    for store in stores:
-        print(f"  - {store['name']}")
-    
     results = {}
-    
-    # Process each store
-    for store in stores:
-        store_name = store['name']
-        
-        # Check if scraper exists
-        if not os.path.exists(store['scraper']):
-            print(f"\n⚠️ Scraper no encontrado para {store_name}: {store['scraper']}")
-            results[store_name] = {
-                'scrape_success': False,
-                'load_success': False,
-                'error': 'Scraper not found'
+    tracer = Tracer()
+    sent = set()  # Tiendas con páginas para el escritor
+
+    try:
+        with ProcessPoolExecutor(max_workers=len(store_keys)) as executor, \
+                BatchUpserter(db, tracer=tracer) as upserter:
+            futures = {
+                executor.submit(scrape_store, store_key, product_queue, max_pages): store_key
+                for store_key in store_keys
             }
-            continue
-        
-        # Run scraper
-        scrape_success = run_scraper(store_name, store['scraper'])
-        
-        # Load to database if scraping successful
-        load_success = False
-        if scrape_success and os.path.exists(store['loader']):
-            load_success = load_to_database(store_name, store['loader'])
-        elif scrape_success:
-            print(f"⚠️ Loader no encontrado para {store_name}: {store['loader']}")
-        
-        results[store_name] = {
-            'scrape_success': scrape_success,
-            'load_success': load_success
-        }
-    
-    # Final summary
+
+            # El proceso principal es el único escritor de SQLite
+            pending = set(store_keys)
+            while pending:
+                try:
+                    store_key, category_key, products = product_queue.get(timeout=5)
+                except queue.Empty:
+                    # Un proceso que muere sin enviar la señal de fin no debe bloquearnos
+                    finished = {futures[f] for f in futures if f.done()}
+                    if pending <= finished:
+                        break
+                    continue
+
+                if products is None:
+                    pending.discard(store_key)
+                    print(f"   🏁 {STORES[store_key]['name']}: scraping terminado")
+                    continue
+
+                sent.add(store_key)
+                # Si el escritor falló se sigue vaciando la cola (los workers esperan
+                # en put() hasta que haya sitio) pero las páginas se descartan
+                if not upserter.error:
+                    try:
+                        upserter.put(store_key, category_key, products)
+                    except RuntimeError:
+                        pass  # El escritor falló entre la comprobación y put()
+
+            for future, store_key in futures.items():
+                try:
+                    results[store_key] = future.result()
+                except Exception as e:
+                    results[store_key] = {'store': store_key, 'products': 0, 'categories': {},
+                                          'seconds': 0.0, 'spans': [], 'error': str(e)}
+    finally:
+        manager.shutdown()
+
+    # El escritor ya vació su cola al salir del bloque with
+    db_spans = tracer.collect()
+    for store_key, result in results.items():
+        result['saved'] = upserter.counts.get(store_key, {'inserted': 0, 'updated': 0, 'errors': 0})
+        result['spans'] += [span for span in db_spans if span['store'] == store_key]
+        if upserter.error and store_key in sent and not result['error']:
+            result['error'] = f"El escritor de la BD falló: {upserter.error}"
+
+    return results
+
+
+def print_summary(results, wall_seconds):
+    """Imprime tiempos y resultados por tienda"""
     print("\n\n" + "="*80)
     print("✅ PROCESAMIENTO COMPLETADO - RESUMEN FINAL")
     print("="*80)
-    
-    print(f"\n{'Tienda':<20} {'Scraping':<15} {'Carga BD':<15}")
+
+    print(f"\n{'Tienda':<16} {'Productos':>10} {'Nuevos':>8} {'Actualiz.':>10} {'Errores':>8} {'Tiempo':>10}  Estado")
     print("-" * 80)
-    
+
     total_success = 0
-    for store_name, result in results.items():
-        scrape_icon = "✅" if result['scrape_success'] else "❌"
-        load_icon = "✅" if result['load_success'] else "❌"
-        
-        scrape_text = f"{scrape_icon} {'Exitoso' if result['scrape_success'] else 'Fallido'}"
-        load_text = f"{load_icon} {'Exitoso' if result['load_success'] else 'Fallido'}"
-        
-        print(f"{store_name:<20} {scrape_text:<15} {load_text:<15}")
-        
-        if result['scrape_success'] and result['load_success']:
+    sum_seconds = 0.0
+    for store_key, result in results.items():
+        saved = result['saved']
+        status = "✅ Exitoso" if not result['error'] else f"❌ {result['error'][:30]}"
+        if not result['error']:
             total_success += 1
-    
+        sum_seconds += result['seconds']
+
+        print(f"{STORES[store_key]['name']:<16} {result['products']:>10} {saved['inserted']:>8} "
+              f"{saved['updated']:>10} {saved['errors']:>8} {result['seconds']:>9.1f}s  {status}")
+
+        for category_key, category in result['categories'].items():
+            print(f"  └ {category_key:<20} {category['products']:>5} productos {category['seconds']:>9.1f}s")
+
     print("-" * 80)
-    print(f"\n📊 Tiendas completadas exitosamente: {total_success}/{len(stores)}")
-    
-    # Check database stats
+    print(f"\n📊 Tiendas completadas exitosamente: {total_success}/{len(results)}")
+    print(f"⏱️  Tiempo total: {wall_seconds:.1f}s (suma secuencial: {sum_seconds:.1f}s)")
+
+
+def print_db_stats(db):
+    """Muestra productos activos por tienda en la base de datos"""
     try:
-        sys.path.append(os.path.dirname(os.path.abspath(__file__)))
-        from database import Database
-        
-        db = Database('pc_prices.db')
         conn = db.get_connection()
         cursor = conn.cursor()
-        
+
         cursor.execute("""
-            SELECT store, COUNT(*) as count 
-            FROM products 
+            SELECT store, COUNT(*) as count
+            FROM products
             WHERE is_active = 1
             GROUP BY store
             ORDER BY count DESC
         """)
-        
+
         print(f"\n📈 Productos en base de datos:")
         total_db = 0
         for row in cursor.fetchall():
             count = row['count']
             total_db += count
             print(f"  - {row['store']:<20}: {count:>5} productos")
-        
+
         print(f"  {'TOTAL':<20}: {total_db:>5} productos")
-        
+
         conn.close()
-        
+
     except Exception as e:
         print(f"\n⚠️ No se pudo obtener estadísticas de BD: {e}")
-    
+
+
+def main():
+    """Ejecuta todos los scrapers en paralelo y carga a BD"""
+    parser = argparse.ArgumentParser(description='Scraping unificado de todas las tiendas')
+    parser.add_argument('--stores', nargs='+', choices=get_store_keys(), default=get_store_keys(),
+                        help='Tiendas a procesar (default: todas)')
+    parser.add_argument('--max-pages', type=int, default=None,
+                        help='Máximo de páginas por categoría (default: todas)')
+    parser.add_argument('--db', default=config.DATABASE_PATH,
+                        help=f'Ruta a la base de datos (default: {config.DATABASE_PATH})')
+    cassettes = parser.add_mutually_exclusive_group()
+    cassettes.add_argument('--record', metavar='DIR',
+                           help='Grabar todas las páginas descargadas en cassettes (DIR/<tienda>.ndjson.gz)')
+    cassettes.add_argument('--replay', metavar='DIR',
+                           help='Reproducir las páginas desde cassettes grabados, sin red')
+    parser.add_argument('--latency', type=float, default=0.0,
+                        help='Con --replay: segundos de latencia artificial por página (default: 0)')
+    parser.add_argument('--jitter', type=float, default=0.0,
+                        help='Con --replay: segundos aleatorios extra por página, 0..jitter (default: 0)')
+    args = parser.parse_args()
+
+    # Los procesos de cada tienda heredan la configuración por el entorno
+    if args.record or args.replay:
+        os.environ['SCRAPER_CASSETTE_MODE'] = 'record' if args.record else 'replay'
+        os.environ['SCRAPER_CASSETTE_DIR'] = os.path.abspath(args.record or args.replay)
+        os.environ['SCRAPER_REPLAY_LATENCY'] = str(args.latency)
+        os.environ['SCRAPER_REPLAY_JITTER'] = str(args.jitter)
+
+    print("\n" + "="*80)
+    print("🚀 SCRAPING UNIFICADO - TODAS LAS TIENDAS")
+    print("="*80)
+    print(f"Fecha: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
+    print(f"Tiendas a procesar (en paralelo): {len(args.stores)}")
+    for store_key in args.stores:
+        print(f"  - {STORES[store_key]['name']}")
+    if args.record:
+        print(f"📼 Grabando cassettes en {args.record}")
+    elif args.replay:
+        print(f"📼 Reproduciendo cassettes de {args.replay} (latencia {args.latency}s + 0..{args.jitter}s)")
+
+    db = Database(args.db)
+    db.init_db()
+
+    started = time.perf_counter()
+    results = run_all_stores(args.stores, db, max_pages=args.max_pages)
+    wall_seconds = time.perf_counter() - started
+
+    print_summary(results, wall_seconds)
+
+    # Tiempos por etapa de todas las tiendas (fetch, Selenium, parseo, BD...)
+    spans = [span for result in results.values() for span in result['spans']]
+    if spans:
+        run_id = uuid.uuid4().hex[:12]
+        db.save_scrape_spans(run_id, spans)
+        print(f"\n⏱️  Tiempo por etapa, suma de todas las tiendas (run {run_id}):")
+        print(format_flame_table(spans))
+
+    print_db_stats(db)
+
     print("\n" + "="*80)
     print("✅ Proceso completado")
     print("="*80)
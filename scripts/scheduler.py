@@ -3,23 +3,40 @@ Scheduler for Automatic Scraping
 Handles periodic updates of product prices
 """
 
+import math
 import schedule
 import time
+import random
 import threading
-from datetime import datetime, timedelta
+from concurrent.futures import Future, ThreadPoolExecutor
+from functools import partial
+from datetime import datetime, timedelta, timezone
 from typing import List, Dict, Optional
 from database import Database
+from config import config
+from deals import refresh_deals
 from scrapers import SercoPlusScraper, MemoryKingsScraper, PCImpactoScraper
 
 
+def as_datetime(value) -> datetime:
+    """Timestamp column value as a datetime (SQLite returns ISO text, PostgreSQL datetimes)"""
+    return value if isinstance(value, datetime) else datetime.fromisoformat(value)
+
+
 class ScrapingScheduler:
     """Manages scheduled scraping tasks"""
     
-    def __init__(self, db: Database):
+    def __init__(self, db: Database, max_workers: int = None):
         self.db = db
         self.is_running = False
         self.scheduler_thread = None
         
+        # At most one active task per store, at most max_workers stores at once
+        self.max_workers = max_workers or config.MAX_CONCURRENT_SCRAPES
+        self._active_stores = set()
+        self._active_lock = threading.Lock()
+        self._executor = None  # Long-lived, created on the first check
+        
         # Initialize scrapers
         self.scrapers = {
             'SercoPlus': SercoPlusScraper(),
@@ -84,8 +101,13 @@ class ScrapingScheduler:
         return tasks
     
     def update_task(self, task_id: int, last_run: datetime = None, 
-                   next_run: datetime = None) -> bool:
-        """Updates task timestamps"""
+                   next_run: datetime = None, adaptive_frequency_hours: int = None) -> bool:
+        """
+        Updates task timestamps (and the adapted frequency, if given)
+        
+        The adapted interval goes to adaptive_frequency_hours; frequency_hours
+        stays the configured base that compute_frequency() falls back to.
+        """
         conn = self.db.get_connection()
         cursor = conn.cursor()
         
@@ -103,6 +125,13 @@ class ScrapingScheduler:
                     WHERE id = ?
                 """, (last_run.isoformat(), task_id))
             
+            if adaptive_frequency_hours:
+                cursor.execute("""
+                    UPDATE scraping_schedule 
+                    SET adaptive_frequency_hours = ?
+                    WHERE id = ?
+                """, (adaptive_frequency_hours, task_id))
+            
             conn.commit()
             conn.close()
             return True
@@ -115,7 +144,7 @@ class ScrapingScheduler:
     def log_scraping_run(self, store_name: str, url: str, products_found: int,
                         products_saved: int, status: str, error_message: str = None,
                         duration: float = 0.0, started_at: datetime = None,
-                        completed_at: datetime = None) -> bool:
+                        completed_at: datetime = None, price_changes: int = None) -> bool:
         """Logs a scraping run"""
         conn = self.db.get_connection()
         cursor = conn.cursor()
@@ -124,13 +153,14 @@ class ScrapingScheduler:
             cursor.execute("""
                 INSERT INTO scraping_logs 
                 (store_name, url, products_found, products_saved, status, 
-                 error_message, duration_seconds, started_at, completed_at)
-                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+                 error_message, duration_seconds, started_at, completed_at, price_changes)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
             """, (
                 store_name, url, products_found, products_saved, status,
                 error_message, duration, 
                 started_at.isoformat() if started_at else None,
-                completed_at.isoformat() if completed_at else None
+                completed_at.isoformat() if completed_at else None,
+                price_changes
             ))
             
             conn.commit()
@@ -162,7 +192,8 @@ class ScrapingScheduler:
             'products_found': 0,
             'products_saved': 0,
             'status': 'failed',
-            'error_message': None
+            'error_message': None,
+            'price_changes': None
         }
         
         try:
@@ -182,13 +213,12 @@ class ScrapingScheduler:
             
             result['products_found'] = len(products)
             
-            # Save products to database
-            saved_count = 0
-            for product in products:
-                if self.db.insert_product(product):
-                    saved_count += 1
+            # Save products to database in one transaction
+            saved = self.db.upsert_products(products)
+            saved_count = saved['inserted'] + saved['updated']
             
             result['products_saved'] = saved_count
+            result['price_changes'] = self.count_price_changes(store_name, started_at)
             result['status'] = 'success'
             
             print(f"✅ Scraping completado: {saved_count}/{len(products)} productos guardados")
@@ -213,30 +243,230 @@ class ScrapingScheduler:
                 error_message=result['error_message'],
                 duration=duration,
                 started_at=started_at,
-                completed_at=completed_at
+                completed_at=completed_at,
+                price_changes=result['price_changes']
             )
             
-            # Update task schedule
-            frequency_hours = task.get('frequency_hours', 24)
-            next_run = datetime.now() + timedelta(hours=frequency_hours)
-            self.update_task(task['id'], last_run=completed_at, next_run=next_run)
+            # Update task schedule (adapted to volatility, jittered so tasks do not bunch up)
+            frequency_hours = self.compute_frequency(task)
+            next_run = self.compute_next_run(completed_at, frequency_hours)
+            self.update_task(task['id'], last_run=completed_at, next_run=next_run,
+                             adaptive_frequency_hours=frequency_hours)
         
         return result
     
-    def check_and_run_tasks(self):
-        """Checks for pending tasks and runs them"""
-        pending_tasks = self.get_pending_tasks()
+    def count_price_changes(self, store_name: str, since: datetime) -> int:
+        """
+        Counts the price_history rows written for a store since a local time
         
-        if not pending_tasks:
+        New rows are only written when price or stock moved, or a product
+        appeared. A store only runs one task at a time, so counting right
+        after a run's upsert gives that run's changes.
+        """
+        # recorded_at is UTC; floor to the second like CURRENT_TIMESTAMP
+        since_utc = since.astimezone(timezone.utc).strftime('%Y-%m-%d %H:%M:%S')
+        
+        conn = self.db.get_connection()
+        cursor = conn.cursor()
+        cursor.execute("""
+            SELECT COUNT(*) AS count FROM price_history ph
+            JOIN products p ON p.id = ph.product_id
+            WHERE LOWER(p.store) = LOWER(?) AND ph.recorded_at >= ?
+        """, (store_name, since_utc))
+        count = cursor.fetchone()['count']
+        conn.close()
+        
+        return count
+    
+    def compute_change_rate(self, task: Dict) -> Optional[float]:
+        """
+        Estimates how fast a task's products change, in changes per product-hour
+        
+        Looks at the task's last ADAPTIVE_LOOKBACK_RUNS successful runs in
+        scraping_logs, using the price changes each run recorded when it
+        finished (see count_price_changes). Reading the stored counts keeps
+        the estimate independent of price_history compaction.
+        
+        Returns:
+            The estimated rate, or None while there are fewer than
+            ADAPTIVE_MIN_RUNS runs to compare
+        """
+        conn = self.db.get_connection()
+        cursor = conn.cursor()
+        
+        # Runs logged before price_changes existed have nothing to compare
+        cursor.execute("""
+            SELECT started_at, products_found, price_changes AS changes
+            FROM scraping_logs
+            WHERE store_name = ? AND url = ?
+            AND status = 'success' AND products_found > 0
+            AND price_changes IS NOT NULL
+            ORDER BY started_at DESC
+            LIMIT ?
+        """, (task['store_name'], task['url'], config.ADAPTIVE_LOOKBACK_RUNS))
+        
+        runs = [dict(row) for row in cursor.fetchall()]
+        conn.close()
+        
+        if len(runs) < config.ADAPTIVE_MIN_RUNS:
+            return None
+        
+        # Each run's changes accumulated since the previous run (the oldest
+        # run has no previous one to compare with, so it is skipped)
+        runs.reverse()
+        changes = 0
+        product_hours = 0.0
+        for previous, run in zip(runs, runs[1:]):
+            elapsed_hours = (as_datetime(run['started_at']) -
+                             as_datetime(previous['started_at'])).total_seconds() / 3600
+            if elapsed_hours <= 0:
+                continue
+            changes += min(run['changes'], run['products_found'])
+            product_hours += run['products_found'] * elapsed_hours
+        
+        if product_hours <= 0:
+            return None
+        return changes / product_hours
+    
+    def compute_frequency(self, task: Dict) -> int:
+        """
+        Returns the scrape interval (hours) for a task
+        
+        Picks the interval after which ADAPTIVE_TARGET_CHANGE_RATE of the
+        task's products are expected to have changed, assuming changes arrive
+        independently at the observed rate, clamped to
+        [MIN_SCRAPE_FREQUENCY_HOURS, MAX_SCRAPE_FREQUENCY_HOURS]. Volatile
+        categories get scraped more often and stable ones less. Falls back
+        to the task's configured frequency without enough history.
+        """
+        frequency_hours = task.get('frequency_hours') or config.DEFAULT_SCRAPE_FREQUENCY_HOURS
+        if not config.ADAPTIVE_SCHEDULING:
+            return frequency_hours
+        
+        rate = self.compute_change_rate(task)
+        if rate is None:
+            return frequency_hours
+        
+        if rate > 0:
+            frequency_hours = -math.log(1 - config.ADAPTIVE_TARGET_CHANGE_RATE) / rate
+        else:
+            frequency_hours = config.MAX_SCRAPE_FREQUENCY_HOURS
+        
+        return int(round(min(max(frequency_hours, config.MIN_SCRAPE_FREQUENCY_HOURS),
+                             config.MAX_SCRAPE_FREQUENCY_HOURS)))
+    
+    def compute_next_run(self, completed_at: datetime, frequency_hours: float) -> datetime:
+        """
+        Returns the next due time for a task
+
+        Adds a random delay of up to SCHEDULER_JITTER_MINUTES so tasks that
+        were created or finished together spread out over later checks.
+        """
+        jitter_minutes = random.uniform(0, config.SCHEDULER_JITTER_MINUTES)
+        return completed_at + timedelta(hours=frequency_hours, minutes=jitter_minutes)
+    
+    def _run_store_tasks(self, store_name: str, tasks: List[Dict]) -> List[Dict]:
+        """Runs one store's pending tasks in due order, one at a time"""
+        results = []
+        try:
+            for i, task in enumerate(tasks):
+                if i > 0:
+                    # Small delay between tasks of the same store to be respectful
+                    time.sleep(5)
+                results.append(self.run_scraping_task(task))
+        finally:
+            with self._active_lock:
+                self._active_stores.discard(store_name)
+        return results
+    
+    def _report_store_results(self, store_name: str, future: Future):
+        """Done-callback of a store's batch: prints its outcome"""
+        if future.cancelled():
             return
+        error = future.exception()
+        if error:
+            print(f"❌ Error en las tareas de {store_name}: {error}")
+            return
+        results = future.result()
+        succeeded = sum(1 for result in results if result['status'] == 'success')
+        print(f"🏁 {store_name}: {succeeded}/{len(results)} tarea(s) exitosa(s)")
+    
+    def check_and_run_tasks(self, wait: bool = True) -> Dict:
+        """
+        Checks for pending tasks and runs them concurrently
+        
+        Tasks are grouped by store and each store gets a single worker slot,
+        so a store is never hit by two tasks at once. Stores are dispatched
+        in order of their most overdue task and at most max_workers run in
+        parallel. Stores still busy from a previous check are skipped.
+        
+        Args:
+            wait: Block until the dispatched stores finish. The background
+                scheduler passes False so a long store run does not hold
+                up later checks (idle stores start as soon as they are due)
+                or the nightly jobs.
+        
+        Returns:
+            Results per store, in the order the tasks ran (with wait=False,
+            the Future of each dispatched store instead)
+        """
+        pending_tasks = self.get_pending_tasks()
         
-        print(f"\n📋 Encontradas {len(pending_tasks)} tareas pendientes")
+        if not pending_tasks:
+            return {}
         
+        # get_pending_tasks() is ordered by next_run, so dict order is due order
+        tasks_by_store: Dict[str, List[Dict]] = {}
         for task in pending_tasks:
-            self.run_scraping_task(task)
-            
-            # Small delay between tasks to be respectful
-            time.sleep(5)
+            tasks_by_store.setdefault(task['store_name'], []).append(task)
+        
+        with self._active_lock:
+            busy = [store for store in tasks_by_store if store in self._active_stores]
+            for store in busy:
+                del tasks_by_store[store]
+            self._active_stores.update(tasks_by_store)
+        
+        if busy:
+            print(f"⏳ Tiendas aún en ejecución, se omiten: {', '.join(busy)}")
+        if not tasks_by_store:
+            return {}
+        
+        print(f"\n📋 Encontradas {len(pending_tasks)} tareas pendientes "
+              f"({len(tasks_by_store)} tiendas, máx. {self.max_workers} en paralelo)")
+        
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=self.max_workers,
+                                                thread_name_prefix='scrape')
+        
+        futures = {}
+        for store_name, tasks in tasks_by_store.items():
+            future = self._executor.submit(self._run_store_tasks, store_name, tasks)
+            future.add_done_callback(partial(self._report_store_results, store_name))
+            futures[store_name] = future
+        
+        if not wait:
+            return futures
+        return {store_name: future.result() for store_name, future in futures.items()}
+    
+    def rollup_price_history(self) -> Dict[str, int]:
+        """Builds daily/weekly price rollups and compacts old raw history"""
+        result = self.db.rollup_price_history(config.PRICE_HISTORY_RAW_DAYS or None)
+        print(f"📉 Historial: {result['rows_rolled_up']} filas agregadas, "
+              f"{result['rows_compacted']} compactadas")
+        return result
+    
+    def refresh_deals(self) -> int:
+        """Recomputes the deals table (see deals.py)"""
+        count = refresh_deals(self.db, config.DEAL_WINDOW_DAYS,
+                              config.DEAL_MIN_DROP, config.DEAL_MIN_SPREAD)
+        print(f"🏷️  Ofertas detectadas: {count}")
+        return count
+    
+    def prune_change_log(self) -> int:
+        """Drops product_changes rows older than CHANGE_LOG_RETENTION_DAYS"""
+        deleted = self.db.prune_changes(config.CHANGE_LOG_RETENTION_DAYS)
+        print(f"🧹 Cambios antiguos eliminados: {deleted}")
+        return deleted
     
     def start_scheduler(self):
         """Starts the scheduler in a background thread"""
@@ -247,10 +477,15 @@ class ScrapingScheduler:
         self.is_running = True
         
         # Schedule check every hour
-        schedule.every(1).hours.do(self.check_and_run_tasks)
+        schedule.every(1).hours.do(self.check_and_run_tasks, wait=False)
         
         # Also check immediately on start
-        schedule.every(5).minutes.do(self.check_and_run_tasks)
+        schedule.every(5).minutes.do(self.check_and_run_tasks, wait=False)
+        
+        # Nightly price history rollup/compaction, then deal detection
+        schedule.every().day.at("03:30").do(self.rollup_price_history)
+        schedule.every().day.at("03:45").do(self.refresh_deals)
+        schedule.every().day.at("04:00").do(self.prune_change_log)
         
         def run_scheduler():
             print("✅ Scheduler iniciado")
@@ -269,6 +504,10 @@ class ScrapingScheduler:
         if self.scheduler_thread:
             self.scheduler_thread.join(timeout=5)
         schedule.clear()
+        if self._executor:
+            # Running stores finish their current batch; queued ones are dropped
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
         print("⏹️ Scheduler detenido")
     
     def get_scraping_logs(self, limit: int = 50, store_name: str = None) -> List[Dict]:
@@ -314,13 +553,14 @@ class ScrapingScheduler:
         """, (now,))
         pending_tasks = cursor.fetchone()['count']
         
-        # Recent logs
+        # Recent logs (completed_at is local time, like the cutoff)
+        since = (datetime.now() - timedelta(hours=24)).isoformat()
         cursor.execute("""
             SELECT status, COUNT(*) as count 
             FROM scraping_logs 
-            WHERE completed_at >= datetime('now', '-24 hours')
+            WHERE completed_at >= ?
             GROUP BY status
-        """)
+        """, (since,))
         recent_runs = {row['status']: row['count'] for row in cursor.fetchall()}
         
         conn.close()
@@ -0,0 +1,60 @@
+"""
+Muestra el tiempo por etapa de las últimas ejecuciones de scraping
+(spans guardados en scrape_spans por pipeline.run_store y
+run_all_scrapers_complete.py)
+"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from database import Database
+from config import config
+from scrapers.tracing import format_flame_table
+
+
+def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Tiempo por etapa de las ejecuciones de scraping')
+    parser.add_argument('--db', default=config.DATABASE_PATH,
+                        help=f'Ruta a la base de datos (default: {config.DATABASE_PATH})')
+    parser.add_argument('--run', help='ID de la ejecución (default: la última)')
+    parser.add_argument('--store', help='Mostrar solo una tienda')
+    parser.add_argument('--list', action='store_true', help='Listar las últimas ejecuciones')
+
+    args = parser.parse_args()
+
+    db = Database(args.db)
+    db.init_db()
+
+    if args.list:
+        print(f"{'Run':<14} {'Fecha':<20} {'Tiempo':>9}  Tiendas")
+        print("-" * 70)
+        for run in db.get_scrape_runs():
+            print(f"{run['run_id']:<14} {run['recorded_at']:<20} {run['total_ms'] / 1000:>8.1f}s  {run['stores']}")
+        return
+
+    spans = db.get_scrape_spans(args.run)
+    if args.store:
+        spans = [span for span in spans if span['store'] == args.store]
+    if not spans:
+        print("⚠️ No hay spans registrados para esa ejecución")
+        return
+
+    print(f"⏱️  Run {spans[0]['run_id']} ({spans[0]['recorded_at']})\n")
+    print(format_flame_table(spans))
+
+    # Páginas más lentas: candidatas a revisar primero
+    pages = sorted((span for span in spans if span['stage'] == 'page'),
+                   key=lambda span: -span['total_ms'])[:5]
+    if pages:
+        print("\n🐢 Páginas más lentas:")
+        for span in pages:
+            print(f"  {span['store']:<14} {span['category']:<16} página {span['page']:<4} "
+                  f"{span['total_ms'] / 1000:>7.2f}s")
+
+
+if __name__ == "__main__":
+    main()
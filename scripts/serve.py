@@ -0,0 +1,67 @@
+"""
+Modo de producción de la API: N workers de uvicorn en solo lectura
+
+Los workers abren la base de datos con PRAGMA query_only, no ejecutan
+init_db ni crean scrapers, así que arrancan rápido y ocupan poca memoria.
+La base se pasa a WAL antes de lanzarlos: los lectores no se bloquean
+entre sí ni con el proceso que escribe (scripts/writer.py). Con una URL
+postgresql:// (DATABASE_URL) cada worker abre su propio pool y varios
+nodos pueden servir el mismo catálogo.
+
+Uso:
+    python scripts/serve.py                  # un worker por CPU
+    python scripts/serve.py --workers 4 --port 8080
+"""
+
+import os
+import sys
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT_DIR)
+
+from database import Database
+from storage import is_postgres_url
+from config import config
+
+
+def main():
+    import argparse
+    import uvicorn
+
+    parser = argparse.ArgumentParser(description='API en modo producción (workers de solo lectura)')
+    parser.add_argument('--workers', type=int, default=config.API_WORKERS,
+                        help='Número de workers (default: API_WORKERS, 0 = uno por CPU)')
+    parser.add_argument('--host', default=config.API_HOST, help=f'Host (default: {config.API_HOST})')
+    parser.add_argument('--port', type=int, default=int(os.getenv('PORT', config.API_PORT)),
+                        help='Puerto (default: PORT o API_PORT)')
+    parser.add_argument('--db', default=config.DATABASE_URL or config.DATABASE_PATH,
+                        help='Ruta a la base SQLite o URL postgresql:// (default: DATABASE_URL o DATABASE_PATH)')
+
+    args = parser.parse_args()
+    workers = args.workers or os.cpu_count() or 1
+
+    # Workers are separate processes that import main and read config from the environment
+    os.environ['API_READ_ONLY'] = 'true'
+    if is_postgres_url(args.db):
+        os.environ['DATABASE_URL'] = args.db
+        target = 'PostgreSQL'
+    else:
+        if not os.path.exists(args.db):
+            print(f"❌ No existe la base de datos: {args.db}")
+            print("   Créala con el proceso de escritura: python scripts/writer.py --init")
+            sys.exit(1)
+
+        mode = Database(args.db).enable_wal()
+        if mode != 'wal':
+            print(f"⚠️ El sistema de archivos no admite WAL (modo {mode}): los lectores pueden esperar al writer")
+        os.environ['DATABASE_PATH'] = args.db
+        os.environ['DATABASE_URL'] = ''  # An explicit --db file wins over DATABASE_URL
+        target = f'{args.db}, journal {mode}'
+
+    print(f"🚀 {workers} worker(s) de solo lectura en {args.host}:{args.port} ({target})")
+    uvicorn.run("main:app", host=args.host, port=args.port, workers=workers,
+                app_dir=ROOT_DIR, reload=False, log_level=config.LOG_LEVEL.lower())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,51 @@
+"""
+Sincroniza miniaturas de imágenes de productos
+Descarga cada image_url distinta una sola vez y guarda miniaturas
+direccionadas por contenido, servidas por /api/images/{hash}
+"""
+
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from database import Database
+from config import config
+from images import ImageCache
+
+
+def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Sincroniza miniaturas de imágenes de productos')
+    parser.add_argument('--db', default=config.DATABASE_PATH,
+                        help=f'Ruta a la base de datos (default: {config.DATABASE_PATH})')
+    parser.add_argument('--dir', default=config.IMAGE_CACHE_DIR,
+                        help=f'Directorio de miniaturas (default: {config.IMAGE_CACHE_DIR})')
+    parser.add_argument('--workers', type=int, default=config.IMAGE_FETCH_WORKERS,
+                        help=f'Descargas simultáneas (default: {config.IMAGE_FETCH_WORKERS})')
+    parser.add_argument('--refresh', action='store_true',
+                        help='Revalidar también imágenes ya cacheadas (HEAD + ETag/Last-Modified)')
+
+    args = parser.parse_args()
+
+    db = Database(args.db)
+    db.init_db()
+    cache = ImageCache(db, args.dir, max_workers=args.workers)
+
+    pending = len(cache.pending_urls(args.refresh))
+    print(f"🖼️  {pending} URLs de imagen por procesar ({args.workers} descargas simultáneas)")
+
+    start = time.time()
+    counts = cache.sync(args.refresh)
+
+    print(f"\n✅ Nuevas: {counts['ok']}")
+    print(f"♻️  Reutilizadas: {counts['reused']}")
+    print(f"⏭️  Sin cambios: {counts['unchanged']}")
+    print(f"❌ Fallidas: {counts['failed']}")
+    print(f"⏱️  Tiempo: {time.time() - start:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
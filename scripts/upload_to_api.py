@@ -1,107 +1,205 @@
 """
 Script para subir productos de la base de datos local a una API remota
 Funciona con cualquier API compatible (Render, PythonAnywhere, etc.)
+
+Envía lotes NDJSON comprimidos con gzip a POST /api/products/bulk sobre una
+sola sesión HTTP. Solo la primera vez se sube todo; después solo los productos
+cambiados desde la última sincronización (log de cambios, ver /api/changes).
+El progreso se guarda en un checkpoint para poder reanudar.
 """
-import sqlite3
-import requests
+import os
+import sys
+import json
+import gzip
 import time
-from typing import List, Dict
+from typing import Dict, Iterator, List, Optional
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from database import Database
+from scrapers.product import PRODUCT_FIELDS
 
 # Configuración - Cambiar según tu API remota
-API_URL = "https://pc-componentes-scraper.onrender.com"  # Cambiar a tu URL
+API_URL = os.getenv('UPLOAD_API_URL', "https://pc-componentes-scraper.onrender.com")  # Cambiar a tu URL
 LOCAL_DB = "pc_prices.db"
+CHECKPOINT_FILE = ".upload_checkpoint.json"
+BATCH_SIZE = 500
+
+
+def create_session() -> requests.Session:
+    """Sesión con conexiones reutilizadas y reintentos ante errores temporales"""
+    session = requests.Session()
+    retry = Retry(total=5, backoff_factor=1, status_forcelist=[429, 500, 502, 503, 504],
+                  allowed_methods=None)
+    adapter = HTTPAdapter(max_retries=retry, pool_connections=1, pool_maxsize=4)
+    session.mount('http://', adapter)
+    session.mount('https://', adapter)
+    return session
+
+
+def load_checkpoint(path: str, api_url: str) -> Dict:
+    """Checkpoint de la API destino: cursor del log de cambios y progreso de la carga completa"""
+    if not os.path.exists(path):
+        return {}
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f).get(api_url, {})
+
+
+def save_checkpoint(path: str, api_url: str, state: Dict):
+    data = {}
+    if os.path.exists(path):
+        with open(path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+    data[api_url] = state
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(data, f, indent=2)
+    os.replace(tmp_path, path)
+
+
+def product_line(row: Dict) -> Dict:
+    """Fila de products -> línea NDJSON con los campos del producto"""
+    line = {field: row.get(field) for field in PRODUCT_FIELDS}
+    if isinstance(line['metadata'], str):
+        line['metadata'] = json.loads(line['metadata'])
+    return line
+
+
+def upload_batch(session: requests.Session, api_url: str, lines: List[Dict]) -> Dict:
+    """Sube un lote como NDJSON comprimido; lanza excepción si falla"""
+    body = '\n'.join(json.dumps(line, ensure_ascii=False) for line in lines).encode('utf-8')
+    response = session.post(
+        f"{api_url}/api/products/bulk",
+        data=gzip.compress(body),
+        headers={'Content-Type': 'application/x-ndjson', 'Content-Encoding': 'gzip'},
+        timeout=120
+    )
+    response.raise_for_status()
+    return response.json()
+
+
+def iter_full_batches(db: Database, after_id: int, batch_size: int) -> Iterator[List[Dict]]:
+    """Todos los productos activos por lotes, ordenados por id (keyset, reanudable)"""
+    while True:
+        conn = db.get_connection()
+        rows = conn.execute("""
+            SELECT * FROM products
+            WHERE is_active = 1 AND id > ?
+            ORDER BY id
+            LIMIT ?
+        """, (after_id, batch_size)).fetchall()
+        conn.close()
+        if not rows:
+            return
+        batch = [dict(row) for row in rows]
+        after_id = batch[-1]['id']
+        yield batch
+
+
+def change_lines(db: Database, changes: List[Dict]) -> List[Dict]:
+    """Cambios del log -> líneas NDJSON (las eliminaciones no se propagan)"""
+    lines = []
+    for change in changes:
+        if change['op'] in ('insert', 'update'):
+            lines.append(product_line(change['product']))
+        elif change['op'] == 'deactivate':
+            product = db.get_product_by_id(change['product_id'])
+            if product:
+                lines.append({'source_url': product['source_url'], 'is_active': 0})
+    return lines
+
+
+def add_counts(totals: Dict, result: Dict):
+    for key in ('inserted', 'updated', 'deactivated', 'errors'):
+        totals[key] = totals.get(key, 0) + result.get(key, 0)
+
+
+def sync(db: Database, api_url: str, checkpoint_path: str = CHECKPOINT_FILE,
+         batch_size: int = BATCH_SIZE, full: bool = False,
+         session: Optional[requests.Session] = None) -> Dict:
+    """
+    Sincroniza la BD local con la API remota
+
+    Returns:
+        Totales devueltos por la API (inserted, updated, deactivated, errors) y sent
+    """
+    session = session or create_session()
+    state = {} if full else load_checkpoint(checkpoint_path, api_url)
+    totals = {'sent': 0}
+
+    if 'cursor' in state and 'full_after_id' not in state:
+        # Incremental: solo lo cambiado desde el último cursor
+        cursor = state['cursor']
+        while True:
+            page = db.get_changes(cursor, limit=batch_size)
+            if page['reset']:
+                print("⚠️ El checkpoint es más antiguo que el log de cambios: carga completa")
+                return sync(db, api_url, checkpoint_path, batch_size, full=True, session=session)
+
+            lines = change_lines(db, page['changes'])
+            if lines:
+                add_counts(totals, upload_batch(session, api_url, lines))
+                totals['sent'] += len(lines)
+                print(f"✅ {totals['sent']} cambios enviados")
+
+            cursor = page['next_cursor']
+            save_checkpoint(checkpoint_path, api_url, {'cursor': cursor})
+            if not page['has_more']:
+                return totals
+
+    # Carga completa (o reanudación de una interrumpida). El cursor se toma
+    # antes de leer, así lo que cambie durante la carga se envía la próxima vez
+    if 'full_after_id' not in state:
+        state = {'cursor': db.get_change_cursor(), 'full_after_id': 0}
+    else:
+        print(f"↩️  Reanudando carga completa desde el producto {state['full_after_id']}")
+
+    for batch in iter_full_batches(db, state['full_after_id'], batch_size):
+        add_counts(totals, upload_batch(session, api_url, [product_line(row) for row in batch]))
+        totals['sent'] += len(batch)
+        state['full_after_id'] = batch[-1]['id']
+        save_checkpoint(checkpoint_path, api_url, state)
+        print(f"✅ {totals['sent']} productos enviados")
+
+    save_checkpoint(checkpoint_path, api_url, {'cursor': state['cursor']})
+    return totals
 
-def get_local_products() -> List[Dict]:
-    """Obtiene todos los productos de la BD local"""
-    conn = sqlite3.connect(LOCAL_DB)
-    conn.row_factory = sqlite3.Row
-    cursor = conn.cursor()
-    
-    cursor.execute("""
-        SELECT * FROM products 
-        ORDER BY store, component_type
-    """)
-    
-    products = [dict(row) for row in cursor.fetchall()]
-    conn.close()
-    
-    print(f"📦 Encontrados {len(products)} productos locales")
-    return products
-
-def upload_product(product: Dict) -> bool:
-    """Sube un producto a la API remota usando el endpoint POST /api/products"""
-    try:
-        # Mapear campos de BD a API
-        payload = {
-            "name": product["name"],
-            "price": float(product["price_usd"]),
-            "currency": product.get("currency", "USD"),
-            "url": product["source_url"],
-            "store_name": product["store"],
-            "component_type": product.get("component_type"),
-            "image_url": product.get("image_url"),
-            "brand": product.get("brand"),
-            "stock_status": product.get("stock", "available"),
-            "sku": product.get("sku")
-        }
-        
-        response = requests.post(
-            f"{API_URL}/api/products",
-            json=payload,
-            timeout=30
-        )
-        
-        if response.status_code in [200, 201]:
-            return True
-        else:
-            print(f"   Status: {response.status_code}, Response: {response.text[:100]}")
-            return False
-    
-    except Exception as e:
-        print(f"   Exception: {e}")
-        return False
 
 def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Sube productos locales a una API remota')
+    parser.add_argument('--api-url', default=API_URL, help=f'URL de la API (default: {API_URL})')
+    parser.add_argument('--db', default=LOCAL_DB, help=f'Base de datos local (default: {LOCAL_DB})')
+    parser.add_argument('--batch-size', type=int, default=BATCH_SIZE,
+                        help=f'Productos por lote (default: {BATCH_SIZE})')
+    parser.add_argument('--checkpoint', default=CHECKPOINT_FILE,
+                        help=f'Archivo de checkpoint (default: {CHECKPOINT_FILE})')
+    parser.add_argument('--full', action='store_true',
+                        help='Ignorar el checkpoint y subir todo de nuevo')
+
+    args = parser.parse_args()
+    api_url = args.api_url.rstrip('/')
+
     print("🚀 Iniciando carga de productos a API remota...")
-    print(f"🎯 Destino: {API_URL}")
-    
-    # Obtener productos locales
-    products = get_local_products()
-    
-    # Agrupar por tienda
-    by_store = {}
-    for p in products:
-        store = p["store"]
-        by_store.setdefault(store, []).append(p)
-    
-    print(f"\n📊 Productos por tienda:")
-    for store, prods in by_store.items():
-        print(f"  - {store}: {len(prods)} productos")
-    
-    # Subir productos
-    print(f"\n⬆️  Subiendo productos...")
-    success = 0
-    failed = 0
-    
-    for i, product in enumerate(products, 1):
-        if upload_product(product):
-            success += 1
-            print(f"✅ [{i}/{len(products)}] {product['name'][:50]}")
-        else:
-            failed += 1
-            print(f"❌ [{i}/{len(products)}] Error: {product['name'][:50]}")
-        
-        # Rate limiting: 1 request por segundo
-        if i % 10 == 0:
-            print(f"⏸️  Pausa (evitar sobrecarga)...")
-            time.sleep(2)
-        else:
-            time.sleep(0.5)
-    
-    print(f"\n✨ Completado!")
-    print(f"  ✅ Exitosos: {success}")
-    print(f"  ❌ Fallidos: {failed}")
-    print(f"  📊 Total: {len(products)}")
+    print(f"🎯 Destino: {api_url}")
+
+    db = Database(args.db)
+    db.init_db()
+
+    start = time.time()
+    totals = sync(db, api_url, args.checkpoint, args.batch_size, args.full)
+
+    print(f"\n✨ Completado en {time.time() - start:.1f}s!")
+    print(f"  📤 Enviados: {totals['sent']}")
+    print(f"  ➕ Insertados: {totals.get('inserted', 0)}")
+    print(f"  🔄 Actualizados: {totals.get('updated', 0)}")
+    print(f"  ⏸️  Desactivados: {totals.get('deactivated', 0)}")
+    print(f"  ❌ Fallidos: {totals.get('errors', 0)}")
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,63 @@
+"""
+Proceso de escritura: el único que scrapea y modifica la base de datos
+cuando la API corre en workers de solo lectura (scripts/serve.py)
+
+Ejecuta el scheduler (tareas de scraping, rollup del historial, ofertas y
+limpieza del log de cambios) contra la misma base, en modo WAL.
+
+Uso:
+    python scripts/writer.py            # scheduler en primer plano
+    python scripts/writer.py --once     # ejecuta las tareas pendientes y sale
+    python scripts/writer.py --init     # solo crea/migra el esquema
+"""
+
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from storage import open_storage, is_postgres_url
+from config import config
+
+
+def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Proceso de escritura (scraping programado)')
+    parser.add_argument('--db', default=config.DATABASE_URL or config.DATABASE_PATH,
+                        help='Ruta a la base SQLite o URL postgresql:// (default: DATABASE_URL o DATABASE_PATH)')
+    parser.add_argument('--once', action='store_true', help='Ejecutar las tareas pendientes una vez y salir')
+    parser.add_argument('--init', action='store_true', help='Crear/migrar el esquema y salir')
+
+    args = parser.parse_args()
+
+    db = open_storage(args.db, pool_size=config.DATABASE_POOL_SIZE)
+    db.init_db()
+    if is_postgres_url(args.db):
+        print("✍️  Writer sobre PostgreSQL")
+    else:
+        print(f"✍️  Writer sobre {args.db} (journal {db.enable_wal()})")
+    if args.init:
+        return
+
+    # Imported here: pulls in every scraper, which --init does not need
+    from scheduler import ScrapingScheduler
+
+    scheduler = ScrapingScheduler(db)
+    if args.once:
+        results = scheduler.check_and_run_tasks()
+        print(f"✅ {sum(len(runs) for runs in results.values())} tarea(s) ejecutada(s)")
+        return
+
+    scheduler.start_scheduler()
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        scheduler.stop_scheduler()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,234 @@
+"""
+Snapshot Formats
+Line-delimited JSON (and optional Parquet) snapshots of scrape outputs,
+with readers that stream rows and only materialize the requested columns
+"""
+
+import json
+import os
+from datetime import datetime
+from typing import Dict, Iterator, List, Optional
+
+# Column order for columnar exports (matches Database.insert_product fields)
+SNAPSHOT_COLUMNS = [
+    'name', 'normalized_name', 'component_type', 'brand', 'sku',
+    'price_usd', 'price_local', 'currency', 'stock', 'store',
+    'source_url', 'image_url', 'last_scraped', 'metadata'
+]
+
+# File names looked up by find_snapshot(), in order of preference
+SNAPSHOT_FILES = {
+    'ndjson': 'products.ndjson',
+    'parquet': 'products.parquet',
+    'json': 'products.json',
+}
+
+
+def _product_json(product) -> str:
+    """Serializes a Product record or a product dictionary"""
+    if hasattr(product, 'to_json'):
+        return product.to_json()
+    return json.dumps(product, ensure_ascii=False)
+
+
+class JsonSnapshotSink:
+    """
+    Writes products.json incrementally as pages arrive
+
+    Produces the same document as the old run.py scripts
+    ({'timestamp', 'categories', 'total_products'}) without holding
+    the whole catalog in memory. Pages must arrive grouped by category.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self.total_products = 0
+        self._current_category = None
+        self._first_in_category = True
+        self._file = open(path, 'w', encoding='utf-8')
+        self._file.write('{\n  "timestamp": %s,\n  "categories": {' % json.dumps(datetime.now().isoformat()))
+        self._first_category = True
+
+    def write(self, category_key: str, products: List[Dict]):
+        """Appends a page of products to the snapshot"""
+        if category_key != self._current_category:
+            if self._current_category is not None:
+                self._file.write('\n    ]')
+            self._file.write('\n' if self._first_category else ',\n')
+            self._file.write('    %s: [' % json.dumps(category_key, ensure_ascii=False))
+            self._current_category = category_key
+            self._first_category = False
+            self._first_in_category = True
+
+        for product in products:
+            self._file.write('\n      ' if self._first_in_category else ',\n      ')
+            self._file.write(_product_json(product))
+            self._first_in_category = False
+            self.total_products += 1
+
+    def close(self):
+        """Closes the JSON document"""
+        if self._file.closed:
+            return
+        if self._current_category is not None:
+            self._file.write('\n    ]\n  ')
+        self._file.write('},\n  "total_products": %d\n}\n' % self.total_products)
+        self._file.close()
+
+
+class NdjsonSnapshotSink:
+    """Writes one product per line as pages arrive"""
+
+    def __init__(self, path: str):
+        self.path = path
+        self.total_products = 0
+        self._file = open(path, 'w', encoding='utf-8')
+
+    def write(self, category_key: str, products: List[Dict]):
+        """Appends a page of products"""
+        for product in products:
+            self._file.write(_product_json(product))
+            self._file.write('\n')
+        self.total_products += len(products)
+
+    def close(self):
+        """Closes the snapshot file"""
+        if not self._file.closed:
+            self._file.close()
+
+
+class ParquetSnapshotSink:
+    """
+    Writes products to a Parquet file, one row group per page
+
+    Requires the optional pyarrow package. metadata is stored as a JSON
+    string column so the schema stays flat.
+    """
+
+    def __init__(self, path: str):
+        try:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+        except ImportError:
+            raise RuntimeError("Exportar Parquet requiere pyarrow: pip install pyarrow")
+
+        self.path = path
+        self.total_products = 0
+        self._pa = pa
+        self._schema = pa.schema([
+            (column, pa.float64() if column in ('price_usd', 'price_local') else pa.string())
+            for column in SNAPSHOT_COLUMNS
+        ])
+        self._writer = pq.ParquetWriter(path, self._schema, compression='zstd')
+
+    def write(self, category_key: str, products: List[Dict]):
+        """Appends a page of products as a row group"""
+        if not products:
+            return
+        columns = {column: [] for column in SNAPSHOT_COLUMNS}
+        for product in products:
+            for column in SNAPSHOT_COLUMNS:
+                value = product.get(column)
+                if column == 'metadata':
+                    value = json.dumps(value, ensure_ascii=False) if value else None
+                elif value is not None and column not in ('price_usd', 'price_local'):
+                    value = str(value)
+                columns[column].append(value)
+        self._writer.write_table(self._pa.Table.from_pydict(columns, schema=self._schema))
+        self.total_products += len(products)
+
+    def close(self):
+        """Finalizes the Parquet footer"""
+        if self._writer:
+            self._writer.close()
+            self._writer = None
+
+
+def build_snapshot_sinks(directory: str, formats: List[str]) -> List:
+    """
+    Creates one sink per requested format inside directory
+
+    Args:
+        directory: Output directory (usually the scraper directory)
+        formats: Any of 'ndjson', 'parquet', 'json'
+    """
+    sink_classes = {
+        'ndjson': NdjsonSnapshotSink,
+        'parquet': ParquetSnapshotSink,
+        'json': JsonSnapshotSink,
+    }
+    return [sink_classes[fmt](os.path.join(directory, SNAPSHOT_FILES[fmt])) for fmt in formats]
+
+
+def find_snapshot(directory: str) -> Optional[str]:
+    """Returns the preferred snapshot file in directory, or None"""
+    for filename in SNAPSHOT_FILES.values():
+        path = os.path.join(directory, filename)
+        if os.path.exists(path):
+            return path
+    return None
+
+
+def _project(product: Dict, columns: Optional[List[str]]) -> Dict:
+    if columns is None:
+        return product
+    return {column: product.get(column) for column in columns}
+
+
+def iter_snapshot(path: str, columns: Optional[List[str]] = None,
+                  batch_size: int = 1024) -> Iterator[Dict]:
+    """
+    Streams products from a snapshot file
+
+    Supports .ndjson (read line by line), .parquet (memory-mapped, only the
+    requested columns are decoded) and legacy products.json documents.
+    For legacy documents the category key overrides component_type, which
+    is what the load_to_db.py scripts always did.
+
+    Args:
+        path: Snapshot file path
+        columns: Columns to return (None = all)
+        batch_size: Rows per decoded batch for Parquet
+    """
+    if path.endswith('.ndjson'):
+        with open(path, 'r', encoding='utf-8') as f:
+            for line in f:
+                if line.strip():
+                    yield _project(json.loads(line), columns)
+
+    elif path.endswith('.parquet'):
+        try:
+            import pyarrow.parquet as pq
+        except ImportError:
+            raise RuntimeError("Leer Parquet requiere pyarrow: pip install pyarrow")
+
+        parquet_file = pq.ParquetFile(path, memory_map=True)
+        for batch in parquet_file.iter_batches(batch_size=batch_size, columns=columns):
+            for product in batch.to_pylist():
+                if product.get('metadata'):
+                    product['metadata'] = json.loads(product['metadata'])
+                yield product
+
+    else:
+        with open(path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        for category_key, products in data.get('categories', {}).items():
+            for product in products:
+                product['component_type'] = category_key
+                yield _project(product, columns)
+
+
+def read_columns(path: str, columns: List[str]) -> Dict[str, list]:
+    """Reads only the given columns of a snapshot into column lists"""
+    if path.endswith('.parquet'):
+        try:
+            import pyarrow.parquet as pq
+        except ImportError:
+            raise RuntimeError("Leer Parquet requiere pyarrow: pip install pyarrow")
+        return pq.read_table(path, columns=columns, memory_map=True).to_pydict()
+
+    result = {column: [] for column in columns}
+    for product in iter_snapshot(path, columns=columns):
+        for column in columns:
+            result[column].append(product.get(column))
+    return result
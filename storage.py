@@ -0,0 +1,167 @@
+"""
+Storage Interface
+The catalog operations used by the API, the loaders and the batch jobs,
+independent of the database engine
+
+Two backends implement it: database.Database (SQLite file, the default)
+and pg_database.PostgresDatabase (PostgreSQL, shared by several API nodes).
+open_storage() picks one from DATABASE_URL / DATABASE_PATH.
+"""
+
+from abc import ABC, abstractmethod
+from typing import Dict, List, Optional
+
+
+class Storage(ABC):
+    """
+    Catalog storage backend
+
+    Connections follow the sqlite3 API whatever the engine: qmark (?)
+    placeholders, rows readable by column name or position, and close()
+    discarding uncommitted work.
+    """
+
+    read_only: bool = False
+
+    @abstractmethod
+    def get_connection(self):
+        """Returns a new (or pooled) connection; callers close() it"""
+
+    def close(self):
+        """Releases pooled connections (nothing to do for per-call connections)"""
+
+    @abstractmethod
+    def init_db(self):
+        """Creates or migrates the schema"""
+
+    # Writes
+
+    @abstractmethod
+    def insert_product(self, product) -> bool:
+        """Inserts or updates one product"""
+
+    @abstractmethod
+    def upsert_products(self, products: List) -> Dict:
+        """Inserts or updates a batch; returns 'inserted', 'updated' and 'errors' counts"""
+
+    @abstractmethod
+    def deactivate_products(self, source_urls: List[str]) -> int:
+        """Marks products inactive by source URL"""
+
+    @abstractmethod
+    def refresh_store_counts(self, names: Optional[set] = None):
+        """Recomputes products.store_count"""
+
+    @abstractmethod
+    def delete_product(self, product_id: int) -> bool:
+        """Deletes a product and its history"""
+
+    # Catalog reads
+
+    @abstractmethod
+    def get_products(self, skip: int = 0, limit: int = 50, filters=None) -> List[Dict]:
+        """Products with optional filters, most recently scraped first"""
+
+    @abstractmethod
+    def count_products(self, filters=None) -> int:
+        """Counts products with optional filters"""
+
+    @abstractmethod
+    def get_product_by_id(self, product_id: int) -> Optional[Dict]:
+        """A single product, or None"""
+
+    @abstractmethod
+    def search_products(self, query: str, limit: int = 20) -> List[Dict]:
+        """Products matching a search term, cheapest first"""
+
+    @abstractmethod
+    def get_all_stores(self) -> List[str]:
+        """Distinct stores"""
+
+    @abstractmethod
+    def get_all_brands(self) -> List[str]:
+        """Distinct brands"""
+
+    @abstractmethod
+    def get_all_types(self) -> List[str]:
+        """Distinct component types"""
+
+    @abstractmethod
+    def get_statistics(self) -> Dict:
+        """Totals by type and store plus price range"""
+
+    @abstractmethod
+    def get_deals(self, component_type: Optional[str] = None, limit: int = 10) -> List[Dict]:
+        """Best current deals computed by deals.refresh_deals()"""
+
+    # Price history
+
+    @abstractmethod
+    def get_price_history(self, product_id: int) -> List[Dict]:
+        """Raw price history of a product, newest first"""
+
+    @abstractmethod
+    def get_price_series(self, product_id: int, resolution: str = 'auto',
+                         days: Optional[int] = None, max_points: int = 500,
+                         raw_days: int = 30) -> Dict:
+        """Chart-ready price series (raw, daily or weekly buckets)"""
+
+    @abstractmethod
+    def rollup_price_history(self, compact_after_days: Optional[int] = None) -> Dict[str, int]:
+        """Folds new price_history rows into daily and weekly buckets"""
+
+    # Change log (/api/changes)
+
+    @abstractmethod
+    def get_change_cursor(self) -> int:
+        """Latest change log id (0 if there are none)"""
+
+    @abstractmethod
+    def get_changes(self, since: int = 0, limit: int = 1000) -> Dict:
+        """Products changed after a cursor, one entry per product"""
+
+    @abstractmethod
+    def prune_changes(self, keep_days: int) -> int:
+        """Deletes change log rows older than keep_days"""
+
+    # Scrape traces (scrapers/tracing.py)
+
+    @abstractmethod
+    def save_scrape_spans(self, run_id: str, spans: List[Dict]) -> int:
+        """Stores the aggregated spans of a scrape run"""
+
+    @abstractmethod
+    def get_scrape_spans(self, run_id: Optional[str] = None) -> List[Dict]:
+        """Spans of a scrape run (the latest run when run_id is None)"""
+
+    @abstractmethod
+    def get_scrape_runs(self, limit: int = 10) -> List[Dict]:
+        """Latest traced scrape runs"""
+
+    @abstractmethod
+    def get_scrape_metrics(self) -> List[Dict]:
+        """Per-store scrape counters for /metrics"""
+
+
+def is_postgres_url(target: str) -> bool:
+    """True for postgresql:// (or postgres://) connection URLs"""
+    return target.startswith(('postgresql://', 'postgres://'))
+
+
+def open_storage(target: str, profiler=None, read_only: bool = False, pool_size: int = 10) -> Storage:
+    """
+    Opens the storage backend for a database target
+
+    Args:
+        target: PostgreSQL URL or SQLite file path
+        profiler: Optional profiler.QueryProfiler (SQLite only)
+        read_only: Reject every write (API serving workers)
+        pool_size: Maximum pooled connections per process (PostgreSQL only)
+    """
+    if is_postgres_url(target):
+        # Imported here: psycopg is only needed when PostgreSQL is configured
+        from pg_database import PostgresDatabase
+        return PostgresDatabase(target, read_only=read_only, pool_size=pool_size)
+
+    from database import Database
+    return Database(target, profiler=profiler, read_only=read_only)
@@ -0,0 +1,49 @@
+"""
+Pruebas de los fixtures de benchmark: cada scraper los parsea a través del stub
+"""
+import sys
+import os
+import time
+
+import pytest
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT_DIR)
+sys.path.insert(0, os.path.join(ROOT_DIR, 'benchmarks'))
+
+from fixtures import STORES, PRODUCTS_PER_PAGE, category_url
+from stub_server import StubServer
+from bench_scrapers import make_scraper, scrape, compare
+
+
+@pytest.fixture(scope='module')
+def stub():
+    with StubServer() as server:
+        yield server
+
+
+@pytest.mark.parametrize('store_key', list(STORES))
+def test_scraper_parses_fixtures(stub, store_key, monkeypatch):
+    monkeypatch.setattr(time, 'sleep', lambda seconds: None)
+    products = scrape(make_scraper(store_key), store_key, category_url(stub.url, store_key))
+
+    assert len(products) >= PRODUCTS_PER_PAGE
+    for product in products:
+        assert product['name']
+        assert product['price_usd'] > 0 and product['price_local'] > 0
+        assert product['source_url']
+
+
+def test_stub_rejects_unknown_paths(stub):
+    assert stub.load('/sercoplus/procesadores?page=99') is None
+    assert stub.load('/no-existe') is None
+
+
+def test_compare_flags_regressions():
+    baseline = {'a.e2e_pages_per_sec': 100.0, 'a.parse_ms_per_page': 10.0, 'db_insert_ms_per_1k': 50.0}
+    metrics = {'a.e2e_pages_per_sec': 70.0, 'a.parse_ms_per_page': 12.0, 'db_insert_ms_per_1k': 70.0,
+               'nueva_metrica': 1.0}
+
+    flagged = {name for name, _, _, _, regression in compare(metrics, baseline, 0.25) if regression}
+
+    assert flagged == {'a.e2e_pages_per_sec', 'db_insert_ms_per_1k'}
@@ -0,0 +1,150 @@
+"""
+Pruebas de POST /api/products/bulk y del uploader incremental contra un uvicorn local
+"""
+import sys
+import os
+import gzip
+import json
+import socket
+import threading
+import time
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT_DIR)
+sys.path.insert(0, os.path.join(ROOT_DIR, 'scripts'))
+
+import pytest
+
+uvicorn = pytest.importorskip('uvicorn')
+
+import main
+import upload_to_api
+from database import Database
+
+
+def product(sku, price=100.0):
+    return {
+        'name': f'Producto {sku}', 'normalized_name': f'PRODUCTO {sku}', 'store': 'sercoplus',
+        'sku': sku, 'source_url': f'https://sercoplus.example/{sku}', 'price_usd': price,
+        'metadata': {'sku_interno': sku},
+    }
+
+
+@pytest.fixture
+def remote(tmp_path, monkeypatch):
+    """API real servida por uvicorn con su propia BD temporal"""
+    remote_db = Database(str(tmp_path / 'remote.db'))
+    monkeypatch.setattr(main, 'db', remote_db)
+
+    sock = socket.socket()
+    sock.bind(('127.0.0.1', 0))
+    server = uvicorn.Server(uvicorn.Config(main.app, log_level='warning'))
+    thread = threading.Thread(target=server.run, kwargs={'sockets': [sock]}, daemon=True)
+    thread.start()
+    while not server.started:
+        time.sleep(0.01)
+
+    yield f'http://127.0.0.1:{sock.getsockname()[1]}', remote_db
+
+    server.should_exit = True
+    thread.join(timeout=5)
+
+
+@pytest.fixture
+def local(tmp_path):
+    local_db = Database(str(tmp_path / 'local.db'))
+    local_db.init_db()
+    return local_db
+
+
+def remote_prices(remote_db):
+    """Precios de los productos activos en la API remota"""
+    return {p['sku']: p['price_usd'] for p in remote_db.get_products(limit=100) if p['is_active']}
+
+
+def test_bulk_endpoint_accepts_gzipped_ndjson(remote):
+    url, remote_db = remote
+    lines = [json.dumps(product('1')), '{no es json', json.dumps(product('2'))]
+    body = gzip.compress('\n'.join(lines).encode('utf-8'))
+
+    session = upload_to_api.create_session()
+    response = session.post(f'{url}/api/products/bulk', data=body,
+                            headers={'Content-Encoding': 'gzip'})
+
+    assert response.status_code == 200
+    assert response.json() == {'received': 3, 'inserted': 2, 'updated': 0,
+                               'deactivated': 0, 'errors': 1}
+    metadata = {p['sku']: json.loads(p['metadata']) for p in remote_db.get_products()}
+    assert metadata == {'1': {'sku_interno': '1'}, '2': {'sku_interno': '2'}}
+
+
+def test_bulk_endpoint_reads_every_gzip_member(remote):
+    """Un cuerpo con varios miembros gzip (cat a.gz b.gz) se carga completo"""
+    url, remote_db = remote
+    first, second = (json.dumps(product(sku)) + '\n' for sku in ('1', '2'))
+    body = gzip.compress(first.encode()) + gzip.compress(second.encode())
+
+    response = upload_to_api.create_session().post(f'{url}/api/products/bulk', data=body)
+
+    assert response.json()['inserted'] == 2
+    assert sorted(remote_prices(remote_db)) == ['1', '2']
+
+
+def test_bulk_endpoint_rejects_truncated_gzip(remote):
+    """Un gzip truncado responde 400 en lugar de cargar solo una parte"""
+    url, remote_db = remote
+    body = gzip.compress('\n'.join(json.dumps(product(str(i))) for i in range(50)).encode())
+
+    response = upload_to_api.create_session().post(f'{url}/api/products/bulk', data=body[:-12])
+
+    assert response.status_code == 400
+    assert remote_prices(remote_db) == {}
+
+
+def test_bulk_endpoint_caps_the_compressed_body(remote, monkeypatch):
+    """El límite se aplica al cuerpo recibido, antes de descomprimir"""
+    url, remote_db = remote
+    monkeypatch.setattr(main.config, 'BULK_MAX_BYTES', 510)  # Fits decompressed, not compressed
+    body = gzip.compress(os.urandom(500))
+
+    response = upload_to_api.create_session().post(f'{url}/api/products/bulk', data=body)
+
+    assert response.status_code == 413
+
+
+def test_sync_sends_only_changes_after_checkpoint(remote, local, tmp_path):
+    url, remote_db = remote
+    checkpoint = str(tmp_path / 'checkpoint.json')
+    local.upsert_products([product(str(i)) for i in range(5)])
+
+    first = upload_to_api.sync(local, url, checkpoint, batch_size=2)
+    assert first['sent'] == 5 and first['inserted'] == 5
+
+    local.upsert_products([product('1', price=90.0)] + [product(str(i)) for i in range(5) if i != 1])
+    conn = local.get_connection()
+    conn.execute("UPDATE products SET is_active = 0 WHERE sku = '4'")
+    conn.commit()
+    conn.close()
+
+    second = upload_to_api.sync(local, url, checkpoint, batch_size=2)
+
+    assert second['sent'] == 2
+    assert (second['updated'], second['deactivated']) == (1, 1)
+    assert remote_prices(remote_db) == {'0': 100.0, '1': 90.0, '2': 100.0, '3': 100.0}
+    assert upload_to_api.sync(local, url, checkpoint)['sent'] == 0
+
+
+def test_full_upload_resumes_from_checkpoint(remote, local, tmp_path):
+    url, remote_db = remote
+    checkpoint = str(tmp_path / 'checkpoint.json')
+    local.upsert_products([product(str(i)) for i in range(4)])
+    ids = sorted(p['id'] for p in local.get_products())
+
+    # Interrupted after the first two products
+    upload_to_api.save_checkpoint(checkpoint, url, {'cursor': 0, 'full_after_id': ids[1]})
+
+    totals = upload_to_api.sync(local, url, checkpoint, batch_size=10)
+
+    assert totals['sent'] == 2
+    assert sorted(remote_prices(remote_db)) == ['2', '3']
+    assert upload_to_api.load_checkpoint(checkpoint, url) == {'cursor': 0}
@@ -0,0 +1,85 @@
+"""
+Pruebas de grabación y reproducción de páginas (cassettes) en BaseScraper
+"""
+import sys
+import os
+import time
+
+import pytest
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT_DIR)
+sys.path.insert(0, os.path.join(ROOT_DIR, 'benchmarks'))
+
+from fixtures import category_url
+from stub_server import StubServer
+from scrapers.registry import create_scraper
+from scrapers.cassette import Cassette
+
+
+def scrape_all(scraper, url):
+    return [product for page in scraper.iter_category_pages(url) for product in page]
+
+
+def without_timestamps(products):
+    return [{key: value for key, value in dict(p).items() if key != 'last_scraped'} for p in products]
+
+
+@pytest.fixture
+def cassette_env(tmp_path, monkeypatch):
+    monkeypatch.setenv('SCRAPER_CASSETTE_DIR', str(tmp_path))
+    monkeypatch.setattr(time, 'sleep', lambda seconds: None)
+    return monkeypatch
+
+
+def test_replay_reproduces_recorded_run(cassette_env, tmp_path):
+    cassette_env.setenv('SCRAPER_CASSETTE_MODE', 'record')
+    with StubServer() as stub:
+        url = category_url(stub.url, 'sercoplus')
+        scraper = create_scraper('sercoplus', use_selenium=False)
+        recorded = scrape_all(scraper, url)
+        scraper.cassette.close()
+        assert len(stub.requests) == 2
+
+    # Stub stopped: every page has to come from the cassette
+    cassette_env.setenv('SCRAPER_CASSETTE_MODE', 'replay')
+    scraper = create_scraper('sercoplus', use_selenium=True)
+    replayed = scrape_all(scraper, url)
+
+    assert (tmp_path / 'sercoplus.ndjson.gz').exists()
+    assert scraper.driver is None
+    assert without_timestamps(replayed) == without_timestamps(recorded)
+    assert scraper.cassette.hits == 2 and scraper.cassette.misses == 0
+
+
+def test_replay_latency_and_missing_urls(tmp_path):
+    path = str(tmp_path / 'tienda.ndjson.gz')
+    recorder = Cassette(path, 'record')
+    recorder.record('http://tienda/a', '<html><h1>A</h1></html>')
+    recorder.record('http://tienda/caida', None, status=503)
+    recorder.close()
+
+    cassette = Cassette(path, 'replay', latency=0.05)
+    started = time.perf_counter()
+    assert cassette.play('http://tienda/a') == '<html><h1>A</h1></html>'
+    assert time.perf_counter() - started >= 0.05
+    assert cassette.play('http://tienda/caida') is None
+    assert cassette.play('http://tienda/no-grabada') is None
+    assert (cassette.hits, cassette.misses) == (2, 1)
+
+
+def test_store_worker_closes_recorded_cassette(cassette_env, tmp_path):
+    """scrape_store cierra el cassette: los workers del pool salen sin pasar por atexit"""
+    import queue
+    sys.path.insert(0, os.path.join(ROOT_DIR, 'scripts'))
+    import run_all_scrapers_complete as orchestrator
+
+    cassette_env.setenv('SCRAPER_CASSETTE_MODE', 'record')
+    with StubServer() as stub:
+        cassette_env.setattr(orchestrator, 'get_categories',
+                             lambda store_key: {'procesadores': category_url(stub.url, store_key)})
+        result = orchestrator.scrape_store('sercoplus', queue.Queue())
+
+    assert result['error'] is None and result['products'] > 0
+    replay = Cassette(str(tmp_path / 'sercoplus.ndjson.gz'), 'replay')
+    assert len(replay._entries) == 2
@@ -0,0 +1,51 @@
+"""
+Pruebas del generador de catálogo sintético
+"""
+import sys
+import os
+import sqlite3
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT_DIR)
+sys.path.insert(0, os.path.join(ROOT_DIR, 'benchmarks'))
+
+from catalog import build_catalog, load_profile
+
+
+def rows(db_path, query):
+    conn = sqlite3.connect(db_path)
+    result = conn.execute(query).fetchall()
+    conn.close()
+    return result
+
+
+def test_catalog_follows_source_distributions(tmp_path):
+    """Tiendas y tipos del origen, historial por producto y duplicados entre tiendas"""
+    db_path = str(tmp_path / 'catalog.db')
+    profile = load_profile()
+
+    assert build_catalog(db_path, 2000, history=4, with_deals=False) == 2000
+
+    stores = {store for store, in rows(db_path, "SELECT DISTINCT store FROM products")}
+    types = {component_type for component_type, in rows(db_path, "SELECT DISTINCT component_type FROM products")}
+    assert stores == set(profile['stores'])
+    assert types <= set(profile['types'])
+    assert rows(db_path, "SELECT COUNT(*) FROM price_history")[0][0] == 8000
+    # Last history point is the current price
+    assert rows(db_path, """
+        SELECT COUNT(*) FROM products p JOIN price_history h ON h.product_id = p.id
+        WHERE h.recorded_at = (SELECT MAX(recorded_at) FROM price_history WHERE product_id = p.id)
+          AND h.price_usd != p.price_usd
+    """)[0][0] == 0
+    shared = rows(db_path, "SELECT COUNT(*) FROM products WHERE store_count > 1")[0][0]
+    assert 0 < shared < 2000
+
+
+def test_catalog_is_reproducible(tmp_path):
+    """La misma semilla genera los mismos productos"""
+    first, second = str(tmp_path / 'a.db'), str(tmp_path / 'b.db')
+    build_catalog(first, 300, seed=7, history=1, with_deals=False)
+    build_catalog(second, 300, seed=7, history=1, with_deals=False)
+
+    query = "SELECT name, store, price_usd FROM products ORDER BY id"
+    assert rows(first, query) == rows(second, query)
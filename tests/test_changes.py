@@ -0,0 +1,88 @@
+"""
+Pruebas del log de cambios (product_changes) y del feed /api/changes
+"""
+import sys
+import os
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT_DIR)
+
+import pytest
+
+from database import Database
+
+
+def product(sku, price=100.0, stock='5'):
+    return {
+        'name': f'Producto {sku}', 'normalized_name': f'PRODUCTO {sku}', 'store': 'sercoplus',
+        'sku': sku, 'source_url': f'https://sercoplus.example/{sku}',
+        'price_usd': price, 'stock': stock,
+    }
+
+
+@pytest.fixture
+def db(tmp_path):
+    database = Database(str(tmp_path / 'test.db'))
+    database.init_db()
+    return database
+
+
+def ops(feed):
+    return [(change['product']['sku'] if change['product'] else change['product_id'], change['op'])
+            for change in feed['changes']]
+
+
+def test_unchanged_rescrape_produces_no_changes(db):
+    db.upsert_products([product('1'), product('2')])
+    cursor = db.get_change_cursor()
+
+    db.upsert_products([product('1'), product('2')])
+
+    assert db.get_changes(cursor)['changes'] == []
+    assert db.get_changes(cursor)['next_cursor'] == cursor
+
+
+def test_feed_collapses_changes_per_product(db):
+    db.upsert_products([product('1'), product('2')])
+    cursor = db.get_change_cursor()
+
+    db.upsert_products([product('1', price=90.0), product('3')])
+    db.upsert_products([product('1', price=80.0)])
+    feed = db.get_changes(cursor)
+
+    assert ops(feed) == [('3', 'insert'), ('1', 'update')]
+    assert feed['changes'][1]['product']['price_usd'] == 80.0
+    assert db.get_changes(feed['next_cursor'])['changes'] == []
+
+
+def test_deactivation_and_delete(db):
+    db.upsert_products([product('1'), product('2')])
+    ids = {p['sku']: p['id'] for p in db.get_products()}
+    cursor = db.get_change_cursor()
+
+    conn = db.get_connection()
+    conn.execute("UPDATE products SET is_active = 0 WHERE id = ?", (ids['1'],))
+    conn.commit()
+    conn.close()
+    db.delete_product(ids['2'])
+
+    feed = db.get_changes(cursor)
+    assert ops(feed) == [(ids['1'], 'deactivate'), (ids['2'], 'delete')]
+
+
+def test_paging_and_reset(db):
+    db.upsert_products([product(str(i)) for i in range(5)])
+
+    first = db.get_changes(0, limit=3)
+    second = db.get_changes(first['next_cursor'], limit=3)
+    assert first['has_more'] and not second['has_more']
+    assert len(first['changes']) + len(second['changes']) == 5
+
+    conn = db.get_connection()
+    conn.execute("UPDATE product_changes SET changed_at = '2000-01-01'")
+    conn.commit()
+    conn.close()
+    db.prune_changes(keep_days=30)
+
+    assert db.get_changes(0)['reset'] is True
+    assert db.get_changes(db.get_change_cursor() - 1)['reset'] is False
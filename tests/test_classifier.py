@@ -0,0 +1,91 @@
+"""
+Pruebas del clasificador compilado (tipo, marca y nombre normalizado)
+
+Compara contra una copia de las reglas anteriores de BaseScraper usando
+todos los nombres de los products.json de los scrapers.
+"""
+import sys
+import os
+import re
+import json
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT_DIR, 'scrapers'))
+
+import classifier
+
+
+def legacy_identify_component_type(name, category=''):
+    text = (name + ' ' + category).lower()
+    for component_type, keywords in classifier.EXCLUSION_KEYWORDS + classifier.TYPE_KEYWORDS:
+        if any(keyword in text for keyword in keywords):
+            return component_type
+    return 'otro'
+
+
+def legacy_extract_brand_from_name(name):
+    name_upper = name.upper()
+    for brand in sorted(classifier.COMMON_BRANDS, key=len, reverse=True):
+        if brand.upper() in name_upper:
+            return brand
+    for word in name.split():
+        word_upper = word.upper().strip()
+        if word_upper and word_upper not in classifier.BRAND_SKIP_WORDS and len(word_upper) > 2:
+            return word
+    return 'Unknown'
+
+
+def legacy_normalize_product_name(name):
+    name = re.sub(r'\s+', ' ', name.upper()).strip()
+    for word in classifier.REMOVE_WORDS:
+        name = name.replace(word, '')
+    for old, new in {'INTEL®': 'INTEL', 'AMD®': 'AMD', 'NVIDIA®': 'NVIDIA'}.items():
+        name = name.replace(old, new)
+    name = re.sub(r'[^\w\s\-/.]', '', name)
+    return re.sub(r'\s+', ' ', name).strip()
+
+
+def fixture_products():
+    for store in ['sercoplus', 'impacto', 'cyccomputer', 'computershop']:
+        path = os.path.join(ROOT_DIR, 'scrapers', store, 'products.json')
+        with open(path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        for category_key, products in data['categories'].items():
+            for product in products:
+                yield product['name'], category_key
+
+
+def test_identical_results_on_fixtures():
+    checked = 0
+    for name, category_key in fixture_products():
+        for category in ('', category_key):
+            assert classifier.identify_component_type(name, category) == \
+                legacy_identify_component_type(name, category), name
+        assert classifier.extract_brand_from_name(name) == legacy_extract_brand_from_name(name), name
+        assert classifier.normalize_product_name(name) == legacy_normalize_product_name(name), name
+        checked += 1
+    assert checked > 1000
+
+
+def test_priority_with_overlapping_keywords():
+    # "case s/" (exclusion) and "case" (gabinete) start at the same position
+    assert classifier.identify_component_type('Case S/ Fuente ATX') == 'gabinete'
+    # processor keywords win over GPU keywords anywhere in the text
+    assert classifier.identify_component_type('Radeon Graphics Ryzen 5 5600G') == 'procesador'
+    assert classifier.identify_component_type('Soporte para GPU RTX') == 'accesorio'
+    assert classifier.identify_component_type('Cable HDMI') == 'otro'
+
+
+def test_longest_brand_wins():
+    assert classifier.extract_brand_from_name('Disco WD Western Digital Blue 1TB') == 'Western Digital'
+    assert classifier.extract_brand_from_name('Memoria G.Skill Trident') == 'G.Skill'
+    assert classifier.extract_brand_from_name('Cooler DEEPCOOL AK400') == 'DeepCool'
+    assert classifier.extract_brand_from_name('Tarjeta de Video Foo') == 'Foo'
+
+
+def test_classify():
+    assert classifier.classify('Procesador Intel® Core i5-12400F BOX') == {
+        'component_type': 'procesador',
+        'brand': 'Intel',
+        'normalized_name': 'INTEL CORE I5-12400F',
+    }
@@ -0,0 +1,111 @@
+"""
+Pruebas del motor de ofertas (NumPy sobre price_history)
+"""
+import sys
+import os
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT_DIR)
+
+import pytest
+
+pytest.importorskip('numpy')
+
+from database import Database
+from deals import refresh_deals
+
+
+@pytest.fixture
+def db(tmp_path):
+    database = Database(str(tmp_path / 'test.db'))
+    database.init_db()
+    return database
+
+
+def add_product(db, sku, store, price, normalized_name, history=()):
+    """Inserts a product whose price_history is `history` (days ago, price) plus today"""
+    db.insert_product({
+        'name': normalized_name.title(), 'normalized_name': normalized_name,
+        'component_type': 'procesador', 'store': store, 'sku': sku,
+        'source_url': f'https://{store}.example/{sku}', 'price_usd': price,
+    })
+    conn = db.get_connection()
+    product_id = conn.execute("SELECT id FROM products WHERE sku = ?", (sku,)).fetchone()[0]
+    conn.executemany("""
+        INSERT INTO price_history (product_id, price_usd, recorded_at)
+        VALUES (?, ?, datetime('now', ?))
+    """, [(product_id, old_price, f'-{days} days') for days, old_price in history])
+    conn.commit()
+    conn.close()
+    return product_id
+
+
+def deals_by_id(db):
+    return {deal['id']: deal for deal in db.get_deals(limit=100)}
+
+
+def test_price_drop_from_trailing_median(db):
+    dropped = add_product(db, '1', 'sercoplus', 80.0, 'RYZEN 5 5600',
+                          history=[(20, 100.0), (10, 100.0), (5, 120.0)])
+    stable = add_product(db, '2', 'sercoplus', 100.0, 'CORE I5 12400',
+                         history=[(20, 100.0), (10, 100.0)])
+
+    refresh_deals(db)
+    deals = deals_by_id(db)
+
+    assert stable not in deals
+    deal = deals[dropped]
+    assert deal['trailing_median'] == 100.0
+    assert deal['drop_pct'] == pytest.approx(0.2)
+    assert deal['all_time_low'] == 1
+
+
+def test_old_history_outside_window_is_ignored(db):
+    product = add_product(db, '1', 'sercoplus', 100.0, 'RYZEN 5 5600', history=[(90, 200.0)])
+
+    refresh_deals(db, window_days=30)
+    deal = deals_by_id(db)[product]
+
+    # Not a drop vs the (empty) window, but still the all-time low
+    assert deal['trailing_median'] is None
+    assert deal['drop_pct'] == 0
+    assert deal['all_time_low'] == 1
+
+
+def test_cross_store_spread(db):
+    cheap = add_product(db, '1', 'sercoplus', 90.0, 'RTX 4060')
+    pricey = add_product(db, '2', 'pcimpacto', 100.0, 'RTX 4060')
+    add_product(db, '3', 'pcimpacto', 50.0, 'GTX 1650')
+
+    assert refresh_deals(db) == 1
+    deal = deals_by_id(db)[cheap]
+
+    assert pricey not in deals_by_id(db)
+    assert deal['store_count'] == 2
+    assert deal['is_cheapest'] == 1
+    assert (deal['min_price_usd'], deal['max_price_usd']) == (90.0, 100.0)
+    assert deal['spread_pct'] == pytest.approx(0.1)
+
+
+def test_refresh_replaces_previous_deals(db):
+    product = add_product(db, '1', 'sercoplus', 80.0, 'RYZEN 5 5600', history=[(5, 100.0)])
+    refresh_deals(db)
+    assert product in deals_by_id(db)
+
+    db.insert_product({'name': 'Ryzen 5 5600', 'store': 'sercoplus', 'sku': '1',
+                       'source_url': 'https://sercoplus.example/1', 'price_usd': 120.0})
+    assert refresh_deals(db) == 0
+    assert db.get_deals() == []
+
+
+def test_no_active_products_with_stale_rollups(db):
+    """Sin productos activos (pero con rollups antiguos) no hay ofertas y no falla"""
+    product = add_product(db, '1', 'sercoplus', 80.0, 'RYZEN 5 5600', history=[(5, 100.0)])
+    db.rollup_price_history()
+    db.deactivate_products(['https://sercoplus.example/1'])
+
+    conn = db.get_connection()
+    assert conn.execute("SELECT COUNT(*) FROM price_rollups WHERE product_id = ?", (product,)).fetchone()[0]
+    conn.close()
+    assert refresh_deals(db) == 0
+    assert db.get_deals() == []
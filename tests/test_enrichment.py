@@ -0,0 +1,90 @@
+"""
+Pruebas de la caché de enriquecimiento (LRU + SQLite versionada)
+"""
+import sys
+import os
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT_DIR, 'scrapers'))
+
+import classifier
+import enrichment
+from enrichment import EnrichmentCache
+
+NAMES = [
+    'Procesador Intel Core i5-12400F',
+    'Tarjeta de Video ASUS RTX 4060',
+    'Memoria RAM Kingston Fury 16GB DDR4',
+]
+
+
+def counting_classify(monkeypatch):
+    calls = []
+    original = classifier.classify
+
+    def classify(name, category=''):
+        calls.append(name)
+        return original(name, category)
+
+    monkeypatch.setattr(enrichment.classifier, 'classify', classify)
+    return calls
+
+
+def test_repeat_run_does_no_classification(tmp_path, monkeypatch):
+    calls = counting_classify(monkeypatch)
+    path = str(tmp_path / 'cache.db')
+
+    first = EnrichmentCache(path)
+    results = [first.get('sercoplus', name, 'procesadores') for name in NAMES]
+    first.flush()
+    assert len(calls) == 3
+    assert results[0] == classifier.classify(NAMES[0], 'procesadores')
+
+    # A new process starts with an empty LRU but reads the persisted rows
+    calls.clear()
+    second = EnrichmentCache(path)
+    assert [second.get('sercoplus', name, 'procesadores') for name in NAMES] == results
+    assert calls == []
+    assert second.stats()['hits'] == 3
+
+
+def test_rules_version_invalidates(tmp_path, monkeypatch):
+    calls = counting_classify(monkeypatch)
+    path = str(tmp_path / 'cache.db')
+
+    cache = EnrichmentCache(path, rules_version=1)
+    cache.get('sercoplus', NAMES[0])
+    cache.flush()
+
+    calls.clear()
+    EnrichmentCache(path, rules_version=2).get('sercoplus', NAMES[0])
+    assert calls == [NAMES[0]]
+
+
+def test_key_includes_store_and_category(tmp_path):
+    cache = EnrichmentCache(None)
+    cache.get('sercoplus', 'Cooler Master Hyper 212', '')
+    cache.get('sercoplus', 'Cooler Master Hyper 212', 'procesadores')
+    cache.get('cyccomputer', 'Cooler Master Hyper 212', '')
+    assert cache.stats() == {'hits': 0, 'misses': 3, 'size': 3}
+
+
+def test_lru_is_bounded():
+    cache = EnrichmentCache(None, maxsize=2)
+    for name in NAMES:
+        cache.get('sercoplus', name)
+    cache.get('sercoplus', NAMES[0])  # evicted, classified again
+    assert cache.stats() == {'hits': 0, 'misses': 4, 'size': 2}
+
+
+def test_shared_cache_reads_config(tmp_path, monkeypatch):
+    """La caché compartida toma ruta y tamaño de config (leídos después de cargar .env)"""
+    sys.path.insert(0, ROOT_DIR)
+    from config import config
+
+    monkeypatch.setattr(config, 'ENRICHMENT_CACHE_PATH', str(tmp_path / 'cache.db'))
+    monkeypatch.setattr(config, 'ENRICHMENT_CACHE_SIZE', 7)
+    monkeypatch.setattr(enrichment, '_shared_cache', None)
+
+    cache = enrichment.get_enrichment_cache()
+    assert (cache.path, cache.maxsize) == (str(tmp_path / 'cache.db'), 7)
@@ -0,0 +1,131 @@
+"""
+Pruebas de la caché de miniaturas contra un CDN falso (http.server local)
+"""
+import sys
+import os
+import io
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT_DIR)
+
+Image = pytest.importorskip('PIL.Image')
+
+from database import Database
+from images import ImageCache, THUMBNAIL_SIZES
+
+
+def make_png(width=800, height=600):
+    buffer = io.BytesIO()
+    Image.new('RGBA', (width, height), (200, 30, 30, 128)).save(buffer, 'PNG')
+    return buffer.getvalue()
+
+
+class StubCDN:
+    """Sirve /a.png y /b.png (mismos bytes) y /page.html, contando peticiones"""
+
+    def __init__(self):
+        png = make_png()
+        self.files = {
+            '/a.png': ('image/png', png),
+            '/b.png': ('image/png', png),
+            '/page.html': ('text/html', b'<html></html>'),
+        }
+        self.requests = []
+        cdn = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def _send_headers(self):
+                if self.path not in cdn.files:
+                    self.send_error(404)
+                    return None
+                content_type, body = cdn.files[self.path]
+                self.send_response(200)
+                self.send_header('Content-Type', content_type)
+                self.send_header('Content-Length', str(len(body)))
+                self.send_header('ETag', f'"{hash(body)}"')
+                self.end_headers()
+                return body
+
+            def do_HEAD(self):
+                cdn.requests.append(('HEAD', self.path))
+                self._send_headers()
+
+            def do_GET(self):
+                cdn.requests.append(('GET', self.path))
+                body = self._send_headers()
+                if body is not None:
+                    self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        self.url = f'http://127.0.0.1:{self.server.server_address[1]}'
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+    def gets(self):
+        return [path for method, path in self.requests if method == 'GET']
+
+
+@pytest.fixture
+def cdn():
+    server = StubCDN()
+    yield server
+    server.server.shutdown()
+
+
+@pytest.fixture
+def db(tmp_path, cdn):
+    database = Database(str(tmp_path / 'test.db'))
+    database.init_db()
+    # Three products, two distinct URLs with identical bytes, one non-image
+    for sku, path in [('1', '/a.png'), ('2', '/a.png'), ('3', '/b.png'), ('4', '/page.html')]:
+        database.insert_product({
+            'name': f'Producto {sku}', 'store': 'sercoplus', 'sku': sku,
+            'source_url': f'https://example.com/{sku}', 'image_url': cdn.url + path,
+            'price_usd': 10.0,
+        })
+    return database
+
+
+def test_sync_dedups_and_writes_thumbnails(db, cdn, tmp_path):
+    cache = ImageCache(db, str(tmp_path / 'thumbs'), max_workers=4)
+
+    counts = cache.sync()
+
+    assert counts['failed'] == 1
+    assert counts['ok'] + counts['reused'] == 2
+    # Each distinct URL is downloaded once; the HTML page never is
+    assert sorted(cdn.gets()) == ['/a.png', '/b.png']
+
+    a = cache.get_image(cdn.url + '/a.png')
+    b = cache.get_image(cdn.url + '/b.png')
+    assert a['content_hash'] == b['content_hash']
+    assert (a['width'], a['height']) == (800, 600)
+    for size, pixels in THUMBNAIL_SIZES.items():
+        with Image.open(cache.thumbnail_path(a['content_hash'], size)) as thumb:
+            assert max(thumb.size) == pixels
+            assert thumb.format == 'JPEG'
+
+    products = {p['sku']: p for p in db.get_products()}
+    assert products['1']['image_hash'] == a['content_hash']
+    assert products['4']['image_hash'] is None
+    assert cache.get_image(cdn.url + '/page.html')['status'] == 'failed'
+
+
+def test_refresh_skips_unchanged_images(db, cdn, tmp_path):
+    cache = ImageCache(db, str(tmp_path / 'thumbs'))
+    cache.sync()
+    cdn.requests.clear()
+
+    # Nothing pending without --refresh except the failed URL
+    assert cache.pending_urls() == [cdn.url + '/page.html']
+
+    counts = cache.sync(refresh=True)
+
+    assert counts['unchanged'] == 2
+    assert cdn.gets() == []
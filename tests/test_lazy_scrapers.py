@@ -0,0 +1,45 @@
+"""
+Pruebas de la carga diferida de scrapers (arranque rápido de la API)
+"""
+import sys
+import os
+import subprocess
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT_DIR)
+
+from scrapers.registry import ScraperRegistry
+
+
+class FakeScraper:
+    instances = 0
+
+    def __init__(self, **kwargs):
+        FakeScraper.instances += 1
+        self.kwargs = kwargs
+
+
+def test_registry_builds_each_scraper_once_on_first_use():
+    """keys() no construye nada; get() construye una sola vez por tienda"""
+    FakeScraper.instances = 0
+    registry = ScraperRegistry({'Fake': (__name__, 'FakeScraper')}, use_selenium=False)
+
+    assert registry.keys() == ['Fake'] and 'Fake' in registry
+    assert not registry.is_loaded('Fake') and FakeScraper.instances == 0
+
+    scraper = registry.get('Fake')
+    assert registry.get('Fake') is scraper
+    assert FakeScraper.instances == 1
+    assert scraper.kwargs == {'use_selenium': False}
+    assert registry.get('Otra') is None
+
+
+def test_importing_main_does_not_load_scraping_stack():
+    """Importar la API no carga BeautifulSoup, requests ni Selenium"""
+    code = ("import sys, main; "
+            "print(','.join(m for m in ('bs4', 'requests', 'selenium', 'numpy') if m in sys.modules))")
+    env = dict(os.environ, ENRICHMENT_CACHE_PATH='')
+    output = subprocess.run([sys.executable, '-c', code], cwd=ROOT_DIR, env=env,
+                            capture_output=True, text=True, check=True).stdout
+
+    assert output.strip().splitlines()[-1:] in ([], [''])
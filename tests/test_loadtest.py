@@ -0,0 +1,75 @@
+"""
+Pruebas del generador de carga: catálogo sintético, percentiles y cliente HTTP
+"""
+import sys
+import os
+import asyncio
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT_DIR)
+sys.path.insert(0, os.path.join(ROOT_DIR, 'benchmarks'))
+
+import pytest
+
+from database import Database
+from loadtest import HttpConnection, build_catalog, percentile, summarize
+
+
+def test_summarize_percentiles_and_errors():
+    """p50/p95/p99 por endpoint y fila total con errores y req/s"""
+    samples = {
+        '/api/mobile/latest': [(200, ms / 1000) for ms in range(1, 101)],
+        '/api/search': [(200, 0.005), (500, 0.010)],
+    }
+
+    result = summarize(samples, elapsed=2.0)
+
+    latest = result['endpoints']['/api/mobile/latest']
+    assert (latest['p50_ms'], latest['p95_ms'], latest['p99_ms']) == (50.0, 95.0, 99.0)
+    assert latest['rps'] == 50.0
+    assert result['endpoints']['/api/search']['errors'] == 1
+    assert result['endpoints']['total']['requests'] == 102
+    assert percentile([], 95) == 0.0
+
+
+def test_build_catalog_has_history_and_deals(tmp_path):
+    """El catálogo sintético tiene el tamaño pedido, historial de precios y ofertas"""
+    db_path = str(tmp_path / 'catalog.db')
+
+    assert build_catalog(db_path, 300) == 300
+
+    conn = Database(db_path).get_connection()
+    history = conn.execute("SELECT COUNT(*) FROM price_history").fetchone()[0]
+    conn.close()
+    assert history > 300  # one row per insert plus the repriced slice
+    assert Database(db_path).get_deals(limit=5)
+
+
+def test_timed_out_request_drops_the_connection():
+    """Tras un timeout no se reutiliza el socket: la respuesta tardía no se leería como la siguiente"""
+    async def scenario():
+        served = []
+
+        async def handle(reader, writer):
+            try:
+                while True:
+                    await reader.readuntil(b'\r\n\r\n')
+                    served.append(1)
+                    if len(served) == 1:
+                        await asyncio.sleep(0.2)  # Answers after the client gave up
+                    body = str(len(served)).encode()
+                    writer.write(b'HTTP/1.1 200 OK\r\nContent-Length: %d\r\n\r\n%s' % (len(body), body))
+                    await writer.drain()
+            except (asyncio.IncompleteReadError, ConnectionError):
+                writer.close()
+
+        server = await asyncio.start_server(handle, '127.0.0.1', 0)
+        connection = HttpConnection('127.0.0.1', server.sockets[0].getsockname()[1])
+        with pytest.raises(asyncio.TimeoutError):
+            await connection.get('/lenta', timeout=0.05)
+        status, body = await connection.get('/rapida')
+        await connection.close()
+        server.close()
+        return status, body
+
+    assert asyncio.run(scenario()) == (200, b'2')
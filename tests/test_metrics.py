@@ -0,0 +1,76 @@
+"""
+Pruebas del registro de métricas y del endpoint /metrics (formato Prometheus)
+"""
+import sys
+import os
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT_DIR)
+
+import pytest
+
+from database import Database
+from metrics import Registry, DB_CALL_SECONDS
+
+
+def test_histogram_renders_cumulative_buckets():
+    registry = Registry()
+    latency = registry.histogram('latencia_seconds', 'Latencia', ('route',), buckets=(0.1, 1.0))
+    for value in (0.05, 0.5, 0.5, 3.0):
+        latency.observe(value, route='/a')
+
+    lines = registry.render().splitlines()
+
+    assert '# TYPE pcscraper_latencia_seconds histogram' in lines
+    assert 'pcscraper_latencia_seconds_bucket{route="/a",le="0.1"} 1' in lines
+    assert 'pcscraper_latencia_seconds_bucket{route="/a",le="1"} 3' in lines
+    assert 'pcscraper_latencia_seconds_bucket{route="/a",le="+Inf"} 4' in lines
+    assert 'pcscraper_latencia_seconds_count{route="/a"} 4' in lines
+    with pytest.raises(ValueError):
+        latency.observe(1.0, ruta='/a')
+
+
+def test_database_methods_are_timed(tmp_path):
+    db = Database(str(tmp_path / 'test.db'))
+    db.init_db()
+    before = DB_CALL_SECONDS.count(method='get_products')
+
+    db.get_products()
+
+    assert DB_CALL_SECONDS.count(method='get_products') == before + 1
+
+
+def test_metrics_endpoint(tmp_path, monkeypatch):
+    from fastapi.testclient import TestClient
+    import main
+    from scrapers import price_parser  # Parser caches are reported once a scraper has loaded them
+
+    price_parser.parse_price('S/ 1,299.00')
+    db = Database(str(tmp_path / 'test.db'))
+    db.init_db()
+    db.save_scrape_spans('run1', [
+        {'store': 'sercoplus', 'category': 'procesadores', 'page': page, 'stage': 'page', 'parent': None,
+         'calls': 1, 'total_ms': 1000.0, 'self_ms': 100.0, 'max_ms': 1000.0}
+        for page in (1, 2)
+    ] + [
+        {'store': 'sercoplus', 'category': 'procesadores', 'page': 1, 'stage': 'selenium_wait', 'parent': 'fetch',
+         'calls': 1, 'total_ms': 500.0, 'self_ms': 500.0, 'max_ms': 500.0},
+        {'store': 'sercoplus', 'category': 'procesadores', 'page': 2, 'stage': 'fetch_error', 'parent': 'fetch',
+         'calls': 3, 'total_ms': 0.0, 'self_ms': 0.0, 'max_ms': 0.0},
+    ])
+    monkeypatch.setattr(main, 'db', db)
+    client = TestClient(main.app)
+
+    assert client.get('/api/products/999999/history').status_code == 404
+    response = client.get('/metrics')
+
+    assert response.status_code == 200
+    assert response.headers['content-type'].startswith('text/plain; version=0.0.4')
+    body = response.text
+    assert 'pcscraper_http_requests_total{method="GET",route="/api/products/{product_id}/history",status="404"}' in body
+    assert 'pcscraper_db_call_duration_seconds_count{method="get_scrape_metrics"}' in body
+    assert 'pcscraper_scrape_pages_total{store="sercoplus"} 2' in body
+    assert 'pcscraper_scrape_fetch_errors_total{store="sercoplus"} 3' in body
+    assert 'pcscraper_scrape_pages_per_second{store="sercoplus"} 1' in body
+    assert 'pcscraper_scrape_selenium_utilization{store="sercoplus"} 0.25' in body
+    assert 'pcscraper_cache_requests_total{cache="parse_price",result="hit"}' in body
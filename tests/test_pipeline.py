@@ -0,0 +1,147 @@
+"""
+Pruebas del pipeline de scraping (scraper -> cola -> BD / snapshot)
+"""
+import sys
+import os
+import json
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from database import Database
+from pipeline import _STOP, BatchUpserter, JsonSnapshotSink, iter_store_pages, run_store
+
+
+class FakeScraper:
+    """Scraper falso que entrega páginas fijas por categoría"""
+
+    def __init__(self, pages_per_category=3, products_per_page=4):
+        self.pages_per_category = pages_per_category
+        self.products_per_page = products_per_page
+
+    def iter_category_pages(self, url, max_pages=None):
+        pages = self.pages_per_category if not max_pages else min(max_pages, self.pages_per_category)
+        for page in range(pages):
+            yield [
+                {
+                    'name': f'{url} producto {page}-{i}',
+                    'price_usd': 10.0 + i,
+                    'price_local': 35.0 + i,
+                    'stock': '+10',
+                    'source_url': f'{url}/p{page}-{i}',
+                    'image_url': '',
+                }
+                for i in range(self.products_per_page)
+            ]
+
+
+def make_db(tmp_path):
+    db = Database(str(tmp_path / 'test.db'))
+    db.init_db()
+    return db
+
+
+def test_run_store_streams_to_db_and_snapshot(tmp_path):
+    db = make_db(tmp_path)
+    snapshot = tmp_path / 'products.json'
+    categories = {'procesadores': 'https://x/cpu', 'memorias-ram': 'https://x/ram'}
+
+    stats = run_store(FakeScraper(), 'sercoplus', categories, db=db,
+                      sinks=[JsonSnapshotSink(str(snapshot))])
+
+    assert stats['total_products'] == 24
+    assert stats['categories'] == {'procesadores': 12, 'memorias-ram': 12}
+    assert stats['saved'] == {'inserted': 24, 'updated': 0, 'errors': 0}
+
+    conn = db.get_connection()
+    rows = conn.execute(
+        "SELECT component_type, COUNT(*) AS n FROM products WHERE store = 'sercoplus' GROUP BY component_type"
+    ).fetchall()
+    conn.close()
+    assert {row['component_type']: row['n'] for row in rows} == stats['categories']
+
+    data = json.loads(snapshot.read_text(encoding='utf-8'))
+    assert data['total_products'] == 24
+    assert [len(products) for products in data['categories'].values()] == [12, 12]
+
+
+def test_rerun_updates_instead_of_inserting(tmp_path):
+    db = make_db(tmp_path)
+    categories = {'procesadores': 'https://x/cpu'}
+
+    run_store(FakeScraper(), 'sercoplus', categories, db=db)
+    stats = run_store(FakeScraper(), 'sercoplus', categories, db=db, max_pages=1)
+
+    assert stats['saved'] == {'inserted': 0, 'updated': 4, 'errors': 0}
+
+
+def test_upserter_flushes_in_batches(tmp_path):
+    db = make_db(tmp_path)
+    calls = []
+    original = db.upsert_products
+
+    def counting_upsert(products):
+        calls.append(len(products))
+        return original(products)
+
+    db.upsert_products = counting_upsert
+
+    with BatchUpserter(db, batch_size=5, max_pending_pages=2) as upserter:
+        pages = iter_store_pages(FakeScraper(pages_per_category=5), 'sercoplus',
+                                 {'procesadores': 'https://x/cpu'})
+        for category_key, products in pages:
+            upserter.put('sercoplus', category_key, products)
+
+    assert sum(calls) == 20
+    assert max(calls) <= 8  # never more than one buffered page past batch_size
+    assert upserter.counts['sercoplus']['inserted'] == 20
+
+
+def test_upserter_reports_errors_of_the_final_flush(tmp_path):
+    """Si falla el lote que se vacía tras la señal de fin, el error queda en upserter.error"""
+    db = make_db(tmp_path)
+
+    def failing_upsert(products):
+        raise RuntimeError('disco lleno')
+
+    db.upsert_products = failing_upsert
+    page = next(FakeScraper().iter_category_pages('https://x/cpu'))
+    upserter = BatchUpserter(db, batch_size=100)
+    # Queued before the writer starts: nothing is flushed until after _STOP
+    upserter.put('sercoplus', 'procesadores', page)
+    upserter.put('sercoplus', 'procesadores', page)
+    upserter._queue.put(_STOP)
+    upserter.start()
+    upserter.close()
+
+    assert str(upserter.error) == 'disco lleno'
+
+
+def flooding_scrape_store(store_key, product_queue, max_pages=None):
+    """scrape_store falso: más páginas de las que caben en la cola acotada"""
+    for page in range(20):
+        product_queue.put((store_key, 'procesadores', [{'name': f'{store_key} {page}', 'price_usd': 1.0,
+                                                         'source_url': f'https://{store_key}/{page}'}]))
+    product_queue.put((store_key, None, None))
+    return {'store': store_key, 'products': 20, 'categories': {}, 'spans': [], 'error': None, 'seconds': 0.0}
+
+
+def test_orchestrator_survives_writer_failure(tmp_path, monkeypatch):
+    """Si el escritor falla, la cola se sigue vaciando (sin bloqueo) y cada tienda reporta el error"""
+    sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'scripts'))
+    import run_all_scrapers_complete as orchestrator
+
+    db = make_db(tmp_path)
+
+    def failing_upsert(products):
+        raise RuntimeError('disco lleno')
+
+    db.upsert_products = failing_upsert
+    # Forked pool workers see the patched function
+    monkeypatch.setattr(orchestrator, 'scrape_store', flooding_scrape_store)
+
+    results = orchestrator.run_all_stores(['sercoplus', 'pcimpacto'], db)
+
+    assert {key: result['error'] for key, result in results.items()} == {
+        'sercoplus': 'El escritor de la BD falló: disco lleno',
+        'pcimpacto': 'El escritor de la BD falló: disco lleno',
+    }
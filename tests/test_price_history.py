@@ -0,0 +1,109 @@
+"""
+Pruebas de rollups diarios/semanales y compactación de price_history
+"""
+import sys
+import os
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT_DIR)
+
+import pytest
+
+from database import Database
+
+
+@pytest.fixture
+def db(tmp_path):
+    database = Database(str(tmp_path / 'test.db'))
+    database.init_db()
+    return database
+
+
+def add_history(db, product_id, rows):
+    conn = db.get_connection()
+    conn.executemany("""
+        INSERT INTO price_history (product_id, price_usd, price_local, stock, recorded_at)
+        VALUES (?, ?, ?, ?, ?)
+    """, [(product_id, price, price * 3.7, stock, at) for at, price, stock in rows])
+    conn.commit()
+    conn.close()
+
+
+def rollups(db, resolution):
+    conn = db.get_connection()
+    rows = conn.execute("""
+        SELECT bucket_start, min_price_usd, max_price_usd, price_usd, stock, samples
+        FROM price_rollups WHERE product_id = 1 AND resolution = ?
+        ORDER BY bucket_start
+    """, (resolution,)).fetchall()
+    conn.close()
+    return [tuple(row) for row in rows]
+
+
+def test_daily_and_weekly_buckets(db):
+    add_history(db, 1, [
+        ('2024-01-01 08:00:00', 100.0, '5'),   # Monday
+        ('2024-01-01 20:00:00', 90.0, '3'),
+        ('2024-01-03 10:00:00', 95.0, '3'),
+        ('2024-01-08 10:00:00', 80.0, '0'),    # next Monday
+    ])
+
+    assert db.rollup_price_history()['rows_rolled_up'] == 4
+
+    assert rollups(db, 'day') == [
+        ('2024-01-01', 90.0, 100.0, 90.0, '3', 2),
+        ('2024-01-03', 95.0, 95.0, 95.0, '3', 1),
+        ('2024-01-08', 80.0, 80.0, 80.0, '0', 1),
+    ]
+    assert rollups(db, 'week') == [
+        ('2024-01-01', 90.0, 100.0, 95.0, '3', 3),
+        ('2024-01-08', 80.0, 80.0, 80.0, '0', 1),
+    ]
+
+
+def test_incremental_rollup_merges_into_existing_buckets(db):
+    add_history(db, 1, [('2024-01-01 08:00:00', 100.0, '5')])
+    db.rollup_price_history()
+    add_history(db, 1, [('2024-01-01 20:00:00', 110.0, '2')])
+
+    assert db.rollup_price_history()['rows_rolled_up'] == 1
+    assert db.rollup_price_history()['rows_rolled_up'] == 0
+    assert rollups(db, 'day') == [('2024-01-01', 100.0, 110.0, 110.0, '2', 2)]
+
+
+def test_compaction_keeps_rollups_and_latest_row(db):
+    add_history(db, 1, [
+        ('2024-01-01 08:00:00', 100.0, '5'),
+        ('2024-01-02 08:00:00', 90.0, '5'),
+        ('2024-01-03 08:00:00', 85.0, '5'),
+    ])
+
+    result = db.rollup_price_history(compact_after_days=30)
+
+    assert result['rows_compacted'] == 2
+    assert [row['price_usd'] for row in db.get_price_history(1)] == [85.0]
+    series = db.get_price_series(1, 'day')
+    assert [point['price_usd'] for point in series['points']] == [100.0, 90.0, 85.0]
+
+
+def test_series_is_bounded_and_includes_unrolled_rows(db):
+    add_history(db, 1, [(f'2024-02-{day:02d} 12:00:00', 100.0 - day, '5') for day in range(1, 21)])
+    db.rollup_price_history()
+    add_history(db, 1, [('2024-02-20 18:00:00', 50.0, '1')])
+
+    series = db.get_price_series(1, 'day', max_points=5)
+
+    assert [point['t'] for point in series['points']] == [
+        '2024-02-16', '2024-02-17', '2024-02-18', '2024-02-19', '2024-02-20'
+    ]
+    last = series['points'][-1]
+    assert (last['min_price_usd'], last['max_price_usd'], last['price_usd']) == (50.0, 80.0, 50.0)
+    assert len(db.get_price_series(1, 'raw', max_points=5)['points']) == 5
+
+
+def test_auto_resolution_picks_coarser_buckets_for_long_ranges(db):
+    add_history(db, 1, [('2020-01-06 12:00:00', 100.0, '5'), ('2020-01-07 12:00:00', 90.0, '5')])
+    db.rollup_price_history()
+
+    assert db.get_price_series(1, max_points=500)['resolution'] == 'week'
+    assert db.get_price_series(1, max_points=5000)['resolution'] == 'day'
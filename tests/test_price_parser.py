@@ -0,0 +1,71 @@
+"""
+Pruebas del parser compilado de precios y stock
+"""
+import sys
+import os
+
+import pytest
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT_DIR, 'scrapers'))
+sys.path.insert(0, os.path.join(ROOT_DIR, 'benchmarks'))
+
+from price_parser import normalize_price_number, parse_labeled_stock, parse_price, parse_stock
+from bench_price_parser import legacy_parse_price, legacy_parse_stock, load_samples
+
+
+@pytest.mark.parametrize('text, usd, local', [
+    ('$91,80 (S/319,46)', 91.80, 319.46),
+    ('$131.00 - S/445.40', 131.00, 445.40),
+    ('$389.00 - S/1 326.49', 389.00, 1326.49),
+    ('$3 270.00 - S/11 150.70', 3270.00, 11150.70),
+    ('$ 345.00 ó S/ 1,186.50', 345.00, 1186.50),
+    ('$ 1.953,67 (S/ 2.444,00)', 1953.67, 2444.00),
+    ('$\xa026,00\xa0\xa0\xa0(S/\xa089,70)', 26.00, 89.70),
+    ('$3  270.00 - S/11 150.70', 3270.00, 11150.70),
+])
+def test_docstring_formats(text, usd, local):
+    assert parse_price(text) == {'price_usd': usd, 'price_local': local, 'currency': 'PEN'}
+
+
+def test_usd_only_and_missing():
+    assert parse_price('$ 1,000') == {'price_usd': 1000.0, 'currency': 'USD'}
+    assert parse_price('Consultar precio') == {}
+
+
+def test_local_only():
+    assert parse_price('S/ 89,70') == {'price_local': 89.70, 'currency': 'PEN'}
+
+
+def test_result_is_a_fresh_dict():
+    prices = parse_price('$10.00 (S/35.00)')
+    prices['name'] = 'x'
+    assert 'name' not in parse_price('$10.00 (S/35.00)')
+
+
+@pytest.mark.parametrize('text, expected', [
+    ('1.953,67', '1953.67'), ('1,953.67', '1953.67'), ('1 326.49', '1326.49'),
+    ('91,80', '91.80'), ('1,000', '1000'), ('1.953.456', '1953456'), ('91.80', '91.80'),
+])
+def test_normalize_price_number(text, expected):
+    assert normalize_price_number(text) == expected
+
+
+def test_matches_legacy_parser_on_fixtures():
+    prices, stocks = load_samples()
+
+    for text, usd, local in prices:
+        assert parse_price(text) == {'price_usd': usd, 'price_local': local, 'currency': 'PEN'}
+        legacy = legacy_parse_price(text)
+        if legacy.get('price_local') == local:
+            assert parse_price(text) == legacy
+
+    for text in stocks + ['Últimas unidades', 'Pocas unidades', 'Disponible', '']:
+        assert parse_stock(text) == legacy_parse_stock(text)
+
+
+def test_labeled_stock():
+    assert parse_labeled_stock('Stock: Mayor a 10 Artículos') == '+10'
+    assert parse_labeled_stock('Stock: 3 Artículos') == '3'
+    assert parse_labeled_stock('Stock: Agotado') == '0'
+    assert parse_labeled_stock('Sin información') == 'unknown'
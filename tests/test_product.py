@@ -0,0 +1,90 @@
+"""
+Pruebas del registro Product (slots, to_row/to_json y acceso tipo dict)
+"""
+import sys
+import os
+import json
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from database import Database
+from scrapers.product import PRODUCT_FIELDS, Product
+from snapshots import NdjsonSnapshotSink, iter_snapshot
+
+
+def make_product(i=0):
+    return Product(name=f'Procesador AMD Ryzen 5 {i}', normalized_name=f'AMD RYZEN 5 {i}',
+                   component_type='procesadores', brand='AMD', price_usd=100.0 + i,
+                   price_local=350.0, stock='+10', store='sercoplus',
+                   source_url=f'https://x/p{i}', last_scraped='2025-01-01T00:00:00')
+
+
+def test_dict_style_access():
+    product = make_product()
+    product['store'] = 'pcimpacto'
+
+    assert product.store == 'pcimpacto'
+    assert product.get('price_usd') == 100.0
+    assert product.get('unknown', 'x') == 'x'
+    assert product['metadata'] == {}
+    assert list(dict(product)) == list(PRODUCT_FIELDS)
+    assert not hasattr(product, '__dict__')
+
+
+def test_to_row_and_to_json():
+    product = make_product()
+    product.metadata = {'sku_source': 'card'}
+
+    row = product.to_row()
+    assert len(row) == len(PRODUCT_FIELDS)
+    assert row[PRODUCT_FIELDS.index('metadata')] == '{"sku_source": "card"}'
+    # No local price is NULL, as for the dictionaries before Product
+    assert Product(name='x', price_usd=1.0).to_row()[PRODUCT_FIELDS.index('price_local')] is None
+
+    data = json.loads(product.to_json())
+    assert data['name'] == product.name
+    assert Product.from_dict(data) == product
+
+
+def test_uses_less_memory_than_dicts():
+    def measure(factory):
+        tracemalloc.start()
+        items = [factory(i) for i in range(2000)]
+        size = tracemalloc.get_traced_memory()[0]
+        tracemalloc.stop()
+        assert len(items) == 2000
+        return size
+
+    slotted = measure(make_product)
+    dicts = measure(lambda i: {**make_product(i).to_dict(), 'metadata': {}})
+    assert slotted < dicts * 0.7
+
+
+def test_database_and_snapshot_accept_products(tmp_path):
+    db = Database(str(tmp_path / 'test.db'))
+    db.init_db()
+
+    products = [make_product(i) for i in range(3)]
+    assert db.upsert_products(products) == {'inserted': 3, 'updated': 0, 'errors': 0}
+    # Plain dictionaries still work and hit the same rows
+    assert db.upsert_products([p.to_dict() for p in products]) == {'inserted': 0, 'updated': 3, 'errors': 0}
+
+    sink = NdjsonSnapshotSink(str(tmp_path / 'products.ndjson'))
+    sink.write('procesadores', products)
+    sink.close()
+    assert [Product.from_dict(row) for row in iter_snapshot(sink.path)] == products
+
+
+def test_rescrape_without_changes_adds_no_history(tmp_path):
+    """Sin stock se guarda 'unknown': volver a scrapear igual no escribe historial"""
+    db = Database(str(tmp_path / 'test.db'))
+    db.init_db()
+    product = make_product()
+    product.stock = None
+
+    db.upsert_products([product])
+    db.upsert_products([product])
+
+    history = db.get_price_history(db.get_products()[0]['id'])
+    assert [(row['price_usd'], row['stock']) for row in history] == [(100.0, 'unknown')]
@@ -0,0 +1,87 @@
+"""
+Pruebas del profiler de consultas SQL y de /api/admin/queries
+"""
+import sys
+import os
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT_DIR)
+
+from types import SimpleNamespace
+
+from database import Database
+from profiler import QueryProfiler, normalize_sql, params_shape
+
+
+def make_product(i, store='sercoplus'):
+    return {'name': f'Producto {i}', 'component_type': 'procesadores', 'brand': 'AMD',
+            'price_usd': 100.0 + i, 'store': store, 'source_url': f'https://{store}.test/p/{i}'}
+
+
+def test_normalize_sql_folds_literals_and_in_lists():
+    """Literales, listas IN y espacios no generan entradas distintas"""
+    sql = """SELECT * FROM products
+             WHERE store = 'sercoplus' AND price_usd > 10.5 AND id IN (?, ?, ?)"""
+
+    assert normalize_sql(sql) == 'SELECT * FROM products WHERE store = ? AND price_usd > ? AND id IN (?...)'
+    assert params_shape(('a', 1, None)) == '(str, int, NoneType)'
+    assert params_shape({'store': 'x'}) == '{store: str}'
+
+
+def test_profiler_aggregates_database_methods(tmp_path):
+    """Cada consulta se atribuye al método de Database con filas y forma de parámetros"""
+    profiler = QueryProfiler(threshold_ms=0)  # Todo es "lento": se captura el plan
+    db = Database(str(tmp_path / 'test.db'), profiler=profiler)
+    db.init_db()
+    for i in range(3):
+        db.insert_product(make_product(i))
+    profiler.reset()
+
+    db.get_products(0, 50, SimpleNamespace(component_type='procesadores', brand=None, store='sercoplus',
+                                           min_price=None, max_price=None))
+    db.get_products(0, 50, SimpleNamespace(component_type='procesadores', brand=None, store='pcimpacto',
+                                           min_price=None, max_price=None))
+    db.count_products()
+
+    entries = {entry['method']: entry for entry in profiler.report(order='calls')}
+    listing = entries['get_products']
+    assert listing['calls'] == 2
+    assert listing['rows'] == 3
+    assert listing['shapes'] == ['(str, str, int, int)']
+    assert 'store = ?' in listing['sql'] and 'sercoplus' not in listing['sql']
+    assert any(step.startswith(('SCAN', 'SEARCH')) for step in listing['plan'])
+    assert entries['count_products']['rows'] == 1
+
+    slow = profiler.slow_queries()
+    assert slow[0]['method'] == 'count_products'
+    assert len(slow) == 3
+
+
+def test_admin_queries_endpoint(tmp_path, monkeypatch):
+    """El informe exige el token de administración y 404 si el profiler está desactivado"""
+    from fastapi.testclient import TestClient
+    import main
+
+    profiler = QueryProfiler(threshold_ms=1000)
+    db = Database(str(tmp_path / 'test.db'), profiler=profiler)
+    db.init_db()
+    profiler.reset()
+    monkeypatch.setattr(main, 'db', db)
+    monkeypatch.setattr(main.config, 'ADMIN_TOKEN', 'secreto')
+    client = TestClient(main.app)
+
+    client.get('/api/products')
+    assert client.get('/api/admin/queries').status_code == 403
+
+    response = client.get('/api/admin/queries', params={'order': 'max'}, headers={'X-Admin-Token': 'secreto'})
+    assert response.status_code == 200
+    methods = {entry['method'] for entry in response.json()['queries']}
+    assert {'get_products', 'count_products'} <= methods
+    assert client.get('/api/admin/queries', params={'order': 'x'},
+                      headers={'X-Admin-Token': 'secreto'}).status_code == 400
+
+    assert client.post('/api/admin/queries/reset', headers={'X-Admin-Token': 'secreto'}).status_code == 200
+    assert profiler.report() == []
+
+    monkeypatch.setattr(main, 'db', Database(str(tmp_path / 'test.db')))
+    assert client.get('/api/admin/queries', headers={'X-Admin-Token': 'secreto'}).status_code == 404
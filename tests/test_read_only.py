@@ -0,0 +1,65 @@
+"""
+Pruebas del modo de solo lectura (workers de scripts/serve.py)
+"""
+import sys
+import os
+import sqlite3
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT_DIR)
+
+import pytest
+
+from database import Database
+
+
+def make_product(i):
+    return {'name': f'Procesador {i}', 'component_type': 'procesadores', 'brand': 'AMD',
+            'price_usd': 100.0 + i, 'store': 'sercoplus', 'source_url': f'https://sercoplus.test/p/{i}'}
+
+
+@pytest.fixture
+def db_path(tmp_path):
+    path = str(tmp_path / 'test.db')
+    writer = Database(path)
+    writer.init_db()
+    assert writer.enable_wal() == 'wal'
+    writer.upsert_products([make_product(i) for i in range(3)])
+    return path
+
+
+def test_read_only_database_reads_but_never_writes(db_path):
+    """Las lecturas funcionan y cualquier escritura falla, mientras el writer sigue escribiendo"""
+    reader = Database(db_path, read_only=True)
+
+    assert reader.count_products() == 3
+    assert reader.upsert_products([make_product(10)])['errors'] == 1
+    with pytest.raises(sqlite3.OperationalError):
+        reader.get_connection().execute("DELETE FROM products")
+
+    # WAL: the writer commits while a reader holds an open read transaction
+    conn = reader.get_connection()
+    conn.execute("BEGIN")
+    assert conn.execute("SELECT COUNT(*) FROM products").fetchone()[0] == 3
+    Database(db_path).upsert_products([make_product(11)])
+    assert conn.execute("SELECT COUNT(*) FROM products").fetchone()[0] == 3  # Snapshot isolation
+    conn.close()
+    assert reader.count_products() == 4
+
+
+def test_read_only_api_rejects_writes(db_path, monkeypatch):
+    """Los endpoints de escritura responden 503 y los de lectura siguen funcionando"""
+    from fastapi.testclient import TestClient
+    import main
+
+    monkeypatch.setattr(main, 'db', Database(db_path, read_only=True))
+    client = TestClient(main.app)
+
+    assert client.get('/api/products').json()['total'] == 3
+    response = client.post('/api/products', json={'name': 'X', 'price': 10, 'url': 'https://x.test/1',
+                                                  'store_name': 'sercoplus'})
+    assert response.status_code == 503
+    assert client.post('/api/products/bulk', content=b'{}').status_code == 503
+    product_id = client.get('/api/products').json()['products'][0]['id']
+    assert client.delete(f'/api/products/{product_id}').status_code == 503
+    assert client.get('/api/products').json()['total'] == 3
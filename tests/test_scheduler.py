@@ -0,0 +1,195 @@
+"""
+Pruebas del scheduler concurrente (un slot por tienda, límite global)
+"""
+import sys
+import os
+import time
+import threading
+from datetime import datetime, timedelta
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT_DIR)
+sys.path.insert(0, os.path.join(ROOT_DIR, 'scripts'))
+
+import scheduler as scheduler_module
+from database import Database
+from scheduler import ScrapingScheduler
+
+
+class SlowScraper:
+    """Scraper falso que registra cuántas tareas corren a la vez"""
+
+    def __init__(self, store_name, tracker):
+        self.store_name = store_name
+        self.tracker = tracker
+
+    def scrape_category_page(self, url):
+        self.tracker.enter(self.store_name)
+        threading.Event().wait(0.1)  # time.sleep is patched out below
+        self.tracker.leave(self.store_name)
+        return [{'name': url, 'store': self.store_name, 'source_url': url, 'price_usd': 1.0}]
+
+
+class Tracker:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.active = {}
+        self.max_total = 0
+        self.max_per_store = 0
+
+    def enter(self, store):
+        with self.lock:
+            self.active[store] = self.active.get(store, 0) + 1
+            self.max_per_store = max(self.max_per_store, self.active[store])
+            self.max_total = max(self.max_total, sum(self.active.values()))
+
+    def leave(self, store):
+        with self.lock:
+            self.active[store] -= 1
+
+
+def make_scheduler(tmp_path, monkeypatch, stores, tasks_per_store, max_workers):
+    monkeypatch.setattr(scheduler_module.time, 'sleep', lambda seconds: None)
+    db = Database(str(tmp_path / 'test.db'))
+    db.init_db()
+
+    tracker = Tracker()
+    scheduler = ScrapingScheduler(db, max_workers=max_workers)
+    scheduler.scrapers = {store: SlowScraper(store, tracker) for store in stores}
+
+    past = (datetime.now() - timedelta(hours=1)).isoformat()
+    conn = db.get_connection()
+    for store in stores:
+        for i in range(tasks_per_store):
+            conn.execute("""
+                INSERT INTO scraping_schedule (store_name, url, category, frequency_hours, next_run, is_active)
+                VALUES (?, ?, ?, 24, ?, 1)
+            """, (store, f'https://{store}/{i}', f'cat{i}', past))
+    conn.commit()
+    conn.close()
+    return scheduler, tracker
+
+
+def test_backlog_drains_in_parallel_with_one_slot_per_store(tmp_path, monkeypatch):
+    stores = ['A', 'B', 'C', 'D']
+    scheduler, tracker = make_scheduler(tmp_path, monkeypatch, stores, 2, max_workers=3)
+
+    started = time.perf_counter()
+    results = scheduler.check_and_run_tasks()
+    elapsed = time.perf_counter() - started
+
+    assert sorted(results) == stores
+    assert all(r['status'] == 'success' for store in stores for r in results[store])
+    assert tracker.max_per_store == 1
+    assert tracker.max_total == 3
+    assert elapsed < 8 * 0.1  # faster than running the 8 tasks one by one
+    assert scheduler.get_pending_tasks() == []
+
+
+class BlockedScraper:
+    """Scraper falso que no termina hasta que se libera"""
+
+    def __init__(self):
+        self.release = threading.Event()
+
+    def scrape_category_page(self, url):
+        self.release.wait(5)
+        return [{'name': url, 'store': 'A', 'source_url': url, 'price_usd': 1.0}]
+
+
+def test_checks_do_not_wait_for_running_stores(tmp_path, monkeypatch):
+    """Un check no espera a las tiendas en curso: una tienda ociosa arranca en el siguiente"""
+    scheduler, tracker = make_scheduler(tmp_path, monkeypatch, ['A'], 1, max_workers=2)
+    blocked = scheduler.scrapers['A'] = BlockedScraper()
+
+    first = scheduler.check_and_run_tasks(wait=False)
+    assert not first['A'].done()
+
+    scheduler.scrapers['B'] = SlowScraper('B', tracker)
+    scheduler.add_scraping_task('B', 'https://B/0', 'cat0', frequency_hours=0)
+    second = scheduler.check_and_run_tasks(wait=False)
+
+    assert list(second) == ['B']  # A is still busy, B does not wait for it
+    assert second['B'].result(timeout=5)[0]['status'] == 'success'
+    assert not first['A'].done()
+    blocked.release.set()
+    assert first['A'].result(timeout=5)[0]['status'] == 'success'
+    scheduler.stop_scheduler()
+
+
+def test_next_run_is_jittered_after_frequency(tmp_path, monkeypatch):
+    scheduler, _ = make_scheduler(tmp_path, monkeypatch, ['A'], 0, max_workers=1)
+    completed_at = datetime(2025, 1, 1, 12, 0)
+
+    next_runs = {scheduler.compute_next_run(completed_at, 24) for _ in range(20)}
+
+    assert all(completed_at + timedelta(hours=24) <= run for run in next_runs)
+    assert all(run <= completed_at + timedelta(hours=24, minutes=scheduler_module.config.SCHEDULER_JITTER_MINUTES)
+               for run in next_runs)
+    assert len(next_runs) > 1
+
+
+def add_history(db, store, url, runs, products, changes_per_run):
+    """Simula runs cada 24 h: cada run cambia changes_per_run productos"""
+    conn = db.get_connection()
+    start = datetime.now() - timedelta(days=runs)
+    for run in range(runs):
+        started_at = start + timedelta(hours=24 * run)
+        completed_at = started_at + timedelta(minutes=5)
+        conn.execute("""
+            INSERT INTO scraping_logs (store_name, url, products_found, products_saved, status,
+                                       started_at, completed_at, price_changes)
+            VALUES (?, ?, ?, ?, 'success', ?, ?, ?)
+        """, (store, url, products, products, started_at.isoformat(), completed_at.isoformat(),
+              changes_per_run))
+    conn.commit()
+    conn.close()
+
+
+def test_frequency_follows_observed_volatility(tmp_path, monkeypatch):
+    scheduler, _ = make_scheduler(tmp_path, monkeypatch, [], 0, max_workers=1)
+    config = scheduler_module.config
+
+    add_history(scheduler.db, 'Volatil', 'https://v', runs=5, products=20, changes_per_run=10)
+    add_history(scheduler.db, 'Medio', 'https://m', runs=5, products=20, changes_per_run=1)
+    add_history(scheduler.db, 'Estable', 'https://e', runs=5, products=20, changes_per_run=0)
+    add_history(scheduler.db, 'Nuevo', 'https://n', runs=1, products=20, changes_per_run=20)
+
+    def frequency(store, url):
+        return scheduler.compute_frequency({'store_name': store, 'url': url, 'frequency_hours': 24})
+
+    assert frequency('Volatil', 'https://v') == config.MIN_SCRAPE_FREQUENCY_HOURS
+    assert frequency('Estable', 'https://e') == config.MAX_SCRAPE_FREQUENCY_HOURS
+    # 5% of the products change per day -> scrape about once a day
+    assert 20 <= frequency('Medio', 'https://m') <= 28
+    # Not enough runs yet: keep the configured frequency
+    assert frequency('Nuevo', 'https://n') == 24
+
+
+def test_runs_record_their_price_changes(tmp_path, monkeypatch):
+    """Cada run guarda sus cambios en scraping_logs: compactar el historial no los borra"""
+    scheduler, _ = make_scheduler(tmp_path, monkeypatch, ['A'], 1, max_workers=1)
+
+    scheduler.check_and_run_tasks()
+    scheduler.db.rollup_price_history(compact_after_days=0)
+
+    assert [log['price_changes'] for log in scheduler.get_scraping_logs()] == [1]
+
+
+def test_adaptive_runs_keep_the_configured_frequency(tmp_path, monkeypatch):
+    """El intervalo adaptado va a su propia columna: frequency_hours sigue siendo el configurado"""
+    scheduler, _ = make_scheduler(tmp_path, monkeypatch, ['A'], 1, max_workers=1)
+    config = scheduler_module.config
+    add_history(scheduler.db, 'A', 'https://A/0', runs=5, products=20, changes_per_run=10)
+
+    scheduler.check_and_run_tasks()
+
+    conn = scheduler.db.get_connection()
+    task = dict(conn.execute("SELECT * FROM scraping_schedule").fetchone())
+    conn.close()
+    assert task['frequency_hours'] == 24
+    assert task['adaptive_frequency_hours'] == config.MIN_SCRAPE_FREQUENCY_HOURS
+
+    # Turning adaptive scheduling off goes back to the configured interval
+    monkeypatch.setattr(config, 'ADAPTIVE_SCHEDULING', False)
+    assert scheduler.compute_frequency(task) == 24
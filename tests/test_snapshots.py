@@ -0,0 +1,87 @@
+"""
+Pruebas de los formatos de snapshot (NDJSON / Parquet / JSON antiguo)
+"""
+import sys
+import os
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from database import Database
+from pipeline import load_snapshot
+from snapshots import (JsonSnapshotSink, NdjsonSnapshotSink, find_snapshot,
+                       iter_snapshot, read_columns)
+
+
+def make_page(category_key, count):
+    return [
+        {
+            'name': f'{category_key} {i}',
+            'component_type': category_key,
+            'price_usd': 10.0 + i,
+            'price_local': 35.0 + i,
+            'stock': '+10' if i % 2 else '',
+            'store': 'sercoplus',
+            'source_url': f'https://x/{category_key}/{i}',
+            'metadata': {'sku_source': 'card'},
+        }
+        for i in range(count)
+    ]
+
+
+def write_snapshot(sink):
+    sink.write('procesadores', make_page('procesadores', 3))
+    sink.write('memorias-ram', make_page('memorias-ram', 2))
+    sink.close()
+    return sink.path
+
+
+def test_ndjson_round_trip(tmp_path):
+    path = write_snapshot(NdjsonSnapshotSink(str(tmp_path / 'products.ndjson')))
+
+    products = list(iter_snapshot(path))
+    assert len(products) == 5
+    assert products[0]['metadata'] == {'sku_source': 'card'}
+
+    columns = read_columns(path, ['store', 'stock'])
+    assert list(columns) == ['store', 'stock']
+    assert columns['stock'] == ['', '+10', '', '', '+10']
+
+
+def test_parquet_round_trip(tmp_path):
+    pytest.importorskip('pyarrow')
+    from snapshots import ParquetSnapshotSink
+
+    path = write_snapshot(ParquetSnapshotSink(str(tmp_path / 'products.parquet')))
+
+    products = list(iter_snapshot(path))
+    assert [p['component_type'] for p in products] == ['procesadores'] * 3 + ['memorias-ram'] * 2
+    assert products[1]['price_usd'] == 11.0
+    assert products[0]['metadata'] == {'sku_source': 'card'}
+
+    assert list(iter_snapshot(path, columns=['stock']))[1] == {'stock': '+10'}
+
+
+def test_find_snapshot_prefers_ndjson(tmp_path):
+    write_snapshot(JsonSnapshotSink(str(tmp_path / 'products.json')))
+    assert find_snapshot(str(tmp_path)).endswith('products.json')
+
+    write_snapshot(NdjsonSnapshotSink(str(tmp_path / 'products.ndjson')))
+    assert find_snapshot(str(tmp_path)).endswith('products.ndjson')
+
+
+def test_load_snapshot_from_legacy_json(tmp_path):
+    path = write_snapshot(JsonSnapshotSink(str(tmp_path / 'products.json')))
+    db = Database(str(tmp_path / 'test.db'))
+    db.init_db()
+
+    stats = load_snapshot(db, path, 'pcimpacto', batch_size=2)
+
+    assert stats['categories'] == {'procesadores': 3, 'memorias-ram': 2}
+    assert stats['saved'] == {'inserted': 5, 'updated': 0, 'errors': 0}
+
+    conn = db.get_connection()
+    stores = {row['store'] for row in conn.execute("SELECT store FROM products")}
+    conn.close()
+    assert stores == {'pcimpacto'}
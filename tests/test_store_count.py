@@ -0,0 +1,84 @@
+"""
+Pruebas de products.store_count (tiendas que ofrecen el mismo producto normalizado)
+"""
+import sys
+import os
+import sqlite3
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT_DIR)
+
+import pytest
+
+from database import Database
+
+
+def product(sku, store, normalized_name, price=100.0):
+    return {
+        'name': normalized_name.title(), 'normalized_name': normalized_name,
+        'store': store, 'sku': sku, 'source_url': f'https://{store}.example/{sku}',
+        'price_usd': price,
+    }
+
+
+def store_counts(db):
+    conn = db.get_connection()
+    rows = conn.execute("SELECT sku, store_count FROM products ORDER BY sku").fetchall()
+    conn.close()
+    return {row['sku']: row['store_count'] for row in rows}
+
+
+@pytest.fixture
+def db(tmp_path):
+    database = Database(str(tmp_path / 'test.db'))
+    database.init_db()
+    return database
+
+
+def test_batch_upsert_maintains_store_count(db):
+    db.upsert_products([
+        product('1', 'sercoplus', 'RTX 4060'),
+        product('2', 'pcimpacto', 'RTX 4060'),
+        product('3', 'cyccomputer', 'RTX 4060 TI'),
+        product('4', 'sercoplus', 'RTX 4060', price=90.0),  # same store twice
+    ])
+    assert store_counts(db) == {'1': 2, '2': 2, '3': 1, '4': 2}
+
+    # Renaming a product refreshes both its old and new group
+    db.insert_product(product('2', 'pcimpacto', 'RTX 4060 TI'))
+    assert store_counts(db) == {'1': 1, '2': 2, '3': 2, '4': 1}
+
+
+def test_delete_refreshes_store_count(db):
+    db.upsert_products([product('1', 'sercoplus', 'RYZEN 5'), product('2', 'pcimpacto', 'RYZEN 5')])
+    product_id = db.get_products()[0]['id']
+
+    db.delete_product(product_id)
+
+    assert list(store_counts(db).values()) == [1]
+
+
+def test_migration_backfills_existing_database(tmp_path):
+    path = str(tmp_path / 'old.db')
+    conn = sqlite3.connect(path)
+    conn.execute("""
+        CREATE TABLE products (
+            id INTEGER PRIMARY KEY AUTOINCREMENT, name TEXT NOT NULL, normalized_name TEXT,
+            component_type TEXT, brand TEXT, sku TEXT, price_usd REAL NOT NULL, price_local REAL,
+            currency TEXT, stock TEXT, store TEXT NOT NULL, source_url TEXT UNIQUE, image_url TEXT,
+            last_scraped TIMESTAMP, created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            is_active INTEGER DEFAULT 1, metadata TEXT
+        )
+    """)
+    conn.executemany("INSERT INTO products (name, normalized_name, sku, price_usd, store) VALUES (?, ?, ?, ?, ?)", [
+        ('a', 'SSD 1TB', '1', 50.0, 'sercoplus'),
+        ('b', 'SSD 1TB', '2', 55.0, 'cyccomputer'),
+        ('c', '', '3', 10.0, 'cyccomputer'),
+    ])
+    conn.commit()
+    conn.close()
+
+    db = Database(path)
+    db.init_db()
+
+    assert store_counts(db) == {'1': 2, '2': 2, '3': 1}
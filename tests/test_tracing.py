@@ -0,0 +1,70 @@
+"""
+Pruebas de los spans de tiempo por etapa de una ejecución de scraping
+"""
+import sys
+import os
+import time
+
+import pytest
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT_DIR)
+sys.path.insert(0, os.path.join(ROOT_DIR, 'benchmarks'))
+
+from fixtures import category_url
+from stub_server import StubServer
+from database import Database
+from pipeline import run_store
+from scrapers.registry import create_scraper
+from scrapers.tracing import Tracer, summarize, format_flame_table
+
+
+def test_nested_spans_split_total_and_self_time():
+    tracer = Tracer(enabled=True)
+    tracer.set_context('tienda', 'cat', 1)
+    with tracer.span('page'):
+        with tracer.span('fetch'):
+            time.sleep(0.02)
+        with tracer.span('fetch'):
+            pass
+
+    rows = {row['stage']: row for row in tracer.collect()}
+
+    assert rows['fetch']['calls'] == 2 and rows['fetch']['parent'] == 'page'
+    assert rows['page']['parent'] is None and rows['page']['page'] == 1
+    assert rows['page']['total_ms'] >= 20
+    assert rows['page']['self_ms'] == pytest.approx(rows['page']['total_ms'] - rows['fetch']['total_ms'],
+                                                    abs=0.01)
+    assert tracer.collect() == []
+
+
+def test_run_store_saves_spans_per_page(tmp_path, monkeypatch, capsys):
+    monkeypatch.setattr(time, 'sleep', lambda seconds: None)
+    db = Database(str(tmp_path / 'test.db'))
+    db.init_db()
+
+    with StubServer() as stub:
+        scraper = create_scraper('cyccomputer', use_selenium=False)
+        stats = run_store(scraper, 'cyccomputer', {'procesadores': category_url(stub.url, 'cyccomputer')},
+                          db=db)
+
+    spans = db.get_scrape_spans()
+    assert spans and all(span['run_id'] == stats['run_id'] for span in spans)
+    assert {span['page'] for span in spans if span['stage'] == 'page'} == {1, 2}
+    assert {'fetch', 'http', 'soup', 'enrich', 'pause', 'db_write'} <= {span['stage'] for span in spans}
+    assert sum(span['calls'] for span in spans if span['stage'] == 'enrich') == stats['total_products']
+
+    order = [entry['stage'] for entry in summarize(spans)]
+    assert order.index('page') < order.index('fetch') < order.index('http')
+    assert 'Tiempo por etapa' in capsys.readouterr().out
+    assert 'db_write' in format_flame_table(spans)
+
+
+def test_default_follows_config(monkeypatch):
+    """Sin enabled explícito, el tracer sigue SCRAPE_TRACING de config (leído después de cargar .env)"""
+    from config import config
+
+    monkeypatch.setattr(config, 'SCRAPE_TRACING', False)
+    assert not Tracer().enabled
+    monkeypatch.setattr(config, 'SCRAPE_TRACING', True)
+    assert Tracer().enabled